@@ -20,8 +20,13 @@ Base utilities to build API operation managers and objects on top of.
 """
 
 import copy
+import itertools
 from urllib import parse as urlparse
 
+from magnumclient.common import httpclient
+from magnumclient.common import utils
+from magnumclient import exceptions
+
 
 def getid(obj):
     """Wrapper to get  object's ID.
@@ -39,6 +44,13 @@ class Manager(object):
     def __init__(self, api):
         self.api = api
 
+    def _json_request(self, method, url, deadline=None, **kwargs):
+        # Only forward a deadline when one is set, so that API objects
+        # predating deadlines keep working.
+        if deadline is not None:
+            kwargs['deadline'] = deadline
+        return self.api.json_request(method, url, **kwargs)
+
     def _create(self, url, body):
         resp, body = self.api.json_request('POST', url, body=body)
         if body:
@@ -59,7 +71,7 @@ class Manager(object):
         return data
 
     def _list_pagination(self, url, response_key=None, obj_class=None,
-                         limit=None):
+                         limit=None, deadline=None):
         """Retrieve a list of items.
 
         The Magnum API is configured to return a maximum number of
@@ -75,7 +87,22 @@ class Manager(object):
         :param obj_class: class for constructing the returned objects.
         :param limit: maximum number of items to return. If None returns
             everything.
+        :param deadline: optional overall time budget in seconds (or a
+            :class:`magnumclient.common.httpclient.Deadline`) shared by all
+            the page requests. DeadlineExceeded is raised once it expires.
+
+        """
+        return list(self._iter_pagination(url, response_key=response_key,
+                                          obj_class=obj_class, limit=limit,
+                                          deadline=deadline))
+
+    def _iter_pagination(self, url, response_key=None, obj_class=None,
+                         limit=None, deadline=None):
+        """Iterate over a paginated list of items.
 
+        Same as :meth:`_list_pagination`, but items are yielded as each page
+        arrives and the next page is only requested once the previous one
+        has been consumed, so a caller can stop paging early.
         """
         if obj_class is None:
             obj_class = self.resource_class
@@ -83,23 +110,17 @@ class Manager(object):
         if limit is not None:
             limit = int(limit)
 
-        object_list = []
+        deadline = httpclient.Deadline.coerce(deadline)
+
         object_count = 0
-        limit_reached = False
         while url:
-            resp, body = self.api.json_request('GET', url)
+            resp, body = self._json_request('GET', url, deadline=deadline)
             data = self._format_body_data(body, response_key)
             for obj in data:
-                object_list.append(obj_class(self, obj, loaded=True))
+                yield obj_class(self, obj, loaded=True)
                 object_count += 1
                 if limit and object_count >= limit:
-                    # break the for loop
-                    limit_reached = True
-                    break
-
-            # break the while loop and return
-            if limit_reached:
-                break
+                    return
 
             url = body.get('next')
             if url:
@@ -109,10 +130,55 @@ class Manager(object):
                 url_parts[0] = url_parts[1] = ''
                 url = urlparse.urlunparse(url_parts)
 
-        return object_list
+    def _iter_list(self, url, response_key=None, limit=None,
+                   deadline=None, filters=None):
+        """Iterate over a list, paginating when a limit is given.
+
+        Without a limit this is :meth:`_list`, with one
+        :meth:`_iter_pagination`. Nothing is requested before the first item
+        is asked for, and pages are only requested as the previous ones are
+        consumed.
+
+        :param filters: client-side filters, see
+                        :func:`magnumclient.common.utils.matches_filters`.
+                        Items not matching them are skipped as the pages
+                        arrive, and a limit then counts the matching items
+                        only: pages keep their size but are requested until
+                        enough items match. A filter on an attribute the
+                        items do not have raises ValidationError.
+        """
+        if not filters:
+            if limit is None:
+                yield from self._list(url, response_key, deadline=deadline)
+            else:
+                yield from self._iter_pagination(url, response_key,
+                                                 limit=limit,
+                                                 deadline=deadline)
+            return
 
-    def _list(self, url, response_key=None, obj_class=None, body=None):
-        resp, body = self.api.json_request('GET', url)
+        if limit is None:
+            items = self._list(url, response_key, deadline=deadline)
+        else:
+            items = self._iter_pagination(url, response_key, limit=0,
+                                          deadline=deadline)
+        matches = (item for item in items
+                   if self._check_filters(item, filters) and
+                   utils.matches_filters(item, filters))
+        yield from itertools.islice(matches, limit or None)
+
+    @staticmethod
+    def _check_filters(item, filters):
+        unknown = sorted(key for key in filters if key not in item._info)
+        if unknown:
+            raise exceptions.ValidationError(
+                'Cannot filter on unknown attributes: %s'
+                % ', '.join(unknown))
+        return True
+
+    def _list(self, url, response_key=None, obj_class=None, body=None,
+              deadline=None):
+        deadline = httpclient.Deadline.coerce(deadline)
+        resp, body = self._json_request('GET', url, deadline=deadline)
 
         if obj_class is None:
             obj_class = self.resource_class
@@ -0,0 +1,146 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Local cache of cluster CA certificates."""
+
+import datetime
+import os
+import re
+import threading
+import time
+
+from cryptography.hazmat.primitives import hashes
+from cryptography import x509
+from oslo_serialization import jsonutils
+
+# Cached CAs are re-downloaded once they are older than this, in case they
+# were rotated by another client.
+DEFAULT_MAX_AGE = 3600
+
+
+def default_path():
+    cache_home = os.environ.get('XDG_CACHE_HOME',
+                                os.path.expanduser('~/.cache'))
+    return os.path.join(cache_home, 'magnumclient', 'ca')
+
+
+def _utcnow():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def parse_ca(pem):
+    """Return the notAfter (ISO 8601, UTC) and SHA-256 fingerprint of a PEM.
+
+    :returns: a ``(not_after, fingerprint)`` tuple, both None if the PEM
+              cannot be parsed.
+    """
+    try:
+        cert = x509.load_pem_x509_certificate(pem.encode('utf-8'))
+    except ValueError:
+        return None, None
+    not_after = getattr(cert, 'not_valid_after_utc', None)
+    if not_after is None:
+        not_after = cert.not_valid_after.replace(
+            tzinfo=datetime.timezone.utc)
+    return (not_after.isoformat(),
+            cert.fingerprint(hashes.SHA256()).hex())
+
+
+class CACache(object):
+    """Cluster CA certificates keyed by cluster UUID.
+
+    Entries hold the PEM with its notAfter and fingerprint. An entry is
+    served until the certificate expires or it is older than ``max_age``
+    seconds, after which the next lookup downloads it again. Entries are
+    kept in memory and, when ``path`` is given, in one JSON file per
+    cluster so that separate command runs share them.
+    """
+
+    def __init__(self, path=None, max_age=DEFAULT_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _file(self, cluster_uuid):
+        if self.path is None or not re.match(r'^[\w-]+$', cluster_uuid):
+            return None
+        return os.path.join(self.path, '%s.json' % cluster_uuid)
+
+    def _load(self, cluster_uuid):
+        entry = self._entries.get(cluster_uuid)
+        path = self._file(cluster_uuid)
+        if entry is None and path is not None:
+            try:
+                with open(path) as f:
+                    entry = jsonutils.loads(f.read())
+            except (OSError, ValueError):
+                return None
+            self._entries[cluster_uuid] = entry
+        return entry
+
+    def get(self, cluster_uuid):
+        """Return the fresh cached entry for a cluster, or None.
+
+        An entry is a dict with ``pem``, ``not_after``, ``fingerprint`` and
+        ``fetched_at`` keys.
+        """
+        with self._lock:
+            entry = self._load(cluster_uuid)
+        if entry is None:
+            return None
+        if time.time() - entry.get('fetched_at', 0) >= self.max_age:
+            return None
+        not_after = entry.get('not_after')
+        if (not_after is not None and
+                datetime.datetime.fromisoformat(not_after) <= _utcnow()):
+            return None
+        return entry
+
+    def put(self, cluster_uuid, pem):
+        """Store the CA PEM of a cluster and return its entry."""
+        not_after, fingerprint = parse_ca(pem)
+        entry = {'pem': pem, 'not_after': not_after,
+                 'fingerprint': fingerprint, 'fetched_at': time.time()}
+        with self._lock:
+            self._entries[cluster_uuid] = entry
+            path = self._file(cluster_uuid)
+            if path is not None:
+                self._write(path, entry)
+        return entry
+
+    def _write(self, path, entry):
+        tmp_path = '%s.%d.%d.tmp' % (path, os.getpid(),
+                                     threading.get_ident())
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                f.write(jsonutils.dumps(entry))
+            os.replace(tmp_path, path)
+        except OSError:
+            # The cache is only an optimization; an unwritable cache
+            # directory must not break the command.
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def invalidate(self, cluster_uuid):
+        """Drop the cached CA of a cluster, e.g. after it was rotated."""
+        with self._lock:
+            self._entries.pop(cluster_uuid, None)
+            path = self._file(cluster_uuid)
+            if path is not None:
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
@@ -16,8 +16,11 @@
 # W0621: Redefining name %s from outer scope
 # pylint: disable=W0603,W0621
 
+import csv
 import getpass
 import inspect
+import itertools
+import json
 import os
 import sys
 import textwrap
@@ -25,11 +28,14 @@ import textwrap
 import decorator
 from magnumclient import exceptions
 from oslo_utils import encodeutils
+from oslo_utils import importutils
 from oslo_utils import strutils
 import prettytable
 
 from magnumclient.i18n import _
 
+wcwidth = importutils.try_import('wcwidth')
+
 
 class MissingArgs(Exception):
     """Supplied arguments are not sufficient for calling a function."""
@@ -164,10 +170,80 @@ def add_arg(func, *args, **kwargs):
         func.arguments.insert(0, (args, kwargs))
 
 
+def _column_accessors(fields, formatters, mixed_case_fields):
+    """Return one callable per field, reading its value from an object."""
+    accessors = []
+    for field in fields:
+        if field in formatters:
+            accessors.append(formatters[field])
+            continue
+        if field in mixed_case_fields:
+            field_name = field.replace(' ', '_')
+        else:
+            field_name = field.lower().replace(' ', '_')
+        accessors.append(
+            lambda o, field_name=field_name: getattr(o, field_name, ''))
+    return accessors
+
+
+def _dash_none(value):
+    return '-' if value is None else value
+
+
+def _text_width(text):
+    if text.isascii():
+        return len(text)
+    width = wcwidth.wcswidth(text) if wcwidth else -1
+    return width if width >= 0 else len(text)
+
+
+def _table_lines(labels, rows, sample_size=None):
+    """Yield the lines of a table of string cells, like prettytable's.
+
+    Column widths come from every row, or from the first sample_size rows
+    only, in which case the remaining rows are rendered as they arrive
+    and a longer cell widens its own row instead of the whole column.
+    """
+    rows = iter(rows)
+    if sample_size:
+        sample = list(itertools.islice(rows, sample_size))
+    else:
+        sample = list(rows)
+    widths = [_text_width(label) for label in labels]
+    for row in sample:
+        for index, cell in enumerate(row):
+            for line in cell.split('\n'):
+                width = _text_width(line)
+                if width > widths[index]:
+                    widths[index] = width
+
+    def format_row(row):
+        cells = [cell.split('\n') for cell in row]
+        for n in range(max(len(lines) for lines in cells)):
+            parts = []
+            for lines, width in zip(cells, widths):
+                line = lines[n] if n < len(lines) else ''
+                parts.append(line + ' ' * (width - _text_width(line)))
+            yield '| ' + ' | '.join(parts) + ' |'
+
+    border = '+' + '+'.join('-' * (width + 2) for width in widths) + '+'
+    yield border
+    yield from format_row(labels)
+    yield border
+    for row in itertools.chain(sample, rows):
+        yield from format_row(row)
+    yield border
+
+
 def print_list(objs, fields, formatters=None, sortby_index=0,
-               mixed_case_fields=None, field_labels=None):
+               mixed_case_fields=None, field_labels=None,
+               output_format='table', stream=None, sample_size=None):
     """Print a list or objects as a table, one row per object.
 
+    Every row is computed once, through per-column accessors. Unless rows
+    are sorted they are written as they are produced, which for the csv
+    and json formats means as objs yields them.
+
     :param objs: iterable of :class:`Resource`
     :param fields: attributes that correspond to columns, in order
     :param formatters: `dict` of callables for field formatting
@@ -176,6 +252,11 @@ def print_list(objs, fields, formatters=None, sortby_index=0,
         have mixed case names (e.g., 'serverId')
     :param field_labels: Labels to use in the heading of the table, default to
         fields.
+    :param output_format: 'table', 'csv' or 'json' for JSON lines, one
+        object per row.
+    :param stream: file to write to, default to stdout.
+    :param sample_size: size the table columns after this many rows, so
+        that the remaining rows are streamed too.
     """
     formatters = formatters or {}
     mixed_case_fields = mixed_case_fields or []
@@ -184,32 +265,35 @@ def print_list(objs, fields, formatters=None, sortby_index=0,
         raise ValueError(_("Field labels list %(labels)s has different number "
                            "of elements than fields list %(fields)s"),
                          {'labels': field_labels, 'fields': fields})
+    if output_format not in ('table', 'csv', 'json'):
+        raise ValueError(_("Unknown output format %s") % output_format)
+    stream = stream or sys.stdout
 
-    if sortby_index is None:
-        kwargs = {}
+    accessors = _column_accessors(fields, formatters, mixed_case_fields)
+    if output_format == 'json':
+        rows = ([accessor(o) for accessor in accessors] for o in objs)
     else:
-        kwargs = {'sortby': field_labels[sortby_index]}
-    pt = prettytable.PrettyTable(field_labels)
-    pt.align = 'l'
-
-    for o in objs:
-        row = []
-        for field in fields:
-            data = '-'
-            if field in formatters:
-                data = formatters[field](o)
-            else:
-                if field in mixed_case_fields:
-                    field_name = field.replace(' ', '_')
-                else:
-                    field_name = field.lower().replace(' ', '_')
-                data = getattr(o, field_name, '')
-            if data is None:
-                data = '-'
-            row.append(data)
-        pt.add_row(row)
-
-    print(encodeutils.safe_encode(pt.get_string(**kwargs)).decode())
+        rows = ([_dash_none(accessor(o)) for accessor in accessors]
+                for o in objs)
+    if sortby_index is not None:
+        # Like prettytable, ties are ordered by the whole row.
+        rows = sorted(rows, key=lambda row: [_dash_none(row[sortby_index])]
+                      + [_dash_none(value) for value in row])
+
+    if output_format == 'json':
+        for row in rows:
+            stream.write(json.dumps(dict(zip(field_labels, row)),
+                                    default=str) + '\n')
+        return
+    if output_format == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(field_labels)
+        writer.writerows(rows)
+        return
+
+    rows = ([str(value) for value in row] for row in rows)
+    for line in _table_lines(field_labels, rows, sample_size=sample_size):
+        stream.write(line + '\n')
 
 
 def keys_and_vals_to_strs(dictionary):
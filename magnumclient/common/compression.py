@@ -0,0 +1,152 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""HTTP content codings of request and response bodies.
+
+gzip and deflate are always supported. br needs brotli or brotlicffi, and
+zstd needs zstandard or the Python 3.14 compression.zstd module.
+"""
+
+import gzip
+import zlib
+
+from oslo_utils import importutils
+
+brotli = (importutils.try_import('brotli') or
+          importutils.try_import('brotlicffi'))
+zstandard = importutils.try_import('zstandard')
+stdlib_zstd = importutils.try_import('compression.zstd')
+
+
+class GzipDecoder(object):
+
+    def __init__(self):
+        self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decompress(self, data):
+        result = self._obj.decompress(data)
+        # A body may be several gzip members one after the other.
+        while self._obj.eof and self._obj.unused_data:
+            data = self._obj.unused_data
+            self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            result += self._obj.decompress(data)
+        return result
+
+    def flush(self):
+        return self._obj.flush()
+
+
+class DeflateDecoder(object):
+    """Decoder for deflate, which some servers send without zlib header."""
+
+    def __init__(self):
+        self._obj = zlib.decompressobj()
+        self._first = True
+
+    def decompress(self, data):
+        if not self._first:
+            return self._obj.decompress(data)
+        self._first = False
+        try:
+            return self._obj.decompress(data)
+        except zlib.error:
+            self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self._obj.decompress(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+
+class BrotliDecoder(object):
+
+    def __init__(self):
+        self._obj = brotli.Decompressor()
+
+    def decompress(self, data):
+        if hasattr(self._obj, 'process'):
+            return self._obj.process(data)
+        return self._obj.decompress(data)
+
+    def flush(self):
+        return b''
+
+
+class ZstdDecoder(object):
+
+    def __init__(self):
+        if zstandard is not None:
+            self._obj = zstandard.ZstdDecompressor().decompressobj()
+        else:
+            self._obj = stdlib_zstd.ZstdDecompressor()
+
+    def decompress(self, data):
+        return self._obj.decompress(data)
+
+    def flush(self):
+        return b''
+
+
+class MultiDecoder(object):
+    """Undo several codings, given in the order they were applied."""
+
+    def __init__(self, decoders):
+        self._decoders = list(reversed(decoders))
+
+    def decompress(self, data):
+        for decoder in self._decoders:
+            data = decoder.decompress(data)
+        return data
+
+    def flush(self):
+        data = b''
+        for decoder in self._decoders:
+            data = decoder.decompress(data) + decoder.flush()
+        return data
+
+
+DECODERS = {
+    'gzip': GzipDecoder,
+    'x-gzip': GzipDecoder,
+    'deflate': DeflateDecoder,
+}
+if brotli is not None:
+    DECODERS['br'] = BrotliDecoder
+if zstandard is not None or stdlib_zstd is not None:
+    DECODERS['zstd'] = ZstdDecoder
+
+# The Accept-Encoding request header value.
+ACCEPT_ENCODING = ', '.join(
+    name for name in ('gzip', 'deflate', 'br', 'zstd') if name in DECODERS)
+
+
+def get_decoder(content_encoding):
+    """Return a streaming decoder for a Content-Encoding header value.
+
+    None is returned for an identity or missing coding, and also for a
+    coding that is not supported, since the body can only be passed on as
+    it is then.
+    """
+    names = [name.strip().lower()
+             for name in (content_encoding or '').split(',')]
+    names = [name for name in names if name and name != 'identity']
+    if not names or any(name not in DECODERS for name in names):
+        return None
+    if len(names) == 1:
+        return DECODERS[names[0]]()
+    return MultiDecoder([DECODERS[name]() for name in names])
+
+
+def compress(data):
+    """Return data gzip compressed, for a request body."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return gzip.compress(data, compresslevel=6)
@@ -22,12 +22,19 @@ import logging
 import os
 import socket
 import ssl
+import threading
+import time
 from urllib import parse as urlparse
 
 from keystoneauth1 import adapter
-from oslo_serialization import jsonutils
+from keystoneauth1 import exceptions as ksa_exceptions
 from oslo_utils import importutils
+import requests
+from requests import utils as requests_utils
 
+from magnumclient.common import compression
+from magnumclient.common import jsoncodec
+from magnumclient.common import transport as http_transport
 from magnumclient import exceptions
 
 osprofiler_web = importutils.try_import("osprofiler.web")
@@ -38,13 +45,14 @@ CHUNKSIZE = 1024 * 64  # 64kB
 
 API_VERSION = '/v1'
 DEFAULT_API_VERSION = 'latest'
+DEFAULT_TIMEOUT = 600
 
 
 def _extract_error_json_text(body_json):
     error_json = {}
     if 'error_message' in body_json:
         raw_msg = body_json['error_message']
-        error_json = jsonutils.loads(raw_msg)
+        error_json = jsoncodec.loads(raw_msg)
     elif 'error' in body_json:
         error_body = body_json['error']
         error_json = {'faultstring': error_body['title'],
@@ -62,34 +70,220 @@ def _extract_error_json_text(body_json):
 def _extract_error_json(body, resp):
     """Return error_message from the HTTP response body."""
     try:
-        content_type = resp.headers.get("Content-Type", "")
-    except AttributeError:
-        content_type = ""
-    if content_type.startswith("application/json"):
-        try:
-            body_json = resp.json()
-            return _extract_error_json_text(body_json)
-        except AttributeError:
-            body_json = jsonutils.loads(body)
-            return _extract_error_json_text(body_json)
-        except ValueError:
-            return {}
+        body_json = jsoncodec.loads(body)
+        return _extract_error_json_text(body_json)
+    except (TypeError, ValueError):
+        return {}
+
+
+def _to_text(body):
+    if isinstance(body, bytes):
+        return body.decode('utf-8')
+    return body
+
+
+class TransferStats(object):
+    """Byte counters of the bodies a client sent and received.
+
+    ``*_wire`` counts the bytes actually transferred and the others the
+    bytes before compression or after decompression, so the difference is
+    what compression saved. Safe to update from several threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.bytes_sent = 0
+        self.bytes_sent_wire = 0
+        self.bytes_received = 0
+        self.bytes_received_wire = 0
+
+    def sent(self, size, wire_size):
+        with self._lock:
+            self.bytes_sent += size
+            self.bytes_sent_wire += wire_size
+
+    def received(self, size, wire_size):
+        with self._lock:
+            self.bytes_received += size
+            self.bytes_received_wire += wire_size
+
+    def to_dict(self):
+        with self._lock:
+            return {'bytes_sent': self.bytes_sent,
+                    'bytes_sent_wire': self.bytes_sent_wire,
+                    'bytes_received': self.bytes_received,
+                    'bytes_received_wire': self.bytes_received_wire}
+
+
+def _compress_body(body, headers, threshold, stats):
+    """Return the request body to send, gzip compressed if large enough."""
+    if body is None:
+        return body
+    size = len(body.encode('utf-8') if isinstance(body, str) else body)
+    if (threshold is not None and size >= threshold
+            and 'Content-Encoding' not in headers):
+        body = compression.compress(body)
+        headers['Content-Encoding'] = 'gzip'
+        stats.sent(size, len(body))
     else:
+        stats.sent(size, size)
+    return body
+
+
+class _Call(object):
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.waiters = 0
+        self.result = None
+        self.shared = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """Coalesce identical calls made from several threads at the same time.
+
+    The first caller of :meth:`do` for a key runs the call; callers with the
+    same key arriving while it is in flight wait for it instead of running
+    their own, and get a copy of its result or the exception it raised.
+    ``calls`` counts the calls that ran and ``coalesced`` those that were
+    answered by another one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, func, copy_result=copy.deepcopy, deadline=None):
+        """Return func(), or a copy of the result of a call in flight.
+
+        A waiter gives up with DeadlineExceeded once its own ``deadline``
+        has passed, without affecting the call it was waiting for.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+
+        if not leader:
+            if not call.done.wait(deadline.cap(None) if deadline else None):
+                deadline.check()
+            if call.error is not None:
+                raise call.error
+            return copy_result(call.shared)
+
         try:
-            body_json = jsonutils.loads(body)
-            return _extract_error_json_text(body_json)
-        except ValueError:
-            return {}
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            # No waiter can join any more. They get copies of a private
+            # copy, so that the caller is free to modify its result.
+            if call.waiters and call.error is None:
+                call.shared = copy_result(call.result)
+            call.done.set()
+        return call.result
+
+    def to_dict(self):
+        with self._lock:
+            return {'calls': self.calls, 'coalesced': self.coalesced}
+
+
+def _copy_json_result(result):
+    resp, body = result
+    return resp, copy.deepcopy(body)
+
+
+def _single_flight_json_request(client, method, url, kwargs, func):
+    """Run a JSON request through the client's SingleFlight, if it may be.
+
+    Only GET requests without a body or other options are coalesced, keyed
+    by their URL and headers; the deadline of each caller is kept out of the
+    key.
+    """
+    if (client.single_flight is None or method != 'GET'
+            or not set(kwargs) <= {'headers', 'deadline'}):
+        return func(method, url, **kwargs)
+    headers = kwargs.get('headers') or {}
+    key = (url, tuple(sorted((k.lower(), str(v))
+                             for k, v in headers.items())))
+    return client.single_flight.do(
+        key, lambda: func(method, url, **kwargs),
+        copy_result=_copy_json_result, deadline=kwargs.get('deadline'))
+
+
+class Deadline(object):
+    """An absolute point in time by which an operation must complete.
+
+    One Deadline is shared by every HTTP request made on behalf of a single
+    logical operation (all pages of a list, redirects, ...), so the overall
+    budget holds no matter how many round-trips the operation needs.
+    """
+
+    def __init__(self, timeout):
+        self.timeout = float(timeout)
+        self.expires_at = time.monotonic() + self.timeout
+
+    @classmethod
+    def coerce(cls, deadline):
+        """Return a Deadline from a number of seconds, a Deadline or None."""
+        if deadline is None or isinstance(deadline, Deadline):
+            return deadline
+        return cls(deadline)
+
+    def remaining(self):
+        return self.expires_at - time.monotonic()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self):
+        """Raise DeadlineExceeded if the deadline has already passed."""
+        if self.expired():
+            raise exceptions.DeadlineExceeded(
+                "Operation did not complete within its %.1fs deadline"
+                % self.timeout)
+
+    def cap(self, timeout):
+        """Return timeout, shortened so it does not outlive the deadline."""
+        self.check()
+        remaining = self.remaining()
+        if timeout is None:
+            return remaining
+        return min(timeout, remaining)
 
 
 class HTTPClient(object):
+    """HTTP client talking to the endpoint with a token.
+
+    The ``transport`` keyword picks the HTTP library requests are sent
+    with, see :mod:`magnumclient.common.transport`; ``pool_size`` is the
+    number of connections the pooling ones keep open.
+    """
 
     def __init__(self, endpoint, api_version=DEFAULT_API_VERSION, **kwargs):
         self.endpoint = endpoint
         self.auth_token = kwargs.get('token')
         self.auth_ref = kwargs.get('auth_ref')
         self.api_version = api_version
+        self.compress_threshold = kwargs.get('compress_threshold')
+        self.transfer_stats = TransferStats()
+        self.single_flight = (SingleFlight()
+                              if kwargs.get('single_flight', True) else None)
         self.connection_params = self.get_connection_params(endpoint, **kwargs)
+        self.transport = http_transport.get_transport(
+            kwargs.get('transport'), self.connection_params,
+            pool_size=kwargs.get('pool_size'))
 
     @staticmethod
     def get_connection_params(endpoint, **kwargs):
@@ -100,8 +294,16 @@ class HTTPClient(object):
         path = path.rstrip('/').rstrip(API_VERSION)
 
         _args = (parts.hostname, parts.port, path)
-        _kwargs = {'timeout': (float(kwargs.get('timeout'))
-                               if kwargs.get('timeout') else 600)}
+        # NOTE: 'timeout' is the historical single budget; connect_timeout
+        # and read_timeout override it for their respective phase.
+        timeout = (float(kwargs.get('timeout'))
+                   if kwargs.get('timeout') else DEFAULT_TIMEOUT)
+        connect_timeout = kwargs.get('connect_timeout')
+        read_timeout = kwargs.get('read_timeout')
+        _kwargs = {
+            'timeout': float(connect_timeout) if connect_timeout else timeout,
+            'read_timeout': float(read_timeout) if read_timeout else timeout,
+        }
 
         if parts.scheme == 'https':
             _class = VerifiedHTTPSConnection
@@ -110,17 +312,29 @@ class HTTPClient(object):
             _kwargs['key_file'] = kwargs.get('key_file', None)
             _kwargs['insecure'] = kwargs.get('insecure', False)
         elif parts.scheme == 'http':
-            _class = http_client.HTTPConnection
+            _class = HTTPConnection
         else:
             msg = 'Unsupported scheme: %s' % parts.scheme
             raise exceptions.EndpointException(msg)
 
         return (_class, _args, _kwargs)
 
-    def get_connection(self):
-        _class = self.connection_params[0]
-        return _class(*self.connection_params[1][0:2],
-                      **self.connection_params[2])
+    def get_connection(self, deadline=None):
+        _kwargs = self.connection_params[2]
+        if deadline is not None:
+            _kwargs = dict(_kwargs)
+            for key in ('timeout', 'read_timeout'):
+                _kwargs[key] = deadline.cap(_kwargs.get(key))
+        return self.transport.connection(*self.connection_params[1][0:2],
+                                         **_kwargs)
+
+    def reserve_connections(self, count):
+        """Keep connections open for count concurrent requests."""
+        self.transport.reserve(count)
+
+    def close(self):
+        """Close the connections the transport keeps open."""
+        self.transport.close()
 
     def log_curl_request(self, method, url, kwargs):
         curl = ['curl -i -X %s' % method]
@@ -150,6 +364,10 @@ class HTTPClient(object):
 
     @staticmethod
     def log_http_response(resp, body=None):
+        if not LOG.isEnabledFor(logging.DEBUG):
+            return
+        if isinstance(body, bytes):
+            body = body.decode('utf-8', 'replace')
         status = (resp.version / 10.0, resp.status, resp.reason)
         dump = ['\nHTTP/%.1f %s %s' % status]
         dump.extend(['%s: %s' % (k, v) for k, v in resp.getheaders()])
@@ -168,10 +386,32 @@ class HTTPClient(object):
 
         Wrapper around httplib.HTTP(S)Connection.request to handle tasks such
         as setting headers and error handling.
+
+        An optional ``deadline`` (:class:`Deadline`) bounds the time spent
+        on this request, including any redirects it triggers.
         """
+        deadline = kwargs.get('deadline')
+        resp, body = self._request(url, method, **kwargs)
+        if body is None:
+            return resp, ResponseBodyIterator(resp, self.transfer_stats,
+                                              deadline)
+        return resp, io.StringIO(_to_text(body))
+
+    def _request(self, url, method, **kwargs):
+        """Like _http_request, but return the body as read from the socket.
+
+        The body is ``None`` for ``application/octet-stream`` responses,
+        which are left unread.
+        """
+        deadline = kwargs.pop('deadline', None)
+        if deadline is not None:
+            deadline.check()
+
         # Copy the kwargs so we can reuse the original in case of redirects
         kwargs['headers'] = copy.deepcopy(kwargs.get('headers', {}))
         kwargs['headers'].setdefault('User-Agent', USER_AGENT)
+        kwargs['headers'].setdefault('Accept-Encoding',
+                                     compression.ACCEPT_ENCODING)
         if self.api_version:
             version_string = 'container-infra %s' % self.api_version
             kwargs['headers'].setdefault(
@@ -180,7 +420,11 @@ class HTTPClient(object):
             kwargs['headers'].setdefault('X-Auth-Token', self.auth_token)
 
         self.log_curl_request(method, url, kwargs)
-        conn = self.get_connection()
+        if 'body' in kwargs:
+            kwargs['body'] = _compress_body(
+                kwargs['body'], kwargs['headers'], self.compress_threshold,
+                self.transfer_stats)
+        conn = self.get_connection(deadline=deadline)
 
         try:
             conn_url = self._make_connection_url(url)
@@ -191,64 +435,75 @@ class HTTPClient(object):
                        % dict(url=url, e=e))
             raise exceptions.EndpointNotFound(message)
         except (socket.error, socket.timeout) as e:
+            if deadline is not None:
+                deadline.check()
             endpoint = self.endpoint
             message = ("Error communicating with %(endpoint)s %(e)s"
                        % dict(endpoint=endpoint, e=e))
             raise exceptions.ConnectionRefused(message)
 
-        body_iter = ResponseBodyIterator(resp)
-
-        # Read body into string if it isn't obviously image data
-        body_str = None
+        # Read the body if it isn't obviously image data. It is kept as
+        # bytes, which the JSON codec decodes without a str copy. The fake
+        # responses of the unit tests return str chunks instead.
+        body = None
         if resp.getheader('content-type', None) != 'application/octet-stream':
-            # decoding byte to string is necessary for Python 3.4 compatibility
-            # this issues has not been found with Python 3.4 unit tests
-            # because the test creates a fake http response of type str
-            # the if statement satisfies test (str) and real (bytes) behavior
-            body_list = [
-                chunk.decode("utf-8") if isinstance(chunk, bytes)
-                else chunk for chunk in body_iter
-            ]
-            body_str = ''.join(body_list)
-            self.log_http_response(resp, body_str)
-            body_iter = io.StringIO(body_str)
+            try:
+                chunks = list(ResponseBodyIterator(
+                    resp, self.transfer_stats, deadline))
+            except exceptions.DeadlineExceeded:
+                # The rest of the body is not read, the connection is not
+                # reused.
+                resp.close()
+                raise
+            except socket.timeout:
+                if deadline is not None:
+                    deadline.check()
+                raise
+            body = ''.join(chunks) if chunks and isinstance(
+                chunks[0], str) else b''.join(chunks)
+            self.log_http_response(resp, body)
         else:
             self.log_http_response(resp)
 
         if 400 <= resp.status < 600:
             LOG.warning("Request returned failure status.")
-            error_json = _extract_error_json(body_str, resp)
+            error_json = _extract_error_json(body, resp)
             raise exceptions.from_response(
                 resp, error_json.get('faultstring'),
                 error_json.get('debuginfo'), method, url)
         elif resp.status in (301, 302, 305):
             # Redirected. Reissue the request to the new location.
-            return self._http_request(resp['location'], method, **kwargs)
+            return self._request(resp['location'], method,
+                                 deadline=deadline, **kwargs)
         elif resp.status == 300:
             raise exceptions.from_response(resp, method=method, url=url)
 
-        return resp, body_iter
+        return resp, body
 
     def json_request(self, method, url, **kwargs):
+        return _single_flight_json_request(self, method, url, kwargs,
+                                           self._json_request)
+
+    def _json_request(self, method, url, **kwargs):
         kwargs.setdefault('headers', {})
         kwargs['headers'].setdefault('Content-Type', 'application/json')
         kwargs['headers'].setdefault('Accept', 'application/json')
 
         if 'body' in kwargs:
-            kwargs['body'] = jsonutils.dumps(kwargs['body'])
+            kwargs['body'] = jsoncodec.dumps(kwargs['body'])
 
-        resp, body_iter = self._http_request(url, method, **kwargs)
+        resp, body = self._request(url, method, **kwargs)
         content_type = resp.getheader('content-type', None)
 
         if resp.status == 204 or resp.status == 205 or content_type is None:
             return resp, list()
 
         if 'application/json' in content_type:
-            body = ''.join([chunk for chunk in body_iter])
             try:
-                body = jsonutils.loads(body)
+                body = jsoncodec.loads(body)
             except ValueError:
                 LOG.error('Could not decode response body as JSON')
+                body = _to_text(body)
         else:
             body = None
 
@@ -261,6 +516,23 @@ class HTTPClient(object):
         return self._http_request(url, method, **kwargs)
 
 
+class HTTPConnection(http_client.HTTPConnection):
+    """httplib connection with separate connect and read timeouts.
+
+    ``timeout`` only bounds establishing the connection; once connected the
+    socket timeout is switched to ``read_timeout``.
+    """
+
+    def __init__(self, host, port, timeout=None, read_timeout=None):
+        http_client.HTTPConnection.__init__(self, host, port, timeout=timeout)
+        self.read_timeout = read_timeout
+
+    def connect(self):
+        http_client.HTTPConnection.connect(self)
+        if self.read_timeout is not None:
+            self.sock.settimeout(self.read_timeout)
+
+
 class VerifiedHTTPSConnection(http_client.HTTPSConnection):
     """httplib-compatibile connection using client-side SSL authentication
 
@@ -269,7 +541,8 @@ class VerifiedHTTPSConnection(http_client.HTTPSConnection):
     """
 
     def __init__(self, host, port, key_file=None, cert_file=None,
-                 ca_file=None, timeout=None, insecure=False):
+                 ca_file=None, timeout=None, insecure=False,
+                 read_timeout=None):
         http_client.HTTPSConnection.__init__(self, host, port)
         self.key_file = key_file
         self.cert_file = cert_file
@@ -278,6 +551,7 @@ class VerifiedHTTPSConnection(http_client.HTTPSConnection):
         else:
             self.ca_file = self.get_system_ca_file()
         self.timeout = timeout
+        self.read_timeout = read_timeout
         self.insecure = insecure
 
     def connect(self):
@@ -308,6 +582,8 @@ class VerifiedHTTPSConnection(http_client.HTTPSConnection):
             context.load_cert_chain(self.cert_file, self.key_file)
 
         self.sock = context.wrap_socket(sock, server_hostname=self.host)
+        if self.read_timeout is not None:
+            self.sock.settimeout(self.read_timeout)
 
     @staticmethod
     def get_system_ca_file():
@@ -325,15 +601,100 @@ class VerifiedHTTPSConnection(http_client.HTTPSConnection):
 
 
 class SessionClient(adapter.LegacyJsonAdapter):
-    """HTTP client based on Keystone client session."""
+    """HTTP client based on Keystone client session.
+
+    With a ``transport`` or a ``pool_size``, the requests to the API are
+    sent with an adapter of :mod:`magnumclient.common.transport`, mounted
+    on the session for the host of the endpoint only.
+    """
 
     def __init__(self, user_agent=USER_AGENT, logger=LOG,
-                 api_version=DEFAULT_API_VERSION, *args, **kwargs):
+                 api_version=DEFAULT_API_VERSION, connect_timeout=None,
+                 read_timeout=None, compress_threshold=None,
+                 single_flight=True, transport=None, pool_size=None,
+                 *args, **kwargs):
         self.user_agent = USER_AGENT
         self.api_version = api_version
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.compress_threshold = compress_threshold
+        self.transfer_stats = TransferStats()
+        self.single_flight = SingleFlight() if single_flight else None
+        self.transport = transport
+        self.pool_size = pool_size
+        self._adapter = (http_transport.session_adapter(transport, pool_size)
+                         if transport or pool_size else None)
+        self._retired = []
+        self._mounted = False
+        self._mount_lock = threading.Lock()
         super(SessionClient, self).__init__(*args, **kwargs)
 
+    def reserve_connections(self, count):
+        """Keep connections open for count concurrent requests.
+
+        The session keeps as many connections per host as ``requests``
+        does by default, transport.DEFAULT_POOL_SIZE; more are kept by an
+        adapter mounted for the endpoint.
+        """
+        with self._mount_lock:
+            if count <= (self.pool_size or http_transport.DEFAULT_POOL_SIZE):
+                return
+            self.pool_size = count
+            reserve = getattr(self._adapter, 'reserve', None)
+            if reserve is not None:
+                reserve(count)
+                return
+            # Requests in flight finish on the adapter replaced.
+            if self._adapter is not None:
+                self._retired.append(self._adapter)
+            self._adapter = http_transport.session_adapter(self.transport,
+                                                           count)
+            self._mounted = False
+
+    def _mount_adapter(self):
+        with self._mount_lock:
+            if self._adapter is None or self._mounted:
+                return
+            session = getattr(self.session, 'session', None)
+            endpoint = (self.get_endpoint()
+                        if isinstance(session, requests.Session) else None)
+            if endpoint:
+                parts = urlparse.urlsplit(endpoint)
+                session.mount('%s://%s/' % (parts.scheme, parts.netloc),
+                              self._adapter)
+            self._mounted = True
+
+    def close(self):
+        """Close the connections of the adapters mounted, if any."""
+        with self._mount_lock:
+            adapters, self._retired = self._retired, []
+            if self._adapter is not None:
+                adapters.append(self._adapter)
+        for mounted in adapters:
+            mounted.close()
+
+    def _get_timeout(self, deadline=None):
+        """Return the requests timeout for one call, or None for default.
+
+        The session's single timeout is split into (connect, read) when
+        either phase is configured, and both are capped by the deadline.
+        """
+        if (self.connect_timeout is None and self.read_timeout is None
+                and deadline is None):
+            return None
+        default = getattr(self.session, 'timeout', None)
+        connect_timeout = self.connect_timeout or default
+        read_timeout = self.read_timeout or default
+        if deadline is not None:
+            connect_timeout = deadline.cap(connect_timeout)
+            read_timeout = deadline.cap(read_timeout)
+        return (connect_timeout, read_timeout)
+
     def _http_request(self, url, method, **kwargs):
+        deadline = kwargs.pop('deadline', None)
+        if deadline is not None:
+            deadline.check()
+
         if url.startswith(API_VERSION):
             url = url[len(API_VERSION):]
 
@@ -344,6 +705,14 @@ class SessionClient(adapter.LegacyJsonAdapter):
         # Copy the kwargs so we can reuse the original in case of redirects
         kwargs['headers'] = copy.deepcopy(kwargs.get('headers', {}))
         kwargs['headers'].setdefault('User-Agent', self.user_agent)
+        # requests decodes what urllib3 supports, which may differ from
+        # what the compression module supports.
+        kwargs['headers'].setdefault('Accept-Encoding',
+                                     requests_utils.DEFAULT_ACCEPT_ENCODING)
+        if 'data' in kwargs:
+            kwargs['data'] = _compress_body(
+                kwargs['data'], kwargs['headers'], self.compress_threshold,
+                self.transfer_stats)
         # NOTE(tovin07): osprofiler_web.get_trace_id_headers does not add any
         # headers in case if osprofiler is not initialized.
         if osprofiler_web:
@@ -358,8 +727,19 @@ class SessionClient(adapter.LegacyJsonAdapter):
         endpoint_filter.setdefault('service_type', self.service_type)
         endpoint_filter.setdefault('region_name', self.region_name)
 
-        resp = self.session.request(url, method,
-                                    raise_exc=False, **kwargs)
+        timeout = self._get_timeout(deadline)
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+
+        self._mount_adapter()
+        try:
+            resp = self.session.request(url, method,
+                                        raise_exc=False, **kwargs)
+        except ksa_exceptions.ConnectTimeout:
+            if deadline is not None:
+                deadline.check()
+            raise
+        self._count_received(resp)
 
         if 400 <= resp.status_code < 600:
             error_json = _extract_error_json(resp.content, resp)
@@ -369,17 +749,31 @@ class SessionClient(adapter.LegacyJsonAdapter):
         elif resp.status_code in (301, 302, 305):
             # Redirected. Reissue the request to the new location.
             location = resp.headers.get('location')
-            resp = self._http_request(location, method, **kwargs)
+            resp = self._http_request(location, method, deadline=deadline,
+                                      **kwargs)
         elif resp.status_code == 300:
             raise exceptions.from_response(resp, method=method, url=url)
         return resp
 
+    def _count_received(self, resp):
+        size = len(resp.content or b'')
+        try:
+            # The bytes urllib3 read from the socket, before decoding.
+            wire_size = resp.raw.tell()
+        except AttributeError:
+            wire_size = size
+        self.transfer_stats.received(size, wire_size)
+
     def json_request(self, method, url, **kwargs):
+        return _single_flight_json_request(self, method, url, kwargs,
+                                           self._json_request)
+
+    def _json_request(self, method, url, **kwargs):
         kwargs.setdefault('headers', {})
         kwargs['headers'].setdefault('Content-Type', 'application/json')
         kwargs['headers'].setdefault('Accept', 'application/json')
         if 'body' in kwargs:
-            kwargs['data'] = jsonutils.dumps(kwargs.pop('body'))
+            kwargs['data'] = jsoncodec.dumps(kwargs.pop('body'))
 
         resp = self._http_request(url, method, **kwargs)
         body = resp.content
@@ -389,7 +783,7 @@ class SessionClient(adapter.LegacyJsonAdapter):
             return resp, list()
         if 'application/json' in content_type:
             try:
-                body = resp.json()
+                body = jsoncodec.loads(body)
             except ValueError:
                 LOG.error('Could not decode response body as JSON')
         else:
@@ -410,7 +804,7 @@ class SessionClient(adapter.LegacyJsonAdapter):
             return resp, list()
         if 'application/json' in content_type:
             try:
-                body = resp.json()
+                body = jsoncodec.loads(body)
             except ValueError:
                 LOG.error('Could not decode response body as JSON')
         else:
@@ -420,10 +814,23 @@ class SessionClient(adapter.LegacyJsonAdapter):
 
 
 class ResponseBodyIterator(object):
-    """A class that acts as an iterator over an HTTP response."""
+    """A class that acts as an iterator over an HTTP response.
+
+    A compressed body is decoded chunk by chunk as it is read. The sizes
+    read and produced are added to ``stats``, a :class:`TransferStats`.
+    With a ``deadline``, chunks are read as they arrive and
+    DeadlineExceeded is raised before any read once it expired, however
+    fast each single read is.
+    """
 
-    def __init__(self, resp):
+    def __init__(self, resp, stats=None, deadline=None):
         self.resp = resp
+        self.stats = stats
+        self.deadline = deadline
+        getheader = getattr(resp, 'getheader', None)
+        self._decoder = compression.get_decoder(
+            getheader('content-encoding', None) if getheader else None)
+        self._eof = False
 
     def __iter__(self):
         while True:
@@ -438,11 +845,26 @@ class ResponseBodyIterator(object):
     __nonzero__ = __bool__  # Python 2.x compatibility
 
     def next(self):
-        chunk = self.resp.read(CHUNKSIZE)
-        if chunk:
-            return chunk
-        else:
-            raise StopIteration
+        read = self.resp.read
+        if self.deadline is not None:
+            read = getattr(self.resp, 'read1', read)
+        while not self._eof:
+            if self.deadline is not None:
+                self.deadline.check()
+            chunk = read(CHUNKSIZE)
+            if not chunk:
+                self._eof = True
+            if self._decoder is None:
+                data = chunk
+            elif chunk:
+                data = self._decoder.decompress(chunk)
+            else:
+                data = self._decoder.flush()
+            if self.stats is not None:
+                self.stats.received(len(data), len(chunk))
+            if data:
+                return data
+        raise StopIteration
 
 
 def _construct_http_client(*args, **kwargs):
@@ -0,0 +1,147 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""JSON encoding and decoding of API request and response bodies.
+
+The fastest installed backend is used: orjson, then msgspec, then the
+standard library json module. The ``MAGNUMCLIENT_JSON_CODEC`` environment
+variable or :func:`set_codec` pick another one.
+
+:func:`loads` takes the raw ``bytes`` of a response body (``str`` works
+too) and raises ``ValueError`` on invalid JSON whatever the backend.
+:func:`dumps` returns ``str``, like ``jsonutils.dumps``.
+"""
+
+import json
+import logging
+import os
+
+from oslo_serialization import jsonutils
+from oslo_utils import importutils
+
+LOG = logging.getLogger(__name__)
+
+orjson = importutils.try_import('orjson')
+msgspec = importutils.try_import('msgspec')
+
+ENV_VAR = 'MAGNUMCLIENT_JSON_CODEC'
+
+
+class Codec(object):
+    """A JSON backend."""
+
+    name = None
+
+    def loads(self, data):
+        raise NotImplementedError()
+
+    def dumps(self, obj):
+        raise NotImplementedError()
+
+
+class StdlibCodec(Codec):
+    name = 'json'
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj):
+        return json.dumps(obj, default=jsonutils.to_primitive)
+
+
+class OrjsonCodec(Codec):
+    name = 'orjson'
+
+    def loads(self, data):
+        # orjson.JSONDecodeError is a ValueError.
+        return orjson.loads(data)
+
+    def dumps(self, obj):
+        return orjson.dumps(obj, default=jsonutils.to_primitive,
+                            option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+
+class MsgspecCodec(Codec):
+    name = 'msgspec'
+
+    def __init__(self):
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder(enc_hook=jsonutils.to_primitive)
+
+    def loads(self, data):
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e))
+
+    def dumps(self, obj):
+        return self._encoder.encode(obj).decode('utf-8')
+
+
+# In order of preference.
+CODECS = {
+    'orjson': OrjsonCodec,
+    'msgspec': MsgspecCodec,
+    'json': StdlibCodec,
+}
+
+_MODULES = {
+    'orjson': orjson,
+    'msgspec': msgspec,
+    'json': json,
+}
+
+
+def available():
+    """Return the names of the installed backends, fastest first."""
+    return [name for name in CODECS if _MODULES[name] is not None]
+
+
+def get_codec(name=None):
+    """Return a new codec, the fastest installed one if no name is given.
+
+    :raises ValueError: if the backend is unknown or not installed.
+    """
+    names = available()
+    if name is None:
+        name = names[0]
+    elif name not in names:
+        raise ValueError('JSON codec %r is not available, use one of: %s'
+                         % (name, ', '.join(names)))
+    return CODECS[name]()
+
+
+def set_codec(name=None):
+    """Use another backend for :func:`loads` and :func:`dumps`."""
+    global _codec
+    _codec = get_codec(name)
+    return _codec
+
+
+def _default_codec():
+    name = os.environ.get(ENV_VAR) or None
+    try:
+        return get_codec(name)
+    except ValueError as e:
+        LOG.warning('%s, ignoring %s', e, ENV_VAR)
+        return get_codec()
+
+
+_codec = _default_codec()
+
+
+def loads(data):
+    return _codec.loads(data)
+
+
+def dumps(obj):
+    return _codec.dumps(obj)
@@ -0,0 +1,122 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""On-disk store of client private keys, reused across config runs."""
+
+import os
+import re
+import stat
+import threading
+
+from magnumclient.common import utils
+from magnumclient import exceptions
+from magnumclient.i18n import _
+
+DIR_MODE = 0o700
+FILE_MODE = 0o600
+
+
+def default_path():
+    config_home = os.environ.get('XDG_CONFIG_HOME',
+                                 os.path.expanduser('~/.config'))
+    return os.path.join(config_home, 'magnumclient', 'keys')
+
+
+class KeyStore(object):
+    """Directory of private keys, one per cluster and key type.
+
+    The directory must only be accessible by its owner (0700) and every key
+    file must be owned by the current user and readable by it only (0600).
+    A store that does not meet these rules is refused rather than silently
+    fixed, since a key readable by others may already be compromised.
+    """
+
+    def __init__(self, path=None):
+        self.path = os.path.abspath(path or default_path())
+
+    def _check_mode(self, path, st, mode):
+        if os.name != 'posix':
+            return
+        if st.st_uid != os.getuid() or stat.S_IMODE(st.st_mode) & ~mode:
+            raise exceptions.CommandError(
+                _("%(path)s must be owned by the current user with mode "
+                  "%(mode)o or stricter.") % {'path': path, 'mode': mode})
+
+    def _ensure_dir(self):
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path, mode=DIR_MODE)
+            # makedirs honours the umask, which may be looser.
+            os.chmod(self.path, DIR_MODE)
+        self._check_mode(self.path, os.stat(self.path), DIR_MODE)
+
+    def _key_path(self, name, key_type):
+        if not re.match(r'^[\w.-]+$', name) or name.startswith('.'):
+            raise exceptions.InvalidAttribute(
+                _("Invalid key name %s") % name)
+        return os.path.join(self.path, '%s.%s.pem' % (name, key_type))
+
+    def get_key(self, name, key_type=utils.DEFAULT_KEY_TYPE):
+        """Return the stored key PEM for name, creating it if missing.
+
+        :param name: key name, usually the cluster UUID.
+        :param key_type: type of the key, see
+                         :func:`magnumclient.common.utils.generate_key`.
+        """
+        key = self.find_key(name, key_type)
+        if key is None:
+            key = self.add_key(name, utils.generate_key(key_type), key_type)
+        return key
+
+    def find_key(self, name, key_type=utils.DEFAULT_KEY_TYPE):
+        """Return the stored key PEM for name, or None if there is none."""
+        self._ensure_dir()
+        try:
+            return self._read_key(self._key_path(name, key_type))
+        except FileNotFoundError:
+            return None
+
+    def add_key(self, name, key, key_type=utils.DEFAULT_KEY_TYPE):
+        """Store a key PEM generated for name, unless one is stored.
+
+        :returns: the stored key, which is the one of another run if that
+                  run stored its key first.
+        """
+        self._ensure_dir()
+        return self._store_key(self._key_path(name, key_type), key)
+
+    def _read_key(self, path):
+        with open(path) as f:
+            self._check_mode(path, os.fstat(f.fileno()), FILE_MODE)
+            return f.read()
+
+    def _store_key(self, path, key):
+        tmp_path = '%s.%d.%d.tmp' % (path, os.getpid(),
+                                     threading.get_ident())
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+                     FILE_MODE)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(key)
+            # Another process may have stored a key meanwhile; keep the
+            # first one so that certificates signed for it stay valid.
+            os.link(tmp_path, path)
+        except FileExistsError:
+            key = None
+        finally:
+            os.unlink(tmp_path)
+        return key if key is not None else self._read_key(path)
+
+    def delete_key(self, name, key_type=utils.DEFAULT_KEY_TYPE):
+        try:
+            os.unlink(self._key_path(name, key_type))
+        except FileNotFoundError:
+            pass
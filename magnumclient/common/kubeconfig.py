@@ -0,0 +1,202 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Kubeconfig documents with merge and in-place update semantics."""
+
+import contextlib
+import os
+import tempfile
+
+from oslo_utils import importutils
+import yaml
+
+from magnumclient import exceptions
+from magnumclient.i18n import _
+
+fcntl = importutils.try_import('fcntl')
+
+# Kubeconfig list sections and the key holding each entry's body.
+SECTIONS = (('clusters', 'cluster'), ('users', 'user'),
+            ('contexts', 'context'))
+
+
+class KubeConfig(object):
+    """A kubeconfig document.
+
+    Clusters, users and contexts are named entries. Setting an entry
+    replaces the entry of the same name in place, or appends it, and keeps
+    the content and order of the other entries, so regenerating the
+    credentials of one cluster does not change the others. The document is
+    parsed and dumped as YAML, so comments, anchors, quoting and layout of
+    a loaded file are not kept when it is saved.
+    """
+
+    def __init__(self, data=None):
+        self.data = data or {}
+        self.data.setdefault('apiVersion', 'v1')
+        self.data.setdefault('kind', 'Config')
+        self.data.setdefault('preferences', {})
+        for section, _key in SECTIONS:
+            if self.data.get(section) is None:
+                self.data[section] = []
+        self.data.setdefault('current-context', '')
+
+    @classmethod
+    def from_yaml(cls, text):
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise exceptions.CommandError(
+                _("Invalid kubeconfig: %s") % e)
+        if data is not None and not isinstance(data, dict):
+            raise exceptions.CommandError(
+                _("Invalid kubeconfig: expected a mapping."))
+        return cls(data)
+
+    @classmethod
+    def load(cls, path):
+        """Load a kubeconfig file, or return an empty one if missing."""
+        try:
+            with open(path) as f:
+                return cls.from_yaml(f.read())
+        except FileNotFoundError:
+            return cls()
+
+    @property
+    def current_context(self):
+        return self.data['current-context']
+
+    @current_context.setter
+    def current_context(self, name):
+        self.data['current-context'] = name
+
+    def names(self, section):
+        return [entry['name'] for entry in self.data[section]]
+
+    def get(self, section, name):
+        """Return the body of a named cluster, user or context, or None."""
+        key = dict(SECTIONS)[section]
+        for entry in self.data[section]:
+            if entry['name'] == name:
+                return entry.get(key)
+        return None
+
+    def _set(self, section, name, body):
+        key = dict(SECTIONS)[section]
+        entries = self.data[section]
+        for index, entry in enumerate(entries):
+            if entry['name'] == name:
+                entries[index] = {'name': name, key: body}
+                return
+        entries.append({'name': name, key: body})
+
+    def set_cluster(self, name, server, ca_data=None):
+        cluster = {'server': server}
+        if ca_data is not None:
+            cluster['certificate-authority-data'] = ca_data
+        self._set('clusters', name, cluster)
+
+    def set_user(self, name, user):
+        self._set('users', name, user)
+
+    def set_context(self, name, cluster, user):
+        self._set('contexts', name, {'cluster': cluster, 'user': user})
+        if not self.current_context:
+            self.current_context = name
+
+    def remove_context(self, name):
+        """Remove a context and the cluster and user only it referenced."""
+        context = self.get('contexts', name)
+        if context is None:
+            return
+        self.data['contexts'] = [c for c in self.data['contexts']
+                                 if c['name'] != name]
+        used = [c.get('context') or {} for c in self.data['contexts']]
+        for section, key in (('clusters', 'cluster'), ('users', 'user')):
+            if not any(u.get(key) == context.get(key) for u in used):
+                self.data[section] = [e for e in self.data[section]
+                                      if e['name'] != context.get(key)]
+        if self.current_context == name:
+            self.current_context = ''
+
+    def merge(self, other):
+        """Upsert every cluster, user and context of another KubeConfig.
+
+        The current context is only taken from other if none is set.
+        """
+        for section, key in SECTIONS:
+            for entry in other.data[section]:
+                self._set(section, entry['name'], entry.get(key))
+        if not self.current_context:
+            self.current_context = other.current_context
+
+    def to_yaml(self):
+        return yaml.safe_dump(self.data, default_flow_style=False,
+                              sort_keys=False)
+
+    def save(self, path):
+        """Write the kubeconfig atomically, readable by its owner only.
+
+        The document goes to a temporary file in the same directory which
+        is then renamed over path, so readers never see a partial file.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.kubeconfig-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(self.to_yaml())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+@contextlib.contextmanager
+def _locked(path):
+    if fcntl is None:
+        yield
+        return
+    lock_path = path + '.lock'
+    while True:
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        # The holder before us removes the lock file on release; a lock
+        # taken on a removed file does not exclude anyone.
+        try:
+            locked = os.stat(lock_path).st_ino == os.fstat(fd).st_ino
+        except FileNotFoundError:
+            locked = False
+        if locked:
+            break
+        os.close(fd)
+    try:
+        yield
+    finally:
+        os.unlink(lock_path)
+        os.close(fd)
+
+
+def update_file(path, kubeconfig):
+    """Merge a KubeConfig into the kubeconfig file at path.
+
+    The file is created if missing, and rewritten from the merged document
+    otherwise, see :class:`KubeConfig`. Concurrent updates of the same file
+    are serialized with a ``<path>.lock`` file, removed once done, where
+    the platform supports it, so that no update is lost.
+
+    :returns: the merged :class:`KubeConfig`.
+    """
+    with _locked(path):
+        merged = KubeConfig.load(path)
+        merged.merge(kubeconfig)
+        merged.save(path)
+    return merged
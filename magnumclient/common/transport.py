@@ -0,0 +1,530 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""The HTTP libraries :class:`~magnumclient.common.httpclient.HTTPClient`
+sends its requests with.
+
+``httplib``, the default, opens a new ``http.client`` connection for every
+request. ``requests`` and ``urllib3`` keep a pool of keep-alive connections
+shared by the threads using the client, and ``httpx`` multiplexes
+concurrent requests over a single HTTP/2 connection to servers offering it
+when the ``h2`` package is installed, or pools HTTP/1.1 connections
+otherwise.
+
+Every transport hands out ``http.client``-like connections, so the client
+sends requests and reads responses the same way whatever the library. The
+response bodies are read as sent, still compressed, and transport errors
+are raised as :class:`OSError`, timeouts as :class:`socket.timeout`.
+
+Clients using a keystoneauth session send their requests with ``requests``;
+:func:`session_adapter` returns the adapter such a session sends the
+requests to an endpoint with, through ``urllib3`` or ``httpx``.
+"""
+
+from http import client as http_client
+import os
+import socket
+import ssl
+import threading
+
+from oslo_utils import importutils
+import requests
+
+from magnumclient import exceptions
+
+urllib3 = importutils.try_import('urllib3')
+httpx = importutils.try_import('httpx')
+h2 = importutils.try_import('h2')
+
+DEFAULT_TRANSPORT = 'httplib'
+# Connections kept per transport, enough for the default parallelism of
+# the commands fanning out requests.
+DEFAULT_POOL_SIZE = 10
+
+
+class Transport(object):
+    """An HTTP library sending the requests of a client.
+
+    :param connection_params: the ``(class, (host, port, path), kwargs)``
+        of :meth:`HTTPClient.get_connection_params`.
+    :param pool_size: number of connections kept open for reuse.
+    """
+
+    name = None
+    # Whether concurrent requests may share a connection.
+    multiplexed = False
+
+    def __init__(self, connection_params, pool_size=DEFAULT_POOL_SIZE):
+        self.connection_class, args, self.tls = connection_params
+        self.host, self.port = args[0:2]
+        self.pool_size = pool_size
+        # The connection pool of the library, None if it has none, and the
+        # pools replaced by larger ones, closed with the transport.
+        self._pool = None
+        self._retired = []
+        self._lock = threading.Lock()
+        self.scheme = ('https' if issubclass(self.connection_class,
+                                             http_client.HTTPSConnection)
+                       else 'http')
+        default_port = 443 if self.scheme == 'https' else 80
+        self.base_url = '%s://%s:%d' % (self.scheme, self.host,
+                                        self.port or default_port)
+
+    def connection(self, host, port, timeout=None, read_timeout=None,
+                   **kwargs):
+        """Return a connection for a single request."""
+        return _Connection(self, timeout, read_timeout)
+
+    def send(self, method, url, body, headers, timeout, read_timeout):
+        """Send a request and return its :class:`Response`."""
+        raise NotImplementedError()
+
+    def reserve(self, count):
+        """Keep connections open for count concurrent requests.
+
+        A pool smaller than that is replaced by one of count connections,
+        so that the requests of that many threads do not open connections
+        which the pool then has no room to keep. Requests in flight finish
+        on the connections of the pool replaced.
+        """
+        with self._lock:
+            if (self._pool is None or self.multiplexed
+                    or count <= self.pool_size):
+                return
+            self.pool_size = count
+            self._retired.append(self._pool)
+            self._pool = self._new_pool()
+
+    def close(self):
+        """Close the connections kept open."""
+        with self._lock:
+            pools, self._retired = self._retired, []
+            if self._pool is not None:
+                pools.append(self._pool)
+        for pool in pools:
+            pool.close()
+
+    def _new_pool(self):
+        """Return the pool of the library, of pool_size connections."""
+        return None
+
+    def _ssl_context(self):
+        context = ssl.create_default_context(
+            cafile=self.tls.get('ca_file'))
+        if self.tls.get('insecure'):
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        if self.tls.get('cert_file'):
+            context.load_cert_chain(self.tls['cert_file'],
+                                    self.tls.get('key_file'))
+        return context
+
+
+class HttplibTransport(Transport):
+    name = 'httplib'
+
+    def connection(self, host, port, **kwargs):
+        return self.connection_class(host, port, **kwargs)
+
+
+class _Connection(object):
+    """The part of ``http.client.HTTPConnection`` used by HTTPClient."""
+
+    def __init__(self, transport, timeout, read_timeout):
+        self.transport = transport
+        self.timeout = timeout
+        self.read_timeout = read_timeout
+        self._response = None
+
+    def request(self, method, url, body=None, headers=None):
+        self._response = self.transport.send(
+            method, url, body, headers or {}, self.timeout,
+            self.read_timeout)
+
+    def getresponse(self):
+        return self._response
+
+
+class Response(object):
+    """The part of ``http.client.HTTPResponse`` used by HTTPClient.
+
+    :param read: reads up to a number of bytes of the body as sent.
+    :param release: called once the body was read to its end.
+    :param read1: like read, but returns what a single read from the
+        connection gives rather than waiting for the number of bytes.
+    :param abort: called instead of release when the response is closed
+        before its end, to drop its connection.
+    """
+
+    def __init__(self, status, reason, version, headers, read, release=None,
+                 errors=(), read1=None, abort=None):
+        self.status = status
+        self.reason = reason
+        self.version = version
+        self._headers = headers
+        self._read = read
+        self._read1 = read1 or read
+        self._release = release
+        self._abort = abort
+        self._errors = errors
+        self._done = False
+
+    def getheader(self, name, default=None):
+        return self._headers.get(name, default)
+
+    def getheaders(self):
+        return list(self._headers.items())
+
+    def __getitem__(self, name):
+        return self._headers[name]
+
+    def read(self, amt=None):
+        return self._read_with(self._read, amt)
+
+    def read1(self, amt=-1):
+        return self._read_with(self._read1, None if amt < 0 else amt)
+
+    def _read_with(self, read, amt):
+        try:
+            data = read(amt)
+        except self._errors as e:
+            raise _os_error(e)
+        if not data or amt is None:
+            self._done = True
+            self.close()
+        return data
+
+    def close(self):
+        if self._release is not None:
+            release, self._release = self._release, None
+            if not self._done and self._abort is not None:
+                release = self._abort
+            release()
+
+
+def _urllib3_read1(resp):
+    if not hasattr(resp, 'read1'):
+        # urllib3 < 2.0
+        return None
+    return lambda amt: resp.read1(amt, decode_content=False)
+
+
+def _os_error(error):
+    timeouts = tuple(cls for cls in (
+        urllib3 and urllib3.exceptions.TimeoutError,
+        httpx and httpx.TimeoutException) if cls)
+    if isinstance(error, timeouts):
+        return socket.timeout(str(error))
+    return OSError(str(error))
+
+
+class RequestsTransport(Transport):
+    name = 'requests'
+
+    def __init__(self, *args, **kwargs):
+        super(RequestsTransport, self).__init__(*args, **kwargs)
+        # Passed with every request, as REQUESTS_CA_BUNDLE would override
+        # the session's verify.
+        self._verify = True
+        if self.tls.get('insecure'):
+            self._verify = False
+        elif self.tls.get('ca_file'):
+            self._verify = self.tls['ca_file']
+        self._cert = None
+        if self.tls.get('cert_file'):
+            self._cert = (self.tls['cert_file'], self.tls.get('key_file'))
+        self._pool = self._new_pool()
+
+    def _new_pool(self):
+        session = requests.Session()
+        session.mount(self.base_url, requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.pool_size))
+        return session
+
+    def send(self, method, url, body, headers, timeout, read_timeout):
+        try:
+            resp = self._pool.request(
+                method, self.base_url + url, data=body, headers=headers,
+                timeout=(timeout, read_timeout), stream=True,
+                allow_redirects=False, verify=self._verify, cert=self._cert)
+        except requests.exceptions.Timeout as e:
+            raise socket.timeout(str(e))
+        # requests exceptions are OSErrors already.
+        raw = resp.raw
+        return Response(
+            resp.status_code, resp.reason, raw.version, resp.headers,
+            lambda amt: raw.read(amt, decode_content=False), resp.close,
+            errors=(urllib3.exceptions.HTTPError,),
+            read1=_urllib3_read1(raw))
+
+
+class Urllib3Transport(Transport):
+    name = 'urllib3'
+
+    def __init__(self, *args, **kwargs):
+        super(Urllib3Transport, self).__init__(*args, **kwargs)
+        self._pool = self._new_pool()
+
+    def _new_pool(self):
+        kwargs = {'maxsize': self.pool_size}
+        if self.scheme == 'https':
+            kwargs['ssl_context'] = self._ssl_context()
+            if self.tls.get('insecure'):
+                kwargs['cert_reqs'] = 'CERT_NONE'
+        return urllib3.connection_from_url(self.base_url, **kwargs)
+
+    def send(self, method, url, body, headers, timeout, read_timeout):
+        try:
+            resp = self._pool.urlopen(
+                method, url, body=body, headers=headers,
+                timeout=urllib3.Timeout(connect=timeout, read=read_timeout),
+                retries=False, redirect=False, preload_content=False,
+                decode_content=False)
+        except urllib3.exceptions.HTTPError as e:
+            raise _os_error(e)
+
+        def abort():
+            resp.close()
+            resp.release_conn()
+
+        return Response(
+            resp.status, resp.reason, resp.version, resp.headers,
+            lambda amt: resp.read(amt, decode_content=False),
+            resp.release_conn, errors=(urllib3.exceptions.HTTPError,),
+            read1=_urllib3_read1(resp), abort=abort)
+
+
+class HttpxTransport(Transport):
+    name = 'httpx'
+
+    def __init__(self, *args, **kwargs):
+        super(HttpxTransport, self).__init__(*args, **kwargs)
+        # HTTP/2 is negotiated with TLS ALPN, plain http stays HTTP/1.1.
+        self.multiplexed = h2 is not None and self.scheme == 'https'
+        self._pool = self._new_pool()
+
+    def _new_pool(self):
+        return httpx.Client(
+            http2=h2 is not None,
+            verify=self._ssl_context() if self.scheme == 'https' else True,
+            limits=httpx.Limits(max_connections=self.pool_size,
+                                max_keepalive_connections=self.pool_size))
+
+    def send(self, method, url, body, headers, timeout, read_timeout):
+        client = self._pool
+        request = client.build_request(
+            method, self.base_url + url, content=body, headers=headers,
+            timeout=httpx.Timeout(read_timeout, connect=timeout))
+        try:
+            resp = client.send(request, stream=True)
+        except httpx.TransportError as e:
+            raise _os_error(e)
+        major, _sep, minor = resp.http_version.partition('/')[2].partition(
+            '.')
+        chunks = resp.iter_raw()
+        buffer = bytearray()
+
+        def take(amt):
+            size = len(buffer) if amt is None else min(amt, len(buffer))
+            data = bytes(buffer[:size])
+            del buffer[:size]
+            return data
+
+        def read(amt):
+            while amt is None or len(buffer) < amt:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                buffer.extend(chunk)
+            return take(amt)
+
+        def read1(amt):
+            if not buffer:
+                buffer.extend(next(chunks, b''))
+            return take(amt)
+
+        return Response(
+            resp.status_code, resp.reason_phrase,
+            int(major) * 10 + int(minor or 0), resp.headers, read,
+            resp.close, errors=(httpx.TransportError,), read1=read1)
+
+
+class HttpxAdapter(requests.adapters.BaseAdapter):
+    """Sends the requests of a ``requests`` session with ``httpx``.
+
+    Responses are read whole and returned as :class:`requests.Response`,
+    their content decoded; ``raw.tell()`` is the size received. The proxy
+    requests selects for a URL, from the session or the environment, is
+    used for it.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE):
+        super(HttpxAdapter, self).__init__()
+        self.pool_size = pool_size
+        # Whether concurrent requests share a connection, known once a
+        # request was sent.
+        self.multiplexed = False
+        # httpx verifies and authenticates per client, requests per call.
+        self._clients = {}
+        self._retired = []
+        self._lock = threading.Lock()
+
+    def reserve(self, count):
+        """Keep connections open for count concurrent requests.
+
+        As :meth:`Transport.reserve`, HTTP/2 needs a single connection.
+        """
+        with self._lock:
+            if self.multiplexed or count <= self.pool_size:
+                return
+            self.pool_size = count
+            self._retired.extend(self._clients.values())
+            self._clients = {}
+
+    def _client(self, verify, cert, proxy):
+        key = (verify, cert if not isinstance(cert, list) else tuple(cert),
+               proxy)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                context = ssl.create_default_context()
+                if isinstance(verify, str):
+                    context.load_verify_locations(
+                        **{'capath' if os.path.isdir(verify)
+                           else 'cafile': verify})
+                elif not verify:
+                    context.check_hostname = False
+                    context.verify_mode = ssl.CERT_NONE
+                if cert:
+                    context.load_cert_chain(
+                        *((cert,) if isinstance(cert, str) else cert))
+                # requests already chose the proxy from the environment.
+                client = self._clients[key] = httpx.Client(
+                    trust_env=False, transport=httpx.HTTPTransport(
+                        http2=h2 is not None, verify=context,
+                        limits=httpx.Limits(
+                            max_connections=self.pool_size,
+                            max_keepalive_connections=self.pool_size),
+                        proxy=httpx.Proxy(proxy) if proxy else None))
+            return client
+
+    def send(self, request, stream=False, timeout=None, verify=True,
+             cert=None, proxies=None):
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        client = self._client(
+            verify, cert,
+            requests.utils.select_proxy(request.url, proxies or {}))
+        self.multiplexed = h2 is not None and request.url.startswith(
+            'https:')
+        try:
+            resp = client.request(
+                request.method, request.url, content=request.body,
+                headers=dict(request.headers), timeout=timeout)
+        except httpx.ConnectTimeout as e:
+            raise requests.exceptions.ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+        response = requests.Response()
+        response.status_code = resp.status_code
+        response.reason = resp.reason_phrase
+        response.headers = requests.structures.CaseInsensitiveDict(
+            resp.headers)
+        response.encoding = requests.utils.get_encoding_from_headers(
+            response.headers)
+        response.url = str(resp.url)
+        response.request = request
+        response.connection = self
+        response.elapsed = resp.elapsed
+        response._content = resp.content
+        response._content_consumed = True
+        response.raw = _Received(resp.num_bytes_downloaded)
+        return response
+
+    def close(self):
+        with self._lock:
+            clients = self._retired + list(self._clients.values())
+            self._clients, self._retired = {}, []
+        for client in clients:
+            client.close()
+
+
+class _Received(object):
+    """The part of a urllib3 response counting the bytes read."""
+
+    def __init__(self, size):
+        self._size = size
+
+    def tell(self):
+        return self._size
+
+
+# The default first.
+TRANSPORTS = {
+    'httplib': HttplibTransport,
+    'requests': RequestsTransport,
+    'urllib3': Urllib3Transport,
+    'httpx': HttpxTransport,
+}
+
+_MODULES = {
+    'httplib': http_client,
+    'requests': requests,
+    'urllib3': urllib3,
+    'httpx': httpx,
+}
+
+
+def available():
+    """Return the names of the installed transports."""
+    return [name for name in TRANSPORTS if _MODULES[name] is not None]
+
+
+def get_transport(name, connection_params, pool_size=None):
+    """Return a new transport, ``httplib`` if no name is given.
+
+    :raises ClientException: if the transport is unknown or its library is
+        not installed.
+    """
+    name = name or DEFAULT_TRANSPORT
+    if name not in available():
+        raise exceptions.ClientException(
+            'HTTP transport %r is not available, use one of: %s'
+            % (name, ', '.join(available())))
+    return TRANSPORTS[name](connection_params,
+                            pool_size=pool_size or DEFAULT_POOL_SIZE)
+
+
+def session_adapter(name, pool_size=None):
+    """Return the ``requests`` adapter a session sends requests with.
+
+    ``requests`` and ``urllib3`` both give the adapter of ``requests``,
+    with a pool of pool_size connections per host.
+
+    :raises ClientException: if the transport is unknown, not installed or
+        cannot send the requests of a session, as ``httplib``.
+    """
+    name = name or 'requests'
+    pool_size = pool_size or DEFAULT_POOL_SIZE
+    if name not in ('requests', 'urllib3', 'httpx'):
+        raise exceptions.ClientException(
+            'HTTP transport %r cannot be used with a session, use one of: '
+            'requests, urllib3, httpx' % name)
+    if name not in available():
+        raise exceptions.ClientException(
+            'HTTP transport %r is not available, use one of: %s'
+            % (name, ', '.join(available())))
+    if name == 'httpx':
+        return HttpxAdapter(pool_size)
+    return requests.adapters.HTTPAdapter(pool_maxsize=pool_size)
@@ -15,9 +15,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+from concurrent import futures
 import os
+from urllib import parse as urlparse
 
 from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric import ed25519
 from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives import serialization
@@ -25,10 +30,18 @@ from cryptography import x509
 from cryptography.x509.oid import NameOID
 from oslo_serialization import base64
 from oslo_serialization import jsonutils
+import yaml
 
+from magnumclient.common import jsoncodec
+from magnumclient.common import kubeconfig
 from magnumclient import exceptions as exc
 from magnumclient.i18n import _
 
+# Default number of API calls bulk helpers keep in flight at once.
+DEFAULT_MAX_WORKERS = 10
+
+BulkResult = collections.namedtuple('BulkResult', ['item', 'result', 'error'])
+
 
 def common_filters(marker=None, limit=None, sort_key=None, sort_dir=None):
     """Generate common filters for any list request.
@@ -51,6 +64,95 @@ def common_filters(marker=None, limit=None, sort_key=None, sort_dir=None):
     return filters
 
 
+def split_filters(filters, server_keys=()):
+    """Split list filters into query string ones and client-side ones.
+
+    :param filters: dict mapping attributes to the value they must have, or
+                    to a list of accepted values.
+    :param server_keys: the attributes the API can filter on. A filter on
+                        one of them with a single value goes into the query
+                        string.
+    :returns: a ``(query_filters, client_filters)`` tuple of a list of
+              string filters, as :func:`common_filters` returns, and a dict
+              of the filters left to :func:`matches_filters`.
+    """
+    query_filters = []
+    client_filters = {}
+    for key, value in sorted((filters or {}).items()):
+        if key in server_keys and not isinstance(value, (list, tuple, set)):
+            query_filters.append('%s=%s' % (key, urlparse.quote(str(value))))
+        else:
+            client_filters[key] = value
+    return query_filters, client_filters
+
+
+def filters_need_detail(filters, summary_fields):
+    """Return whether client-side filters need the detailed listing.
+
+    :param summary_fields: the attributes of the items of a summary
+                           listing, or None if they are unknown.
+    """
+    return (summary_fields is not None and
+            any(key not in summary_fields for key in filters or {}))
+
+
+def _filter_text(value):
+    if isinstance(value, bool):
+        return str(value).lower()
+    return value if value is None else str(value)
+
+
+def matches_filters(resource, filters):
+    """Return whether a resource matches every client-side filter.
+
+    Values are compared as text, so ``'3'`` matches a node_count of 3 and
+    ``'true'`` a True flag. A list of values matches any of them.
+    """
+    for key, wanted in filters.items():
+        value = _filter_text(getattr(resource, key, None))
+        if not isinstance(wanted, (list, tuple, set)):
+            wanted = [wanted]
+        if value not in [_filter_text(w) for w in wanted]:
+            return False
+    return True
+
+
+def run_concurrently(func, items, max_workers=DEFAULT_MAX_WORKERS,
+                     http_client=None):
+    """Call func on every item with bounded parallelism.
+
+    Yields a :class:`BulkResult` per item as soon as its call completes, so
+    results arrive in completion order rather than input order. An
+    exception raised by func is captured in ``BulkResult.error`` instead of
+    being propagated, so one failing item does not abort the others.
+
+    :param func: callable taking a single item.
+    :param items: iterable of items to process.
+    :param max_workers: maximum number of calls running at the same time.
+    :param http_client: the HTTP client func sends its requests with, whose
+                        connection pool is grown to the number of workers.
+    """
+    items = list(items)
+    if not items:
+        return
+    workers = max(1, min(int(max_workers), len(items)))
+    reserve = getattr(http_client, 'reserve_connections', None)
+    if reserve is not None:
+        reserve(workers)
+    executor = futures.ThreadPoolExecutor(max_workers=workers)
+    try:
+        pending = dict((executor.submit(func, item), item) for item in items)
+        for future in futures.as_completed(pending):
+            error = future.exception()
+            if error is None:
+                yield BulkResult(pending[future], future.result(), None)
+            else:
+                yield BulkResult(pending[future], None, error)
+    finally:
+        # Stop scheduling queued calls if the caller stopped consuming.
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 def split_and_deserialize(string):
     """Split and try to JSON deserialize a string.
 
@@ -132,6 +234,26 @@ def format_labels(lbls, parse_comma=True):
     return labels
 
 
+def format_filters(filter_args):
+    """Reformat --filter KEY=VALUE arguments into list filters.
+
+    A key given more than once matches any of its values.
+    """
+    filters = {}
+    for arg in filter_args or []:
+        key, sep, value = arg.partition('=')
+        if not sep or not key:
+            raise exc.CommandError(_('filters must be a list of KEY=VALUE '
+                                     'not %s') % arg)
+        if key not in filters:
+            filters[key] = value
+        elif isinstance(filters[key], list):
+            filters[key].append(value)
+        else:
+            filters[key] = [filters[key], value]
+    return filters
+
+
 _VALID_TAINT_EFFECTS = ('NoSchedule', 'PreferNoSchedule', 'NoExecute')
 
 
@@ -181,7 +303,7 @@ def handle_json_from_file(json_arg):
     try:
         with open(json_arg, 'r') as f:
             json_arg = f.read().strip()
-            json_arg = jsonutils.loads(json_arg)
+            json_arg = jsoncodec.loads(json_arg)
     except IOError as e:
         err = _("Cannot get JSON from file '%(file)s'. "
                 "Error: %(err)s") % {'err': e, 'file': json_arg}
@@ -194,6 +316,28 @@ def handle_json_from_file(json_arg):
     return json_arg
 
 
+def handle_yaml_from_file(yaml_arg):
+    """Attempts to read a YAML (or JSON) file by the file url.
+
+    :param yaml_arg: May be a file name containing the YAML.
+    :returns: A list or dictionary parsed from YAML.
+    """
+
+    try:
+        with open(yaml_arg, 'r') as f:
+            yaml_arg = yaml.safe_load(f)
+    except IOError as e:
+        err = _("Cannot get YAML from file '%(file)s'. "
+                "Error: %(err)s") % {'err': e, 'file': yaml_arg}
+        raise exc.InvalidAttribute(err)
+    except yaml.YAMLError as e:
+        err = (_("For YAML: '%(string)s', error: '%(err)s'") %
+               {'err': e, 'string': yaml_arg})
+        raise exc.InvalidAttribute(err)
+
+    return yaml_arg
+
+
 def config_cluster(cluster, cluster_template, cfg_dir, force=False,
                    certs=None, use_keystone=False, direct_output=False):
     """Return and write configuration for the given cluster."""
@@ -207,146 +351,162 @@ def config_cluster(cluster, cluster_template, cfg_dir, force=False,
                                      force, certs)
 
 
+_OS_TOKEN_EXEC = (
+    "if [ -z ${OS_TOKEN} ]; then\n"
+    "    echo 'Error: Missing OpenStack credential from environment variable "
+    "$OS_TOKEN' > /dev/stderr\n"
+    "    exit 1\n"
+    "else\n"
+    "    echo '{ \"apiVersion\": \"client.authentication.k8s.io/v1beta1\", "
+    "\"kind\": \"ExecCredential\", \"status\": { \"token\": "
+    "\"'\"${OS_TOKEN}\"'\"}}'\n"
+    "fi\n")
+
+
+def kubeconfig_for_cluster(cluster, cluster_template, certs=None,
+                           use_keystone=False, name=None):
+    """Return a :class:`KubeConfig` giving access to a kubernetes cluster.
+
+    :param name: name of the cluster, user and context entries. By default
+                 the entries are named as in a standalone kubeconfig; give
+                 a unique name to merge the result into a shared one.
+    """
+    cfg = kubeconfig.KubeConfig()
+    cluster_name = name or cluster.name
+    if cluster_template.tls_disabled or certs is None:
+        cfg.set_cluster(cluster_name, cluster.api_address)
+        cfg.set_user(cluster_name, {})
+        cfg.set_context(cluster_name, cluster_name, cluster_name)
+        return cfg
+
+    cfg.set_cluster(cluster_name, cluster.api_address,
+                    ca_data=base64.encode_as_text(certs['ca']))
+    if not use_keystone:
+        user_name = name or 'admin'
+        cfg.set_user(user_name, {
+            'client-certificate-data': base64.encode_as_text(certs['cert']),
+            'client-key-data': base64.encode_as_text(certs['key'])})
+        cfg.set_context(name or 'default', cluster_name, user_name)
+    else:
+        user_name = name or 'openstackuser'
+        cfg.set_user(user_name, {'exec': {
+            'command': '/bin/bash',
+            'apiVersion': 'client.authentication.k8s.io/v1beta1',
+            'args': ['-c', _OS_TOKEN_EXEC]}})
+        cfg.set_context(name or 'openstackuser@kubernetes', cluster_name,
+                        user_name)
+    return cfg
+
+
+def _export(name, value):
+    if 'csh' in os.environ.get('SHELL', ''):
+        return "setenv %s %s\n" % (name, value)
+    return "export %s=%s\n" % (name, value)
+
+
 def _config_cluster_kubernetes(cluster, cluster_template, cfg_dir,
                                force=False, certs=None, use_keystone=False,
                                direct_output=False):
     """Return and write configuration for the given kubernetes cluster."""
     cfg_file = "%s/config" % cfg_dir
-    if cluster_template.tls_disabled or certs is None:
-        cfg = ("apiVersion: v1\n"
-               "clusters:\n"
-               "- cluster:\n"
-               "    server: %(api_address)s\n"
-               "  name: %(name)s\n"
-               "contexts:\n"
-               "- context:\n"
-               "    cluster: %(name)s\n"
-               "    user: %(name)s\n"
-               "  name: %(name)s\n"
-               "current-context: %(name)s\n"
-               "kind: Config\n"
-               "preferences: {}\n"
-               "users:\n"
-               "- name: %(name)s\n"
-               % {'name': cluster.name, 'api_address': cluster.api_address})
-    else:
-        if not use_keystone:
-            cfg = ("apiVersion: v1\n"
-                   "clusters:\n"
-                   "- cluster:\n"
-                   "    certificate-authority-data: %(ca)s\n"
-                   "    server: %(api_address)s\n"
-                   "  name: %(name)s\n"
-                   "contexts:\n"
-                   "- context:\n"
-                   "    cluster: %(name)s\n"
-                   "    user: admin\n"
-                   "  name: default\n"
-                   "current-context: default\n"
-                   "kind: Config\n"
-                   "preferences: {}\n"
-                   "users:\n"
-                   "- name: admin\n"
-                   "  user:\n"
-                   "    client-certificate-data: %(cert)s\n"
-                   "    client-key-data: %(key)s\n"
-                   % {'name': cluster.name,
-                      'api_address': cluster.api_address,
-                      'key': base64.encode_as_text(certs['key']),
-                      'cert': base64.encode_as_text(certs['cert']),
-                      'ca': base64.encode_as_text(certs['ca'])})
-        else:
-            cfg = ("apiVersion: v1\n"
-                   "clusters:\n"
-                   "- cluster:\n"
-                   "    certificate-authority-data: %(ca)s\n"
-                   "    server: %(api_address)s\n"
-                   "  name: %(name)s\n"
-                   "contexts:\n"
-                   "- context:\n"
-                   "    cluster: %(name)s\n"
-                   "    user: openstackuser\n"
-                   "  name: openstackuser@kubernetes\n"
-                   "current-context: openstackuser@kubernetes\n"
-                   "kind: Config\n"
-                   "preferences: {}\n"
-                   "users:\n"
-                   "- name: openstackuser\n"
-                   "  user:\n"
-                   "    exec:\n"
-                   "      command: /bin/bash\n"
-                   "      apiVersion: client.authentication.k8s.io/v1beta1\n"
-                   "      args:\n"
-                   "      - -c\n"
-                   "      - >\n"
-                   "        if [ -z ${OS_TOKEN} ]; then\n"
-                   "            echo 'Error: Missing OpenStack credential from environment variable $OS_TOKEN' > /dev/stderr\n"  # noqa
-                   "            exit 1\n"
-                   "        else\n"
-                   "            echo '{ \"apiVersion\": \"client.authentication.k8s.io/v1beta1\", \"kind\": \"ExecCredential\", \"status\": { \"token\": \"'\"${OS_TOKEN}\"'\"}}'\n"  # noqa
-                   "        fi\n"
-                   % {'name': cluster.name,
-                      'api_address': cluster.api_address,
-                      'ca': base64.encode_as_text(certs['ca'])})
+    cfg = kubeconfig_for_cluster(cluster, cluster_template, certs=certs,
+                                 use_keystone=use_keystone)
 
     if direct_output:
-        return cfg
+        return cfg.to_yaml()
     if os.path.exists(cfg_file) and not force:
         raise exc.CommandError("File %s exists, aborting." % cfg_file)
-    else:
-        f = open(cfg_file, "w")
-        f.write(cfg)
-        f.close()
-    if 'csh' in os.environ['SHELL']:
-        return "setenv KUBECONFIG %s\n" % cfg_file
-    else:
-        return "export KUBECONFIG=%s\n" % cfg_file
+    cfg.save(cfg_file)
+    return _export('KUBECONFIG', cfg_file)
 
 
 def _config_cluster_swarm(cluster, cluster_template, cfg_dir,
                           force=False, certs=None):
     """Return and write configuration for the given swarm cluster."""
     tls = "" if cluster_template.tls_disabled else True
-    if 'csh' in os.environ['SHELL']:
-        result = ("setenv DOCKER_HOST %(docker_host)s\n"
-                  "setenv DOCKER_CERT_PATH %(cfg_dir)s\n"
-                  "setenv DOCKER_TLS_VERIFY %(tls)s\n"
-                  % {'docker_host': cluster.api_address,
-                     'cfg_dir': cfg_dir,
-                     'tls': tls}
-                  )
+    return (_export('DOCKER_HOST', cluster.api_address) +
+            _export('DOCKER_CERT_PATH', cfg_dir) +
+            _export('DOCKER_TLS_VERIFY', tls))
+
+
+KEY_TYPES = ('rsa', 'ecdsa', 'ed25519')
+DEFAULT_KEY_TYPE = 'rsa'
+
+
+def generate_key(key_type=DEFAULT_KEY_TYPE):
+    """Return a new private key of the given type as a PEM string.
+
+    :param key_type: 'rsa' (2048 bits), 'ecdsa' (P-256) or 'ed25519'. The
+                     last two are much cheaper to generate, but the cluster
+                     CA must accept them.
+    """
+    if key_type == 'rsa':
+        key = rsa.generate_private_key(
+            public_exponent=65537,
+            key_size=2048,
+            backend=default_backend())
+    elif key_type == 'ecdsa':
+        key = ec.generate_private_key(ec.SECP256R1(), default_backend())
+    elif key_type == 'ed25519':
+        key = ed25519.Ed25519PrivateKey.generate()
     else:
-        result = ("export DOCKER_HOST=%(docker_host)s\n"
-                  "export DOCKER_CERT_PATH=%(cfg_dir)s\n"
-                  "export DOCKER_TLS_VERIFY=%(tls)s\n"
-                  % {'docker_host': cluster.api_address,
-                     'cfg_dir': cfg_dir,
-                     'tls': tls}
-                  )
+        raise exc.InvalidAttribute(
+            _("Key type must be one of %s") % ", ".join(KEY_TYPES))
 
-    return result
+    # Ed25519 keys have no traditional OpenSSL encoding.
+    key_format = (serialization.PrivateFormat.PKCS8 if key_type == 'ed25519'
+                  else serialization.PrivateFormat.TraditionalOpenSSL)
+    return key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=key_format,
+        encryption_algorithm=serialization.NoEncryption()).decode("utf-8")
 
 
-def generate_csr_and_key():
-    """Return a dict with a new csr and key."""
-    key = rsa.generate_private_key(
-        public_exponent=65537,
-        key_size=2048,
-        backend=default_backend())
+def generate_csr_and_key(key_type=DEFAULT_KEY_TYPE, key=None):
+    """Return a dict with a new csr and key.
 
+    :param key_type: type of the key to generate, see :func:`generate_key`.
+    :param key: optional existing private key PEM to build the csr for,
+                instead of generating a new one.
+    """
+    if key is None:
+        key = generate_key(key_type)
+    private_key = serialization.load_pem_private_key(
+        key.encode("utf-8"), password=None, backend=default_backend())
+
+    # Ed25519 signatures embed their own digest.
+    algorithm = (None if isinstance(private_key, ed25519.Ed25519PrivateKey)
+                 else hashes.SHA256())
     csr = x509.CertificateSigningRequestBuilder().subject_name(
         x509.Name([
             x509.NameAttribute(NameOID.COMMON_NAME, u"admin"),
             x509.NameAttribute(NameOID.ORGANIZATION_NAME, u"system:masters")
-        ])).sign(key, hashes.SHA256(), default_backend())
+        ])).sign(private_key, algorithm, default_backend())
 
     result = {
         'csr': csr.public_bytes(
             encoding=serialization.Encoding.PEM).decode("utf-8"),
-        'key': key.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.TraditionalOpenSSL,
-            encryption_algorithm=serialization.NoEncryption()).decode("utf-8"),
+        'key': key,
     }
 
     return result
+
+
+def generate_csrs_and_keys(count, key_type=DEFAULT_KEY_TYPE,
+                           max_workers=None):
+    """Return a list of count new csr and key dicts.
+
+    Key generation is CPU bound, so the keys are generated across a pool of
+    processes rather than threads.
+
+    :param count: number of csr and key pairs to generate.
+    :param key_type: type of the keys, see :func:`generate_key`.
+    :param max_workers: number of processes, defaults to the CPU count.
+    """
+    if key_type not in KEY_TYPES:
+        raise exc.InvalidAttribute(
+            _("Key type must be one of %s") % ", ".join(KEY_TYPES))
+    if count <= 1:
+        return [generate_csr_and_key(key_type) for _i in range(count)]
+    with futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(generate_csr_and_key, [key_type] * count))
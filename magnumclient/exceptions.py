@@ -53,6 +53,11 @@ class ConnectionRefused(ConnectionError):
     pass
 
 
+class DeadlineExceeded(ClientException):
+    """The overall deadline of an operation expired before it completed."""
+    pass
+
+
 class AuthPluginOptionsMissing(AuthorizationFailure):
     """Auth plugin misses some options."""
     def __init__(self, opt_names):
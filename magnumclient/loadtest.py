@@ -0,0 +1,408 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Drive the Magnum API through the v1 managers and measure it.
+
+An operation mix such as ``clusters.list=5,clusters.get=3`` is replayed
+with a number of concurrent workers, for a duration or a number of
+requests, and the latency percentiles, error rate and throughput of every
+operation are reported. ``--stub`` runs against the in-memory
+:mod:`magnumclient.stub_server` instead of a deployment.
+
+Two modes are available. ``thread`` runs closed-loop workers, each issuing
+its next request as soon as the previous one returns. ``async`` schedules
+requests from an event loop, at ``--rate`` per second if given, and runs
+them on an executor since the managers are synchronous. With a rate, its
+latencies are measured from the scheduled start, so time spent queued
+behind a saturated API counts; without one, from the start of each call.
+"""
+
+import argparse
+import asyncio
+import collections
+from concurrent import futures
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+from magnumclient.common import transport
+from magnumclient.v1 import client as v1_client
+
+DEFAULT_MIX = 'clusters.list=5,clusters.get=3,nodegroups.list=2'
+PERCENTILES = (50, 90, 95, 99)
+
+
+def _random_cluster(targets, rng):
+    return rng.choice(targets['clusters'])
+
+
+# Each operation takes the client, the targets found at setup and a
+# random.Random.
+OPERATIONS = {
+    'clusters.list': lambda c, t, r: c.clusters.list(),
+    'clusters.list_all': lambda c, t, r: c.clusters.list(limit=0),
+    'clusters.list_detail': lambda c, t, r: c.clusters.list(detail=True),
+    'clusters.get': lambda c, t, r: c.clusters.get(_random_cluster(t, r)),
+    'nodegroups.list': lambda c, t, r: c.nodegroups.list(
+        _random_cluster(t, r)),
+    'cluster_templates.list': lambda c, t, r: c.cluster_templates.list(),
+    'quotas.list': lambda c, t, r: c.quotas.list(all_tenants=True),
+    'stats.list': lambda c, t, r: c.stats.list(),
+    'mservices.list': lambda c, t, r: c.mservices.list(),
+}
+
+# Operations needing the uuids of existing clusters.
+_NEEDS_CLUSTERS = ('clusters.get', 'nodegroups.list')
+
+
+def parse_mix(text):
+    """Parse ``name=weight,...`` into a list of (operation, weight)."""
+    mix = []
+    for item in text.split(','):
+        name, _sep, weight = item.strip().partition('=')
+        if name not in OPERATIONS:
+            raise ValueError('Unknown operation %r, expected one of %s'
+                             % (name, ', '.join(sorted(OPERATIONS))))
+        try:
+            weight = float(weight) if weight else 1.0
+        except ValueError:
+            raise ValueError('Invalid weight for %s: %r' % (name, weight))
+        if weight < 0:
+            raise ValueError('Invalid weight for %s: %r' % (name, weight))
+        mix.append((name, weight))
+    if not any(weight for _name, weight in mix):
+        raise ValueError('The operation mix has no weight')
+    return mix
+
+
+def percentile(values, pct):
+    """Return the pct percentile of sorted values, interpolated."""
+    if not values:
+        return None
+    rank = (len(values) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def _error_key(error):
+    status = getattr(error, 'http_status', None)
+    if status:
+        return 'HTTP %s' % status
+    return type(error).__name__
+
+
+class Recorder(object):
+    """Thread-safe collection of the latencies and errors per operation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = collections.defaultdict(list)
+        self.errors = collections.defaultdict(collections.Counter)
+
+    def record(self, operation, latency, error=None):
+        with self._lock:
+            if error is None:
+                self.latencies[operation].append(latency)
+            else:
+                self.errors[operation][_error_key(error)] += 1
+
+    def summary(self, elapsed):
+        """Return the results as a JSON serializable dict."""
+        with self._lock:
+            names = sorted(set(self.latencies) | set(self.errors))
+            operations = dict((name, self._stats(self.latencies[name],
+                                                 self.errors[name], elapsed))
+                              for name in names)
+            total = self._stats(
+                list(itertools.chain(*self.latencies.values())),
+                sum(self.errors.values(), collections.Counter()), elapsed)
+        return {'elapsed': elapsed, 'total': total, 'operations': operations}
+
+    @staticmethod
+    def _stats(latencies, errors, elapsed):
+        latencies = sorted(latencies)
+        failed = sum(errors.values())
+        count = len(latencies) + failed
+        stats = {
+            'requests': count,
+            'errors': failed,
+            'error_rate': float(failed) / count if count else 0.0,
+            'throughput': count / elapsed if elapsed else 0.0,
+            'error_types': dict(errors),
+            'max': latencies[-1] if latencies else None,
+            'mean': sum(latencies) / len(latencies) if latencies else None,
+        }
+        for pct in PERCENTILES:
+            stats['p%d' % pct] = percentile(latencies, pct)
+        return stats
+
+
+class LoadTest(object):
+    """Replay an operation mix against a client.
+
+    :param client: a :class:`magnumclient.v1.client.Client`, shared by all
+                   workers.
+    :param mix: a list of (operation, weight), see :func:`parse_mix`.
+    :param duration: seconds to run for, unless ``requests`` is reached.
+    :param requests: number of requests to issue, or None.
+    """
+
+    def __init__(self, client, mix, concurrency=10, duration=10.0,
+                 requests=None, seed=None):
+        self.client = client
+        self.names = [name for name, _weight in mix]
+        self.weights = [weight for _name, weight in mix]
+        self.concurrency = concurrency
+        self.duration = duration
+        self.requests = requests
+        self.seed = seed
+        self.recorder = Recorder()
+        self.targets = {}
+
+    def setup(self):
+        """Find the resources the operations act on."""
+        if any(name in _NEEDS_CLUSTERS for name in self.names):
+            self.targets['clusters'] = [
+                c.uuid for c in self.client.clusters.list(limit=0)]
+            if not self.targets['clusters']:
+                raise ValueError('The operation mix needs at least one '
+                                 'cluster to exist')
+
+    def _call(self, name, rng, started=None):
+        if started is None:
+            started = time.monotonic()
+        try:
+            OPERATIONS[name](self.client, self.targets, rng)
+        except Exception as e:
+            self.recorder.record(name, time.monotonic() - started, e)
+        else:
+            self.recorder.record(name, time.monotonic() - started)
+
+    def _budget(self):
+        deadline = time.monotonic() + self.duration if self.duration else None
+        issued = itertools.count()
+
+        def more():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            return self.requests is None or next(issued) < self.requests
+        return more
+
+    def run_threads(self):
+        """Run closed-loop worker threads and return the summary."""
+        more = self._budget()
+
+        def worker(index):
+            rng = random.Random(None if self.seed is None
+                                else self.seed + index)
+            while more():
+                self._call(rng.choices(self.names, self.weights)[0], rng)
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=worker, args=(i,), daemon=True)
+                   for i in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.recorder.summary(time.monotonic() - start)
+
+    def run_async(self, rate=None):
+        """Schedule requests from an event loop and return the summary.
+
+        :param rate: requests per second to start, or None to keep
+                     ``concurrency`` requests in flight.
+        """
+        return asyncio.run(self._run_async(rate))
+
+    async def _run_async(self, rate):
+        loop = asyncio.get_running_loop()
+        rng = random.Random(self.seed)
+        slots = asyncio.Semaphore(self.concurrency)
+        more = self._budget()
+        pending = set()
+        start = time.monotonic()
+        with futures.ThreadPoolExecutor(self.concurrency) as executor:
+            for n in itertools.count():
+                # Without a rate, the latency is measured from the call, not
+                # including the wait for a free slot.
+                scheduled = start + n / rate if rate else None
+                if scheduled is not None:
+                    delay = scheduled - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                if not more():
+                    break
+                await slots.acquire()
+                name = rng.choices(self.names, self.weights)[0]
+                task = loop.run_in_executor(
+                    executor, self._call, name, random.Random(rng.random()),
+                    scheduled)
+                task.add_done_callback(lambda _task: slots.release())
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.wait(pending)
+        return self.recorder.summary(time.monotonic() - start)
+
+
+def format_report(summary):
+    """Render a summary as a text table, latencies in milliseconds."""
+    columns = ['requests', 'errors', 'error_rate', 'throughput', 'mean']
+    columns += ['p%d' % pct for pct in PERCENTILES] + ['max']
+    lines = ['%-24s %9s %7s %7s %9s' % ('operation', 'requests', 'errors',
+                                        'err%', 'req/s')
+             + ''.join(' %8s' % c for c in columns[4:])]
+    rows = sorted(summary['operations'].items())
+    rows.append(('TOTAL', summary['total']))
+    for name, stats in rows:
+        line = '%-24s %9d %7d %6.2f%% %9.1f' % (
+            name, stats['requests'], stats['errors'],
+            stats['error_rate'] * 100, stats['throughput'])
+        for column in columns[4:]:
+            value = stats[column]
+            line += ' %8s' % ('-' if value is None
+                              else '%.1f' % (value * 1000))
+        lines.append(line)
+        for error, count in sorted(stats['error_types'].items()):
+            if name != 'TOTAL':
+                lines.append('    %s: %d' % (error, count))
+    lines.append('elapsed: %.2fs, latencies in ms' % summary['elapsed'])
+    return '\n'.join(lines)
+
+
+def _make_client(args):
+    # Every simulated request must reach the API, so identical concurrent
+    # GETs are not coalesced.
+    if args.endpoint and args.token:
+        return v1_client.Client(endpoint_override=args.endpoint,
+                                auth_token=args.token,
+                                api_version=args.api_version,
+                                single_flight=False,
+                                transport=args.transport,
+                                pool_size=args.concurrency,
+                                ca_file=args.os_cacert)
+    return v1_client.Client(
+        cloud=args.os_cloud, endpoint_override=args.endpoint,
+        auth_type=os.environ.get('OS_AUTH_TYPE', 'password'),
+        api_version=args.api_version, single_flight=False,
+        transport=args.transport, pool_size=args.concurrency)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='magnum-loadtest',
+        description='Replay a mix of Magnum API operations through '
+                    'python-magnumclient and report latency percentiles, '
+                    'error rates and throughput.')
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help='Weighted operations, name=weight separated by '
+                             'commas (default: %s). Available: %s.'
+                             % (DEFAULT_MIX, ', '.join(sorted(OPERATIONS))))
+    parser.add_argument('--mode', choices=['thread', 'async'],
+                        default='thread')
+    parser.add_argument('-c', '--concurrency', type=int, default=10,
+                        help='Workers, or requests in flight in async mode '
+                             '(default: 10).')
+    parser.add_argument('-d', '--duration', type=float, default=10.0,
+                        help='Seconds to run for; 0 for no limit '
+                             '(default: 10).')
+    parser.add_argument('-n', '--requests', type=int,
+                        help='Stop after this many requests.')
+    parser.add_argument('--rate', type=float,
+                        help='Requests started per second in async mode.')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('-f', '--format', choices=['table', 'json'],
+                        default='table')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Log the client warnings, such as every '
+                             'failed request.')
+    auth = parser.add_argument_group(
+        'target', 'Without these options the OS_* environment variables '
+                  'or clouds.yaml are used.')
+    auth.add_argument('--os-cloud', default=os.environ.get('OS_CLOUD'))
+    auth.add_argument('--endpoint', help='Magnum endpoint, e.g. '
+                                         'http://controller:9511/v1.')
+    auth.add_argument('--token', help='Token to use with --endpoint.')
+    auth.add_argument('--os-cacert', default=os.environ.get('OS_CACERT'),
+                      help='CA bundle to verify an https --endpoint with.')
+    auth.add_argument('--api-version', default='latest')
+    auth.add_argument('--transport', choices=transport.available(),
+                      help='HTTP library requests are sent with (default: '
+                           '%s with --endpoint and --token, requests '
+                           'otherwise; httplib needs --endpoint and '
+                           '--token).' % transport.DEFAULT_TRANSPORT)
+    stub = parser.add_argument_group(
+        'stub', 'Run against a local in-memory Magnum API.')
+    stub.add_argument('--stub', action='store_true')
+    stub.add_argument('--stub-clusters', type=int, default=100)
+    stub.add_argument('--stub-latency', type=float, default=0.0)
+    stub.add_argument('--stub-error-rate', type=float, default=0.0)
+    stub.add_argument('--stub-tls', action='store_true',
+                      help='Serve HTTPS, and HTTP/2 when h2 is installed.')
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.WARNING if args.verbose else logging.ERROR)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+    if not args.duration and not args.requests:
+        parser.error('--duration 0 needs --requests')
+
+    server = None
+    if args.stub:
+        from magnumclient import stub_server
+        server = stub_server.StubServer(
+            clusters=args.stub_clusters, latency=args.stub_latency,
+            seed=args.seed, tls=args.stub_tls).start()
+        args.endpoint, args.token = server.endpoint, server.token
+        if server.ca_file:
+            args.os_cacert = server.ca_file
+    try:
+        test = LoadTest(_make_client(args), mix,
+                        concurrency=args.concurrency,
+                        duration=args.duration, requests=args.requests,
+                        seed=args.seed)
+        try:
+            test.setup()
+        except ValueError as e:
+            parser.error(str(e))
+        if server is not None:
+            # Errors are only injected once setup is done.
+            server.error_rate = args.stub_error_rate
+        if args.mode == 'async':
+            summary = test.run_async(rate=args.rate)
+        else:
+            summary = test.run_threads()
+    finally:
+        if server is not None:
+            server.stop()
+
+    if args.format == 'json':
+        print(json.dumps(summary, indent=2, sort_keys=True))
+    else:
+        print(format_report(summary))
+    return 1 if summary['total']['requests'] == 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
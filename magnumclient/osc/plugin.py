@@ -15,6 +15,8 @@ import logging
 
 from osc_lib import utils
 
+from magnumclient.common import cacache
+
 LOG = logging.getLogger(__name__)
 
 DEFAULT_MAJOR_API_VERSION = '1'
@@ -48,7 +50,10 @@ def make_client(instance):
                            interface=instance._interface,
                            insecure=instance._insecure,
                            ca_cert=instance._cacert,
-                           api_version=api_version)
+                           api_version=api_version,
+                           ca_cache=cacache.CACache(cacache.default_path()),
+                           transport=instance.get_configuration().get(
+                               'container_infra_transport'))
     return client
 
 
@@ -64,4 +69,12 @@ def build_option_parser(parser):
         help='Container-Infra API version, default=' +
              DEFAULT_MAJOR_API_VERSION +
              ' (Env: OS_CONTAINER_INFRA_API_VERSION)')
+    parser.add_argument(
+        '--os-container-infra-transport',
+        metavar='<transport>',
+        choices=['requests', 'urllib3', 'httpx'],
+        default=utils.env('OS_CONTAINER_INFRA_TRANSPORT'),
+        help='HTTP library the Container-Infra API requests are sent with: '
+             'requests (default), urllib3 or httpx, which uses HTTP/2 when '
+             'h2 is installed (Env: OS_CONTAINER_INFRA_TRANSPORT)')
     return parser
@@ -15,6 +15,7 @@
 from magnumclient.common import utils as magnum_utils
 from magnumclient.exceptions import InvalidAttribute
 from magnumclient.i18n import _
+from magnumclient.osc.v1 import streaming
 from magnumclient.v1.cluster_templates import (
     CLUSTER_TEMPLATE_ATTRIBUTES
 )
@@ -303,7 +304,7 @@ class DeleteClusterTemplate(command.Command):
                       {'cluster_template': cluster_template, 'e': e})
 
 
-class ListTemplateCluster(command.Lister):
+class ListTemplateCluster(streaming.StreamingLister):
     """List Cluster Templates."""
     _description = _("List Cluster Templates.")
 
@@ -315,7 +316,8 @@ class ListTemplateCluster(command.Lister):
             '--limit',
             metavar='<limit>',
             type=int,
-            help=_('Maximum number of cluster templates to return'))
+            help=_('Maximum number of cluster templates to return '
+                   '(default: all of them, a page at a time)'))
         parser.add_argument(
             '--sort-key',
             metavar='<sort-key>',
@@ -335,6 +337,15 @@ class ListTemplateCluster(command.Lister):
                    'registry_enabled'
                    )
             )
+        parser.add_argument(
+            '--filter',
+            metavar='<key=value>',
+            dest='filters',
+            action='append',
+            help=_('Only list the cluster templates whose attribute has '
+                   'this value. Filters the API supports are sent to it, the '
+                   'others are applied as the pages arrive. Repeat to add '
+                   'filters; a key repeated matches any of its values.'))
         return parser
 
     def take_action(self, parsed_args):
@@ -344,9 +355,10 @@ class ListTemplateCluster(command.Lister):
         columns = ['uuid', 'name', 'tags']
         if parsed_args.fields:
             columns += parsed_args.fields.split(',')
-        cts = mag_client.cluster_templates.list(limit=parsed_args.limit,
-                                                sort_key=parsed_args.sort_key,
-                                                sort_dir=parsed_args.sort_dir)
+        cts = mag_client.cluster_templates.list_iter(
+            limit=streaming.page_limit(parsed_args.limit),
+            sort_key=parsed_args.sort_key, sort_dir=parsed_args.sort_dir,
+            filters=magnum_utils.format_filters(parsed_args.filters))
         return (
             columns,
             (osc_utils.get_item_properties(ct, columns) for ct in cts)
@@ -14,15 +14,82 @@
 
 import os
 
+from magnumclient.common import keystore
+from magnumclient.common import kubeconfig
 from magnumclient.common import utils as magnum_utils
 from magnumclient import exceptions
 from magnumclient.i18n import _
+from magnumclient.osc.v1 import streaming
+from magnumclient.osc.v1 import watch
 from magnumclient.v1.clusters import CLUSTER_ATTRIBUTES  # noqa: F401
 
 from osc_lib.command import command
 from osc_lib import utils
 
 
+def _load_cluster_specs(path):
+    """Read cluster creation entries from a YAML or JSON manifest.
+
+    The manifest is either a list of entries, or a mapping with a
+    ``clusters`` list and an optional ``defaults`` mapping merged into every
+    entry. Entries use the API attribute names (``cluster_template_id``,
+    ``node_count``, ...), and must all have a name and a cluster template.
+    """
+    manifest = magnum_utils.handle_yaml_from_file(path)
+    defaults = {}
+    if isinstance(manifest, dict):
+        defaults = manifest.get('defaults') or {}
+        manifest = manifest.get('clusters')
+    if not isinstance(manifest, list) or not isinstance(defaults, dict):
+        raise exceptions.CommandError(
+            _("%s must contain a list of clusters, or a mapping with a "
+              "'clusters' list and optional 'defaults'.") % path)
+
+    specs = []
+    for index, entry in enumerate(manifest):
+        if not isinstance(entry, dict):
+            raise exceptions.CommandError(
+                _("Cluster entries in %(path)s must be mappings, not "
+                  "%(entry)r") % {'path': path, 'entry': entry})
+        spec = dict(defaults)
+        spec.update(entry)
+        missing = [key for key in ('name', 'cluster_template_id')
+                   if not spec.get(key)]
+        if missing:
+            raise exceptions.CommandError(
+                _("Cluster entry %(index)d in %(path)s has no %(keys)s.")
+                % {'index': index, 'path': path,
+                   'keys': ', '.join(missing)})
+        labels = spec.get('labels')
+        if isinstance(labels, str):
+            labels = [labels]
+        if isinstance(labels, list):
+            spec['labels'] = magnum_utils.handle_labels(labels)
+        specs.append(spec)
+    return specs
+
+
+# Options of CreateCluster setting attributes of a single cluster, which
+# come from the manifest with --from-file.
+_SINGLE_CLUSTER_OPTIONS = (
+    ('cluster_template', '--cluster-template'),
+    ('discovery_url', '--discovery-url'),
+    ('docker_volume_size', '--docker-volume-size'),
+    ('labels', '--labels'),
+    ('keypair', '--keypair'),
+    ('master_count', '--master-count'),
+    ('node_count', '--node-count'),
+    ('timeout', '--timeout'),
+    ('master_flavor', '--master-flavor'),
+    ('flavor', '--flavor'),
+    ('fixed_network', '--fixed-network'),
+    ('fixed_subnet', '--fixed-subnet'),
+    ('floating_ip_enabled', '--floating-ip-enabled/--floating-ip-disabled'),
+    ('merge_labels', '--merge-labels'),
+    ('master_lb_enabled', '--master-lb-enabled/--master-lb-disabled'),
+)
+
+
 class CreateCluster(command.Command):
     _description = _("Create a cluster")
 
@@ -32,9 +99,9 @@ class CreateCluster(command.Command):
         # with a default, required.
         parser.add_argument('--cluster-template',
                             dest='cluster_template',
-                            required=True,
                             metavar='<cluster-template>',
-                            help='ID or name of the cluster template.')
+                            help=('ID or name of the cluster template. '
+                                  'Required unless --from-file is used.'))
         parser.add_argument('--discovery-url',
                             dest='discovery_url',
                             metavar='<discovery-url>',
@@ -59,21 +126,21 @@ class CreateCluster(command.Command):
         parser.add_argument('--master-count',
                             dest='master_count',
                             type=int,
-                            default=1,
                             metavar='<master-count>',
-                            help='The number of master nodes for the cluster.')
+                            help='The number of master nodes for the cluster '
+                                 '(default: 1).')
         parser.add_argument('name',
                             metavar='<name>',
-                            help='Name of the cluster to create.')
+                            nargs='?',
+                            help=('Name of the cluster to create. Required '
+                                  'unless --from-file is used.'))
         parser.add_argument('--node-count',
                             dest='node_count',
                             type=int,
-                            default=1,
                             metavar='<node-count>',
-                            help='The cluster node count.')
+                            help='The cluster node count (default: 1).')
         parser.add_argument('--timeout',
                             type=int,
-                            default=60,
                             metavar='<timeout>',
                             help=('The timeout for cluster creation time. The '
                                   'default is 60 minutes.'))
@@ -133,6 +200,31 @@ class CreateCluster(command.Command):
             action='append_const',
             const=False,
             help=_('Disable master LB creation on the new cluster'))
+        parser.add_argument(
+            '--from-file',
+            dest='from_file',
+            metavar='<file>',
+            help=_('YAML or JSON manifest describing several clusters to '
+                   'create at once, either as a list of entries or as a '
+                   'mapping with a "clusters" list and optional "defaults". '
+                   'Entries use API attribute names such as '
+                   'cluster_template_id and node_count. All entries are '
+                   'validated before any cluster is created. Cannot be '
+                   'combined with the options of a single cluster.'))
+        parser.add_argument(
+            '--parallel',
+            metavar='<parallel>',
+            type=int,
+            default=magnum_utils.DEFAULT_MAX_WORKERS,
+            help=_('Maximum number of create requests in flight when '
+                   'using --from-file (default: %d).')
+            % magnum_utils.DEFAULT_MAX_WORKERS)
+        parser.add_argument(
+            '--wait',
+            action='store_true',
+            default=False,
+            help=_('Wait until the cluster(s) finished creating and report '
+                   'their final status.'))
 
         return parser
 
@@ -140,6 +232,19 @@ class CreateCluster(command.Command):
         self.log.debug("take_action(%s)", parsed_args)
 
         mag_client = self.app.client_manager.container_infra
+        if parsed_args.from_file:
+            return self._create_from_file(mag_client, parsed_args)
+        if parsed_args.name is None or parsed_args.cluster_template is None:
+            raise exceptions.CommandError(
+                _('A cluster name and --cluster-template are required '
+                  'unless --from-file is used.'))
+
+        # The defaults are not set by the parser, so that --from-file can
+        # tell the options that were given.
+        for dest, default in (('master_count', 1), ('node_count', 1),
+                              ('timeout', 60)):
+            if getattr(parsed_args, dest) is None:
+                setattr(parsed_args, dest, default)
         args = {
             'cluster_template_id': parsed_args.cluster_template,
             'create_timeout': parsed_args.timeout,
@@ -202,6 +307,54 @@ class CreateCluster(command.Command):
         cluster = mag_client.clusters.create(**args)
         print("Request to create cluster %s accepted"
               % cluster.uuid)
+        if parsed_args.wait:
+            cluster = mag_client.clusters.wait_for_completion(cluster.uuid)
+            print("Cluster %s is %s" % (cluster.uuid, cluster.status))
+            if not (cluster.status or '').endswith('_COMPLETE'):
+                raise exceptions.CommandError(
+                    _('Cluster %(uuid)s failed: %(status)s')
+                    % {'uuid': cluster.uuid, 'status': cluster.status})
+
+    def _create_from_file(self, mag_client, parsed_args):
+        if parsed_args.name is not None:
+            raise exceptions.CommandError(
+                _('--from-file cannot be combined with a cluster name.'))
+        given = [option for dest, option in _SINGLE_CLUSTER_OPTIONS
+                 if getattr(parsed_args, dest) not in (None, False, [])]
+        if given:
+            raise exceptions.CommandError(
+                _('--from-file cannot be combined with %s, set them in the '
+                  'manifest instead.') % ', '.join(given))
+
+        specs = _load_cluster_specs(parsed_args.from_file)
+        results = mag_client.clusters.create_many(
+            specs, max_workers=parsed_args.parallel, wait=parsed_args.wait)
+
+        # Rows are printed as each cluster completes, so the name column
+        # width is taken from the manifest rather than from the results.
+        width = max([len('Name')] +
+                    [len(str(spec.get('name', ''))) for spec in specs])
+        row = '%%-%ds  %%-36s  %%s' % width
+        print(row % ('Name', 'UUID', 'Result'), flush=True)
+        failed = 0
+        for result in results:
+            name = result.item.get('name', '-')
+            if result.error is not None:
+                failed += 1
+                print(row % (name, '-', 'FAILED: %s' % result.error),
+                      flush=True)
+                continue
+            status = 'ACCEPTED'
+            if parsed_args.wait:
+                status = result.result.status
+                if not status.endswith('_COMPLETE'):
+                    failed += 1
+            print(row % (name, result.result.uuid, status), flush=True)
+
+        if failed:
+            raise exceptions.CommandError(
+                _('%(failed)d of %(total)d clusters failed.')
+                % {'failed': failed, 'total': len(specs)})
 
 
 class DeleteCluster(command.Command):
@@ -226,7 +379,7 @@ class DeleteCluster(command.Command):
             print("Request to delete cluster %s has been accepted." % cluster)
 
 
-class ListCluster(command.Lister):
+class ListCluster(streaming.StreamingLister):
     _description = _("List clusters")
 
     def get_parser(self, prog_name):
@@ -236,7 +389,8 @@ class ListCluster(command.Lister):
             '--limit',
             metavar='<limit>',
             type=int,
-            help=_('Maximum number of clusters to return'))
+            help=_('Maximum number of clusters to return '
+                   '(default: all of them, a page at a time)'))
         parser.add_argument(
             '--sort-key',
             metavar='<sort-key>',
@@ -246,6 +400,15 @@ class ListCluster(command.Lister):
             metavar='<sort-dir>',
             choices=['desc', 'asc'],
             help=_('Direction to sort. "asc" or "desc".'))
+        parser.add_argument(
+            '--filter',
+            metavar='<key=value>',
+            dest='filters',
+            action='append',
+            help=_('Only list the clusters whose attribute has this value. '
+                   'Filters the API supports are sent to it, the others '
+                   'are applied as the pages arrive. Repeat to add filters; '
+                   'a key repeated matches any of its values.'))
 
         return parser
 
@@ -256,15 +419,27 @@ class ListCluster(command.Lister):
         columns = [
             'uuid', 'name', 'keypair', 'node_count', 'master_count', 'status',
             'health_status']
-        clusters = mag_client.clusters.list(limit=parsed_args.limit,
-                                            sort_key=parsed_args.sort_key,
-                                            sort_dir=parsed_args.sort_dir)
+        clusters = mag_client.clusters.list_iter(
+            limit=streaming.page_limit(parsed_args.limit),
+            sort_key=parsed_args.sort_key, sort_dir=parsed_args.sort_dir,
+            filters=magnum_utils.format_filters(parsed_args.filters))
         return (
             columns,
             (utils.get_item_properties(c, columns) for c in clusters)
         )
 
 
+class WatchCluster(watch.WatchCommand):
+    _description = _("Follow the status, health and node count of every "
+                     "cluster, printing only what changes")
+
+    def get_watch(self, parsed_args):
+        mag_client = self.app.client_manager.container_infra
+        return mag_client.clusters.watch(
+            fast_interval=parsed_args.interval,
+            slow_interval=parsed_args.max_interval)
+
+
 class ShowCluster(command.ShowOne):
     _description = _("Show a Cluster")
 
@@ -381,7 +556,31 @@ class ConfigCluster(command.Command):
         parser.add_argument(
             'cluster',
             metavar='<cluster>',
-            help=_('The name or UUID of cluster to update'))
+            nargs='*',
+            help=_('The name or UUID of the cluster(s) to configure. With '
+                   'several clusters, each one is configured in its own '
+                   '<dir>/<cluster name> directory unless --merge is used.'))
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            dest='all_clusters',
+            default=False,
+            help=_('Configure every cluster of the project.'))
+        parser.add_argument(
+            '--merge',
+            action='store_true',
+            default=False,
+            help=_('Add or update one context per cluster, named after the '
+                   'cluster, in the kubeconfig <dir>/config, keeping its '
+                   'other contexts (kubernetes only).'))
+        parser.add_argument(
+            '--parallel',
+            metavar='<parallel>',
+            type=int,
+            default=magnum_utils.DEFAULT_MAX_WORKERS,
+            help=_('Maximum number of clusters configured at once when '
+                   'configuring several clusters (default: %d).')
+            % magnum_utils.DEFAULT_MAX_WORKERS)
         parser.add_argument(
             '--dir',
             metavar='<dir>',
@@ -411,6 +610,30 @@ class ConfigCluster(command.Command):
             dest='use_keystone',
             default=False,
             help=_('Use Keystone token in config files.'))
+        parser.add_argument(
+            '--key-type',
+            dest='key_type',
+            choices=magnum_utils.KEY_TYPES,
+            default=magnum_utils.DEFAULT_KEY_TYPE,
+            help=_('Type of the client private key: rsa (2048 bits), '
+                   'ecdsa (P-256) or ed25519. ecdsa and ed25519 are much '
+                   'faster to generate but must be accepted by the cluster '
+                   'CA (default: %s).') % magnum_utils.DEFAULT_KEY_TYPE)
+        parser.add_argument(
+            '--reuse-key',
+            action='store_true',
+            dest='reuse_key',
+            default=False,
+            help=_('Reuse the private key stored for the cluster in the key '
+                   'store instead of generating a new one, creating it on '
+                   'first use.'))
+        parser.add_argument(
+            '--key-store',
+            metavar='<dir>',
+            dest='key_store',
+            help=_('Directory of the key store used by --reuse-key, which it '
+                   'implies. It must only be accessible by its owner '
+                   '(default: $XDG_CONFIG_HOME/magnumclient/keys).'))
 
         return parser
 
@@ -431,7 +654,22 @@ class ConfigCluster(command.Command):
         mag_client = self.app.client_manager.container_infra
 
         parsed_args.dir = os.path.abspath(parsed_args.dir)
-        cluster = mag_client.clusters.get(parsed_args.cluster)
+        if parsed_args.all_clusters and parsed_args.cluster:
+            raise exceptions.CommandError(
+                _('--all cannot be combined with cluster names.'))
+        if not parsed_args.all_clusters and not parsed_args.cluster:
+            raise exceptions.CommandError(
+                _('A cluster is required unless --all is used.'))
+
+        key_store = None
+        if parsed_args.reuse_key or parsed_args.key_store:
+            key_store = keystore.KeyStore(parsed_args.key_store)
+
+        if (parsed_args.all_clusters or parsed_args.merge or
+                len(parsed_args.cluster) > 1):
+            return self._config_many(mag_client, parsed_args, key_store)
+
+        cluster = mag_client.clusters.get(parsed_args.cluster[0])
         if cluster.api_address is None:
             self.log.warning("WARNING: The cluster's api_address is"
                              " not known yet.")
@@ -443,7 +681,9 @@ class ConfigCluster(command.Command):
             mag_client=mag_client,
             cluster_uuid=cluster.uuid,
             tls_required=(not cluster_template.tls_disabled),
-            certkey_required=(not parsed_args.use_keystone)
+            certkey_required=(not parsed_args.use_keystone),
+            key_type=parsed_args.key_type,
+            key_store=key_store,
         )
 
         if parsed_args.output_certs:
@@ -458,12 +698,159 @@ class ConfigCluster(command.Command):
             force=parsed_args.force, certs=tls,
             use_keystone=parsed_args.use_keystone))
 
+    def _config_many(self, mag_client, parsed_args, key_store):
+        parallel = parsed_args.parallel
+        if parsed_args.all_clusters:
+            clusters = mag_client.clusters.list(limit=0, detail=True)
+            failed = 0
+        else:
+            clusters = []
+            failed = self._collect(
+                magnum_utils.run_concurrently(
+                    mag_client.clusters.get, parsed_args.cluster,
+                    max_workers=parallel,
+                    http_client=mag_client.http_client),
+                clusters, 'fetch cluster')
+
+        # Clusters usually share a handful of templates.
+        templates = {}
+        template_ids = set(c.cluster_template_id for c in clusters)
+        for result in magnum_utils.run_concurrently(
+                mag_client.cluster_templates.get, template_ids,
+                max_workers=parallel, http_client=mag_client.http_client):
+            templates[result.item] = result
+        jobs = []
+        for cluster in clusters:
+            result = templates[cluster.cluster_template_id]
+            if result.error is not None:
+                failed += 1
+                self._warn_failure(cluster.name, 'fetch cluster template',
+                                   result.error)
+            elif parsed_args.merge and result.result.coe != 'kubernetes':
+                failed += 1
+                self._warn_failure(cluster.name, 'merge config',
+                                   'only kubernetes clusters can be merged')
+            else:
+                jobs.append((cluster, result.result))
+
+        # Keys are CPU bound to generate, so the fresh ones, including those
+        # missing from the key store, are made upfront with their CSRs
+        # across processes and the API calls then run on threads. Stored
+        # keys only need their CSR.
+        keys = {}
+        csrs = {}
+        if not parsed_args.use_keystone:
+            key_type = parsed_args.key_type
+            need_key = [c.uuid for c, t in jobs if not t.tls_disabled]
+            if key_store is not None:
+                for uuid in need_key:
+                    key = key_store.find_key(uuid, key_type)
+                    if key is not None:
+                        keys[uuid] = key
+            missing = [uuid for uuid in need_key if uuid not in keys]
+            if missing:
+                fresh = magnum_utils.generate_csrs_and_keys(len(missing),
+                                                            key_type)
+                for uuid, csr in zip(missing, fresh):
+                    key = csr['key']
+                    if key_store is not None:
+                        key = key_store.add_key(uuid, key, key_type)
+                    if key == csr['key']:
+                        csrs[uuid] = csr
+                    else:
+                        # Another run stored a key first.
+                        keys[uuid] = key
+
+        def _fetch(job):
+            cluster, cluster_template = job
+            return self._fetch_tls(
+                mag_client=mag_client,
+                cluster_uuid=cluster.uuid,
+                tls_required=(not cluster_template.tls_disabled),
+                certkey_required=(not parsed_args.use_keystone),
+                key_type=parsed_args.key_type,
+                key=keys.get(cluster.uuid),
+                csr=csrs.get(cluster.uuid))
+
+        names = [c.name for c, _t in jobs]
+        configs = []
+        for result in magnum_utils.run_concurrently(
+                _fetch, jobs, max_workers=parallel,
+                http_client=mag_client.http_client):
+            cluster, cluster_template = result.item
+            if result.error is not None:
+                failed += 1
+                self._warn_failure(cluster.name, 'fetch certificates',
+                                   result.error)
+                continue
+            # Names are not unique, fall back to the uuid on clashes.
+            name = cluster.name
+            if not name or names.count(name) > 1:
+                name = cluster.uuid
+            try:
+                configs.append((name, self._write_one(
+                    cluster, cluster_template, name, result.result,
+                    parsed_args)))
+            except Exception as e:
+                failed += 1
+                self._warn_failure(cluster.name, 'write config', e)
+
+        if parsed_args.merge and configs:
+            # Only the contexts of the configured clusters are replaced, the
+            # rest of an existing kubeconfig is kept as is.
+            merged = kubeconfig.KubeConfig()
+            for name, cfg in sorted(configs, key=lambda c: c[0]):
+                merged.merge(cfg)
+            cfg_file = os.path.join(parsed_args.dir, 'config')
+            kubeconfig.update_file(cfg_file, merged)
+            print("export KUBECONFIG=%s" % cfg_file)
+        else:
+            for name, output in sorted(configs):
+                print("# %s\n%s" % (name, output))
+
+        if failed:
+            raise exceptions.CommandError(
+                _('%(failed)d of %(total)d clusters failed.')
+                % {'failed': failed, 'total': failed + len(configs)})
+
+    def _write_one(self, cluster, cluster_template, name, tls, parsed_args):
+        if parsed_args.merge:
+            return magnum_utils.kubeconfig_for_cluster(
+                cluster, cluster_template, certs=tls or None,
+                use_keystone=parsed_args.use_keystone, name=name)
+        path = os.path.join(parsed_args.dir, name)
+        os.makedirs(path, exist_ok=True)
+        if parsed_args.output_certs:
+            self._write_certs(certs=tls, path=path, force=parsed_args.force)
+        return magnum_utils.config_cluster(
+            cluster, cluster_template, path, force=parsed_args.force,
+            certs=tls, use_keystone=parsed_args.use_keystone)
+
+    def _collect(self, results, items, action):
+        failed = 0
+        for result in results:
+            if result.error is not None:
+                failed += 1
+                self._warn_failure(result.item, action, result.error)
+            else:
+                items.append(result.result)
+        return failed
+
+    def _warn_failure(self, cluster, action, error):
+        self.log.warning("Failed to %(action)s for %(cluster)s: %(error)s",
+                         {'action': action, 'cluster': cluster,
+                          'error': error})
+
     def _fetch_tls(
             self,
             mag_client,
             cluster_uuid,
             tls_required,
             certkey_required=True,
+            key_type=magnum_utils.DEFAULT_KEY_TYPE,
+            key_store=None,
+            key=None,
+            csr=None,
     ):
         if not tls_required:
             return {}
@@ -475,7 +862,10 @@ class ConfigCluster(command.Command):
         }
 
         if certkey_required:
-            csr = magnum_utils.generate_csr_and_key()
+            if csr is None:
+                if key is None and key_store is not None:
+                    key = key_store.get_key(cluster_uuid, key_type)
+                csr = magnum_utils.generate_csr_and_key(key_type, key=key)
             opts['csr'] = csr['csr']
             tls['cert'] = mag_client.certificates.create(**opts).pem
             tls['key'] = csr['key']
@@ -0,0 +1,155 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+
+from magnumclient.i18n import _
+from magnumclient.v1 import fleet_upgrade
+
+from osc_lib.command import command
+
+
+def _format_progress(progress):
+    text = '%d/%d upgraded, %d failed' % (
+        progress['upgraded'], progress['total'], progress['failed'])
+    if progress['clusters_per_hour'] is not None:
+        text += ', %.1f clusters/h, ETA %s' % (
+            progress['clusters_per_hour'],
+            datetime.timedelta(seconds=int(progress['eta'])))
+    return text
+
+
+class UpgradeFleet(command.Command):
+    _description = _("Upgrade many clusters to a cluster template in waves")
+
+    def get_parser(self, prog_name):
+        parser = super(UpgradeFleet, self).get_parser(prog_name)
+        parser.add_argument(
+            'cluster_template',
+            metavar='<cluster-template>',
+            help=_('ID or name of the cluster template to upgrade to.'))
+        parser.add_argument(
+            '--state-file',
+            metavar='<path>',
+            required=True,
+            help=_('JSON file keeping the plan and the progress. Run the '
+                   'command again with the same file to resume a paused or '
+                   'interrupted upgrade. Creating <path>.pause pauses it '
+                   'once the clusters being upgraded are done.'))
+        parser.add_argument(
+            '--cluster',
+            metavar='<cluster>',
+            dest='clusters',
+            action='append',
+            help=_('ID or name of a cluster to upgrade, in order; repeat '
+                   'for more clusters (default: every cluster not using '
+                   'the cluster template, by name).'))
+        parser.add_argument(
+            '--wave-size',
+            metavar='<wave-size>',
+            type=int,
+            default=fleet_upgrade.DEFAULT_WAVE_SIZE,
+            help=_('Number of clusters per wave (default: %d).')
+            % fleet_upgrade.DEFAULT_WAVE_SIZE)
+        parser.add_argument(
+            '--concurrency',
+            metavar='<concurrency>',
+            type=int,
+            default=fleet_upgrade.DEFAULT_CONCURRENCY,
+            help=_('Number of clusters upgrading at the same time '
+                   '(default: %d).') % fleet_upgrade.DEFAULT_CONCURRENCY)
+        parser.add_argument(
+            '--max-batch-size',
+            metavar='<max_batch_size>',
+            type=int,
+            default=1,
+            help=_("The max batch size for upgrading each time."))
+        parser.add_argument(
+            '--nodegroup',
+            metavar='<nodegroup>',
+            help=_('Only upgrade the nodegroup with this name in every '
+                   'cluster.'))
+        parser.add_argument(
+            '--max-failures',
+            metavar='<max-failures>',
+            type=int,
+            default=0,
+            help=_('Number of failed clusters a wave may have before the '
+                   'upgrade pauses (default: 0).'))
+        parser.add_argument(
+            '--require-healthy',
+            action='store_true',
+            default=False,
+            help=_('Count clusters whose health_status is not HEALTHY as '
+                   'failed. By default only UNHEALTHY clusters fail.'))
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            default=False,
+            help=_('Upgrade again the clusters that failed in an earlier '
+                   'run.'))
+        parser.add_argument(
+            '--poll-interval',
+            metavar='<seconds>',
+            type=float,
+            default=fleet_upgrade.DEFAULT_POLL_INTERVAL,
+            help=_('Seconds between status polls of an upgrading cluster '
+                   '(default: %d).') % fleet_upgrade.DEFAULT_POLL_INTERVAL)
+        parser.add_argument(
+            '--timeout',
+            metavar='<seconds>',
+            type=float,
+            help=_('Seconds an upgrading cluster may take before it counts '
+                   'as failed (default: no limit).'))
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug("take_action(%s)", parsed_args)
+
+        mag_client = self.app.client_manager.container_infra
+        upgrade = fleet_upgrade.FleetUpgrade(
+            mag_client, parsed_args.cluster_template, parsed_args.state_file,
+            clusters=parsed_args.clusters,
+            wave_size=parsed_args.wave_size,
+            concurrency=parsed_args.concurrency,
+            max_batch_size=parsed_args.max_batch_size,
+            nodegroup=parsed_args.nodegroup,
+            max_failures=parsed_args.max_failures,
+            require_healthy=parsed_args.require_healthy,
+            poll_interval=parsed_args.poll_interval,
+            timeout=parsed_args.timeout,
+            retry_failed=parsed_args.retry_failed)
+        waves = len(upgrade.plan()['waves'])
+
+        for event in upgrade.run():
+            if event.kind == fleet_upgrade.STARTED:
+                print("Upgrading %d clusters in %d waves: %s"
+                      % (event.progress['total'], waves,
+                         _format_progress(event.progress)))
+            elif event.kind == fleet_upgrade.WAVE_STARTED:
+                print("Wave %d/%d started" % (event.wave, waves))
+            elif event.kind == fleet_upgrade.WAVE_PASSED:
+                print("Wave %d/%d passed its health gate"
+                      % (event.wave, waves))
+            elif event.kind == fleet_upgrade.PAUSED:
+                print("Paused: %s. Run the command again with the same "
+                      "state file to resume." % event.entry['reason'])
+                return 1
+            elif event.kind == fleet_upgrade.FINISHED:
+                print("Finished: %s" % _format_progress(event.progress))
+            else:
+                entry = event.entry
+                print("Cluster %s %s (%s): %s" % (
+                    entry['name'] or event.uuid, event.kind,
+                    entry['error'] or '%s, %s' % (entry['status'],
+                                                  entry['health_status']),
+                    _format_progress(event.progress)))
@@ -0,0 +1,78 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import sys
+
+from magnumclient.common import utils as magnum_utils
+from magnumclient import exceptions
+from magnumclient.i18n import _
+from magnumclient.v1 import inventory
+
+from osc_lib.command import command
+
+
+class ExportInventory(command.Command):
+    _description = _("Export a snapshot of clusters, nodegroups, cluster "
+                     "templates, quotas and stats")
+
+    def get_parser(self, prog_name):
+        parser = super(ExportInventory, self).get_parser(prog_name)
+        parser.add_argument(
+            '--format',
+            dest='export_format',
+            choices=['jsonl', 'parquet'],
+            default='jsonl',
+            help=_('Snapshot format. jsonl writes one JSON record per line; '
+                   'parquet writes one file per record type and requires '
+                   'pyarrow (default: jsonl).'))
+        parser.add_argument(
+            '--output',
+            metavar='<path>',
+            help=_('File (jsonl) or directory (parquet) to write to. '
+                   'jsonl defaults to standard output.'))
+        parser.add_argument(
+            '--all-projects',
+            action='store_true',
+            default=False,
+            help=_('Include the quotas of all projects (admin only).'))
+        parser.add_argument(
+            '--parallel',
+            metavar='<parallel>',
+            type=int,
+            default=magnum_utils.DEFAULT_MAX_WORKERS,
+            help=_('Maximum number of API requests in flight (default: %d).')
+            % magnum_utils.DEFAULT_MAX_WORKERS)
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug("take_action(%s)", parsed_args)
+
+        if parsed_args.export_format == 'parquet' and not parsed_args.output:
+            raise exceptions.CommandError(
+                _('--output is required with --format parquet.'))
+
+        mag_client = self.app.client_manager.container_infra
+        records = inventory.collect(mag_client,
+                                    all_projects=parsed_args.all_projects,
+                                    max_workers=parsed_args.parallel)
+
+        if parsed_args.export_format == 'parquet':
+            for path, count in sorted(
+                    inventory.write_parquet(records,
+                                            parsed_args.output).items()):
+                print("Wrote %d records to %s" % (count, path))
+        elif parsed_args.output:
+            with open(parsed_args.output, 'w') as f:
+                count = inventory.write_jsonl(records, f)
+            print("Wrote %d records to %s" % (count, parsed_args.output))
+        else:
+            inventory.write_jsonl(records, sys.stdout)
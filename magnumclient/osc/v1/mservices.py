@@ -12,16 +12,17 @@
 
 import logging
 
-from osc_lib.command import command
 from osc_lib import utils
 
+from magnumclient.osc.v1 import streaming
+
 
 def _get_client(obj, parsed_args):
     obj.log.debug("take_action(%s)" % parsed_args)
     return obj.app.client_manager.container_infra
 
 
-class ListService(command.Lister):
+class ListService(streaming.StreamingLister):
     """Print a list of Magnum services."""
 
     log = logging.getLogger(__name__ + ".ListService")
@@ -32,7 +33,7 @@ class ListService(command.Lister):
 
     def take_action(self, parsed_args):
         client = _get_client(self, parsed_args)
-        services = client.mservices.list()
+        services = client.mservices.list_iter()
         columns = ('id', 'host', 'binary', 'state', 'disabled',
                    'disabled_reason', 'created_at', 'updated_at')
         return (columns, (utils.get_item_properties(service, columns)
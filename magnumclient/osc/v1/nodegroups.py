@@ -13,9 +13,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import itertools
+import sys
+
 from magnumclient.common import utils as magnum_utils
 from magnumclient import exceptions
 from magnumclient.i18n import _
+from magnumclient.osc.v1 import streaming
+from magnumclient.osc.v1 import watch
 from magnumclient.v1.nodegroups import NODEGROUP_ATTRIBUTES  # noqa: F401
 
 from osc_lib.command import command
@@ -179,21 +184,56 @@ class DeleteNodeGroup(command.Command):
             print("Request to delete nodegroup %s has been accepted." % ng)
 
 
-class ListNodeGroup(command.Lister):
+def _sorted(nodegroups, sort_key, reverse=False):
+    # None sorts last whatever the direction, as with the API.
+    nodegroups = list(nodegroups)
+    present = [n for n in nodegroups
+               if getattr(n, sort_key, None) is not None]
+    missing = [n for n in nodegroups if getattr(n, sort_key, None) is None]
+    present.sort(key=lambda n: getattr(n, sort_key), reverse=reverse)
+    return present + missing
+
+
+class ListNodeGroup(streaming.StreamingLister):
     _description = _("List nodegroups")
 
+    # The clusters --all-clusters could not list, of how many.
+    _failures = ()
+    _clusters = 0
+
     def get_parser(self, prog_name):
         parser = super(ListNodeGroup, self).get_parser(prog_name)
 
         parser.add_argument(
             'cluster',
             metavar='<cluster>',
-            help=_('ID or name of the cluster where the nodegroup belongs.'))
+            nargs='?',
+            help=_('ID or name of the cluster where the nodegroup belongs. '
+                   'Required unless --all-clusters is used.'))
+        parser.add_argument(
+            '--all-clusters',
+            dest='all_clusters',
+            action='store_true',
+            default=False,
+            help=_('List the nodegroups of every cluster in the project, '
+                   'adding a cluster_id column. --sort-key and --limit then '
+                   'apply to the merged nodegroups. Clusters that cannot be '
+                   'listed are reported after the others and make the '
+                   'command fail.'))
+        parser.add_argument(
+            '--parallel',
+            metavar='<parallel>',
+            type=int,
+            default=magnum_utils.DEFAULT_MAX_WORKERS,
+            help=_('Maximum number of clusters queried at once with '
+                   '--all-clusters (default: %d).')
+            % magnum_utils.DEFAULT_MAX_WORKERS)
         parser.add_argument(
             '--limit',
             metavar='<limit>',
             type=int,
-            help=_('Maximum number of nodegroups to return'))
+            help=_('Maximum number of nodegroups to return '
+                   '(default: all of them, a page at a time)'))
         parser.add_argument(
             '--sort-key',
             metavar='<sort-key>',
@@ -207,6 +247,15 @@ class ListNodeGroup(command.Lister):
             '--role',
             metavar='<role>',
             help=_('List the nodegroups in the cluster with this role'))
+        parser.add_argument(
+            '--filter',
+            metavar='<key=value>',
+            dest='filters',
+            action='append',
+            help=_('Only list the nodegroups whose attribute has this value. '
+                   'Filters the API supports are sent to it, the others '
+                   'are applied as the pages arrive. Repeat to add filters; '
+                   'a key repeated matches any of its values.'))
 
         return parser
 
@@ -216,17 +265,92 @@ class ListNodeGroup(command.Lister):
         mag_client = self.app.client_manager.container_infra
         columns = ['uuid', 'name', 'flavor_id', 'image_id', 'node_count',
                    'status', 'role']
+        if parsed_args.all_clusters:
+            if parsed_args.cluster is not None:
+                raise exceptions.CommandError(
+                    _('--all-clusters cannot be combined with a cluster.'))
+            columns.insert(0, 'cluster_id')
+            # Every nodegroup is listed; the sort and the limit apply to
+            # the merged rows.
+            results = mag_client.nodegroups.list_all(
+                max_workers=parsed_args.parallel,
+                limit=0,
+                role=parsed_args.role,
+                filters=magnum_utils.format_filters(parsed_args.filters))
+            nodegroups = self._merge_results(results)
+            if parsed_args.sort_key:
+                nodegroups = _sorted(nodegroups, parsed_args.sort_key,
+                                     parsed_args.sort_dir == 'desc')
+            if parsed_args.limit:
+                nodegroups = itertools.islice(nodegroups, parsed_args.limit)
+            return (
+                columns,
+                (utils.get_item_properties(n, columns) for n in nodegroups)
+            )
+        if parsed_args.cluster is None:
+            raise exceptions.CommandError(
+                _('A cluster is required unless --all-clusters is used.'))
+
         cluster_id = parsed_args.cluster
-        nodegroups = mag_client.nodegroups.list(cluster_id,
-                                                limit=parsed_args.limit,
-                                                sort_key=parsed_args.sort_key,
-                                                sort_dir=parsed_args.sort_dir,
-                                                role=parsed_args.role)
+        nodegroups = mag_client.nodegroups.list_iter(
+            cluster_id, limit=streaming.page_limit(parsed_args.limit),
+            sort_key=parsed_args.sort_key, sort_dir=parsed_args.sort_dir,
+            role=parsed_args.role,
+            filters=magnum_utils.format_filters(parsed_args.filters))
         return (
             columns,
             (utils.get_item_properties(n, columns) for n in nodegroups)
         )
 
+    def _merge_results(self, results):
+        # A cluster that could not be listed (deleted meanwhile, forbidden,
+        # ...) is reported once the others are printed.
+        self._failures = []
+        self._clusters = 0
+        for result in results:
+            self._clusters += 1
+            if result.error is not None:
+                self._failures.append(result)
+                continue
+            for nodegroup in result.result:
+                yield nodegroup
+
+    def produce_output(self, parsed_args, column_names, data):
+        status = super(ListNodeGroup, self).produce_output(
+            parsed_args, column_names, data)
+        if self._failures:
+            for result in self._failures:
+                sys.stderr.write("Failed to list nodegroups of cluster "
+                                 "%s: %s\n" % (result.item, result.error))
+            raise exceptions.CommandError(
+                _('%(failed)d of %(total)d clusters failed.')
+                % {'failed': len(self._failures), 'total': self._clusters})
+        return status
+
+
+class WatchNodeGroup(watch.WatchCommand):
+    _description = _("Follow the status and node count of the nodegroups "
+                     "of a cluster, printing only what changes")
+
+    def get_parser(self, prog_name):
+        parser = super(WatchNodeGroup, self).get_parser(prog_name)
+        parser.add_argument(
+            'cluster',
+            metavar='<cluster>',
+            help=_('ID or name of the cluster where the nodegroups belong.'))
+        parser.add_argument(
+            '--role',
+            metavar='<role>',
+            help=_('Only follow the nodegroups with this role'))
+        return parser
+
+    def get_watch(self, parsed_args):
+        mag_client = self.app.client_manager.container_infra
+        return mag_client.nodegroups.watch(
+            parsed_args.cluster, role=parsed_args.role,
+            fast_interval=parsed_args.interval,
+            slow_interval=parsed_args.max_interval)
+
 
 class ShowNodeGroup(command.ShowOne):
     _description = _("Show a nodegroup")
@@ -0,0 +1,173 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import sys
+
+from magnumclient.common import utils as magnum_utils
+from magnumclient import exceptions
+from magnumclient.i18n import _
+from magnumclient.v1 import mirror
+
+from osc_lib.command import command
+
+
+# Indexed columns holding text, where true and false are kept as text.
+_TEXT_COLUMNS = frozenset(
+    column for key, indexed in mirror.TABLES.values()
+    for column in (key,) + indexed if column not in mirror.INTEGER_COLUMNS)
+
+
+def _parse_where(text):
+    for op in ('!=', '='):
+        column, sep, value = text.partition(op)
+        if sep and column:
+            break
+    else:
+        raise exceptions.CommandError(
+            _('Invalid filter %s, expected <column>=<value> or '
+              '<column>!=<value>') % text)
+    if value == '':
+        value = None
+    elif (column.rsplit('.', 1)[-1] not in _TEXT_COLUMNS and
+            value.lower() in ('true', 'false')):
+        value = value.lower() == 'true'
+    return column, op, value
+
+
+class QueryMirror(command.Lister):
+    _description = _("Query a local mirror of clusters, cluster templates, "
+                     "nodegroups and quotas. The columns of -c may be any "
+                     "attribute of the resources.")
+
+    def get_parser(self, prog_name):
+        parser = super(QueryMirror, self).get_parser(prog_name)
+        parser.add_argument(
+            'table',
+            metavar='<table>',
+            choices=list(mirror.TABLES),
+            help=_('The resources to query: %s.') % ', '.join(mirror.TABLES))
+        parser.add_argument(
+            '--mirror',
+            metavar='<path>',
+            default=mirror.DEFAULT_PATH,
+            help=_('SQLite file of the mirror (default: %s).')
+            % mirror.DEFAULT_PATH)
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            default=False,
+            help=_('Refresh the mirror from the API first. Only the clusters '
+                   'changed since the last refresh are listed, along with '
+                   'their nodegroups. A mirror that was never refreshed is '
+                   'refreshed anyway.'))
+        parser.add_argument(
+            '--full-refresh',
+            action='store_true',
+            default=False,
+            help=_('Refresh every cluster and nodegroup of the mirror, '
+                   'which also drops the deleted ones.'))
+        parser.add_argument(
+            '--max-age',
+            metavar='<seconds>',
+            type=float,
+            help=_('Refresh the mirror first if the queried tables are '
+                   'older than this.'))
+        parser.add_argument(
+            '--where',
+            metavar='<column>=<value>',
+            action='append',
+            default=[],
+            help=_('Only return the rows whose column has this value, or '
+                   'not with <column>!=<value>. An empty value matches '
+                   'null. Columns of the joined table are named '
+                   '<table>.<column>. Repeat to add filters.'))
+        parser.add_argument(
+            '--group-by',
+            metavar='<column>',
+            action='append',
+            help=_('Count the rows per value of this column; repeat to '
+                   'group by more columns.'))
+        parser.add_argument(
+            '--join',
+            metavar='<table>',
+            help=_('Join a related table: cluster_templates for clusters, '
+                   'clusters for nodegroups and quotas.'))
+        parser.add_argument(
+            '--sort-key',
+            metavar='<column>',
+            help=_('Column to sort results by.'))
+        parser.add_argument(
+            '--sort-dir',
+            metavar='<sort-dir>',
+            choices=['desc', 'asc'],
+            default='asc',
+            help=_('Direction to sort. "asc" or "desc".'))
+        parser.add_argument(
+            '--limit',
+            metavar='<limit>',
+            type=int,
+            help=_('Maximum number of rows to return.'))
+        parser.add_argument(
+            '--parallel',
+            metavar='<parallel>',
+            type=int,
+            default=magnum_utils.DEFAULT_MAX_WORKERS,
+            help=_('Maximum number of API requests in flight while '
+                   'refreshing (default: %d).')
+            % magnum_utils.DEFAULT_MAX_WORKERS)
+        return parser
+
+    def _needs_refresh(self, store, parsed_args, tables):
+        if parsed_args.refresh or parsed_args.full_refresh:
+            return True
+        freshness = store.freshness(tables)
+        if any(f['age'] is None for f in freshness.values()):
+            return True
+        return (parsed_args.max_age is not None and
+                any(f['age'] > parsed_args.max_age
+                    for f in freshness.values()))
+
+    def take_action(self, parsed_args):
+        self.log.debug("take_action(%s)", parsed_args)
+
+        where = [_parse_where(text) for text in parsed_args.where]
+        tables = [parsed_args.table] + (
+            [parsed_args.join] if parsed_args.join else [])
+        store = mirror.Mirror(parsed_args.mirror)
+        try:
+            if self._needs_refresh(store, parsed_args, tables):
+                mag_client = self.app.client_manager.container_infra
+                counts = store.refresh(mag_client,
+                                       full=parsed_args.full_refresh,
+                                       max_workers=parsed_args.parallel)
+                if counts['errors']:
+                    sys.stderr.write(
+                        "Refreshing the mirror: %d lists failed, their rows "
+                        "were kept\n" % counts['errors'])
+            # The columns of -c are the ones queried, not only displayed.
+            result = store.query(
+                parsed_args.table, where=where, columns=parsed_args.columns,
+                group_by=parsed_args.group_by, join=parsed_args.join,
+                sort_key=parsed_args.sort_key, sort_dir=parsed_args.sort_dir,
+                limit=parsed_args.limit)
+        except exceptions.ValidationError as e:
+            raise exceptions.CommandError(str(e))
+        finally:
+            store.close()
+
+        for table, freshness in sorted(result.freshness.items()):
+            if freshness['age'] is None:
+                sys.stderr.write("Mirror of %s was never refreshed\n" % table)
+            else:
+                sys.stderr.write("Mirror of %s refreshed %ds ago\n"
+                                 % (table, freshness['age']))
+        return result.columns, result.rows
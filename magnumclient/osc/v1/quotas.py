@@ -14,9 +14,13 @@
 
 from magnumclient.common import cliutils as utils
 from magnumclient.common import utils as magnum_utils
+from magnumclient import exceptions
 from magnumclient.i18n import _
+from magnumclient.osc.v1 import streaming
+from magnumclient.v1 import quotas as quotas_lib
 from magnumclient.v1.quotas import QUOTA_ATTRIBUTES  # noqa: F401
 from osc_lib.command import command
+from osc_lib import utils as osc_utils
 
 
 def _show_quota(quota):
@@ -163,7 +167,94 @@ class UpdateQuotas(command.Command):
                               'e': e})
 
 
-class ListQuotas(command.Command):
+def _format_change(change):
+    if change.action == quotas_lib.CREATE:
+        limit = change.new
+    elif change.action == quotas_lib.UPDATE:
+        limit = '%s -> %s' % (change.old, change.new)
+    else:
+        limit = change.old
+    return "%s quota of project %s for %s: %s" % (
+        change.action.capitalize(), change.project_id, change.resource,
+        limit)
+
+
+class ApplyQuotas(command.Command):
+    _description = _("Bring quotas to the hard limits listed in a file.")
+
+    def get_parser(self, prog_name):
+        parser = super(ApplyQuotas, self).get_parser(prog_name)
+        parser.add_argument(
+            '--file',
+            required=True,
+            metavar='<file>',
+            help=_('CSV file with project_id, resource and hard_limit '
+                   'columns, or YAML file with a list of such mappings or '
+                   'a mapping of project IDs to resources and hard limits. '
+                   'An empty hard limit deletes the quota.'))
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            default=False,
+            help=_('Also delete the quotas of the projects in the file for '
+                   'resources the file does not list.'))
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            default=False,
+            help=_('Only print the changes that would be made.'))
+        parser.add_argument(
+            '--parallel',
+            metavar='<parallel>',
+            type=int,
+            default=magnum_utils.DEFAULT_MAX_WORKERS,
+            help=_('Maximum number of API requests in flight (default: %d).')
+            % magnum_utils.DEFAULT_MAX_WORKERS)
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug("take_action(%s)", parsed_args)
+
+        mag_client = self.app.client_manager.container_infra
+        desired = quotas_lib.load_quota_file(parsed_args.file)
+        changes = quotas_lib.plan_quota_changes(
+            mag_client.quotas.list(limit=0, all_tenants=True), desired,
+            prune=parsed_args.prune)
+
+        if parsed_args.dry_run:
+            for change in changes:
+                print(_format_change(change))
+            counts = [change.action for change in changes]
+            failures = 0
+        else:
+            counts = []
+            failures = 0
+            for result in mag_client.quotas.apply_changes(
+                    changes, max_workers=parsed_args.parallel):
+                if result.error is not None:
+                    failures += 1
+                    print("Failed: %s: %s" % (_format_change(result.item),
+                                              result.error))
+                else:
+                    counts.append(result.item.action)
+                    print(_format_change(result.item))
+
+        unchanged = len(set(desired) - set((c.project_id, c.resource)
+                                           for c in changes))
+        if parsed_args.dry_run:
+            summary = "Dry run: %d to create, %d to update, %d to delete"
+        else:
+            summary = "%d created, %d updated, %d deleted"
+        print((summary + ", %d unchanged") % (
+            counts.count(quotas_lib.CREATE), counts.count(quotas_lib.UPDATE),
+            counts.count(quotas_lib.DELETE), unchanged))
+        if failures:
+            raise exceptions.CommandError(
+                _('%(failed)d of %(total)d quota changes failed.')
+                % {'failed': failures, 'total': len(changes)})
+
+
+class ListQuotas(streaming.StreamingLister):
     _description = _("Print a list of available quotas.")
 
     def get_parser(self, prog_name):
@@ -176,7 +267,9 @@ class ListQuotas(command.Command):
         parser.add_argument('--limit',
                             metavar='<limit>',
                             type=int,
-                            help='Maximum number of quotas to return.')
+                            help='Maximum number of quotas to return '
+                                 '(default: all of them, a page at a '
+                                 'time).')
         parser.add_argument('--sort-key',
                             metavar='<sort-key>',
                             help='Column to sort results by.')
@@ -195,13 +288,13 @@ class ListQuotas(command.Command):
 
         mag_client = self.app.client_manager.container_infra
 
-        quotas = mag_client.quotas.list(marker=parsed_args.marker,
-                                        limit=parsed_args.limit,
-                                        sort_key=parsed_args.sort_key,
-                                        sort_dir=parsed_args.sort_dir,
-                                        all_tenants=parsed_args.all_tenants)
+        quotas = mag_client.quotas.list_iter(
+            marker=parsed_args.marker,
+            limit=streaming.page_limit(parsed_args.limit),
+            sort_key=parsed_args.sort_key, sort_dir=parsed_args.sort_dir,
+            all_tenants=parsed_args.all_tenants)
         columns = ['project_id', 'resource', 'hard_limit']
-        utils.print_list(quotas, columns,
-                         {'versions':
-                          magnum_utils.print_list_field('versions')},
-                         sortby_index=None)
+        return (
+            columns,
+            (osc_utils.get_item_properties(q, columns) for q in quotas)
+        )
@@ -12,24 +12,90 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+import operator
+import sys
+
 from magnumclient.common import cliutils as utils
+from magnumclient import exceptions
 from magnumclient.i18n import _
+from magnumclient.v1 import stats as stats_lib
 
 from osc_lib.command import command
 
 
 class ListStats(command.Command):
-    _description = _("Show stats for the given project_id")
+    _description = _("Show stats for the given project_id, or for all "
+                     "projects")
 
     def get_parser(self, prog_name):
         parser = super(ListStats, self).get_parser(prog_name)
         parser.add_argument('project_id',
                             metavar='<project>',
+                            nargs='?',
                             help='Project ID')
+        parser.add_argument(
+            '--all-projects',
+            action='store_true',
+            default=False,
+            help=_('Aggregate the stats of every project owning a cluster, '
+                   'counted from one listing of the clusters (admin '
+                   'only).'))
+        parser.add_argument(
+            '--top',
+            metavar='<top>',
+            type=int,
+            default=10,
+            help=_('With --all-projects, number of largest projects to list; '
+                   '0 lists only the totals (default: 10).'))
+        parser.add_argument(
+            '--sort-key',
+            choices=stats_lib.STATS_FIELDS,
+            default='nodes',
+            help=_('With --all-projects, the field ranking the projects '
+                   '(default: nodes).'))
+        parser.add_argument(
+            '--format',
+            dest='stats_format',
+            choices=['table', 'json'],
+            default='table',
+            help=_('With --all-projects, the output format (default: '
+                   'table).'))
         return parser
 
+    def _aggregate(self, mag_client, parsed_args):
+        aggregate = stats_lib.StatsAggregate(top=parsed_args.top,
+                                             sort_key=parsed_args.sort_key)
+        aggregate.add_results(mag_client.stats.list_many())
+
+        if parsed_args.stats_format == 'json':
+            json.dump(aggregate.to_dict(), sys.stdout, indent=2,
+                      sort_keys=True)
+            sys.stdout.write('\n')
+        else:
+            fields = ['project_id'] + list(stats_lib.STATS_FIELDS)
+            if parsed_args.top:
+                formatters = dict((field, operator.itemgetter(field))
+                                  for field in fields)
+                utils.print_list(aggregate.top_projects(), fields,
+                                 formatters=formatters, sortby_index=None)
+            print("Total: %d projects, %s" % (
+                aggregate.projects,
+                ', '.join('%d %s' % (aggregate.totals[field], field)
+                          for field in stats_lib.STATS_FIELDS)))
+
     def take_action(self, parsed_args):
         mag_client = self.app.client_manager.container_infra
+        if parsed_args.all_projects:
+            if parsed_args.project_id:
+                raise exceptions.CommandError(
+                    _('<project> and --all-projects are mutually '
+                      'exclusive.'))
+            return self._aggregate(mag_client, parsed_args)
+        if not parsed_args.project_id:
+            raise exceptions.CommandError(
+                _('A <project> or --all-projects is required.'))
+
         opts = {
             'project_id': parsed_args.project_id
         }
@@ -0,0 +1,73 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import textwrap
+
+from cliff import columns
+from cliff.formatters import json_format
+from osc_lib.command import command
+
+
+def page_limit(limit):
+    """Return the list_iter limit for the value of a --limit option.
+
+    Without --limit the API would return its first page only, in one
+    response; a limit of 0 pages through every item instead, so that rows
+    are printed as each page arrives.
+    """
+    return 0 if limit is None else limit
+
+
+class StreamingJSONFormatter(json_format.JSONFormatter):
+    """JSON list formatter writing every row as soon as it is produced.
+
+    The output is the same as cliff's, which collects all the rows before
+    writing any.
+    """
+
+    def emit_list(self, column_names, data, stdout, parsed_args):
+        indent = None if parsed_args.noindent else 2
+        separator = ',\n' if indent else ', '
+        stdout.write('[')
+        first = True
+        for item in data:
+            row = dict((name, value.machine_readable()
+                        if isinstance(value, columns.FormattableColumn)
+                        else value)
+                       for name, value in zip(column_names, item))
+            text = json.dumps(row, indent=indent)
+            if indent:
+                text = textwrap.indent(text, ' ' * indent)
+            stdout.write(('\n' if indent else '') + text if first
+                         else separator + text)
+            first = False
+        if indent and not first:
+            stdout.write('\n')
+        stdout.write(']\n')
+
+
+class StreamingLister(command.Lister):
+    """A Lister writing rows as take_action yields them.
+
+    cliff's csv and value formatters already consume rows one by one and
+    the json formatter is swapped for :class:`StreamingJSONFormatter`, so a
+    lazily paginated listing is printed page by page. The table and yaml
+    formatters, and sorting with --sort-column, still need every row
+    first.
+    """
+
+    def produce_output(self, parsed_args, column_names, data):
+        if type(self.formatter) is json_format.JSONFormatter:
+            self.formatter = StreamingJSONFormatter()
+        return super(StreamingLister, self).produce_output(
+            parsed_args, column_names, data)
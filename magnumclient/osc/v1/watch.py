@@ -0,0 +1,164 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import shutil
+import sys
+
+from oslo_serialization import jsonutils
+from oslo_utils import timeutils
+
+from magnumclient.i18n import _
+from magnumclient.v1 import watch
+
+from osc_lib.command import command
+
+# Wide enough for every status, e.g. ROLLBACK_IN_PROGRESS.
+_MIN_WIDTHS = {'status': 20}
+_MAX_WIDTH = 40
+
+
+def write_ndjson(deltas, stream):
+    """Write deltas to a text stream, one JSON object per line."""
+    now = timeutils.utcnow().isoformat() + 'Z'
+    for delta in deltas:
+        record = {'time': now, 'action': delta.action, 'uuid': delta.uuid,
+                  'name': delta.name}
+        record.update(delta.state)
+        if delta.changes:
+            record['changes'] = dict((field, list(values)) for field, values
+                                     in delta.changes.items())
+        stream.write(jsonutils.dumps(record, sort_keys=True))
+        stream.write('\n')
+    stream.flush()
+
+
+class TerminalView(object):
+    """A table of resources redrawing only the rows that changed.
+
+    Changed rows are rewritten in place with ANSI cursor movements. A row
+    that has scrolled out of the terminal is written again at the bottom
+    instead, as are new resources. Removed resources stay in the table,
+    shown as removed.
+    """
+
+    def __init__(self, stream, fields, height=None):
+        self.stream = stream
+        self.columns = ('name',) + tuple(fields)
+        self.height = height
+        self.widths = None
+        # uuid -> line of its row, counting from the header line.
+        self.rows = {}
+        self.lines = 0
+
+    def _format(self, values):
+        return '  '.join(('' if value is None else str(value))
+                         .ljust(width)[:width]
+                         for value, width in zip(values, self.widths))
+
+    def _values(self, delta):
+        values = [delta.name] + [delta.state.get(field)
+                                 for field in self.columns[1:]]
+        if delta.action == watch.REMOVED and 'status' in self.columns:
+            values[self.columns.index('status')] = _('(removed)')
+        return values
+
+    def _write_line(self, text):
+        self.stream.write('\x1b[2K' + text + '\n')
+        self.lines += 1
+
+    def _start(self, deltas):
+        self.widths = []
+        for index, column in enumerate(self.columns):
+            width = max([len(column), _MIN_WIDTHS.get(column, 0)] +
+                        [len(str(self._values(d)[index])) for d in deltas])
+            self.widths.append(min(width, _MAX_WIDTH))
+        self._write_line(self._format(self.columns))
+
+    def update(self, deltas):
+        if self.widths is None:
+            self._start(deltas)
+            deltas = sorted(deltas, key=lambda d: d.name or '')
+        height = self.height or shutil.get_terminal_size().lines
+        for delta in deltas:
+            text = self._format(self._values(delta))
+            line = self.rows.get(delta.uuid)
+            up = None if line is None else self.lines - line
+            if up is not None and up < height:
+                self.stream.write('\x1b[%dF\x1b[2K%s\x1b[%dE'
+                                  % (up, text, up))
+            else:
+                self.rows[delta.uuid] = self.lines
+                self._write_line(text)
+        self.stream.flush()
+
+
+class WatchCommand(command.Command):
+    """Base class of the commands following the state of resources.
+
+    Subclasses return the :class:`magnumclient.v1.watch.StateWatch` to
+    follow from :meth:`get_watch`.
+    """
+
+    def get_parser(self, prog_name):
+        parser = super(WatchCommand, self).get_parser(prog_name)
+        parser.add_argument(
+            '--format',
+            dest='watch_format',
+            choices=['ndjson', 'table'],
+            help=_('Output format. ndjson writes one JSON object per change '
+                   'and line; table redraws the rows that changed. Defaults '
+                   'to table on a terminal and ndjson otherwise.'))
+        parser.add_argument(
+            '--interval',
+            metavar='<seconds>',
+            type=float,
+            default=watch.DEFAULT_FAST_INTERVAL,
+            help=_('Seconds between polls while anything is in progress '
+                   '(default: %s).') % watch.DEFAULT_FAST_INTERVAL)
+        parser.add_argument(
+            '--max-interval',
+            metavar='<seconds>',
+            type=float,
+            default=watch.DEFAULT_SLOW_INTERVAL,
+            help=_('Longest time between polls once everything is stable '
+                   '(default: %s).') % watch.DEFAULT_SLOW_INTERVAL)
+        parser.add_argument(
+            '--count',
+            metavar='<count>',
+            type=int,
+            help=_('Stop after this many polls (default: watch until '
+                   'interrupted).'))
+        return parser
+
+    def get_watch(self, parsed_args):
+        raise NotImplementedError()
+
+    def take_action(self, parsed_args):
+        self.log.debug("take_action(%s)", parsed_args)
+
+        state_watch = self.get_watch(parsed_args)
+        watch_format = parsed_args.watch_format
+        if watch_format is None:
+            watch_format = 'table' if sys.stdout.isatty() else 'ndjson'
+        if watch_format == 'table':
+            view = TerminalView(sys.stdout, state_watch.fields)
+            output = view.update
+        else:
+            def output(deltas):
+                write_ndjson(deltas, sys.stdout)
+
+        try:
+            for deltas in state_watch.watch(count=parsed_args.count):
+                if deltas:
+                    output(deltas)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,157 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Command-line interface to the OpenStack Container Infrastructure API.
+
+The ``magnum`` command runs the same commands as ``openstack coe``, without
+the ``coe`` prefix. Only the module of the command being run is imported,
+and no entry points are scanned to find the commands.
+"""
+
+import functools
+import importlib
+import sys
+
+from cliff import commandmanager
+from osc_lib.api import auth
+from osc_lib import clientmanager
+from osc_lib import shell
+
+from magnumclient.osc import plugin
+from magnumclient import version
+
+
+# Command name -> "module:class", relative to magnumclient.osc.v1. These
+# are the openstack.container_infra.v1 entry points of pyproject.toml.
+COMMANDS = {
+    'ca rotate': 'certificates:RotateCa',
+    'ca show': 'certificates:ShowCa',
+    'ca sign': 'certificates:SignCa',
+    'cluster create': 'clusters:CreateCluster',
+    'cluster list': 'clusters:ListCluster',
+    'cluster delete': 'clusters:DeleteCluster',
+    'cluster show': 'clusters:ShowCluster',
+    'cluster update': 'clusters:UpdateCluster',
+    'cluster config': 'clusters:ConfigCluster',
+    'cluster resize': 'clusters:ResizeCluster',
+    'cluster upgrade': 'clusters:UpgradeCluster',
+    'cluster watch': 'clusters:WatchCluster',
+    'cluster template create': 'cluster_templates:CreateClusterTemplate',
+    'cluster template delete': 'cluster_templates:DeleteClusterTemplate',
+    'cluster template list': 'cluster_templates:ListTemplateCluster',
+    'cluster template show': 'cluster_templates:ShowClusterTemplate',
+    'cluster template update': 'cluster_templates:UpdateClusterTemplate',
+    'credential rotate': 'credentials:RotateCredential',
+    'fleet upgrade': 'fleet:UpgradeFleet',
+    'inventory export': 'inventory:ExportInventory',
+    'nodegroup list': 'nodegroups:ListNodeGroup',
+    'nodegroup show': 'nodegroups:ShowNodeGroup',
+    'nodegroup create': 'nodegroups:CreateNodeGroup',
+    'nodegroup delete': 'nodegroups:DeleteNodeGroup',
+    'nodegroup update': 'nodegroups:UpdateNodeGroup',
+    'nodegroup watch': 'nodegroups:WatchNodeGroup',
+    'quotas create': 'quotas:CreateQuotas',
+    'quotas delete': 'quotas:DeleteQuotas',
+    'quotas update': 'quotas:UpdateQuotas',
+    'quotas show': 'quotas:ShowQuotas',
+    'quotas list': 'quotas:ListQuotas',
+    'quotas apply': 'quotas:ApplyQuotas',
+    'query': 'query:QueryMirror',
+    'service list': 'mservices:ListService',
+    'stats list': 'stats:ListStats',
+}
+
+
+class LazyEntryPoint(object):
+    """An entry point-like object importing its command on first load."""
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = 'magnumclient.osc.v1.' + value
+
+    def load(self):
+        module, attr = self.value.split(':')
+        return getattr(importlib.import_module(module), attr)
+
+
+class CommandManager(commandmanager.CommandManager):
+    """A command manager built from :data:`COMMANDS`."""
+
+    def __init__(self, commands=None):
+        super(CommandManager, self).__init__()
+        for name, value in (commands or COMMANDS).items():
+            self.commands[name] = LazyEntryPoint(name, value)
+
+
+class ClientManager(clientmanager.ClientManager):
+    """A client manager that only knows the container_infra client."""
+
+    # plugin.make_client() reads the attribute names openstackclient uses.
+    @property
+    def _region_name(self):
+        return self.region_name
+
+    @property
+    def _interface(self):
+        return self.interface
+
+    @property
+    def _insecure(self):
+        return not self.verify
+
+    @property
+    def _cacert(self):
+        return self.cacert
+
+    @functools.cached_property
+    def container_infra(self):
+        return plugin.make_client(self)
+
+
+class MagnumShell(shell.OpenStackShell):
+
+    NAME = 'magnum'
+
+    def __init__(self, stdin=None, stdout=None, stderr=None):
+        super(MagnumShell, self).__init__(
+            description=__doc__.strip(),
+            version=version.version_info.version_string(),
+            command_manager=CommandManager(),
+            stdin=stdin, stdout=stdout, stderr=stderr)
+
+    def build_option_parser(self, description, version):
+        parser = super(MagnumShell, self).build_option_parser(description,
+                                                              version)
+        parser = auth.build_auth_plugins_option_parser(parser)
+        return plugin.build_option_parser(parser)
+
+    def initialize_app(self, argv):
+        self.api_version = {
+            plugin.API_NAME: getattr(self.options, plugin.API_VERSION_OPTION),
+        }
+        super(MagnumShell, self).initialize_app(argv)
+        self.client_manager = ClientManager(
+            cli_options=self.cloud,
+            api_version=self.api_version,
+            pw_func=shell.prompt_for_password,
+            app_name=self.NAME,
+            app_version=version.version_info.version_string())
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    return MagnumShell().run(argv)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1293 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""A local stand-in for the Magnum API and the parts of Keystone it needs.
+
+The server keeps clusters, cluster templates, nodegroups, quotas, magnum
+services and certificates in memory and answers like the real API does,
+including ``next`` links on paginated lists. It can add latency, pad every
+item to a given size and fail a share of the requests with 429 or 503, so
+the client can be tested and load tested without a Magnum deployment::
+
+    with stub_server.StubServer(clusters=50) as server:
+        client = v1_client.Client(endpoint_override=server.endpoint,
+                                  auth_token=server.token)
+        client.clusters.list(limit=0)
+
+or, for local runs of the CLI::
+
+    python -m magnumclient.stub_server --clusters 10000 --latency 0.05
+
+which prints the ``OS_*`` variables to point ``openstack`` at it. With
+``tls`` (``--tls``) it serves HTTPS, and HTTP/2 to the clients negotiating
+it.
+"""
+
+import argparse
+import collections
+import datetime
+import gzip
+import http.client
+import http.server
+import ipaddress
+import json
+import os
+import random
+import re
+import select
+import shutil
+import socket
+import ssl
+import sys
+import tempfile
+import threading
+import time
+from urllib import parse as urlparse
+import uuid
+
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives import serialization
+from cryptography import x509
+from cryptography.x509.oid import NameOID
+from oslo_utils import importutils
+
+h2 = importutils.try_import('h2')
+if h2 is not None:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.exceptions
+
+# Magnum's default [api] max_limit.
+DEFAULT_MAX_LIMIT = 1000
+DEFAULT_TOKEN = 'stub-token'
+DEFAULT_PROJECT = 'stub-project'
+API_MAX_VERSION = '1.11'
+TRICKLE_SIZE = 1024
+
+_SUMMARY_FIELDS = {
+    'clusters': ('uuid', 'name', 'keypair', 'node_count', 'master_count',
+                 'status', 'health_status', 'cluster_template_id',
+                 'create_timeout', 'stack_id', 'labels', 'links'),
+    'clustertemplates': ('uuid', 'name', 'links'),
+    'nodegroups': ('uuid', 'name', 'flavor_id', 'image_id', 'node_count',
+                   'role', 'is_default', 'status', 'stack_id', 'links'),
+}
+
+
+class _StubError(Exception):
+
+    def __init__(self, status, title, detail=None):
+        super(_StubError, self).__init__(title)
+        self.status = status
+        self.title = title
+        self.detail = detail or title
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc).replace(
+        microsecond=0).isoformat()
+
+
+def _apply_patch(body, patch):
+    """Apply a JSON patch limited to the paths Magnum accepts."""
+    for op in patch:
+        parts = op.get('path', '').strip('/').split('/')
+        target = body
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        if op.get('op') == 'remove':
+            target.pop(parts[-1], None)
+        elif op.get('op') in ('add', 'replace'):
+            target[parts[-1]] = op.get('value')
+        else:
+            raise _StubError(400, 'Invalid patch operation %s' % op.get('op'))
+
+
+class _Collection(object):
+    """Items in creation order, with a cached index for markers."""
+
+    def __init__(self, key='uuid'):
+        self.key = key
+        self.items = collections.OrderedDict()
+        self._order = None
+
+    def add(self, item):
+        self.items[item[self.key]] = item
+        self._order = None
+
+    def remove(self, item_key):
+        self.items.pop(item_key, None)
+        self._order = None
+
+    def _index(self, items):
+        return dict((str(item[self.key]), n) for n, item in enumerate(items))
+
+    def page(self, items, marker, limit, sort_key, sort_dir):
+        """Return the page of items after marker, sorted as requested.
+
+        :param items: a subset of the items to page through, or None for
+                      all of them.
+        """
+        if items is None and not sort_key:
+            if self._order is None:
+                values = list(self.items.values())
+                self._order = (values, self._index(values))
+            items, index = self._order
+        else:
+            if items is None:
+                items = list(self.items.values())
+            if sort_key:
+                items = sorted(items,
+                               key=lambda i: (i.get(sort_key) is None,
+                                              i.get(sort_key) or ''),
+                               reverse=sort_dir == 'desc')
+            index = self._index(items)
+        start = 0
+        if marker:
+            if marker not in index:
+                raise _StubError(400, 'Marker %s not found' % marker)
+            start = index[marker] + 1
+        return items[start:start + limit]
+
+
+class StubServer(object):
+    """An in-memory Magnum API listening on a local port.
+
+    :param clusters: number of clusters to create up front.
+    :param templates: number of cluster templates they are spread over.
+    :param projects: number of projects owning the clusters and quotas.
+    :param extra_nodegroups: worker nodegroups per cluster beside the
+                             default master and worker nodegroups.
+    :param max_limit: largest page size, as Magnum's ``[api] max_limit``.
+    :param latency: seconds every API request is delayed by.
+    :param jitter: up to this many extra seconds are added at random.
+    :param trickle: seconds between the pieces of TRICKLE_SIZE bytes
+                    HTTP/1.1 response bodies are then written in, to
+                    mimic a slow link.
+    :param item_size: pad every cluster, template and nodegroup to about
+                      this many bytes of JSON.
+    :param error_rate: share of API requests answered with an error.
+    :param error_codes: the statuses injected errors pick from.
+    :param retry_after: ``Retry-After`` seconds sent with injected errors.
+    :param transition_time: seconds clusters spend ``*_IN_PROGRESS`` after
+                            a create, update, resize, upgrade or delete.
+    :param require_token: reject API requests without a valid token.
+    :param compress_min_size: gzip response bodies of at least this many
+                              bytes for clients accepting gzip. None never
+                              compresses. gzip request bodies are always
+                              accepted.
+    :param seed: seed of the random numbers behind jitter and errors.
+    :param tls: serve HTTPS with a certificate of the stub CA, whose PEM is
+                written to ``ca_file``. HTTP/2 is offered to clients
+                negotiating it when the ``h2`` package is installed.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, clusters=10, templates=3,
+                 projects=3, extra_nodegroups=0, max_limit=DEFAULT_MAX_LIMIT,
+                 latency=0.0, jitter=0.0, item_size=0, error_rate=0.0,
+                 error_codes=(429, 503), retry_after=1, transition_time=0.0,
+                 require_token=True, token=DEFAULT_TOKEN,
+                 compress_min_size=None, seed=None, tls=False, trickle=0.0):
+        self.max_limit = max_limit
+        self.latency = latency
+        self.jitter = jitter
+        self.trickle = trickle
+        self.item_size = item_size
+        self.error_rate = error_rate
+        self.error_codes = tuple(error_codes)
+        self.retry_after = retry_after
+        self.transition_time = transition_time
+        self.require_token = require_token
+        self.token = token
+        self.compress_min_size = compress_min_size
+        self.tokens = {token: DEFAULT_PROJECT}
+        self.requests = collections.Counter()
+        # Client connections accepted, each serving any number of requests.
+        self.connections = 0
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._pending = {}
+        self._thread = None
+        self._new_ca()
+        self.ca_file = None
+        self._tls_dir = None
+        self._ssl_context = self._server_ssl_context(host) if tls else None
+
+        self._httpd = _HTTPServer((host, port), _Handler)
+        self._httpd.stub = self
+        self.url = '%s://%s:%d' % (('https' if tls else 'http',)
+                                   + self._httpd.server_address[:2])
+        self.endpoint = self.url + '/v1'
+        self.auth_url = self.url + '/v3'
+
+        self.clusters = _Collection()
+        self.templates = _Collection()
+        self.nodegroups = {}
+        self.quotas = _Collection(key='id')
+        self._quota_id = 0
+        self.projects = ['project-%d' % i for i in range(projects)]
+        self._seed(clusters, templates, extra_nodegroups)
+
+    # Life cycle
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        name='stub-magnum-api', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def serve_forever(self):
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._close()
+
+    def _close(self):
+        self._httpd.server_close()
+        if self._tls_dir is not None:
+            shutil.rmtree(self._tls_dir, ignore_errors=True)
+            self._tls_dir = None
+
+    # Data
+
+    def _links(self, path):
+        return [{'href': '%s/v1/%s' % (self.url, path), 'rel': 'self'},
+                {'href': '%s/%s' % (self.url, path), 'rel': 'bookmark'}]
+
+    def _pad(self, item):
+        if self.item_size:
+            missing = self.item_size - len(json.dumps(item))
+            if missing > 0:
+                item['stub_padding'] = 'x' * missing
+        return item
+
+    def _seed(self, clusters, templates, extra_nodegroups):
+        for i in range(templates):
+            self.add_template({'name': 'template-%d' % i,
+                               'uuid': str(uuid.UUID(int=i + 1))})
+        template_ids = list(self.templates.items)
+        for i in range(clusters):
+            cluster = self.add_cluster({
+                'name': 'cluster-%d' % i,
+                'uuid': str(uuid.UUID(int=(1 << 64) + i)),
+                'cluster_template_id': template_ids[i % len(template_ids)],
+                'project_id': self.projects[i % len(self.projects)],
+            }, settle=True)
+            for n in range(extra_nodegroups):
+                self.add_nodegroup(cluster, {'name': 'workers-%d' % n})
+        for project in self.projects:
+            self.add_quota({'project_id': project, 'resource': 'Cluster',
+                            'hard_limit': max(clusters, 20)})
+
+    def add_template(self, values):
+        now = _now()
+        template = {
+            'uuid': str(uuid.uuid4()),
+            'name': None,
+            'coe': 'kubernetes',
+            'image_id': 'fedora-coreos',
+            'flavor_id': 'm1.medium',
+            'master_flavor_id': 'm1.medium',
+            'keypair_id': None,
+            'external_network_id': 'public',
+            'fixed_network': None,
+            'fixed_subnet': None,
+            'dns_nameserver': '8.8.8.8',
+            'docker_volume_size': None,
+            'docker_storage_driver': 'overlay2',
+            'network_driver': 'calico',
+            'volume_driver': 'cinder',
+            'server_type': 'vm',
+            'cluster_distro': 'fedora-coreos',
+            'apiserver_port': None,
+            'http_proxy': None,
+            'https_proxy': None,
+            'no_proxy': None,
+            'labels': {'kube_tag': 'v1.27.4'},
+            'tls_disabled': False,
+            'public': False,
+            'hidden': False,
+            'registry_enabled': False,
+            'insecure_registry': None,
+            'master_lb_enabled': True,
+            'floating_ip_enabled': True,
+            'tags': None,
+            'project_id': DEFAULT_PROJECT,
+            'user_id': 'stub-user',
+            'created_at': now,
+            'updated_at': None,
+        }
+        template.update(values)
+        template['links'] = self._links('clustertemplates/%s'
+                                        % template['uuid'])
+        with self._lock:
+            self.templates.add(self._pad(template))
+        return template
+
+    def add_cluster(self, values, settle=False):
+        now = _now()
+        cluster = {
+            'uuid': str(uuid.uuid4()),
+            'name': None,
+            'cluster_template_id': None,
+            'project_id': DEFAULT_PROJECT,
+            'user_id': 'stub-user',
+            'keypair': 'default',
+            'node_count': 1,
+            'master_count': 1,
+            'docker_volume_size': None,
+            'flavor_id': 'm1.medium',
+            'master_flavor_id': 'm1.medium',
+            'labels': {},
+            'labels_overridden': {},
+            'labels_added': {},
+            'labels_skipped': {},
+            'create_timeout': 60,
+            'discovery_url': None,
+            'fixed_network': None,
+            'fixed_subnet': None,
+            'floating_ip_enabled': True,
+            'master_lb_enabled': True,
+            'stack_id': str(uuid.uuid4()),
+            'status': 'CREATE_COMPLETE',
+            'status_reason': 'Stack CREATE completed successfully',
+            'health_status': 'HEALTHY',
+            'health_status_reason': {},
+            'coe_version': 'v1.27.4',
+            'container_version': '1.12.6',
+            'api_address': None,
+            'master_addresses': [],
+            'node_addresses': [],
+            'created_at': now,
+            'updated_at': now,
+        }
+        cluster.update(values)
+        index = len(self.clusters.items)
+        cluster['api_address'] = 'https://10.0.%d.%d:6443' % (
+            index // 250 % 250, index % 250 + 1)
+        cluster['master_addresses'] = ['10.1.%d.%d' % (index // 250 % 250,
+                                                       index % 250)]
+        cluster['node_addresses'] = ['10.2.%d.%d' % (n, index % 250)
+                                     for n in range(cluster['node_count'])]
+        cluster['links'] = self._links('clusters/%s' % cluster['uuid'])
+        with self._lock:
+            self.clusters.add(self._pad(cluster))
+            self.nodegroups[cluster['uuid']] = _Collection()
+            self.add_nodegroup(cluster, {
+                'name': 'default-master', 'role': 'master',
+                'is_default': True, 'node_count': cluster['master_count'],
+                'node_addresses': cluster['master_addresses']})
+            self.add_nodegroup(cluster, {
+                'name': 'default-worker', 'is_default': True,
+                'node_count': cluster['node_count'],
+                'node_addresses': cluster['node_addresses']})
+            if not settle:
+                self._transition(cluster, 'CREATE')
+        return cluster
+
+    def add_nodegroup(self, cluster, values):
+        nodegroup = {
+            'uuid': str(uuid.uuid4()),
+            'name': None,
+            'cluster_id': cluster['uuid'],
+            'project_id': cluster['project_id'],
+            'docker_volume_size': None,
+            'labels': dict(cluster['labels']),
+            'labels_overridden': {},
+            'labels_added': {},
+            'labels_skipped': {},
+            'flavor_id': cluster['flavor_id'],
+            'image_id': 'fedora-coreos',
+            'node_addresses': [],
+            'node_count': 1,
+            'role': 'worker',
+            'max_node_count': None,
+            'min_node_count': 0,
+            'is_default': False,
+            'stack_id': cluster['stack_id'],
+            'status': 'CREATE_COMPLETE',
+            'status_reason': None,
+            'version': None,
+            'merge_labels': False,
+            'created_at': _now(),
+            'updated_at': None,
+        }
+        nodegroup.update(values)
+        nodegroup['links'] = self._links('clusters/%s/nodegroups/%s' % (
+            cluster['uuid'], nodegroup['uuid']))
+        with self._lock:
+            self.nodegroups[cluster['uuid']].add(self._pad(nodegroup))
+        return nodegroup
+
+    def add_quota(self, values):
+        self._quota_id += 1
+        quota = {'id': self._quota_id, 'project_id': None,
+                 'resource': 'Cluster', 'hard_limit': 20,
+                 'created_at': _now(), 'updated_at': None}
+        quota.update(values)
+        with self._lock:
+            self.quotas.add(quota)
+        return quota
+
+    def _new_ca(self):
+        self._ca_key = ec.generate_private_key(ec.SECP256R1())
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME,
+                                             'stub-ca')])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        self._ca_cert = (
+            x509.CertificateBuilder()
+            .subject_name(name).issuer_name(name)
+            .public_key(self._ca_key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(minutes=5))
+            .not_valid_after(now + datetime.timedelta(days=365))
+            .add_extension(x509.BasicConstraints(ca=True, path_length=None),
+                           critical=True)
+            .sign(self._ca_key, hashes.SHA256()))
+
+    def _server_ssl_context(self, host):
+        key = ec.generate_private_key(ec.SECP256R1())
+        try:
+            names = [x509.IPAddress(ipaddress.ip_address(host))]
+        except ValueError:
+            names = [x509.DNSName(host)]
+        names.append(x509.DNSName('localhost'))
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cert = (x509.CertificateBuilder()
+                .subject_name(x509.Name([
+                    x509.NameAttribute(NameOID.COMMON_NAME, host)]))
+                .issuer_name(self._ca_cert.subject)
+                .public_key(key.public_key())
+                .serial_number(x509.random_serial_number())
+                .not_valid_before(now - datetime.timedelta(minutes=5))
+                .not_valid_after(now + datetime.timedelta(days=30))
+                .add_extension(x509.SubjectAlternativeName(names),
+                               critical=False)
+                .sign(self._ca_key, hashes.SHA256()))
+        self._tls_dir = tempfile.mkdtemp(prefix='stub-magnum-')
+        self.ca_file = os.path.join(self._tls_dir, 'ca.pem')
+        cert_file = os.path.join(self._tls_dir, 'cert.pem')
+        key_file = os.path.join(self._tls_dir, 'key.pem')
+        with open(self.ca_file, 'w') as f:
+            f.write(self._ca_pem())
+        with open(cert_file, 'wb') as f:
+            f.write(cert.public_bytes(serialization.Encoding.PEM))
+        with open(key_file, 'wb') as f:
+            f.write(key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption()))
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_file, key_file)
+        context.set_alpn_protocols(
+            ['h2', 'http/1.1'] if h2 is not None else ['http/1.1'])
+        return context
+
+    def _ca_pem(self):
+        return self._ca_cert.public_bytes(
+            serialization.Encoding.PEM).decode('utf-8')
+
+    def _sign(self, csr_pem):
+        try:
+            csr = x509.load_pem_x509_csr(csr_pem.encode('utf-8'))
+        except (ValueError, AttributeError):
+            raise _StubError(400, 'Invalid CSR')
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cert = (x509.CertificateBuilder()
+                .subject_name(csr.subject)
+                .issuer_name(self._ca_cert.subject)
+                .public_key(csr.public_key())
+                .serial_number(x509.random_serial_number())
+                .not_valid_before(now - datetime.timedelta(minutes=5))
+                .not_valid_after(now + datetime.timedelta(days=30))
+                .sign(self._ca_key, hashes.SHA256()))
+        return cert.public_bytes(serialization.Encoding.PEM).decode('utf-8')
+
+    # Status transitions
+
+    def _transition(self, cluster, action, final=None):
+        """Move a cluster to ACTION_IN_PROGRESS, completing later."""
+        cluster['updated_at'] = _now()
+        if not self.transition_time:
+            if action == 'DELETE':
+                self._remove_cluster(cluster)
+            else:
+                cluster['status'] = '%s_COMPLETE' % action
+                cluster.update(final or {})
+            return
+        cluster['status'] = '%s_IN_PROGRESS' % action
+        self._pending[cluster['uuid']] = (
+            time.monotonic() + self.transition_time, action, final or {})
+
+    def _settle(self):
+        now = time.monotonic()
+        for cluster_uuid, (when, action, final) in list(
+                self._pending.items()):
+            if when > now:
+                continue
+            del self._pending[cluster_uuid]
+            cluster = self.clusters.items.get(cluster_uuid)
+            if cluster is None:
+                continue
+            if action == 'DELETE':
+                self._remove_cluster(cluster)
+                continue
+            cluster['status'] = '%s_COMPLETE' % action
+            cluster['status_reason'] = 'Stack %s completed successfully' % (
+                action)
+            cluster['updated_at'] = _now()
+            cluster.update(final)
+
+    def _remove_cluster(self, cluster):
+        self.clusters.remove(cluster['uuid'])
+        self.nodegroups.pop(cluster['uuid'], None)
+
+    # Request handling
+
+    def respond(self, method, target, headers, data):
+        """Answer one request as read off the wire.
+
+        :param target: the request path, with its query string.
+        :param headers: the request headers, looked up case-insensitively.
+        :param data: the request body as sent.
+        :returns: a ``(status, headers, data)`` tuple, headers being a list
+                  of ``(name, value)`` pairs.
+        """
+        parts = urlparse.urlsplit(target)
+        query = dict(urlparse.parse_qsl(parts.query))
+        body = None
+        if data:
+            try:
+                if headers.get('Content-Encoding') == 'gzip':
+                    data = gzip.decompress(data)
+                body = json.loads(data)
+            except (OSError, ValueError):
+                body = None
+        status, response, extra = self.handle(
+            method, urlparse.unquote(parts.path), query, headers, body)
+        data = b'' if response is None else json.dumps(response).encode()
+        response_headers = []
+        if response is not None:
+            response_headers.append(('Content-Type', 'application/json'))
+        if (self.compress_min_size is not None
+                and len(data) >= self.compress_min_size
+                and 'gzip' in headers.get('Accept-Encoding', '')):
+            data = gzip.compress(data)
+            response_headers.append(('Content-Encoding', 'gzip'))
+        response_headers.append(('Content-Length', str(len(data))))
+        response_headers.append(('OpenStack-API-Version',
+                                 'container-infra %s' % API_MAX_VERSION))
+        response_headers.extend(extra.items())
+        return status, response_headers, data
+
+    def handle(self, method, path, query, headers, body):
+        """Answer one request.
+
+        :returns: a ``(status, body, headers)`` tuple, body being a JSON
+                  serializable object or None.
+        """
+        for route_method, pattern, name in _ROUTES:
+            match = pattern.fullmatch(path)
+            if match and route_method == method:
+                break
+        else:
+            name = None
+        try:
+            if path.startswith('/v1'):
+                self._delay()
+                self._authorize(headers)
+                self._inject_error()
+            if name is None:
+                raise _StubError(404, 'The resource could not be found.')
+            with self._lock:
+                self._settle()
+                result = getattr(self, '_' + name)(
+                    query=query, body=body, headers=headers,
+                    **match.groupdict())
+            status, response = result[:2]
+            extra = result[2] if len(result) > 2 else {}
+        except _StubError as e:
+            status, extra = e.status, {}
+            if e.status in (429, 503):
+                extra['Retry-After'] = str(self.retry_after)
+            response = {'errors': [{
+                'request_id': '', 'code': 'client' if e.status < 500
+                else 'server', 'status': e.status, 'title': e.title,
+                'detail': e.detail, 'links': []}]}
+        self.requests[(method, name, status)] += 1
+        return status, response, extra
+
+    def _delay(self):
+        delay = self.latency
+        if self.jitter:
+            with self._lock:
+                delay += self._random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+    def _authorize(self, headers):
+        if not self.require_token:
+            return
+        if headers.get('X-Auth-Token') not in self.tokens:
+            raise _StubError(401, 'Unauthorized',
+                             'The request you have made requires '
+                             'authentication.')
+
+    def _inject_error(self):
+        if not self.error_rate:
+            return
+        with self._lock:
+            if self._random.random() >= self.error_rate:
+                return
+            status = self._random.choice(self.error_codes)
+        raise _StubError(status, 'Injected error %d' % status)
+
+    def _page(self, collection, resource, query, items=None, path=None,
+              detail=None):
+        try:
+            limit = int(query.get('limit', 0))
+        except ValueError:
+            raise _StubError(400, 'Invalid limit')
+        limit = min(limit, self.max_limit) if limit > 0 else self.max_limit
+        sort_key = query.get('sort_key')
+        sort_dir = query.get('sort_dir', 'asc')
+        if sort_dir not in ('asc', 'desc'):
+            raise _StubError(400, 'Invalid sort direction: %s' % sort_dir)
+        page = collection.page(items, query.get('marker'), limit, sort_key,
+                               sort_dir)
+        if not detail and resource in _SUMMARY_FIELDS:
+            fields = _SUMMARY_FIELDS[resource]
+            page = [dict((k, item.get(k)) for k in fields) for item in page]
+        body = {resource: page}
+        if len(page) == limit:
+            # Like Magnum, a full page links to the next one, which may
+            # turn out empty. The sort arguments are carried over.
+            args = dict((k, v) for k, v in query.items()
+                        if k not in ('limit', 'marker'))
+            args.update(limit=limit, marker=page[-1][collection.key])
+            body['next'] = '%s%s?%s' % (self.url, path,
+                                        urlparse.urlencode(args))
+        return body
+
+    def _find(self, collection, ident, kind):
+        if ident in collection.items:
+            return collection.items[ident]
+        found = [item for item in collection.items.values()
+                 if item.get('name') == ident]
+        if not found:
+            raise _StubError(404, '%s %s could not be found.' % (kind, ident))
+        if len(found) > 1:
+            raise _StubError(409, 'Multiple %ss exist with same name. '
+                             'Please use the %s uuid instead.' % (kind, kind))
+        return found[0]
+
+    def _project(self, headers):
+        return self.tokens.get(headers.get('X-Auth-Token'), DEFAULT_PROJECT)
+
+    # Versions and Keystone
+
+    def _versions(self, **kwargs):
+        return 200, {'versions': [self._v1()[1]]}
+
+    def _v1(self, **kwargs):
+        return 200, {'id': 'v1', 'status': 'CURRENT',
+                     'min_version': '1.1', 'max_version': API_MAX_VERSION,
+                     'links': [{'href': self.endpoint + '/', 'rel': 'self'}]}
+
+    def _identity(self, **kwargs):
+        return 200, {'version': {
+            'id': 'v3.14', 'status': 'stable', 'updated': '2020-04-07',
+            'links': [{'href': self.auth_url + '/', 'rel': 'self'}],
+            'media-types': [{'base': 'application/json',
+                             'type': 'application/vnd.openstack.identity-v3'
+                                     '+json'}]}}
+
+    def _issue_token(self, body, **kwargs):
+        """Issue a token for any credentials, with a catalog of the stub."""
+        auth = (body or {}).get('auth', {})
+        scope = auth.get('scope', {}).get('project', {})
+        project = scope.get('id') or scope.get('name') or DEFAULT_PROJECT
+        token = uuid.uuid4().hex
+        with self._lock:
+            self.tokens[token] = project
+        now = datetime.datetime.now(datetime.timezone.utc)
+        domain = {'id': 'default', 'name': 'Default'}
+        endpoints = [{'id': uuid.uuid4().hex, 'interface': interface,
+                      'region': 'RegionOne', 'region_id': 'RegionOne',
+                      'url': url}
+                     for interface in ('public', 'internal', 'admin')
+                     for url in [self.endpoint]]
+        identity = [dict(e, url=self.auth_url) for e in endpoints]
+        return 201, {'token': {
+            'methods': auth.get('identity', {}).get('methods', ['password']),
+            'issued_at': now.isoformat(),
+            'expires_at': (now + datetime.timedelta(hours=1)).isoformat(),
+            'user': {'id': 'stub-user', 'name': 'stub', 'domain': domain,
+                     'password_expires_at': None},
+            'project': {'id': project, 'name': project, 'domain': domain},
+            'roles': [{'id': 'admin', 'name': 'admin'}],
+            'catalog': [
+                {'id': 'magnum', 'name': 'magnum',
+                 'type': 'container-infra', 'endpoints': endpoints},
+                {'id': 'keystone', 'name': 'keystone', 'type': 'identity',
+                 'endpoints': identity}],
+        }}, {'X-Subject-Token': token}
+
+    # Cluster templates
+
+    def _list_templates(self, query, detail, **kwargs):
+        return 200, self._page(self.templates, 'clustertemplates', query,
+                               path='/v1/clustertemplates' + (detail or ''),
+                               detail=detail)
+
+    def _get_template(self, ident, **kwargs):
+        return 200, self._find(self.templates, ident, 'ClusterTemplate')
+
+    def _create_template(self, body, headers, **kwargs):
+        values = dict(body or {})
+        values.pop('uuid', None)
+        values['project_id'] = self._project(headers)
+        return 201, self.add_template(values)
+
+    def _update_template(self, ident, body, **kwargs):
+        template = self._find(self.templates, ident, 'ClusterTemplate')
+        _apply_patch(template, body or [])
+        template['updated_at'] = _now()
+        return 200, template
+
+    def _delete_template(self, ident, **kwargs):
+        template = self._find(self.templates, ident, 'ClusterTemplate')
+        if any(c['cluster_template_id'] == template['uuid']
+               for c in self.clusters.items.values()):
+            raise _StubError(400, 'ClusterTemplate %s is referenced by one '
+                             'or multiple clusters.' % template['uuid'])
+        self.templates.remove(template['uuid'])
+        return 204, None
+
+    # Clusters
+
+    def _list_clusters(self, query, detail, **kwargs):
+        return 200, self._page(self.clusters, 'clusters', query,
+                               path='/v1/clusters' + (detail or ''),
+                               detail=detail)
+
+    def _get_cluster(self, ident, **kwargs):
+        return 200, self._find(self.clusters, ident, 'Cluster')
+
+    def _create_cluster(self, body, headers, **kwargs):
+        values = dict(body or {})
+        template = self._find(self.templates,
+                              values.get('cluster_template_id') or '',
+                              'ClusterTemplate')
+        values['cluster_template_id'] = template['uuid']
+        values.pop('uuid', None)
+        values['project_id'] = self._project(headers)
+        values.pop('merge_labels', None)
+        labels = dict(template['labels'])
+        labels.update(values.get('labels') or {})
+        values['labels'] = labels
+        cluster = self.add_cluster(values)
+        return 202, {'uuid': cluster['uuid']}
+
+    def _update_cluster(self, ident, body, **kwargs):
+        cluster = self._find(self.clusters, ident, 'Cluster')
+        _apply_patch(cluster, body or [])
+        self._transition(cluster, 'UPDATE')
+        return 202, {'uuid': cluster['uuid']}
+
+    def _delete_cluster(self, ident, **kwargs):
+        cluster = self._find(self.clusters, ident, 'Cluster')
+        self._transition(cluster, 'DELETE')
+        return 204, None
+
+    def _resize_cluster(self, ident, body, **kwargs):
+        cluster = self._find(self.clusters, ident, 'Cluster')
+        body = body or {}
+        if 'node_count' not in body:
+            raise _StubError(400, 'node_count is required')
+        nodegroups = self.nodegroups[cluster['uuid']]
+        nodegroup = self._find(nodegroups,
+                               body.get('nodegroup') or 'default-worker',
+                               'NodeGroup')
+        nodegroup['node_count'] = body['node_count']
+        final = {}
+        if nodegroup['name'] == 'default-worker':
+            final['node_count'] = body['node_count']
+        self._transition(cluster, 'UPDATE', final)
+        return 202, {'uuid': cluster['uuid']}
+
+    def _upgrade_cluster(self, ident, body, **kwargs):
+        cluster = self._find(self.clusters, ident, 'Cluster')
+        template = self._find(self.templates,
+                              (body or {}).get('cluster_template') or '',
+                              'ClusterTemplate')
+        self._transition(cluster, 'UPDATE', {
+            'cluster_template_id': template['uuid'],
+            'coe_version': template['labels'].get('kube_tag',
+                                                  cluster['coe_version'])})
+        return 202, {'uuid': cluster['uuid']}
+
+    # Nodegroups
+
+    def _cluster_nodegroups(self, cluster_ident):
+        cluster = self._find(self.clusters, cluster_ident, 'Cluster')
+        return cluster, self.nodegroups[cluster['uuid']]
+
+    def _list_nodegroups(self, cluster_ident, query, detail, **kwargs):
+        cluster, nodegroups = self._cluster_nodegroups(cluster_ident)
+        items = None
+        if query.get('role'):
+            items = [ng for ng in nodegroups.items.values()
+                     if ng['role'] == query['role']]
+        path = '/v1/clusters/%s/nodegroups%s' % (cluster_ident, detail or '')
+        return 200, self._page(nodegroups, 'nodegroups', query, items=items,
+                               path=path, detail=detail)
+
+    def _get_nodegroup(self, cluster_ident, ident, **kwargs):
+        cluster, nodegroups = self._cluster_nodegroups(cluster_ident)
+        return 200, self._find(nodegroups, ident, 'NodeGroup')
+
+    def _create_nodegroup(self, cluster_ident, body, **kwargs):
+        cluster, nodegroups = self._cluster_nodegroups(cluster_ident)
+        values = dict(body or {})
+        if not values.get('name'):
+            raise _StubError(400, 'name is required')
+        if any(ng['name'] == values['name']
+               for ng in nodegroups.items.values()):
+            raise _StubError(409, 'A node group with name %s already exists '
+                             'in the cluster %s.' % (values['name'],
+                                                     cluster['uuid']))
+        values.pop('uuid', None)
+        return 202, self.add_nodegroup(cluster, values)
+
+    def _update_nodegroup(self, cluster_ident, ident, body, **kwargs):
+        cluster, nodegroups = self._cluster_nodegroups(cluster_ident)
+        nodegroup = self._find(nodegroups, ident, 'NodeGroup')
+        _apply_patch(nodegroup, body or [])
+        nodegroup['updated_at'] = _now()
+        return 202, nodegroup
+
+    def _delete_nodegroup(self, cluster_ident, ident, **kwargs):
+        cluster, nodegroups = self._cluster_nodegroups(cluster_ident)
+        nodegroup = self._find(nodegroups, ident, 'NodeGroup')
+        if nodegroup['is_default']:
+            raise _StubError(400, 'Deleting a default nodegroup is not '
+                             'supported.')
+        nodegroups.remove(nodegroup['uuid'])
+        return 204, None
+
+    # Certificates
+
+    def _get_certificate(self, cluster_ident, **kwargs):
+        cluster = self._find(self.clusters, cluster_ident, 'Cluster')
+        return 200, {'cluster_uuid': cluster['uuid'], 'pem': self._ca_pem(),
+                     'links': self._links('certificates/%s'
+                                          % cluster['uuid'])}
+
+    def _sign_certificate(self, body, **kwargs):
+        body = body or {}
+        cluster = self._find(self.clusters, body.get('cluster_uuid') or '',
+                             'Cluster')
+        return 201, {'cluster_uuid': cluster['uuid'],
+                     'csr': body.get('csr'),
+                     'pem': self._sign(body.get('csr') or ''),
+                     'links': self._links('certificates/%s'
+                                          % cluster['uuid'])}
+
+    def _rotate_ca(self, cluster_ident, **kwargs):
+        self._find(self.clusters, cluster_ident, 'Cluster')
+        self._new_ca()
+        return 202, None
+
+    # Quotas, services and stats
+
+    def _list_quotas(self, query, headers, **kwargs):
+        items = None
+        if query.get('all_tenants', '').lower() != 'true':
+            project = self._project(headers)
+            items = [q for q in self.quotas.items.values()
+                     if q['project_id'] == project]
+        return 200, self._page(self.quotas, 'quotas', query, items=items,
+                               path='/v1/quotas', detail=True)
+
+    def _find_quota(self, project, resource):
+        for quota in self.quotas.items.values():
+            if (quota['project_id'], quota['resource']) == (project,
+                                                            resource):
+                return quota
+        return None
+
+    def _get_quota(self, project, resource, **kwargs):
+        quota = self._find_quota(project, resource)
+        if quota is None:
+            raise _StubError(404, 'Quota could not be found for project %s '
+                             'and resource %s.' % (project, resource))
+        return 200, quota
+
+    def _create_quota(self, body, **kwargs):
+        body = body or {}
+        if not body.get('project_id') or not body.get('resource'):
+            raise _StubError(400, 'project_id and resource are required')
+        if self._find_quota(body['project_id'], body['resource']):
+            raise _StubError(409, 'Quota for project %s already exists for '
+                             'resource %s.' % (body['project_id'],
+                                               body['resource']))
+        return 201, self.add_quota(body)
+
+    def _update_quota(self, project, resource, body, **kwargs):
+        quota = self._get_quota(project, resource)[1]
+        if isinstance(body, dict):
+            # Magnum takes a quota body, not a JSON patch.
+            quota['hard_limit'] = body.get('hard_limit', quota['hard_limit'])
+        else:
+            _apply_patch(quota, body or [])
+        quota['updated_at'] = _now()
+        return 202, quota
+
+    def _delete_quota(self, project, resource, **kwargs):
+        quota = self._get_quota(project, resource)[1]
+        self.quotas.remove(quota['id'])
+        return 204, None
+
+    def _list_mservices(self, **kwargs):
+        now = _now()
+        return 200, {'mservices': [{
+            'id': 1, 'host': 'stub-conductor', 'binary': 'magnum-conductor',
+            'state': 'up', 'disabled': False, 'disabled_reason': None,
+            'report_count': 1, 'created_at': now, 'updated_at': now}]}
+
+    def _stats(self, query, **kwargs):
+        project = query.get('project_id')
+        clusters = [c for c in self.clusters.items.values()
+                    if not project or c['project_id'] == project]
+        return 200, {'clusters': len(clusters),
+                     'nodes': sum(c['node_count'] + c['master_count']
+                                  for c in clusters)}
+
+
+def _route(method, pattern, name):
+    return method, re.compile(pattern), name
+
+
+_ID = r'(?P<%s>[^/]+)'
+_DETAIL = r'(?P<detail>/detail)?/?'
+_CLUSTER = r'/v1/clusters/' + _ID % 'cluster_ident'
+_QUOTA = r'/v1/quotas/%s/%s' % (_ID % 'project', _ID % 'resource')
+
+_ROUTES = [
+    _route('GET', r'/', 'versions'),
+    _route('GET', r'/v1/?', 'v1'),
+    _route('GET', r'/v3/?', 'identity'),
+    _route('POST', r'/v3/auth/tokens', 'issue_token'),
+    _route('GET', r'/v1/clustertemplates' + _DETAIL, 'list_templates'),
+    _route('POST', r'/v1/clustertemplates/?', 'create_template'),
+    _route('GET', r'/v1/clustertemplates/' + _ID % 'ident', 'get_template'),
+    _route('PATCH', r'/v1/clustertemplates/' + _ID % 'ident',
+           'update_template'),
+    _route('DELETE', r'/v1/clustertemplates/' + _ID % 'ident',
+           'delete_template'),
+    _route('GET', r'/v1/clusters' + _DETAIL, 'list_clusters'),
+    _route('POST', r'/v1/clusters/?', 'create_cluster'),
+    _route('GET', r'/v1/clusters/' + _ID % 'ident', 'get_cluster'),
+    _route('PATCH', r'/v1/clusters/' + _ID % 'ident', 'update_cluster'),
+    _route('DELETE', r'/v1/clusters/' + _ID % 'ident', 'delete_cluster'),
+    _route('POST', r'/v1/clusters/' + _ID % 'ident' + '/actions/resize',
+           'resize_cluster'),
+    _route('POST', r'/v1/clusters/' + _ID % 'ident' + '/actions/upgrade',
+           'upgrade_cluster'),
+    _route('GET', _CLUSTER + '/nodegroups' + _DETAIL, 'list_nodegroups'),
+    _route('POST', _CLUSTER + '/nodegroups/?', 'create_nodegroup'),
+    _route('GET', _CLUSTER + '/nodegroups/' + _ID % 'ident',
+           'get_nodegroup'),
+    _route('PATCH', _CLUSTER + '/nodegroups/' + _ID % 'ident',
+           'update_nodegroup'),
+    _route('DELETE', _CLUSTER + '/nodegroups/' + _ID % 'ident',
+           'delete_nodegroup'),
+    _route('POST', r'/v1/certificates/?', 'sign_certificate'),
+    _route('GET', r'/v1/certificates/' + _ID % 'cluster_ident',
+           'get_certificate'),
+    _route('PATCH', r'/v1/certificates/' + _ID % 'cluster_ident',
+           'rotate_ca'),
+    _route('GET', r'/v1/quotas/?', 'list_quotas'),
+    _route('POST', r'/v1/quotas/?', 'create_quota'),
+    _route('GET', _QUOTA, 'get_quota'),
+    _route('PATCH', _QUOTA, 'update_quota'),
+    _route('DELETE', _QUOTA, 'delete_quota'),
+    _route('GET', r'/v1/mservices/?', 'list_mservices'),
+    _route('GET', r'/v1/stats/?', 'stats'),
+]
+
+
+class _HTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connections under load, which clients
+    # only notice as a one second SYN retransmit.
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        # Clients closing their connections or failing the TLS handshake
+        # are not errors of the stub.
+        if not isinstance(sys.exc_info()[1], OSError):
+            super(_HTTPServer, self).handle_error(request, client_address)
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    # Keep-alive, so that clients reuse their connections as they would
+    # with a real deployment.
+    protocol_version = 'HTTP/1.1'
+    # The headers and the body are separate writes; with Nagle's algorithm
+    # the body waits for the delayed ACK of the headers on reused
+    # connections, 40ms per request.
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        context = self.server.stub._ssl_context
+        if context is not None:
+            self.request = context.wrap_socket(self.request,
+                                               server_side=True)
+        super(_Handler, self).setup()
+        with self.server.stub._lock:
+            self.server.stub.connections += 1
+
+    def handle(self):
+        if (isinstance(self.request, ssl.SSLSocket)
+                and self.request.selected_alpn_protocol() == 'h2'):
+            _HTTP2Connection(self.server.stub, self.request).serve()
+        else:
+            super(_Handler, self).handle()
+
+    def finish(self):
+        super(_Handler, self).finish()
+        if isinstance(self.request, ssl.SSLSocket):
+            self.request.close()
+
+    def _dispatch(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        data = self.rfile.read(length) if length else b''
+        status, headers, data = self.server.stub.respond(
+            self.command, self.path, self.headers, data)
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command == 'HEAD':
+            return
+        trickle = self.server.stub.trickle
+        if not trickle:
+            self.wfile.write(data)
+            return
+        for start in range(0, len(data), TRICKLE_SIZE):
+            if start:
+                time.sleep(trickle)
+            self.wfile.write(data[start:start + TRICKLE_SIZE])
+            self.wfile.flush()
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _dispatch
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _HTTP2Connection(object):
+    """Serves the streams of an HTTP/2 connection concurrently.
+
+    The connection thread alone reads and writes the socket; every request
+    is answered in a thread of its own, which queues its frames on the
+    ``h2`` connection and wakes the connection thread up to send them.
+    """
+
+    def __init__(self, stub, sock):
+        self.stub = stub
+        self.sock = sock
+        self._conn = h2.connection.H2Connection(h2.config.H2Configuration(
+            client_side=False, header_encoding='utf-8'))
+        # Guards the h2 connection, notified when flow control windows may
+        # have opened.
+        self._cond = threading.Condition()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_w.setblocking(False)
+        self._streams = {}
+        self._closed = False
+
+    def serve(self):
+        with self._cond:
+            self._conn.initiate_connection()
+        try:
+            while not self._closed:
+                self._flush()
+                if not self.sock.pending():
+                    readable = select.select(
+                        [self.sock, self._wake_r], [], [])[0]
+                    if self._wake_r in readable:
+                        self._wake_r.recv(4096)
+                    if self.sock not in readable:
+                        continue
+                data = self.sock.recv(65536)
+                if not data:
+                    break
+                with self._cond:
+                    events = self._conn.receive_data(data)
+                    self._cond.notify_all()
+                for event in events:
+                    self._handle_event(event)
+        except (OSError, h2.exceptions.ProtocolError):
+            pass
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+                self._wake_r.close()
+                self._wake_w.close()
+
+    def _handle_event(self, event):
+        if isinstance(event, h2.events.RequestReceived):
+            self._streams[event.stream_id] = (dict(event.headers),
+                                              bytearray())
+        elif isinstance(event, h2.events.DataReceived):
+            self._streams[event.stream_id][1].extend(event.data)
+            with self._cond:
+                self._conn.acknowledge_received_data(
+                    event.flow_controlled_length, event.stream_id)
+        elif isinstance(event, h2.events.StreamEnded):
+            headers, data = self._streams.pop(event.stream_id)
+            threading.Thread(target=self._respond, daemon=True,
+                             args=(event.stream_id, headers,
+                                   bytes(data))).start()
+        elif isinstance(event, h2.events.StreamReset):
+            self._streams.pop(event.stream_id, None)
+        elif isinstance(event, h2.events.ConnectionTerminated):
+            self._closed = True
+
+    def _respond(self, stream_id, headers, data):
+        message = http.client.HTTPMessage()
+        for name, value in headers.items():
+            if not name.startswith(':'):
+                message[name] = value
+        method = headers[':method']
+        status, response_headers, data = self.stub.respond(
+            method, headers[':path'], message, data)
+        if method == 'HEAD':
+            data = b''
+        try:
+            with self._cond:
+                self._conn.send_headers(
+                    stream_id, [(':status', str(status))]
+                    + [(name.lower(), str(value))
+                       for name, value in response_headers],
+                    end_stream=not data)
+            self._wake()
+            while data:
+                with self._cond:
+                    while (not self._closed and self._conn
+                           .local_flow_control_window(stream_id) <= 0):
+                        self._cond.wait()
+                    if self._closed:
+                        return
+                    size = min(len(data),
+                               self._conn.local_flow_control_window(
+                                   stream_id),
+                               self._conn.max_outbound_frame_size)
+                    self._conn.send_data(stream_id, data[:size],
+                                         end_stream=size == len(data))
+                data = data[size:]
+                self._wake()
+        except h2.exceptions.ProtocolError:
+            # The client reset the stream.
+            pass
+
+    def _wake(self):
+        with self._cond:
+            if self._closed:
+                return
+            try:
+                self._wake_w.send(b'\0')
+            except BlockingIOError:
+                # Already woken up.
+                pass
+
+    def _flush(self):
+        with self._cond:
+            data = self._conn.data_to_send()
+        if data:
+            self.sock.sendall(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m magnumclient.stub_server',
+        description='Serve an in-memory Magnum API for local testing.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9511)
+    parser.add_argument('--clusters', type=int, default=100)
+    parser.add_argument('--templates', type=int, default=3)
+    parser.add_argument('--projects', type=int, default=3)
+    parser.add_argument('--extra-nodegroups', type=int, default=0)
+    parser.add_argument('--max-limit', type=int, default=DEFAULT_MAX_LIMIT)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds every API request is delayed by.')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--trickle', type=float, default=0.0,
+                        help='Seconds between the %d byte pieces response '
+                             'bodies are written in.' % TRICKLE_SIZE)
+    parser.add_argument('--item-size', type=int, default=0,
+                        help='Pad every item to about this many bytes.')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Share of API requests failing with 429/503.')
+    parser.add_argument('--transition-time', type=float, default=0.0)
+    parser.add_argument('--compress-min-size', type=int,
+                        help='gzip responses of at least this many bytes.')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--tls', action='store_true',
+                        help='Serve HTTPS, and HTTP/2 when h2 is installed.')
+    args = parser.parse_args(argv)
+
+    server = StubServer(
+        host=args.host, port=args.port, clusters=args.clusters,
+        templates=args.templates, projects=args.projects,
+        extra_nodegroups=args.extra_nodegroups, max_limit=args.max_limit,
+        latency=args.latency, jitter=args.jitter, trickle=args.trickle,
+        item_size=args.item_size,
+        error_rate=args.error_rate, transition_time=args.transition_time,
+        compress_min_size=args.compress_min_size, seed=args.seed,
+        tls=args.tls)
+    if server.ca_file:
+        print('export OS_CACERT=%s' % server.ca_file)
+    print('export OS_AUTH_TYPE=password OS_AUTH_URL=%s '
+          'OS_USERNAME=stub OS_PASSWORD=stub OS_PROJECT_NAME=%s '
+          'OS_USER_DOMAIN_NAME=Default OS_PROJECT_DOMAIN_NAME=Default '
+          'OS_IDENTITY_API_VERSION=3' % (server.auth_url, DEFAULT_PROJECT))
+    print('# or, without Keystone: OS_AUTH_TYPE=admin_token '
+          'OS_TOKEN=%s OS_ENDPOINT=%s' % (server.token, server.endpoint),
+          flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Run the benchmarks and write their results as JSON."""
+
+import argparse
+import json
+import sys
+
+from magnumclient.tests.benchmarks import harness
+from magnumclient.tests.benchmarks import suite  # noqa: F401
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m magnumclient.tests.benchmarks',
+        description=__doc__)
+    parser.add_argument('-k', '--filter', metavar='<regex>',
+                        help='Only run the benchmarks matching a regex.')
+    parser.add_argument('-o', '--output', metavar='<file>',
+                        help='Write the results to a JSON file.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Samples per benchmark (default: 5).')
+    parser.add_argument('--min-time', type=float, default=0.1,
+                        help='Minimum seconds per sample (default: 0.1).')
+    parser.add_argument('--quick', action='store_true',
+                        help='Tiny inputs and one sample, to check that '
+                             'the benchmarks run.')
+    parser.add_argument('--compare', metavar='<file>',
+                        help='Baseline results to compare against.')
+    parser.add_argument('--threshold', type=float, default=1.1,
+                        help='Slowdown ratio reported as a regression with '
+                             '--compare, making the run fail '
+                             '(default: 1.1).')
+    args = parser.parse_args(argv)
+
+    results = harness.run_all(args.filter, quick=args.quick,
+                              repeat=args.repeat, min_time=args.min_time,
+                              stream=sys.stdout)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows, regressions = harness.compare(baseline, results,
+                                            args.threshold)
+        for name, old, new, ratio in rows:
+            print('%-45s %12.3f us -> %12.3f us  x%.2f'
+                  % (name, old * 1e6, new * 1e6, ratio))
+        if regressions:
+            print('Regressions: %s' % ', '.join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
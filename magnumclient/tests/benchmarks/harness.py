@@ -0,0 +1,129 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Minimal pyperf-style benchmark harness without extra dependencies."""
+
+import collections
+import platform
+import re
+import statistics
+import sys
+import time
+
+Benchmark = collections.namedtuple('Benchmark',
+                                   ['name', 'setup', 'self_timed'])
+
+BENCHMARKS = []
+
+
+def benchmark(name, self_timed=False):
+    """Register a benchmark.
+
+    The decorated function takes a ``quick`` flag, does its setup and
+    returns the callable to time. A ``self_timed`` benchmark callable
+    returns the duration it measured itself, e.g. for work done in a
+    subprocess.
+    """
+    def decorator(setup):
+        BENCHMARKS.append(Benchmark(name, setup, self_timed))
+        return setup
+    return decorator
+
+
+def _time_loops(func, loops):
+    start = time.perf_counter()
+    for _i in range(loops):
+        func()
+    return time.perf_counter() - start
+
+
+def run(bench, quick=False, repeat=5, min_time=0.1):
+    """Run a benchmark and return its result dict.
+
+    Without ``self_timed``, the number of loops per sample is doubled until
+    one sample takes at least ``min_time`` seconds. Timings are reported
+    per call, in seconds.
+    """
+    func = bench.setup(quick)
+    if quick:
+        repeat, min_time = 1, 0
+    func()  # Warm up caches and lazy imports.
+
+    if bench.self_timed:
+        loops = 1
+        samples = [func() for _i in range(repeat)]
+    else:
+        loops = 1
+        while _time_loops(func, loops) < min_time:
+            loops *= 2
+        samples = [_time_loops(func, loops) / loops for _i in range(repeat)]
+
+    return {
+        'name': bench.name,
+        'loops': loops,
+        'repeat': repeat,
+        'samples': samples,
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.mean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def run_all(pattern=None, quick=False, repeat=5, min_time=0.1,
+            stream=None):
+    """Run the registered benchmarks matching a regex.
+
+    :returns: a JSON serializable dict with the results and metadata.
+    """
+    results = []
+    for bench in BENCHMARKS:
+        if pattern and not re.search(pattern, bench.name):
+            continue
+        result = run(bench, quick=quick, repeat=repeat, min_time=min_time)
+        results.append(result)
+        if stream is not None:
+            stream.write('%-45s %12.3f us +- %.3f\n'
+                         % (bench.name, result['median'] * 1e6,
+                            result['stdev'] * 1e6))
+            stream.flush()
+    return {
+        'metadata': {
+            'python': sys.version.split()[0],
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'quick': quick,
+            'timestamp': time.time(),
+        },
+        'benchmarks': results,
+    }
+
+
+def compare(baseline, current, threshold=1.1):
+    """Compare two run_all results by median.
+
+    :returns: a list of ``(name, baseline, current, ratio)`` tuples and the
+              names of the benchmarks slower than threshold times their
+              baseline.
+    """
+    before = dict((b['name'], b['median']) for b in baseline['benchmarks'])
+    rows = []
+    regressions = []
+    for result in current['benchmarks']:
+        if result['name'] not in before:
+            continue
+        old = before[result['name']]
+        ratio = result['median'] / old if old else float('inf')
+        rows.append((result['name'], old, result['median'], ratio))
+        if ratio > threshold:
+            regressions.append(result['name'])
+    return rows, regressions
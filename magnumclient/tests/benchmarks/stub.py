@@ -0,0 +1,137 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""In-process stand-ins for the Magnum API used by the benchmarks.
+
+Nothing here opens a socket: the stubs plug into the client at the
+connection (HTTPClient), session (SessionClient) or API object (managers)
+level, so the benchmarks measure client code only.
+"""
+
+import io
+from urllib import parse as urlparse
+
+from oslo_serialization import jsonutils
+
+
+def make_cluster(index):
+    """Return a realistic detailed cluster body."""
+    uuid = '%08x-0000-4000-8000-%012x' % (index, index)
+    return {
+        'uuid': uuid,
+        'name': 'cluster-%d' % index,
+        'status': 'CREATE_COMPLETE',
+        'health_status': 'HEALTHY',
+        'cluster_template_id': 'template-%d' % (index % 5),
+        'project_id': 'project-%d' % (index % 20),
+        'node_count': 3,
+        'master_count': 1,
+        'keypair': 'default',
+        'api_address': 'https://10.0.%d.%d:6443' % (
+            index // 250 % 250, index % 250),
+        'coe_version': 'v1.27.4',
+        'labels': {'kube_tag': 'v1.27.4', 'auto_healing_enabled': 'true'},
+        'node_addresses': ['10.1.0.%d' % i for i in range(3)],
+        'master_addresses': ['10.2.0.1'],
+        'created_at': '2024-01-01T00:00:00+00:00',
+        'updated_at': '2024-01-02T00:00:00+00:00',
+        'links': [{'href': 'http://stub/v1/clusters/%s' % uuid,
+                   'rel': 'self'}],
+    }
+
+
+class PaginatingAPI(object):
+    """API object serving a cluster list in pages with ``next`` links.
+
+    Bodies are prebuilt, so each request only costs a dict lookup and the
+    measured time is spent in the manager.
+    """
+
+    def __init__(self, count, page_size=1000):
+        self.pages = {}
+        clusters = [make_cluster(i) for i in range(count)]
+        marker = None
+        for start in range(0, count, page_size):
+            page = clusters[start:start + page_size]
+            body = {'clusters': page}
+            if start + page_size < count:
+                body['next'] = ('http://stub:9511/v1/clusters/?limit=%d&'
+                                'marker=%s' % (page_size, page[-1]['uuid']))
+            self.pages[marker] = body
+            marker = page[-1]['uuid']
+
+    def json_request(self, method, url, **kwargs):
+        query = urlparse.parse_qs(urlparse.urlparse(url).query)
+        return None, self.pages[query.get('marker', [None])[0]]
+
+
+class StubHTTPResponse(object):
+    """http.client.HTTPResponse look-alike over an in-memory body."""
+
+    def __init__(self, body, status=200,
+                 content_type='application/json; charset=UTF-8'):
+        self.status = status
+        self.reason = 'OK'
+        self.version = 11
+        self._headers = {'content-type': content_type,
+                         'content-length': str(len(body))}
+        self._body = io.BytesIO(body)
+
+    def getheader(self, name, default=None):
+        return self._headers.get(name.lower(), default)
+
+    def getheaders(self):
+        return list(self._headers.items())
+
+    def read(self, amt=None):
+        return self._body.read(amt)
+
+
+class StubConnection(object):
+    """Connection handing out a fresh response to every request."""
+
+    def __init__(self, body):
+        self.body = body
+
+    def request(self, method, url, **kwargs):
+        pass
+
+    def getresponse(self):
+        return StubHTTPResponse(self.body)
+
+
+class StubSessionResponse(object):
+
+    def __init__(self, body):
+        self.content = body
+        self.status_code = 200
+        self.headers = {'content-type': 'application/json'}
+
+    def json(self):
+        return jsonutils.loads(self.content)
+
+
+class StubSession(object):
+    """keystoneauth1 Session look-alike for SessionClient."""
+
+    timeout = None
+
+    def __init__(self, body):
+        self.body = body
+
+    def request(self, url, method, **kwargs):
+        return StubSessionResponse(self.body)
+
+
+def cluster_list_body(count):
+    return jsonutils.dump_as_bytes(
+        {'clusters': [make_cluster(i) for i in range(count)]})
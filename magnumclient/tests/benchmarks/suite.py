@@ -0,0 +1,227 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""The client hot path benchmarks."""
+
+import contextlib
+import io
+import subprocess
+import sys
+import time
+
+from magnumclient.common import cliutils
+from magnumclient.common import httpclient
+from magnumclient.common import jsoncodec
+from magnumclient.common import transport
+from magnumclient.common import utils
+from magnumclient import stub_server
+from magnumclient.tests.benchmarks import harness
+from magnumclient.tests.benchmarks import stub
+from magnumclient.v1 import client as v1_client
+from magnumclient.v1 import clusters
+
+benchmark = harness.benchmark
+
+
+def _list_pagination(count):
+    def setup(quick):
+        api = stub.PaginatingAPI(200 if quick else count)
+        mgr = clusters.ClusterManager(api)
+        return lambda: mgr.list(limit=0)
+    return setup
+
+
+benchmark('list_pagination_10k')(_list_pagination(10000))
+benchmark('list_pagination_100k')(_list_pagination(100000))
+
+
+@benchmark('resource_construction_1k')
+def resource_construction(quick):
+    mgr = clusters.ClusterManager(None)
+    bodies = [stub.make_cluster(i) for i in range(10 if quick else 1000)]
+
+    def func():
+        for body in bodies:
+            clusters.Cluster(mgr, body, loaded=True)
+    return func
+
+
+def _json_decode_size(quick):
+    return 10 if quick else 1000
+
+
+@benchmark('httpclient_json_request_1k')
+def httpclient_json_request(quick):
+    client = httpclient.HTTPClient('http://stub:9511', token='token')
+    conn = stub.StubConnection(
+        stub.cluster_list_body(_json_decode_size(quick)))
+    client.get_connection = lambda deadline=None: conn
+    return lambda: client.json_request('GET', '/v1/clusters')
+
+
+@benchmark('sessionclient_json_request_1k')
+def sessionclient_json_request(quick):
+    session = stub.StubSession(
+        stub.cluster_list_body(_json_decode_size(quick)))
+    client = httpclient.SessionClient(session=session,
+                                      endpoint_override='http://stub:9511')
+    return lambda: client.json_request('GET', '/v1/clusters')
+
+
+def _json_loads(name):
+    # A clusters/detail page as received from the server, about 1MB.
+    def setup(quick):
+        codec = jsoncodec.get_codec(name)
+        body = stub.cluster_list_body(_json_decode_size(quick))
+        return lambda: codec.loads(body)
+    return setup
+
+
+def _json_dumps(name):
+    # A cluster create request body.
+    def setup(quick):
+        codec = jsoncodec.get_codec(name)
+        body = stub.make_cluster(0)
+        return lambda: codec.dumps(body)
+    return setup
+
+
+for _name in jsoncodec.available():
+    benchmark('json_loads_%s_1k' % _name)(_json_loads(_name))
+    benchmark('json_dumps_%s' % _name)(_json_dumps(_name))
+
+
+def _fanout_nodegroups(name, tls=False):
+    # The nodegroups of every cluster listed by 10 workers from the local
+    # stub API, with 5ms of latency per request. Only the fan-out is timed,
+    # not starting the server or listing the clusters. Over TLS, httpx
+    # multiplexes the requests on one HTTP/2 connection.
+    def setup(quick):
+        def func():
+            with stub_server.StubServer(clusters=20 if quick else 200,
+                                        latency=0.005, tls=tls) as server:
+                client = v1_client.Client(
+                    endpoint_override=server.endpoint,
+                    auth_token=server.token, transport=name,
+                    ca_file=server.ca_file)
+                uuids = [c.uuid for c in client.clusters.list(limit=0)]
+                start = time.perf_counter()
+                for result in utils.run_concurrently(
+                        client.nodegroups.list, uuids,
+                        http_client=client.http_client):
+                    if result.error is not None:
+                        raise result.error
+                elapsed = time.perf_counter() - start
+                client.http_client.close()
+            return elapsed
+        return func
+    return setup
+
+
+for _name in transport.available():
+    benchmark('fanout_nodegroups_%s_200' % _name,
+              self_timed=True)(_fanout_nodegroups(_name))
+    # httplib sets up TLS for every request, which is all it would measure.
+    if _name != 'httplib':
+        benchmark('fanout_nodegroups_%s_tls_200' % _name,
+                  self_timed=True)(_fanout_nodegroups(_name, tls=True))
+
+
+_FIELDS = ['uuid', 'name', 'keypair', 'node_count', 'master_count',
+           'status', 'health_status']
+
+
+def _resources(count):
+    mgr = clusters.ClusterManager(None)
+    return [clusters.Cluster(mgr, stub.make_cluster(i), loaded=True)
+            for i in range(count)]
+
+
+@benchmark('print_list_1k')
+def print_list(quick):
+    objs = _resources(10 if quick else 1000)
+
+    def func():
+        with contextlib.redirect_stdout(io.StringIO()):
+            cliutils.print_list(objs, _FIELDS)
+    return func
+
+
+@benchmark('print_list_streamed_csv_1k')
+def print_list_streamed_csv(quick):
+    objs = _resources(10 if quick else 1000)
+
+    def func():
+        cliutils.print_list(objs, _FIELDS, sortby_index=None,
+                            output_format='csv', stream=io.StringIO())
+    return func
+
+
+@benchmark('print_list_sampled_1k')
+def print_list_sampled(quick):
+    objs = _resources(10 if quick else 1000)
+
+    def func():
+        cliutils.print_list(objs, _FIELDS, sortby_index=None,
+                            sample_size=100, stream=io.StringIO())
+    return func
+
+
+@benchmark('print_dict')
+def print_dict(quick):
+    info = stub.make_cluster(1)
+
+    def func():
+        with contextlib.redirect_stdout(io.StringIO()):
+            cliutils.print_dict(info)
+    return func
+
+
+@benchmark('args_array_to_patch_100')
+def args_array_to_patch(quick):
+    attributes = ['node_count=%d' % i for i in range(50)]
+    attributes += ['labels=kube_tag=v1.%d,foo=bar' % i for i in range(50)]
+
+    def func():
+        utils.args_array_to_patch('replace', attributes)
+    return func
+
+
+_IMPORT_TIME = ("import time; start = time.perf_counter(); "
+                "import magnumclient.osc.plugin; "
+                "import magnumclient.osc.v1.clusters; "
+                "print(time.perf_counter() - start)")
+
+
+@benchmark('cli_import_time', self_timed=True)
+def cli_import_time(quick):
+    # Every sample is a fresh interpreter, so nothing is cached in
+    # sys.modules; only the import itself is timed, not the startup.
+    def func():
+        output = subprocess.check_output([sys.executable, '-c',
+                                          _IMPORT_TIME])
+        return float(output)
+    return func
+
+
+@benchmark('cli_startup_time', self_timed=True)
+def cli_startup_time(quick):
+    # The whole run of the magnum command, from interpreter start to the
+    # help of a single command, which loads the command but needs no API.
+    argv = [sys.executable, '-m', 'magnumclient.shell',
+            'cluster', 'show', '--help']
+
+    def func():
+        start = time.perf_counter()
+        subprocess.run(argv, stdout=subprocess.DEVNULL, check=True)
+        return time.perf_counter() - start
+    return func
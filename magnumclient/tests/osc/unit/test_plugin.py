@@ -14,18 +14,20 @@ from unittest import mock
 
 import testtools
 
+from magnumclient.common import cacache
 from magnumclient.osc import plugin
 
 
 class TestMakeClient(testtools.TestCase):
 
-    def _make_instance(self, api_version):
+    def _make_instance(self, api_version, config=None):
         instance = mock.Mock()
         instance._api_version = {'container_infra': api_version}
+        instance.get_configuration.return_value = config or {}
         return instance
 
-    def _call_make_client(self, api_version):
-        instance = self._make_instance(api_version)
+    def _call_make_client(self, api_version, config=None):
+        instance = self._make_instance(api_version, config)
         with mock.patch('osc_lib.utils.get_client_class') as mock_gcc:
             mock_client_class = mock.Mock(return_value=mock.Mock())
             mock_gcc.return_value = mock_client_class
@@ -47,3 +49,21 @@ class TestMakeClient(testtools.TestCase):
         # Full microversion must reach the HTTP client
         _, kwargs = mock_client_class.call_args
         self.assertEqual('1.12', kwargs['api_version'])
+
+    def test_ca_cache(self):
+        """The CLI shares an on-disk CA cache between commands."""
+        mock_gcc, mock_client_class = self._call_make_client('1')
+        _, kwargs = mock_client_class.call_args
+        self.assertIsInstance(kwargs['ca_cache'], cacache.CACache)
+        self.assertEqual(cacache.default_path(), kwargs['ca_cache'].path)
+
+    def test_transport(self):
+        """The transport option reaches the client."""
+        mock_gcc, mock_client_class = self._call_make_client('1')
+        _, kwargs = mock_client_class.call_args
+        self.assertIsNone(kwargs['transport'])
+
+        mock_gcc, mock_client_class = self._call_make_client(
+            '1', {'container_infra_transport': 'httpx'})
+        _, kwargs = mock_client_class.call_args
+        self.assertEqual('httpx', kwargs['transport'])
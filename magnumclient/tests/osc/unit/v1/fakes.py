@@ -14,6 +14,7 @@
 import argparse
 import copy
 import datetime
+from unittest import mock
 import uuid
 
 from magnumclient.tests.osc.unit import osc_fakes
@@ -30,6 +31,10 @@ class FakeBaseModelManager(object):
              sort_dir=None, detail=False):
         pass
 
+    def list_iter(self, limit=None, marker=None, sort_key=None,
+                  sort_dir=None, detail=False):
+        pass
+
     def get(self, id):
         pass
 
@@ -45,11 +50,17 @@ class FakeBaseModelManager(object):
     def rotate_ca(self, **kwargs):
         pass
 
+    def watch(self, fast_interval=None, slow_interval=None):
+        pass
+
 
 class FakeStatsModelManager(object):
     def list(self, **kwargs):
         pass
 
+    def list_many(self, **kwargs):
+        pass
+
 
 class FakeQuotasModelManager(object):
     def get(self, id, resource):
@@ -61,12 +72,25 @@ class FakeQuotasModelManager(object):
     def delete(self, id):
         pass
 
+    def list(self, **kwargs):
+        pass
+
+    def apply_changes(self, changes, **kwargs):
+        pass
+
 
 class FakeNodeGroupManager(object):
     def list(self, cluster_id, limit=None, marker=None, sort_key=None,
              sort_dir=None, detail=False):
         pass
 
+    def list_iter(self, cluster_id, limit=None, marker=None, sort_key=None,
+                  sort_dir=None, detail=False):
+        pass
+
+    def list_all(self, cluster_ids=None, max_workers=None, **kwargs):
+        pass
+
     def get(self, cluster_id, id):
         pass
 
@@ -79,6 +103,10 @@ class FakeNodeGroupManager(object):
     def update(self, cluster_id, id, patch):
         pass
 
+    def watch(self, cluster_id, role=None, fast_interval=None,
+              slow_interval=None):
+        pass
+
 
 class FakeCertificatesModelManager(FakeBaseModelManager):
     def get(self, cluster_uuid):
@@ -94,6 +122,7 @@ class MagnumFakeContainerInfra(object):
         self.stats = FakeStatsModelManager()
         self.quotas = FakeQuotasModelManager()
         self.nodegroups = FakeNodeGroupManager()
+        self.http_client = mock.Mock()
 
 
 class MagnumFakeClientManager(osc_fakes.FakeClientManager):
@@ -262,8 +262,8 @@ class TestClusterTemplateList(TestClusterTemplate):
     def setUp(self):
         super(TestClusterTemplateList, self).setUp()
 
-        self.cluster_templates_mock.list = mock.Mock()
-        self.cluster_templates_mock.list.return_value = [
+        self.cluster_templates_mock.list_iter = mock.Mock()
+        self.cluster_templates_mock.list_iter.return_value = [
             self._cluster_template, self._cluster_template2
         ]
 
@@ -281,10 +281,11 @@ class TestClusterTemplateList(TestClusterTemplate):
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
 
         columns, data = self.cmd.take_action(parsed_args)
-        self.cluster_templates_mock.list.assert_called_with(
-            limit=None,
+        self.cluster_templates_mock.list_iter.assert_called_with(
+            limit=0,
             sort_dir=None,
             sort_key=None,
+            filters={},
         )
         self.assertEqual(self.columns, columns)
         index = 0
@@ -297,22 +298,25 @@ class TestClusterTemplateList(TestClusterTemplate):
             '--limit', '1',
             '--sort-key', 'key',
             '--sort-dir', 'asc',
-            '--fields', 'field1,field2'
+            '--fields', 'field1,field2',
+            '--filter', 'coe=kubernetes',
         ]
         verifylist = [
             ('limit', 1),
             ('sort_key', 'key'),
             ('sort_dir', 'asc'),
             ('fields', 'field1,field2'),
+            ('filters', ['coe=kubernetes']),
         ]
         verifycolumns = self.columns + ['field1', 'field2']
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
 
         columns, data = self.cmd.take_action(parsed_args)
-        self.cluster_templates_mock.list.assert_called_with(
+        self.cluster_templates_mock.list_iter.assert_called_with(
             limit=1,
             sort_dir='asc',
             sort_key='key',
+            filters={'coe': 'kubernetes'},
         )
         self.assertEqual(verifycolumns, columns)
 
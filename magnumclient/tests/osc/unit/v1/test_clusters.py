@@ -15,6 +15,7 @@
 
 import copy
 from io import StringIO
+import json
 import os
 import sys
 import tempfile
@@ -23,9 +24,15 @@ from unittest import mock
 from contextlib import contextmanager
 from unittest.mock import call
 
+import fixtures
+import yaml
+
+from magnumclient.common import keystore
+from magnumclient.common import utils as magnum_utils
 from magnumclient import exceptions
 from magnumclient.osc.v1 import clusters as osc_clusters
 from magnumclient.tests.osc.unit.v1 import fakes as magnum_fakes
+from magnumclient.v1 import watch
 
 
 class TestCluster(magnum_fakes.TestMagnumClientOSCV1):
@@ -96,8 +103,47 @@ class TestClusterCreate(TestCluster):
         verifylist = [
             ('name', self._cluster.name)
         ]
-        self.assertRaises(magnum_fakes.MagnumParseException,
-                          self.check_parser, self.cmd, arglist, verifylist)
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
+        self.clusters_mock.create.assert_not_called()
+
+    def test_cluster_create_missing_name(self):
+        arglist = [
+            '--cluster-template', self._cluster.cluster_template_id,
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
+        self.clusters_mock.create.assert_not_called()
+
+    def test_cluster_create_wait(self):
+        settled = magnum_fakes.FakeCluster.create_one_cluster(
+            {'status': 'CREATE_COMPLETE'})
+        self.clusters_mock.wait_for_completion = mock.Mock(
+            return_value=settled)
+        arglist = [
+            '--cluster-template', self._cluster.cluster_template_id,
+            '--wait',
+            self._cluster.name
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, [('wait', True)])
+        self.cmd.take_action(parsed_args)
+        self.clusters_mock.wait_for_completion.assert_called_once_with(
+            self._cluster.uuid)
+
+    def test_cluster_create_wait_failed(self):
+        self.clusters_mock.wait_for_completion = mock.Mock(
+            return_value=magnum_fakes.FakeCluster.create_one_cluster(
+                {'status': 'CREATE_FAILED'}))
+        arglist = [
+            '--cluster-template', self._cluster.cluster_template_id,
+            '--wait',
+            self._cluster.name
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, [('wait', True)])
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
 
     def test_cluster_create_with_labels(self):
         """Verifies labels are properly parsed when given as argument."""
@@ -142,6 +188,109 @@ class TestClusterCreate(TestCluster):
         self.clusters_mock.create.assert_called_with(**expected_args)
 
 
+class TestClusterCreateFromFile(TestCluster):
+
+    def setUp(self):
+        super(TestClusterCreateFromFile, self).setUp()
+
+        self._cluster = magnum_fakes.FakeCluster.create_one_cluster()
+        self.clusters_mock.create_many = mock.Mock()
+        self.cmd = osc_clusters.CreateCluster(self.app, None)
+
+    def _write_manifest(self, contents):
+        fd, path = tempfile.mkstemp(suffix='.yaml')
+        with os.fdopen(fd, 'w') as f:
+            f.write(contents)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_create_from_file(self):
+        path = self._write_manifest(
+            'defaults:\n'
+            '  cluster_template_id: ct\n'
+            '  node_count: 3\n'
+            'clusters:\n'
+            '- name: tenant-a\n'
+            '- name: tenant-b\n'
+            '  node_count: 5\n'
+            '  labels: [k1=v1, k2=v2]\n')
+        self.clusters_mock.create_many.return_value = iter([
+            magnum_utils.BulkResult({'name': 'tenant-a'}, self._cluster,
+                                    None),
+            magnum_utils.BulkResult({'name': 'tenant-b'}, self._cluster,
+                                    None),
+        ])
+        arglist = ['--from-file', path, '--parallel', '4']
+        verifylist = [('from_file', path), ('parallel', 4)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        with capture(self.cmd.take_action, parsed_args) as output:
+            self.assertIn('tenant-a', output)
+            self.assertIn(self._cluster.uuid, output)
+
+        self.clusters_mock.create_many.assert_called_once_with(
+            [{'cluster_template_id': 'ct', 'node_count': 3,
+              'name': 'tenant-a'},
+             {'cluster_template_id': 'ct', 'node_count': 5,
+              'name': 'tenant-b', 'labels': {'k1': 'v1', 'k2': 'v2'}}],
+            max_workers=4, wait=False)
+
+    def test_create_from_file_reports_failures(self):
+        path = self._write_manifest('- name: tenant-a\n'
+                                    '  cluster_template_id: ct\n')
+        self.clusters_mock.create_many.return_value = iter([
+            magnum_utils.BulkResult({'name': 'tenant-a'}, None,
+                                    exceptions.BadRequest()),
+        ])
+        parsed_args = self.check_parser(self.cmd, ['--from-file', path], [])
+
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
+
+    def test_create_from_file_with_name_fails(self):
+        path = self._write_manifest('- name: tenant-a\n'
+                                    '  cluster_template_id: ct\n')
+        parsed_args = self.check_parser(
+            self.cmd, ['--from-file', path, 'extra-name'], [])
+
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
+        self.clusters_mock.create_many.assert_not_called()
+
+    def test_create_from_file_with_cluster_options_fails(self):
+        path = self._write_manifest('- name: tenant-a\n'
+                                    '  cluster_template_id: ct\n')
+        for options in (['--node-count', '1'], ['--master-count', '3'],
+                        ['--labels', 'a=b'], ['--floating-ip-disabled']):
+            parsed_args = self.check_parser(
+                self.cmd, ['--from-file', path] + options, [])
+
+            self.assertRaisesRegex(exceptions.CommandError, options[0],
+                                   self.cmd.take_action, parsed_args)
+        self.clusters_mock.create_many.assert_not_called()
+
+    def test_create_from_file_bad_manifest(self):
+        path = self._write_manifest('clusters: foo\n')
+        parsed_args = self.check_parser(self.cmd, ['--from-file', path], [])
+
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
+
+    def test_create_from_file_incomplete_entry(self):
+        path = self._write_manifest(
+            'defaults:\n'
+            '  cluster_template_id: ct\n'
+            'clusters:\n'
+            '- name: tenant-a\n'
+            '- node_count: 3\n')
+        parsed_args = self.check_parser(self.cmd, ['--from-file', path], [])
+
+        self.assertRaisesRegex(exceptions.CommandError,
+                               'Cluster entry 1 .* has no name',
+                               self.cmd.take_action, parsed_args)
+        self.clusters_mock.create_many.assert_not_called()
+
+
 class TestClusterDelete(TestCluster):
 
     def setUp(self):
@@ -218,8 +367,8 @@ class TestClusterList(TestCluster):
     def setUp(self):
         super(TestClusterList, self).setUp()
 
-        self.clusters_mock.list = mock.Mock()
-        self.clusters_mock.list.return_value = [self._cluster]
+        self.clusters_mock.list_iter = mock.Mock()
+        self.clusters_mock.list_iter.return_value = [self._cluster]
 
         # Get the command object to test
         self.cmd = osc_clusters.ListCluster(self.app, None)
@@ -234,10 +383,11 @@ class TestClusterList(TestCluster):
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
 
         columns, data = self.cmd.take_action(parsed_args)
-        self.clusters_mock.list.assert_called_with(
-            limit=None,
+        self.clusters_mock.list_iter.assert_called_with(
+            limit=0,
             sort_dir=None,
             sort_key=None,
+            filters={},
         )
         self.assertEqual(self.columns, columns)
         self.assertEqual(self.datalist, tuple(data))
@@ -246,7 +396,10 @@ class TestClusterList(TestCluster):
         arglist = [
             '--limit', '1',
             '--sort-key', 'key',
-            '--sort-dir', 'asc'
+            '--sort-dir', 'asc',
+            '--filter', 'status=CREATE_FAILED',
+            '--filter', 'status=UPDATE_FAILED',
+            '--filter', 'node_count=3',
         ]
         verifylist = [
             ('limit', 1),
@@ -256,12 +409,20 @@ class TestClusterList(TestCluster):
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
 
         self.cmd.take_action(parsed_args)
-        self.clusters_mock.list.assert_called_with(
+        self.clusters_mock.list_iter.assert_called_with(
             limit=1,
             sort_dir='asc',
             sort_key='key',
+            filters={'status': ['CREATE_FAILED', 'UPDATE_FAILED'],
+                     'node_count': '3'},
         )
 
+    def test_cluster_list_bad_filter(self):
+        parsed_args = self.check_parser(self.cmd, ['--filter', 'status'],
+                                        [('filters', ['status'])])
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
+
     def test_cluster_list_bad_sort_dir_fail(self):
         arglist = [
             '--sort-dir', 'foo'
@@ -435,10 +596,11 @@ class TestClusterConfig(TestCluster):
 
     def test_cluster_config_no_cluster_fail(self):
         arglist = []
-        verifylist = []
+        verifylist = [('cluster', []), ('all_clusters', False)]
 
-        self.assertRaises(magnum_fakes.MagnumParseException,
-                          self.check_parser, self.cmd, arglist, verifylist)
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
 
     @mock.patch.dict(os.environ, {'SHELL': '/bin/bash'})
     def test_cluster_config_custom_dir_with_config_only_works_if_force(self):
@@ -447,7 +609,7 @@ class TestClusterConfig(TestCluster):
 
         arglist = ['fake-cluster', '--dir', tmp_dir]
         verifylist = [
-            ('cluster', 'fake-cluster'),
+            ('cluster', ['fake-cluster']),
             ('force', False),
             ('dir', tmp_dir),
         ]
@@ -459,7 +621,7 @@ class TestClusterConfig(TestCluster):
 
         arglist = ['fake-cluster', '--force', '--dir', tmp_dir]
         verifylist = [
-            ('cluster', 'fake-cluster'),
+            ('cluster', ['fake-cluster']),
             ('force', True),
             ('dir', tmp_dir),
         ]
@@ -481,7 +643,7 @@ export KUBECONFIG={}/config
 
         arglist = ['fake-cluster', '--dir', tmp_dir]
         verifylist = [
-            ('cluster', 'fake-cluster'),
+            ('cluster', ['fake-cluster']),
             ('dir', tmp_dir),
         ]
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
@@ -499,11 +661,12 @@ export KUBECONFIG={}/config
     @mock.patch.dict(os.environ, {'SHELL': '/bin/bash'})
     def test_cluster_config_creates_config_in_cwd_if_not_dir_specified(self):
         tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(os.chdir, os.getcwd())
         os.chdir(tmp_dir)
 
         arglist = ['fake-cluster']
         verifylist = [
-            ('cluster', 'fake-cluster'),
+            ('cluster', ['fake-cluster']),
         ]
 
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
@@ -517,6 +680,199 @@ export KUBECONFIG={}/config
 
         self.clusters_mock.get.assert_called_with('fake-cluster')
 
+    @mock.patch.dict(os.environ, {'SHELL': '/bin/bash'})
+    def test_cluster_config_key_type(self):
+        tmp_dir = tempfile.mkdtemp()
+        arglist = ['fake-cluster', '--dir', tmp_dir, '--key-type', 'ecdsa']
+        verifylist = [
+            ('cluster', ['fake-cluster']),
+            ('key_type', 'ecdsa'),
+            ('reuse_key', False),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        with mock.patch.object(magnum_utils, 'generate_csr_and_key',
+                               wraps=magnum_utils.generate_csr_and_key) as gen:
+            with capture(self.cmd.take_action, parsed_args):
+                pass
+        gen.assert_called_once_with('ecdsa', key=None)
+
+    @mock.patch.dict(os.environ, {'SHELL': '/bin/bash'})
+    def test_cluster_config_reuse_key(self):
+        tmp_dir = tempfile.mkdtemp()
+        key_dir = os.path.join(tmp_dir, 'keys')
+        arglist = ['fake-cluster', '--dir', tmp_dir, '--force',
+                   '--key-type', 'ed25519', '--reuse-key',
+                   '--key-store', key_dir]
+        verifylist = [
+            ('key_type', 'ed25519'),
+            ('reuse_key', True),
+            ('key_store', key_dir),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        keys = []
+        for _i in range(2):
+            with mock.patch.object(
+                    magnum_utils, 'generate_csr_and_key',
+                    wraps=magnum_utils.generate_csr_and_key) as gen:
+                with capture(self.cmd.take_action, parsed_args):
+                    pass
+            keys.append(gen.call_args[1]['key'])
+        self.assertIsNotNone(keys[0])
+        self.assertEqual(keys[0], keys[1])
+        self.assertEqual(['%s.ed25519.pem' % self._cluster.uuid],
+                         os.listdir(key_dir))
+
+
+class TestClusterConfigMany(TestCluster):
+
+    def setUp(self):
+        super(TestClusterConfigMany, self).setUp()
+        cert = magnum_fakes.FakeCert(pem='foo bar')
+        self.certificates_mock.create = mock.Mock(return_value=cert)
+        self.certificates_mock.get = mock.Mock(return_value=cert)
+        self.cluster_templates_mock = \
+            self.app.client_manager.container_infra.cluster_templates
+        self.cluster_templates_mock.get = mock.Mock(
+            return_value=magnum_fakes.FakeClusterTemplate
+            .create_one_cluster_template({'name': 'fake-ct'}))
+        self.cmd = osc_clusters.ConfigCluster(self.app, None)
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.clusters = dict(
+            (name, magnum_fakes.FakeCluster.create_one_cluster(
+                {'name': name, 'uuid': 'uuid-%s' % name,
+                 'api_address': 'https://%s:6443' % name}))
+            for name in ('c1', 'c2'))
+        self.clusters_mock.get = mock.Mock(
+            side_effect=lambda name: self.clusters[name])
+        self.generated = []
+        self.gen_keys = self.useFixture(fixtures.MockPatch(
+            'magnumclient.common.utils.generate_csrs_and_keys',
+            side_effect=self._generate_csrs_and_keys)).mock
+
+    def _generate_csrs_and_keys(self, count, key_type):
+        csrs = [magnum_utils.generate_csr_and_key(key_type)
+                for _i in range(count)]
+        self.generated.extend(csrs)
+        return csrs
+
+    def _signed_csrs(self):
+        return [c[1]['csr']
+                for c in self.certificates_mock.create.call_args_list]
+
+    def _run(self, arglist):
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        with mock.patch.dict(os.environ, {'SHELL': '/bin/bash'}):
+            with capture(self.cmd.take_action, parsed_args) as output:
+                return output
+
+    def test_config_many_per_cluster_dirs(self):
+        # ecdsa signatures are randomized, so CSRs made again would differ.
+        output = self._run(['c1', 'c2', '--dir', self.tmp_dir,
+                            '--key-type', 'ecdsa', '--output-certs'])
+
+        for name in ('c1', 'c2'):
+            cfg_file = os.path.join(self.tmp_dir, name, 'config')
+            self.assertTrue(os.path.exists(cfg_file))
+            self.assertIn('export KUBECONFIG=%s' % cfg_file, output)
+        # The shared cluster template is only fetched once.
+        self.cluster_templates_mock.get.assert_called_once_with('fake-ct')
+        self.assertEqual(2, self.certificates_mock.create.call_count)
+        self.gen_keys.assert_called_once_with(2, 'ecdsa')
+        # The CSRs generated with the keys are the ones signed.
+        self.assertEqual(sorted(c['csr'] for c in self.generated),
+                         sorted(self._signed_csrs()))
+        for name in ('c1', 'c2'):
+            with open(os.path.join(self.tmp_dir, name, 'key.pem')) as f:
+                self.assertIn(f.read(), [c['key'] for c in self.generated])
+
+    def test_config_many_key_store(self):
+        key_dir = os.path.join(self.tmp_dir, 'keys')
+        store = keystore.KeyStore(key_dir)
+        c1_key = store.get_key('uuid-c1', 'ed25519')
+
+        # --key-store implies --reuse-key.
+        self._run(['c1', 'c2', '--dir', self.tmp_dir, '--key-type',
+                   'ed25519', '--key-store', key_dir])
+
+        # Only the missing key is generated, in the process pool, and
+        # stored.
+        self.gen_keys.assert_called_once_with(1, 'ed25519')
+        self.assertEqual(self.generated[0]['key'],
+                         store.find_key('uuid-c2', 'ed25519'))
+        self.assertEqual(c1_key, store.find_key('uuid-c1', 'ed25519'))
+        signed = self._signed_csrs()
+        self.assertIn(self.generated[0]['csr'], signed)
+        c1_csr = [csr for csr in signed
+                  if csr != self.generated[0]['csr']][0]
+        self.assertEqual(
+            magnum_utils.generate_csr_and_key('ed25519', key=c1_key)['csr'],
+            c1_csr)
+
+    def test_config_many_merge(self):
+        output = self._run(['c1', 'c2', '--dir', self.tmp_dir, '--merge',
+                            '--key-type', 'ed25519'])
+
+        cfg_file = os.path.join(self.tmp_dir, 'config')
+        self.assertEqual('export KUBECONFIG=%s\n' % cfg_file, output)
+        with open(cfg_file) as f:
+            cfg = yaml.safe_load(f)
+        self.assertEqual(['c1', 'c2'], [c['name'] for c in cfg['contexts']])
+        self.assertEqual(['https://c1:6443', 'https://c2:6443'],
+                         [c['cluster']['server'] for c in cfg['clusters']])
+        self.assertEqual({'cluster': 'c2', 'user': 'c2'},
+                         cfg['contexts'][1]['context'])
+        self.assertIn('client-key-data', cfg['users'][0]['user'])
+        self.assertEqual('c1', cfg['current-context'])
+
+    def test_config_merge_keeps_other_contexts(self):
+        cfg_file = os.path.join(self.tmp_dir, 'config')
+        with open(cfg_file, 'w') as f:
+            f.write('contexts:\n- name: other\n  context: {cluster: o, '
+                    'user: o}\ncurrent-context: other\n')
+
+        self._run(['c1', '--dir', self.tmp_dir, '--merge',
+                   '--use-keystone'])
+        self._run(['c1', '--dir', self.tmp_dir, '--merge',
+                   '--use-keystone'])
+
+        with open(cfg_file) as f:
+            cfg = yaml.safe_load(f)
+        self.assertEqual(['other', 'c1'],
+                         [c['name'] for c in cfg['contexts']])
+        self.assertEqual('other', cfg['current-context'])
+
+    def test_config_all(self):
+        self.clusters_mock.list = mock.Mock(
+            return_value=list(self.clusters.values()))
+        self._run(['--all', '--dir', self.tmp_dir, '--use-keystone'])
+
+        self.clusters_mock.list.assert_called_once_with(limit=0, detail=True)
+        self.clusters_mock.get.assert_not_called()
+        self.certificates_mock.create.assert_not_called()
+        self.gen_keys.assert_not_called()
+        self.assertEqual(['c1', 'c2'], sorted(os.listdir(self.tmp_dir)))
+
+    def test_config_all_with_cluster_fail(self):
+        parsed_args = self.check_parser(self.cmd, ['c1', '--all'], [])
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
+
+    def test_config_many_partial_failure(self):
+        arglist = ['c1', 'missing', '--dir', self.tmp_dir,
+                   '--key-type', 'ed25519']
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        with mock.patch.dict(os.environ, {'SHELL': '/bin/bash'}):
+            with capture(self.assertRaises, exceptions.CommandError,
+                         self.cmd.take_action, parsed_args) as output:
+                pass
+        self.assertIn('c1', output)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir, 'c1',
+                                                    'config')))
+
 
 class TestClusterResize(TestCluster):
 
@@ -594,3 +950,57 @@ class TestClusterUpgrade(TestCluster):
         self.clusters_mock.upgrade.assert_called_with(
             "UUID1", cluster_template_id, 1, None
         )
+
+
+class TestClusterWatch(TestCluster):
+
+    def setUp(self):
+        super(TestClusterWatch, self).setUp()
+        self.listings = [
+            [mock.Mock(uuid='UUID1', status='CREATE_COMPLETE',
+                       health_status='HEALTHY', node_count=1)],
+            [mock.Mock(uuid='UUID1', status='UPDATE_IN_PROGRESS',
+                       health_status='HEALTHY', node_count=1)],
+        ]
+        for listing in self.listings:
+            listing[0].name = 'fake-cluster'
+        self.clusters_mock.watch = mock.Mock(
+            return_value=watch.StateWatch(lambda: self.listings.pop(0)))
+        self.cmd = osc_clusters.WatchCluster(self.app, None)
+
+    @mock.patch('time.sleep')
+    def test_cluster_watch_ndjson(self, mock_sleep):
+        arglist = ['--format', 'ndjson', '--count', '2', '--interval', '1']
+        verifylist = [
+            ('watch_format', 'ndjson'),
+            ('count', 2),
+            ('interval', 1.0),
+            ('max_interval', 30.0),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        with mock.patch('sys.stdout', new=StringIO()) as stdout:
+            self.cmd.take_action(parsed_args)
+
+        self.clusters_mock.watch.assert_called_once_with(
+            fast_interval=1.0, slow_interval=30.0)
+        records = [json.loads(line)
+                   for line in stdout.getvalue().splitlines()]
+        self.assertEqual(['added', 'changed'],
+                         [r['action'] for r in records])
+        self.assertEqual({'status': ['CREATE_COMPLETE',
+                                     'UPDATE_IN_PROGRESS']},
+                         records[1]['changes'])
+        mock_sleep.assert_called_once_with(4)
+
+    @mock.patch('time.sleep')
+    def test_cluster_watch_table_on_terminal(self, mock_sleep):
+        parsed_args = self.check_parser(self.cmd, ['--count', '2'],
+                                        [('watch_format', None)])
+
+        with mock.patch('sys.stdout', new=StringIO()) as stdout:
+            stdout.isatty = lambda: True
+            self.cmd.take_action(parsed_args)
+
+        self.assertIn('\x1b[1F\x1b[2Kfake-cluster  UPDATE_IN_PROGRESS',
+                      stdout.getvalue())
@@ -0,0 +1,99 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import io
+from unittest import mock
+
+import fixtures
+
+from magnumclient.osc.v1 import fleet as osc_fleet
+from magnumclient.tests.osc.unit.v1 import fakes as magnum_fakes
+from magnumclient.v1 import fleet_upgrade
+
+PROGRESS = {'total': 3, 'upgraded': 1, 'failed': 0, 'remaining': 2,
+            'elapsed': 600.0, 'clusters_per_hour': 6.0, 'eta': 1200.0}
+ENTRY = {'name': 'cluster-1', 'state': 'upgraded', 'status': 'UPDATE_COMPLETE',
+         'health_status': 'HEALTHY', 'error': None}
+
+
+def _event(kind, wave=None, entry=None):
+    return fleet_upgrade.FleetEvent(kind, wave, 'UUID1', entry, PROGRESS)
+
+
+class TestFleetUpgrade(magnum_fakes.TestMagnumClientOSCV1):
+
+    def setUp(self):
+        super(TestFleetUpgrade, self).setUp()
+        self.upgrade_cls = self.useFixture(fixtures.MockPatch(
+            'magnumclient.v1.fleet_upgrade.FleetUpgrade')).mock
+        self.upgrade = self.upgrade_cls.return_value
+        self.upgrade.plan.return_value = {'waves': [['UUID1'], ['UUID2']]}
+        self.cmd = osc_fleet.UpgradeFleet(self.app, None)
+
+    def _run(self, arglist, verifylist):
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        with mock.patch('sys.stdout', new=io.StringIO()) as stdout:
+            result = self.cmd.take_action(parsed_args)
+        return result, stdout.getvalue()
+
+    def test_upgrade(self):
+        self.upgrade.run.return_value = iter([
+            _event('started'), _event('wave_started', 1),
+            _event('upgraded', 1, ENTRY), _event('wave_passed', 1),
+            _event('finished')])
+        arglist = ['template', '--state-file', 'state.json',
+                   '--cluster', 'c1', '--cluster', 'c2',
+                   '--wave-size', '5', '--concurrency', '3',
+                   '--require-healthy', '--timeout', '3600']
+        verifylist = [
+            ('cluster_template', 'template'),
+            ('state_file', 'state.json'),
+            ('clusters', ['c1', 'c2']),
+            ('wave_size', 5),
+            ('concurrency', 3),
+            ('require_healthy', True),
+        ]
+
+        result, output = self._run(arglist, verifylist)
+
+        self.assertIsNone(result)
+        self.upgrade_cls.assert_called_once_with(
+            self.app.client_manager.container_infra, 'template',
+            'state.json', clusters=['c1', 'c2'], wave_size=5,
+            concurrency=3, max_batch_size=1, nodegroup=None,
+            max_failures=0, require_healthy=True, poll_interval=10,
+            timeout=3600.0, retry_failed=False)
+        self.assertEqual(
+            'Upgrading 3 clusters in 2 waves: 1/3 upgraded, 0 failed, '
+            '6.0 clusters/h, ETA 0:20:00\n'
+            'Wave 1/2 started\n'
+            'Cluster cluster-1 upgraded (UPDATE_COMPLETE, HEALTHY): 1/3 '
+            'upgraded, 0 failed, 6.0 clusters/h, ETA 0:20:00\n'
+            'Wave 1/2 passed its health gate\n'
+            'Finished: 1/3 upgraded, 0 failed, 6.0 clusters/h, '
+            'ETA 0:20:00\n', output)
+
+    def test_paused(self):
+        self.upgrade.run.return_value = iter([
+            _event('started'),
+            _event('paused', 1, {'reason': 'pause requested'})])
+
+        result, output = self._run(['template', '--state-file', 's.json'],
+                                   [('clusters', None)])
+
+        self.assertEqual(1, result)
+        self.assertIn('Paused: pause requested. Run the command again',
+                      output)
+
+    def test_state_file_required(self):
+        self.assertRaises(magnum_fakes.MagnumParseException,
+                          self.check_parser, self.cmd, ['template'], [])
@@ -0,0 +1,85 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import io
+import json
+import os
+from unittest import mock
+
+import fixtures
+
+from magnumclient import exceptions
+from magnumclient.osc.v1 import inventory as osc_inventory
+from magnumclient.tests.osc.unit.v1 import fakes as magnum_fakes
+
+RECORDS = [{'record_type': 'cluster', 'uuid': 'c1'},
+           {'record_type': 'nodegroup', 'uuid': 'ng1', 'cluster_id': 'c1'}]
+
+
+class TestInventoryExport(magnum_fakes.TestMagnumClientOSCV1):
+
+    def setUp(self):
+        super(TestInventoryExport, self).setUp()
+        self.collect = self.useFixture(fixtures.MockPatch(
+            'magnumclient.v1.inventory.collect',
+            return_value=iter(RECORDS))).mock
+        self.cmd = osc_inventory.ExportInventory(self.app, None)
+
+    def test_export_stdout(self):
+        arglist = ['--parallel', '3', '--all-projects']
+        verifylist = [
+            ('export_format', 'jsonl'),
+            ('output', None),
+            ('all_projects', True),
+            ('parallel', 3),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        with mock.patch('sys.stdout', new=io.StringIO()) as stdout:
+            self.cmd.take_action(parsed_args)
+        self.collect.assert_called_once_with(
+            self.app.client_manager.container_infra,
+            all_projects=True, max_workers=3)
+        self.assertEqual(RECORDS, [json.loads(line) for line
+                                   in stdout.getvalue().splitlines()])
+
+    def test_export_file(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'inventory.jsonl')
+        parsed_args = self.check_parser(self.cmd, ['--output', path],
+                                        [('output', path)])
+
+        with mock.patch('sys.stdout', new=io.StringIO()) as stdout:
+            self.cmd.take_action(parsed_args)
+        self.assertIn('Wrote 2 records', stdout.getvalue())
+        with open(path) as f:
+            self.assertEqual(RECORDS, [json.loads(line) for line in f])
+
+    def test_export_parquet_requires_output(self):
+        parsed_args = self.check_parser(self.cmd, ['--format', 'parquet'],
+                                        [('export_format', 'parquet')])
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
+        self.collect.assert_not_called()
+
+    @mock.patch('magnumclient.v1.inventory.write_parquet')
+    def test_export_parquet(self, mock_write):
+        mock_write.return_value = {'out/cluster.parquet': 1}
+        arglist = ['--format', 'parquet', '--output', 'out']
+        parsed_args = self.check_parser(self.cmd, arglist,
+                                        [('export_format', 'parquet'),
+                                         ('output', 'out')])
+
+        with mock.patch('sys.stdout', new=io.StringIO()) as stdout:
+            self.cmd.take_action(parsed_args)
+        mock_write.assert_called_once_with(self.collect.return_value, 'out')
+        self.assertIn('out/cluster.parquet', stdout.getvalue())
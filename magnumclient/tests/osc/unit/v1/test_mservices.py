@@ -22,7 +22,7 @@ class TestServiceList(fakes.TestMagnumClientOSCV1):
     def setUp(self):
         super(TestServiceList, self).setUp()
         self.mservices_mock = self.app.client_manager.container_infra.mservices
-        self.mservices_mock.list = mock.Mock()
+        self.mservices_mock.list_iter = mock.Mock()
         fake_service = mock.Mock(
             Binary='magnum-conductor',
             Host='Host1',
@@ -32,7 +32,7 @@ class TestServiceList(fakes.TestMagnumClientOSCV1):
             Disabled_Reason=None,
         )
         fake_service.name = 'test_service'
-        self.mservices_mock.list.return_value = [fake_service]
+        self.mservices_mock.list_iter.return_value = [fake_service]
 
         # Get the command object to test
         self.cmd = mservices.ListService(self.app, None)
@@ -41,5 +41,5 @@ class TestServiceList(fakes.TestMagnumClientOSCV1):
         arglist = []
         parsed_args = self.check_parser(self.cmd, arglist, [])
         columns, data = self.cmd.take_action(parsed_args)
-        self.mservices_mock.list.assert_called_with()
+        self.mservices_mock.list_iter.assert_called_with()
         self.assertEqual(self.columns, columns)
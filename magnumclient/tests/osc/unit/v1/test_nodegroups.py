@@ -14,12 +14,16 @@
 #    under the License.
 
 import copy
+import io
+import json
 from unittest import mock
 from unittest.mock import call
 
+from magnumclient.common import utils as magnum_utils
 from magnumclient import exceptions
 from magnumclient.osc.v1 import nodegroups as osc_nodegroups
 from magnumclient.tests.osc.unit.v1 import fakes as magnum_fakes
+from magnumclient.v1 import watch
 
 
 class TestNodeGroup(magnum_fakes.TestMagnumClientOSCV1):
@@ -393,8 +397,8 @@ class TestNodeGroupList(TestNodeGroup):
 
     def setUp(self):
         super(TestNodeGroupList, self).setUp()
-        self.ng_mock.list = mock.Mock()
-        self.ng_mock.list.return_value = [self.nodegroup]
+        self.ng_mock.list_iter = mock.Mock()
+        self.ng_mock.list_iter.return_value = [self.nodegroup]
 
         # Get the command object to test
         self.cmd = osc_nodegroups.ListNodeGroup(self.app, None)
@@ -402,13 +406,16 @@ class TestNodeGroupList(TestNodeGroup):
     def test_nodegroup_list_no_options(self):
         arglist = []
         verifylist = [
-            ('cluster', ''),
+            ('cluster', None),
+            ('all_clusters', False),
             ('limit', None),
             ('sort_key', None),
             ('sort_dir', None),
         ]
-        self.assertRaises(magnum_fakes.MagnumParseException,
-                          self.check_parser, self.cmd, arglist, verifylist)
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
+        self.ng_mock.list_iter.assert_not_called()
 
     def test_nodegroup_list_ok(self):
         arglist = ['fake-cluster']
@@ -421,12 +428,13 @@ class TestNodeGroupList(TestNodeGroup):
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
 
         columns, data = self.cmd.take_action(parsed_args)
-        self.ng_mock.list.assert_called_with(
+        self.ng_mock.list_iter.assert_called_with(
             'fake-cluster',
-            limit=None,
+            limit=0,
             sort_dir=None,
             sort_key=None,
             role=None,
+            filters={},
         )
         self.assertEqual(self.columns, columns)
         self.assertEqual(self.datalist, tuple(data))
@@ -436,7 +444,8 @@ class TestNodeGroupList(TestNodeGroup):
             'fake-cluster',
             '--limit', '1',
             '--sort-key', 'key',
-            '--sort-dir', 'asc'
+            '--sort-dir', 'asc',
+            '--filter', 'status=CREATE_FAILED',
         ]
         verifylist = [
             ('cluster', 'fake-cluster'),
@@ -447,10 +456,126 @@ class TestNodeGroupList(TestNodeGroup):
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
 
         self.cmd.take_action(parsed_args)
-        self.ng_mock.list.assert_called_with(
+        self.ng_mock.list_iter.assert_called_with(
             'fake-cluster',
             limit=1,
             sort_dir='asc',
             sort_key='key',
-            role=None
+            role=None,
+            filters={'status': 'CREATE_FAILED'},
         )
+
+    def test_nodegroup_list_all_clusters(self):
+        other = magnum_fakes.FakeNodeGroup.create_one_nodegroup(
+            {'cluster_id': 'other-cluster'})
+        self.ng_mock.list_all = mock.Mock()
+        self.ng_mock.list_all.return_value = iter([
+            magnum_utils.BulkResult('fake-cluster', [self.nodegroup], None),
+            magnum_utils.BulkResult('other-cluster', [other], None),
+        ])
+        arglist = ['--all-clusters', '--parallel', '4', '--role', 'worker']
+        verifylist = [
+            ('cluster', None),
+            ('all_clusters', True),
+            ('parallel', 4),
+            ('role', 'worker'),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+        self.ng_mock.list_all.assert_called_once_with(
+            max_workers=4,
+            limit=0,
+            role='worker',
+            filters={},
+        )
+        self.ng_mock.list_iter.assert_not_called()
+        self.assertEqual(['cluster_id'] + self.columns, columns)
+        data = tuple(data)
+        self.assertEqual(2, len(data))
+        self.assertEqual((self.nodegroup.cluster_id,) + self.datalist[0],
+                         data[0])
+        self.assertEqual('other-cluster', data[1][0])
+
+    def test_nodegroup_list_all_clusters_sort_and_limit(self):
+        nodegroups = [
+            magnum_fakes.FakeNodeGroup.create_one_nodegroup(
+                {'cluster_id': cluster, 'node_count': count})
+            for cluster, count in [('c1', 3), ('c1', 1), ('c2', 2)]]
+        self.ng_mock.list_all = mock.Mock()
+        self.ng_mock.list_all.return_value = iter([
+            magnum_utils.BulkResult('c1', nodegroups[:2], None),
+            magnum_utils.BulkResult('c2', nodegroups[2:], None),
+        ])
+        arglist = ['--all-clusters', '--sort-key', 'node_count',
+                   '--sort-dir', 'desc', '--limit', '2']
+        parsed_args = self.check_parser(self.cmd, arglist,
+                                        [('all_clusters', True)])
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        count = columns.index('node_count')
+        self.assertEqual([3, 2], [row[count] for row in data])
+
+    def test_nodegroup_list_all_clusters_partial_failure(self):
+        self.ng_mock.list_all = mock.Mock()
+        self.ng_mock.list_all.return_value = iter([
+            magnum_utils.BulkResult('gone', None,
+                                    exceptions.NotFound()),
+            magnum_utils.BulkResult('fake-cluster', [self.nodegroup], None),
+        ])
+        arglist = ['--all-clusters', '-f', 'value', '-c', 'name']
+        parsed_args = self.check_parser(self.cmd, arglist,
+                                        [('all_clusters', True)])
+
+        self.app.stdout = io.StringIO()
+        with mock.patch('sys.stderr', new=io.StringIO()) as stderr:
+            error = self.assertRaises(exceptions.CommandError,
+                                      self.cmd.run, parsed_args)
+        # The nodegroups of the other clusters are printed first.
+        self.assertEqual(self.nodegroup.name + '\n',
+                         self.app.stdout.getvalue())
+        self.assertIn('Failed to list nodegroups of cluster gone',
+                      stderr.getvalue())
+        self.assertEqual('1 of 2 clusters failed.', str(error))
+
+    def test_nodegroup_list_all_clusters_with_cluster(self):
+        arglist = ['fake-cluster', '--all-clusters']
+        parsed_args = self.check_parser(self.cmd, arglist,
+                                        [('cluster', 'fake-cluster'),
+                                         ('all_clusters', True)])
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
+
+
+class TestNodeGroupWatch(TestNodeGroup):
+
+    def setUp(self):
+        super(TestNodeGroupWatch, self).setUp()
+        nodegroup = mock.Mock(uuid='UUID1', status='CREATE_COMPLETE',
+                              node_count=2)
+        nodegroup.name = 'default-worker'
+        self.ng_mock.watch = mock.Mock(return_value=watch.StateWatch(
+            lambda: [nodegroup], fields=watch.NODEGROUP_FIELDS))
+        self.cmd = osc_nodegroups.WatchNodeGroup(self.app, None)
+
+    def test_nodegroup_watch(self):
+        arglist = ['fake-cluster', '--role', 'worker', '--format', 'ndjson',
+                   '--count', '1', '--max-interval', '60']
+        verifylist = [
+            ('cluster', 'fake-cluster'),
+            ('role', 'worker'),
+            ('max_interval', 60.0),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        with mock.patch('sys.stdout', new=io.StringIO()) as stdout:
+            self.cmd.take_action(parsed_args)
+
+        self.ng_mock.watch.assert_called_once_with(
+            'fake-cluster', role='worker', fast_interval=2.0,
+            slow_interval=60.0)
+        record = json.loads(stdout.getvalue())
+        self.assertEqual('default-worker', record['name'])
+        self.assertEqual(2, record['node_count'])
+        self.assertNotIn('health_status', record)
@@ -0,0 +1,119 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import io
+from unittest import mock
+
+import fixtures
+
+from magnumclient import exceptions
+from magnumclient.osc.v1 import query as osc_query
+from magnumclient.tests.osc.unit.v1 import fakes as magnum_fakes
+from magnumclient.v1 import mirror
+
+
+class TestQueryMirror(magnum_fakes.TestMagnumClientOSCV1):
+
+    def setUp(self):
+        super(TestQueryMirror, self).setUp()
+        self.mirror_cls = self.useFixture(fixtures.MockPatch(
+            'magnumclient.v1.mirror.Mirror')).mock
+        self.store = self.mirror_cls.return_value
+        self.store.freshness.return_value = {
+            'clusters': {'synced_at': 1.0, 'age': 30.0}}
+        self.store.refresh.return_value = {'errors': 0}
+        self.store.query.return_value = mirror.QueryResult(
+            ['status', 'count'], [('CREATE_FAILED', 2)],
+            {'clusters': {'synced_at': 1.0, 'age': 30.0}})
+        self.stderr = self.useFixture(fixtures.MockPatch(
+            'sys.stderr', new=io.StringIO())).mock
+        self.cmd = osc_query.QueryMirror(self.app, None)
+
+    def test_query(self):
+        arglist = ['clusters', '--mirror', 'm.sqlite',
+                   '--where', 'status=CREATE_FAILED',
+                   '--where', 'cluster_templates.public=true',
+                   '--where', 'health_status!=', '--group-by', 'status',
+                   '--join', 'cluster_templates', '--limit', '5']
+        verifylist = [
+            ('table', 'clusters'),
+            ('mirror', 'm.sqlite'),
+            ('group_by', ['status']),
+            ('join', 'cluster_templates'),
+            ('refresh', False),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        self.store.freshness.return_value['cluster_templates'] = {
+            'synced_at': 1.0, 'age': 30.0}
+
+        columns, rows = self.cmd.take_action(parsed_args)
+
+        self.mirror_cls.assert_called_once_with('m.sqlite')
+        self.store.refresh.assert_not_called()
+        self.store.query.assert_called_once_with(
+            'clusters',
+            where=[('status', '=', 'CREATE_FAILED'),
+                   ('cluster_templates.public', '=', True),
+                   ('health_status', '!=', None)],
+            columns=[], group_by=['status'], join='cluster_templates',
+            sort_key=None, sort_dir='asc', limit=5)
+        self.assertEqual(['status', 'count'], columns)
+        self.assertEqual([('CREATE_FAILED', 2)], rows)
+        self.assertEqual('Mirror of clusters refreshed 30s ago\n',
+                         self.stderr.getvalue())
+        self.store.close.assert_called_once_with()
+
+    def test_parse_where_booleans(self):
+        self.assertEqual(('master_lb_enabled', '=', True),
+                         osc_query._parse_where('master_lb_enabled=True'))
+        self.assertEqual(('clusters.floating_ip_enabled', '!=', False),
+                         osc_query._parse_where(
+                             'clusters.floating_ip_enabled!=false'))
+        # Indexed text columns keep the text.
+        self.assertEqual(('name', '=', 'true'),
+                         osc_query._parse_where('name=true'))
+
+    def test_query_refresh(self):
+        parsed_args = self.check_parser(
+            self.cmd, ['clusters', '--full-refresh', '--parallel', '3'],
+            [('full_refresh', True), ('parallel', 3)])
+
+        self.cmd.take_action(parsed_args)
+
+        self.store.refresh.assert_called_once_with(
+            self.app.client_manager.container_infra, full=True,
+            max_workers=3)
+
+    def test_query_refresh_when_stale(self):
+        parsed_args = self.check_parser(self.cmd,
+                                        ['clusters', '--max-age', '10'],
+                                        [('max_age', 10)])
+
+        self.cmd.take_action(parsed_args)
+
+        self.store.refresh.assert_called_once_with(
+            self.app.client_manager.container_infra, full=False,
+            max_workers=10)
+
+    def test_query_invalid(self):
+        parsed_args = self.check_parser(self.cmd,
+                                        ['clusters', '--where', 'status'],
+                                        [('where', ['status'])])
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
+
+        self.store.query.side_effect = exceptions.ValidationError('bad')
+        parsed_args = self.check_parser(self.cmd, ['clusters'], [])
+        with mock.patch('sys.stdout', new=io.StringIO()):
+            self.assertRaises(exceptions.CommandError,
+                              self.cmd.take_action, parsed_args)
+        self.store.close.assert_called_once_with()
@@ -11,10 +11,17 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import io
+import os
 from unittest import mock
 
+import fixtures
+
+from magnumclient.common import utils as magnum_utils
+from magnumclient import exceptions
 from magnumclient.osc.v1 import quotas as osc_quotas
 from magnumclient.tests.osc.unit.v1 import fakes as magnum_fakes
+from magnumclient.v1 import quotas
 
 
 class TestQuotas(magnum_fakes.TestMagnumClientOSCV1):
@@ -281,8 +288,8 @@ class TestQuotasList(TestQuotas):
         attr['resource'] = 'Cluster'
         self._quota = magnum_fakes.FakeQuota.create_one_quota(attr)
 
-        self.quotas_mock.list = mock.Mock()
-        self.quotas_mock.list.return_value = [self._quota]
+        self.quotas_mock.list_iter = mock.Mock()
+        self.quotas_mock.list_iter.return_value = [self._quota]
 
         self.cmd = osc_quotas.ListQuotas(self.app, None)
 
@@ -298,8 +305,8 @@ class TestQuotasList(TestQuotas):
         ]
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
         self.cmd.take_action(parsed_args)
-        self.quotas_mock.list.assert_called_with(
-            limit=None,
+        self.quotas_mock.list_iter.assert_called_with(
+            limit=0,
             sort_dir=None,
             sort_key=None,
             marker=None,
@@ -313,3 +320,75 @@ class TestQuotasList(TestQuotas):
         ]
         self.assertRaises(magnum_fakes.MagnumParseException,
                           self.check_parser, self.cmd, arglist, verifylist)
+
+
+class TestQuotasApply(TestQuotas):
+
+    def setUp(self):
+        super(TestQuotasApply, self).setUp()
+        self.quotas_mock.list = mock.Mock(return_value=[
+            magnum_fakes.FakeQuota.create_one_quota(
+                {'project_id': 'abc', 'resource': 'Cluster',
+                 'hard_limit': 5}),
+            magnum_fakes.FakeQuota.create_one_quota(
+                {'project_id': 'bcd', 'resource': 'Cluster',
+                 'hard_limit': 10}),
+        ])
+        self.quotas_mock.apply_changes = mock.Mock(
+            side_effect=lambda changes, max_workers: iter(
+                magnum_utils.BulkResult(c, None, None) for c in changes))
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'quotas.csv')
+        with open(self.path, 'w') as f:
+            f.write('project_id,resource,hard_limit\n'
+                    'abc,Cluster,5\n'
+                    'bcd,Cluster,20\n'
+                    'cde,Cluster,3\n')
+        self.cmd = osc_quotas.ApplyQuotas(self.app, None)
+
+    def _run(self, arglist, verifylist):
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        with mock.patch('sys.stdout', new=io.StringIO()) as stdout:
+            self.cmd.take_action(parsed_args)
+        return stdout.getvalue()
+
+    def test_quotas_apply(self):
+        output = self._run(['--file', self.path, '--parallel', '4'],
+                           [('file', self.path), ('parallel', 4),
+                            ('dry_run', False), ('prune', False)])
+
+        self.quotas_mock.list.assert_called_once_with(limit=0,
+                                                      all_tenants=True)
+        self.quotas_mock.apply_changes.assert_called_once_with(
+            [quotas.QuotaChange('update', 'bcd', 'Cluster', 10, 20),
+             quotas.QuotaChange('create', 'cde', 'Cluster', None, 3)],
+            max_workers=4)
+        self.assertEqual(
+            'Update quota of project bcd for Cluster: 10 -> 20\n'
+            'Create quota of project cde for Cluster: 3\n'
+            '1 created, 1 updated, 0 deleted, 1 unchanged\n', output)
+
+    def test_quotas_apply_dry_run(self):
+        output = self._run(['--file', self.path, '--dry-run'],
+                           [('dry_run', True)])
+
+        self.quotas_mock.apply_changes.assert_not_called()
+        self.assertIn('Dry run: 1 to create, 1 to update, 0 to delete, '
+                      '1 unchanged', output)
+
+    def test_quotas_apply_failure(self):
+        self.quotas_mock.apply_changes.side_effect = (
+            lambda changes, max_workers: iter(
+                [magnum_utils.BulkResult(changes[0], None,
+                                         Exception('Forbidden'))]))
+        parsed_args = self.check_parser(self.cmd, ['--file', self.path], [])
+
+        with mock.patch('sys.stdout', new=io.StringIO()) as stdout:
+            self.assertRaises(exceptions.CommandError,
+                              self.cmd.take_action, parsed_args)
+        self.assertIn('Failed: Update quota of project bcd for Cluster: '
+                      '10 -> 20: Forbidden', stdout.getvalue())
+
+    def test_quotas_apply_missing_file(self):
+        self.assertRaises(magnum_fakes.MagnumParseException,
+                          self.check_parser, self.cmd, [], [])
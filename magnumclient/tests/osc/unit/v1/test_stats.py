@@ -12,8 +12,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import io
+import json
 from unittest import mock
 
+from magnumclient.common import utils as magnum_utils
+from magnumclient import exceptions
 from magnumclient.osc.v1 import stats as osc_stats
 from magnumclient.tests.osc.unit.v1 import fakes as magnum_fakes
 
@@ -66,7 +70,53 @@ class TestStatsList(TestStats):
         self.clusters_mock.list.assert_called_once_with(project_id='abcd')
 
     def test_stats_list_missing_args(self):
-        arglist = []
-        verifylist = []
-        self.assertRaises(magnum_fakes.MagnumParseException,
-                          self.check_parser, self.cmd, arglist, verifylist)
+        parsed_args = self.check_parser(self.cmd, [], [])
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
+
+    def test_stats_list_project_and_all_projects(self):
+        parsed_args = self.check_parser(self.cmd, ['abc', '--all-projects'],
+                                        [('all_projects', True)])
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
+
+
+class TestStatsListAllProjects(TestStats):
+
+    def setUp(self):
+        super(TestStatsListAllProjects, self).setUp()
+        self.clusters_mock.list_many = mock.Mock(return_value=iter([
+            magnum_utils.BulkResult('p1', {'clusters': 1, 'nodes': 3}, None),
+            magnum_utils.BulkResult('p3', {'clusters': 2, 'nodes': 9}, None),
+        ]))
+        self.cmd = osc_stats.ListStats(self.app, None)
+
+    def _run(self, arglist, verifylist):
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        with mock.patch('sys.stdout', new=io.StringIO()) as stdout:
+            self.cmd.take_action(parsed_args)
+        return stdout.getvalue()
+
+    def test_table(self):
+        output = self._run(['--all-projects'],
+                           [('all_projects', True),
+                            ('top', 10), ('sort_key', 'nodes'),
+                            ('stats_format', 'table')])
+
+        self.clusters_mock.list_many.assert_called_once_with()
+        lines = output.splitlines()
+        self.assertIn('p3', lines[3])
+        self.assertIn('p1', lines[4])
+        self.assertIn('Total: 2 projects, 3 clusters, 12 nodes', output)
+
+    def test_json(self):
+        output = self._run(['--all-projects', '--format', 'json',
+                            '--top', '1', '--sort-key', 'clusters'],
+                           [('stats_format', 'json'), ('top', 1),
+                            ('sort_key', 'clusters')])
+
+        result = json.loads(output)
+        self.assertEqual({'clusters': 3, 'nodes': 12}, result['totals'])
+        self.assertEqual([{'project_id': 'p3', 'clusters': 2, 'nodes': 9}],
+                         result['top'])
+        self.assertEqual([], result['failures'])
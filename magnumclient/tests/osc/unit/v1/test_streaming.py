@@ -0,0 +1,65 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import argparse
+import io
+
+from cliff.formatters import json_format
+import testtools
+
+from magnumclient.osc.v1 import streaming
+
+
+class TestStreamingJSONFormatter(testtools.TestCase):
+
+    columns = ('uuid', 'name', 'node_count', 'labels')
+    rows = [
+        ('u1', 'first', 1, {'a': 'b'}),
+        ('u2', None, 3, {}),
+    ]
+
+    def _emit(self, formatter, rows, noindent):
+        stdout = io.StringIO()
+        args = argparse.Namespace(noindent=noindent)
+        formatter.emit_list(self.columns, iter(rows), stdout, args)
+        return stdout.getvalue()
+
+    def _assert_same_output(self, rows, noindent):
+        self.assertEqual(
+            self._emit(json_format.JSONFormatter(), rows, noindent),
+            self._emit(streaming.StreamingJSONFormatter(), rows, noindent))
+
+    def test_indent(self):
+        self._assert_same_output(self.rows, False)
+
+    def test_noindent(self):
+        self._assert_same_output(self.rows, True)
+
+    def test_empty(self):
+        self._assert_same_output([], False)
+        self._assert_same_output([], True)
+
+    def test_rows_written_as_produced(self):
+        stdout = io.StringIO()
+        written = []
+
+        def rows():
+            for row in self.rows:
+                yield row
+                written.append(stdout.getvalue())
+
+        streaming.StreamingJSONFormatter().emit_list(
+            self.columns, rows(), stdout,
+            argparse.Namespace(noindent=True))
+
+        self.assertIn('"u1"', written[0])
+        self.assertNotIn('"u2"', written[0])
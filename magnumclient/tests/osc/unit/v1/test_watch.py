@@ -0,0 +1,98 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import io
+import json
+
+import testtools
+
+from magnumclient.osc.v1 import watch as osc_watch
+from magnumclient.v1 import watch
+
+FIELDS = ('status', 'node_count')
+
+
+def _delta(action, uuid, status, node_count=1, changes=None):
+    return watch.Delta(action, uuid, 'name-' + uuid,
+                       {'status': status, 'node_count': node_count},
+                       changes or {})
+
+
+class TestWriteNDJSON(testtools.TestCase):
+
+    def test_write(self):
+        stream = io.StringIO()
+        osc_watch.write_ndjson(
+            [_delta(watch.ADDED, 'a', 'CREATE_COMPLETE'),
+             _delta(watch.CHANGED, 'b', 'UPDATE_IN_PROGRESS', 3,
+                    {'node_count': (1, 3)})], stream)
+
+        records = [json.loads(line) for line in stream.getvalue().split('\n')
+                   if line]
+        self.assertEqual(2, len(records))
+        self.assertNotIn('changes', records[0])
+        self.assertEqual({'node_count': [1, 3]}, records[1]['changes'])
+        self.assertEqual('changed', records[1]['action'])
+        self.assertEqual('UPDATE_IN_PROGRESS', records[1]['status'])
+        self.assertTrue(records[1]['time'].endswith('Z'))
+
+
+class TestTerminalView(testtools.TestCase):
+
+    def setUp(self):
+        super(TestTerminalView, self).setUp()
+        self.stream = io.StringIO()
+        self.view = osc_watch.TerminalView(self.stream, FIELDS, height=10)
+        self.view.update([_delta(watch.ADDED, 'b', 'CREATE_COMPLETE'),
+                          _delta(watch.ADDED, 'a', 'CREATE_COMPLETE')])
+
+    def _output(self):
+        output = self.stream.getvalue()
+        self.stream.seek(0)
+        self.stream.truncate()
+        return output
+
+    def test_table(self):
+        self.assertEqual(
+            '\x1b[2Kname    status                node_count\n'
+            '\x1b[2Kname-a  CREATE_COMPLETE       1         \n'
+            '\x1b[2Kname-b  CREATE_COMPLETE       1         \n',
+            self._output())
+
+    def test_changed_row_redrawn_in_place(self):
+        self._output()
+        self.view.update([_delta(watch.CHANGED, 'a', 'UPDATE_IN_PROGRESS')])
+
+        self.assertEqual(
+            '\x1b[2F\x1b[2Kname-a  UPDATE_IN_PROGRESS    1         \x1b[2E',
+            self._output())
+
+    def test_added_and_removed(self):
+        self._output()
+        self.view.update([_delta(watch.ADDED, 'c', 'CREATE_IN_PROGRESS'),
+                          _delta(watch.REMOVED, 'b', 'DELETE_IN_PROGRESS')])
+
+        self.assertEqual(
+            '\x1b[2Kname-c  CREATE_IN_PROGRESS    1         \n'
+            '\x1b[2F\x1b[2Kname-b  (removed)             1         \x1b[2E',
+            self._output())
+
+    def test_row_scrolled_away_written_again(self):
+        self.view.height = 2
+        self._output()
+        self.view.update([_delta(watch.CHANGED, 'a', 'UPDATE_IN_PROGRESS'),
+                          _delta(watch.CHANGED, 'a', 'UPDATE_COMPLETE')])
+
+        self.assertEqual(
+            '\x1b[2Kname-a  UPDATE_IN_PROGRESS    1         \n'
+            '\x1b[1F\x1b[2Kname-a  UPDATE_COMPLETE       1         \x1b[1E',
+            self._output())
@@ -0,0 +1,80 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import io
+import json
+import os
+
+import fixtures
+
+from magnumclient.tests.benchmarks import __main__ as bench_main
+from magnumclient.tests.benchmarks import harness
+from magnumclient.tests.benchmarks import stub
+from magnumclient.tests.benchmarks import suite  # noqa: F401
+from magnumclient.tests import utils
+from magnumclient.v1 import clusters
+
+
+class BenchmarksTest(utils.BaseTestCase):
+
+    def test_quick_run(self):
+        # Everything but the subprocess based command-line benchmarks.
+        results = harness.run_all('^(?!cli_)', quick=True,
+                                  stream=io.StringIO())
+        names = [r['name'] for r in results['benchmarks']]
+        self.assertIn('list_pagination_100k', names)
+        self.assertIn('sessionclient_json_request_1k', names)
+        self.assertNotIn('cli_import_time', names)
+        self.assertTrue(results['metadata']['quick'])
+        for result in results['benchmarks']:
+            self.assertEqual(1, len(result['samples']))
+            self.assertGreater(result['median'], 0)
+        json.dumps(results)
+
+    def test_pagination_returns_every_item(self):
+        api = stub.PaginatingAPI(2500)
+        self.assertEqual(3, len(api.pages))
+        self.assertEqual(
+            2500, len(clusters.ClusterManager(api).list(limit=0)))
+
+    def _results(self, **medians):
+        return {'metadata': {},
+                'benchmarks': [{'name': name, 'median': median}
+                               for name, median in medians.items()]}
+
+    def test_compare(self):
+        rows, regressions = harness.compare(
+            self._results(a=1.0, b=1.0, c=1.0),
+            self._results(a=1.05, b=1.5, d=2.0))
+        self.assertEqual([('a', 1.0, 1.05, 1.05), ('b', 1.0, 1.5, 1.5)],
+                         rows)
+        self.assertEqual(['b'], regressions)
+
+    def test_main_compare_fails_on_regression(self):
+        tmp = self.useFixture(fixtures.TempDir()).path
+        baseline = os.path.join(tmp, 'baseline.json')
+        output = os.path.join(tmp, 'bench.json')
+        with open(baseline, 'w') as f:
+            json.dump(self._results(print_dict=1e-9), f)
+        self.useFixture(fixtures.MonkeyPatch('sys.stdout', io.StringIO()))
+
+        self.assertEqual(1, bench_main.main(
+            ['--quick', '-k', '^print_dict$', '--output', output,
+             '--compare', baseline]))
+        with open(output) as f:
+            results = json.load(f)
+        self.assertEqual(['print_dict'],
+                         [r['name'] for r in results['benchmarks']])
+
+        self.assertEqual(0, bench_main.main(
+            ['--quick', '-k', '^print_dict$', '--compare', output,
+             '--threshold', '1000']))
@@ -0,0 +1,105 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import os
+from unittest import mock
+
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives import serialization
+from cryptography import x509
+from cryptography.x509.oid import NameOID
+import fixtures
+
+from magnumclient.common import cacache
+from magnumclient.tests import utils as test_utils
+
+UUID = '5d12f6fd-a196-4bf0-ae4c-1f639a523a53'
+
+
+def _make_ca(days=30):
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, u"ca")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = x509.CertificateBuilder().subject_name(name).issuer_name(
+        name).public_key(key.public_key()).serial_number(1).not_valid_before(
+        now - datetime.timedelta(days=1)).not_valid_after(
+        now + datetime.timedelta(days=days)).sign(key, hashes.SHA256())
+    return cert, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+class CACacheTest(test_utils.BaseTestCase):
+
+    def setUp(self):
+        super(CACacheTest, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'ca')
+        self.cache = cacache.CACache(self.path)
+
+    def test_put_and_get(self):
+        cert, pem = _make_ca()
+        self.assertIsNone(self.cache.get(UUID))
+
+        entry = self.cache.put(UUID, pem)
+
+        self.assertEqual(entry, self.cache.get(UUID))
+        self.assertEqual(pem, entry['pem'])
+        self.assertEqual(cert.fingerprint(hashes.SHA256()).hex(),
+                         entry['fingerprint'])
+        self.assertEqual(cert.not_valid_after_utc.isoformat(),
+                         entry['not_after'])
+
+    def test_shared_on_disk(self):
+        _cert, pem = _make_ca()
+        self.cache.put(UUID, pem)
+        self.assertEqual(['%s.json' % UUID], os.listdir(self.path))
+        self.assertEqual(pem, cacache.CACache(self.path).get(UUID)['pem'])
+
+    def test_expired_certificate(self):
+        _cert, pem = _make_ca(days=-1)
+        self.cache.put(UUID, pem)
+        self.assertIsNone(self.cache.get(UUID))
+
+    def test_max_age(self):
+        _cert, pem = _make_ca()
+        with mock.patch('time.time', return_value=1000):
+            self.cache.put(UUID, pem)
+        with mock.patch('time.time', return_value=1000 + 3599):
+            self.assertIsNotNone(self.cache.get(UUID))
+        with mock.patch('time.time', return_value=1000 + 3600):
+            self.assertIsNone(self.cache.get(UUID))
+
+    def test_invalidate(self):
+        _cert, pem = _make_ca()
+        self.cache.put(UUID, pem)
+        self.cache.invalidate(UUID)
+        self.cache.invalidate(UUID)
+        self.assertIsNone(self.cache.get(UUID))
+        self.assertIsNone(cacache.CACache(self.path).get(UUID))
+
+    def test_unparsable_pem(self):
+        entry = self.cache.put(UUID, 'fake-pem')
+        self.assertIsNone(entry['not_after'])
+        self.assertEqual('fake-pem', self.cache.get(UUID)['pem'])
+
+    def test_memory_only(self):
+        cache = cacache.CACache()
+        _cert, pem = _make_ca()
+        cache.put(UUID, pem)
+        self.assertEqual(pem, cache.get(UUID)['pem'])
+
+    def test_unwritable_directory(self):
+        open(self.path, 'w').close()
+        _cert, pem = _make_ca()
+        self.cache.put(UUID, pem)
+        self.assertEqual(pem, self.cache.get(UUID)['pem'])
@@ -0,0 +1,131 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import gzip
+import io
+import zlib
+
+from oslo_serialization import jsonutils
+
+from magnumclient.common import compression
+from magnumclient.common import httpclient
+from magnumclient import stub_server
+from magnumclient.tests import utils
+from magnumclient.v1 import client
+
+DATA = jsonutils.dump_as_bytes(
+    {'clusters': [{'name': 'cluster-%d' % i, 'status': 'CREATE_COMPLETE'}
+                  for i in range(500)]})
+
+
+def _decode(content_encoding, data, chunk_size=100):
+    decoder = compression.get_decoder(content_encoding)
+    chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+    return b''.join(decoder.decompress(c) for c in chunks) + decoder.flush()
+
+
+class DecoderTest(utils.BaseTestCase):
+
+    def test_accept_encoding(self):
+        self.assertTrue(
+            compression.ACCEPT_ENCODING.startswith('gzip, deflate'))
+
+    def test_gzip(self):
+        self.assertEqual(DATA, _decode('gzip', gzip.compress(DATA)))
+
+    def test_gzip_members(self):
+        half = len(DATA) // 2
+        data = gzip.compress(DATA[:half]) + gzip.compress(DATA[half:])
+        self.assertEqual(DATA, _decode('gzip', data))
+
+    def test_deflate(self):
+        self.assertEqual(DATA, _decode('deflate', zlib.compress(DATA)))
+
+    def test_raw_deflate(self):
+        obj = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        data = obj.compress(DATA) + obj.flush()
+        self.assertEqual(DATA, _decode('deflate', data))
+
+    def test_several_codings(self):
+        data = gzip.compress(zlib.compress(DATA))
+        self.assertEqual(DATA, _decode('deflate, gzip', data))
+
+    def test_identity_and_unknown(self):
+        self.assertIsNone(compression.get_decoder(None))
+        self.assertIsNone(compression.get_decoder('identity'))
+        self.assertIsNone(compression.get_decoder('gzip, compress'))
+
+
+class ResponseBodyIteratorTest(utils.BaseTestCase):
+
+    def test_decompresses_and_counts(self):
+        data = gzip.compress(DATA)
+        resp = utils.FakeResponse({'content-encoding': 'gzip'},
+                                  io.BytesIO(data))
+        stats = httpclient.TransferStats()
+
+        body = b''.join(httpclient.ResponseBodyIterator(resp, stats))
+
+        self.assertEqual(DATA, body)
+        self.assertEqual(len(DATA), stats.bytes_received)
+        self.assertEqual(len(data), stats.bytes_received_wire)
+
+    def test_identity(self):
+        resp = utils.FakeResponse({}, io.BytesIO(DATA))
+        self.assertEqual(DATA,
+                         b''.join(httpclient.ResponseBodyIterator(resp)))
+
+
+class CompressionStubServerTest(utils.BaseTestCase):
+
+    def setUp(self):
+        super(CompressionStubServerTest, self).setUp()
+        self.server = stub_server.StubServer(clusters=50,
+                                             compress_min_size=1024)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def _check(self, magnum):
+        clusters = magnum.clusters.list(detail=True)
+        self.assertEqual(50, len(clusters))
+        stats = magnum.http_client.transfer_stats
+        self.assertLess(stats.bytes_received_wire * 5, stats.bytes_received)
+
+        template = magnum.cluster_templates.list()[0]
+        magnum.clusters.create(name='new', cluster_template_id=template.uuid,
+                               labels=dict(('label-%d' % i, 'value')
+                                           for i in range(100)))
+        self.assertIn('label-99', magnum.clusters.get('new').labels)
+        self.assertLess(stats.bytes_sent_wire * 5, stats.bytes_sent)
+
+    def test_httpclient(self):
+        self._check(client.Client(endpoint_override=self.server.endpoint,
+                                  auth_token=self.server.token,
+                                  compress_threshold=1024))
+
+    def test_sessionclient(self):
+        self._check(client.Client(auth_url=self.server.auth_url,
+                                  username='user', password='secret',
+                                  project_name='demo',
+                                  user_domain_name='Default',
+                                  project_domain_name='Default',
+                                  compress_threshold=1024))
+
+    def test_request_bodies_not_compressed_by_default(self):
+        magnum = client.Client(endpoint_override=self.server.endpoint,
+                               auth_token=self.server.token)
+        magnum.clusters.update('cluster-0', [{'op': 'replace',
+                                              'path': '/node_count',
+                                              'value': 4}])
+        stats = magnum.http_client.transfer_stats
+        self.assertEqual(stats.bytes_sent, stats.bytes_sent_wire)
+        self.assertGreater(stats.bytes_sent, 0)
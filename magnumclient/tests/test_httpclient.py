@@ -13,7 +13,6 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from http import client as http_client
 import io
 from unittest import mock
 
@@ -52,7 +51,7 @@ def _get_error_body(faultstring=None, debuginfo=None, err_type=NORMAL_ERROR):
     return raw_body
 
 
-HTTP_CLASS = http_client.HTTPConnection
+HTTP_CLASS = http.HTTPConnection
 HTTPS_CLASS = http.VerifiedHTTPSConnection
 DEFAULT_TIMEOUT = 600
 
@@ -94,6 +93,19 @@ class HttpClientTest(utils.BaseTestCase):
                                   'GET', '/v1/resources')
         self.assertEqual('Internal Server Error (HTTP 500)', str(error))
 
+    def test_server_exception_plain_text_error_message(self):
+        error_body = jsonutils.dumps({'error_message': 'not json text'})
+        fake_resp = utils.FakeResponse({'content-type': 'application/json'},
+                                       io.StringIO(error_body),
+                                       version=1,
+                                       status=500)
+        client = http.HTTPClient('http://localhost/')
+        client.get_connection = (
+            lambda *a, **kw: utils.FakeConnection(fake_resp))
+
+        self.assertRaises(exc.InternalServerError, client.json_request,
+                          'GET', '/v1/resources')
+
     def test_server_exception_msg_only(self):
         error_msg = 'test error msg'
         error_body = _get_error_body(error_msg, err_type=ERROR_DICT)
@@ -172,7 +184,8 @@ class HttpClientTest(utils.BaseTestCase):
         endpoint = 'http://magnum-host:6385/'
         expected = (HTTP_CLASS,
                     ('magnum-host', 6385, ''),
-                    {'timeout': DEFAULT_TIMEOUT})
+                    {'timeout': DEFAULT_TIMEOUT,
+                     'read_timeout': DEFAULT_TIMEOUT})
         params = http.HTTPClient.get_connection_params(endpoint)
         self.assertEqual(expected, params)
 
@@ -182,6 +195,7 @@ class HttpClientTest(utils.BaseTestCase):
                     ('magnum-host', 6385, ''),
                     {
                         'timeout': DEFAULT_TIMEOUT,
+                        'read_timeout': DEFAULT_TIMEOUT,
                         'ca_file': None,
                         'cert_file': None,
                         'key_file': None,
@@ -199,7 +213,8 @@ class HttpClientTest(utils.BaseTestCase):
             'insecure': True,
         }
 
-        expected_kwargs = {'timeout': DEFAULT_TIMEOUT}
+        expected_kwargs = {'timeout': DEFAULT_TIMEOUT,
+                           'read_timeout': DEFAULT_TIMEOUT}
         expected_kwargs.update(ssl_args)
         expected = (HTTPS_CLASS,
                     ('magnum-host', 6385, ''),
@@ -211,15 +226,65 @@ class HttpClientTest(utils.BaseTestCase):
         endpoint = 'http://magnum-host:6385'
         expected = (HTTP_CLASS,
                     ('magnum-host', 6385, ''),
-                    {'timeout': 300.0})
+                    {'timeout': 300.0, 'read_timeout': 300.0})
         params = http.HTTPClient.get_connection_params(endpoint, timeout=300)
         self.assertEqual(expected, params)
 
+    def test_get_connection_params_with_split_timeouts(self):
+        endpoint = 'http://magnum-host:6385'
+        expected = (HTTP_CLASS,
+                    ('magnum-host', 6385, ''),
+                    {'timeout': 5.0, 'read_timeout': 120.0})
+        params = http.HTTPClient.get_connection_params(
+            endpoint, timeout=300, connect_timeout=5, read_timeout=120)
+        self.assertEqual(expected, params)
+
+    def test_get_connection_capped_by_deadline(self):
+        client = http.HTTPClient('http://localhost/', connect_timeout=5,
+                                 read_timeout=120)
+        conn = client.get_connection(deadline=http.Deadline(10))
+        self.assertEqual(5, conn.timeout)
+        self.assertLessEqual(conn.read_timeout, 10)
+
+    def test_expired_deadline_raises(self):
+        client = http.HTTPClient('http://localhost/')
+        conn = mock.Mock()
+        client.get_connection = (lambda *a, **kw: conn)
+
+        self.assertRaises(exc.DeadlineExceeded, client.json_request,
+                          'GET', '/v1/resources', deadline=http.Deadline(0))
+        self.assertFalse(conn.request.called)
+
+    def test_timeout_after_deadline_raises_deadline_exceeded(self):
+        deadline = http.Deadline(0.01)
+        client = http.HTTPClient('http://localhost/')
+
+        def _timeout(*args, **kwargs):
+            while not deadline.expired():
+                pass
+            raise socket.timeout()
+
+        conn = utils.FakeConnection()
+        conn.request = _timeout
+        client.get_connection = (lambda *a, **kw: conn)
+
+        self.assertRaises(exc.DeadlineExceeded, client.json_request,
+                          'GET', '/v1/resources', deadline=deadline)
+
+    def test_timeout_without_deadline_raises_connection_refused(self):
+        client = http.HTTPClient('http://localhost/')
+        client.get_connection = (
+            lambda *a, **kw: utils.FakeConnection(exc=socket.timeout))
+
+        self.assertRaises(exc.ConnectionRefused, client.json_request,
+                          'GET', '/v1/resources')
+
     def test_get_connection_params_with_version(self):
         endpoint = 'http://magnum-host:6385/v1'
         expected = (HTTP_CLASS,
                     ('magnum-host', 6385, ''),
-                    {'timeout': DEFAULT_TIMEOUT})
+                    {'timeout': DEFAULT_TIMEOUT,
+                     'read_timeout': DEFAULT_TIMEOUT})
         params = http.HTTPClient.get_connection_params(endpoint)
         self.assertEqual(expected, params)
 
@@ -227,7 +292,8 @@ class HttpClientTest(utils.BaseTestCase):
         endpoint = 'http://magnum-host:6385/v1/'
         expected = (HTTP_CLASS,
                     ('magnum-host', 6385, ''),
-                    {'timeout': DEFAULT_TIMEOUT})
+                    {'timeout': DEFAULT_TIMEOUT,
+                     'read_timeout': DEFAULT_TIMEOUT})
         params = http.HTTPClient.get_connection_params(endpoint)
         self.assertEqual(expected, params)
 
@@ -235,7 +301,8 @@ class HttpClientTest(utils.BaseTestCase):
         endpoint = 'http://magnum-host:6385/magnum'
         expected = (HTTP_CLASS,
                     ('magnum-host', 6385, '/magnum'),
-                    {'timeout': DEFAULT_TIMEOUT})
+                    {'timeout': DEFAULT_TIMEOUT,
+                     'read_timeout': DEFAULT_TIMEOUT})
         params = http.HTTPClient.get_connection_params(endpoint)
         self.assertEqual(expected, params)
 
@@ -243,7 +310,8 @@ class HttpClientTest(utils.BaseTestCase):
         endpoint = 'http://magnum-host:6385/magnum/'
         expected = (HTTP_CLASS,
                     ('magnum-host', 6385, '/magnum'),
-                    {'timeout': DEFAULT_TIMEOUT})
+                    {'timeout': DEFAULT_TIMEOUT,
+                     'read_timeout': DEFAULT_TIMEOUT})
         params = http.HTTPClient.get_connection_params(endpoint)
         self.assertEqual(expected, params)
 
@@ -251,7 +319,8 @@ class HttpClientTest(utils.BaseTestCase):
         endpoint = 'http://magnum-host:6385/magnum/v1'
         expected = (HTTP_CLASS,
                     ('magnum-host', 6385, '/magnum'),
-                    {'timeout': DEFAULT_TIMEOUT})
+                    {'timeout': DEFAULT_TIMEOUT,
+                     'read_timeout': DEFAULT_TIMEOUT})
         params = http.HTTPClient.get_connection_params(endpoint)
         self.assertEqual(expected, params)
 
@@ -259,7 +328,8 @@ class HttpClientTest(utils.BaseTestCase):
         endpoint = 'http://magnum-host:6385/magnum/v1/'
         expected = (HTTP_CLASS,
                     ('magnum-host', 6385, '/magnum'),
-                    {'timeout': DEFAULT_TIMEOUT})
+                    {'timeout': DEFAULT_TIMEOUT,
+                     'read_timeout': DEFAULT_TIMEOUT})
         params = http.HTTPClient.get_connection_params(endpoint)
         self.assertEqual(expected, params)
 
@@ -350,6 +420,20 @@ class HttpClientTest(utils.BaseTestCase):
         self.assertEqual(resp, fake_resp)
         self.assertEqual(jsonutils.dumps(body), err)
 
+    def test_server_success_body_json_bytes(self):
+        body = {'name': 'cluster\u00e9', 'node_count': 3}
+        fake_resp = utils.FakeResponse(
+            {'content-type': 'application/json'},
+            io.BytesIO(jsonutils.dump_as_bytes(body)), version=1,
+            status=200)
+        client = http.HTTPClient('http://localhost/')
+        conn = utils.FakeConnection(fake_resp)
+        client.get_connection = (lambda *a, **kw: conn)
+
+        resp, resp_body = client.json_request('GET', '/v1/resources')
+
+        self.assertEqual(body, resp_body)
+
     def test_raw_request(self):
         fake_resp = utils.FakeResponse(
             {'content-type': 'application/octet-stream'},
@@ -403,6 +487,17 @@ class SessionClientTest(utils.BaseTestCase):
 
         self.assertEqual('Internal Server Error (HTTP 500)', str(error))
 
+    def test_server_exception_plain_text_error_message(self):
+        error_body = jsonutils.dumps({'error_message': 'not json text'})
+        fake_session = utils.FakeSession({'Content-Type': 'application/json'},
+                                         error_body,
+                                         500)
+
+        client = http.SessionClient(session=fake_session)
+
+        self.assertRaises(exc.InternalServerError, client.json_request,
+                          'GET', '/v1/resources')
+
     def test_bypass_url(self):
         fake_response = utils.FakeSessionResponse(
             {}, content="", status_code=201)
@@ -429,6 +524,56 @@ class SessionClientTest(utils.BaseTestCase):
                           client.json_request,
                           'GET', '/v1/resources')
 
+    def test_split_timeouts(self):
+        fake_response = utils.FakeSessionResponse(
+            {}, content="", status_code=200)
+        fake_session = mock.MagicMock()
+        fake_session.request.side_effect = [fake_response]
+        client = http.SessionClient(
+            session=fake_session, endpoint_override='http://magnum',
+            connect_timeout=5, read_timeout=120)
+
+        client.json_request('GET', '/v1/clusters')
+        self.assertEqual((5, 120),
+                         fake_session.request.call_args[1]['timeout'])
+
+    def test_no_timeout_override_by_default(self):
+        fake_response = utils.FakeSessionResponse(
+            {}, content="", status_code=200)
+        fake_session = mock.MagicMock()
+        fake_session.request.side_effect = [fake_response]
+        client = http.SessionClient(
+            session=fake_session, endpoint_override='http://magnum')
+
+        client.json_request('GET', '/v1/clusters')
+        self.assertNotIn('timeout', fake_session.request.call_args[1])
+
+    def test_deadline_caps_timeout(self):
+        fake_response = utils.FakeSessionResponse(
+            {}, content="", status_code=200)
+        fake_session = mock.MagicMock()
+        fake_session.timeout = 600
+        fake_session.request.side_effect = [fake_response]
+        client = http.SessionClient(
+            session=fake_session, endpoint_override='http://magnum')
+
+        client.json_request('GET', '/v1/clusters',
+                            deadline=http.Deadline(30))
+        connect_timeout, read_timeout = (
+            fake_session.request.call_args[1]['timeout'])
+        self.assertLessEqual(connect_timeout, 30)
+        self.assertLessEqual(read_timeout, 30)
+        self.assertNotIn('deadline', fake_session.request.call_args[1])
+
+    def test_expired_deadline_raises(self):
+        fake_session = mock.MagicMock()
+        client = http.SessionClient(
+            session=fake_session, endpoint_override='http://magnum')
+
+        self.assertRaises(exc.DeadlineExceeded, client.json_request,
+                          'GET', '/v1/clusters', deadline=http.Deadline(0))
+        self.assertFalse(fake_session.request.called)
+
     def test_construct_http_client_return_httpclient(self):
         client = http._construct_http_client('http://localhost/')
 
@@ -0,0 +1,76 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import json
+
+import fixtures
+
+from magnumclient.common import jsoncodec
+from magnumclient.tests import utils
+
+
+class JSONCodecTest(utils.BaseTestCase):
+
+    body = {'clusters': [{'uuid': 'u1', 'name': 'café',
+                          'node_count': 3, 'ratio': 0.5,
+                          'labels': {'a': 'b'}, 'keypair': None,
+                          'master_lb_enabled': True}]}
+
+    def test_backends_agree(self):
+        encoded = json.dumps(self.body)
+        for name in jsoncodec.available():
+            codec = jsoncodec.get_codec(name)
+            self.assertEqual(self.body, codec.loads(encoded.encode('utf-8')),
+                             name)
+            self.assertEqual(self.body, codec.loads(encoded), name)
+            self.assertEqual(self.body, json.loads(codec.dumps(self.body)),
+                             name)
+            self.assertIsInstance(codec.dumps(self.body), str)
+
+    def test_invalid_json_raises_value_error(self):
+        for name in jsoncodec.available():
+            codec = jsoncodec.get_codec(name)
+            self.assertRaises(ValueError, codec.loads, b'{"a": ')
+            self.assertRaises(ValueError, codec.loads, b'')
+
+    def test_dumps_converts_unknown_types(self):
+        when = datetime.datetime(2024, 1, 2, 3, 4, 5)
+        for name in jsoncodec.available():
+            codec = jsoncodec.get_codec(name)
+            self.assertIn('2024-01-02', codec.dumps({'when': when}), name)
+
+    def test_fastest_backend_is_the_default(self):
+        self.assertEqual(jsoncodec.available()[0],
+                         jsoncodec.get_codec().name)
+        self.assertEqual('json', jsoncodec.available()[-1])
+
+    def test_unknown_backend(self):
+        self.assertRaises(ValueError, jsoncodec.get_codec, 'yaml')
+
+    def test_set_codec(self):
+        self.addCleanup(setattr, jsoncodec, '_codec', jsoncodec._codec)
+
+        jsoncodec.set_codec('json')
+
+        self.assertEqual('json', jsoncodec._codec.name)
+        self.assertEqual([1], jsoncodec.loads(b'[1]'))
+
+    def test_environment_variable(self):
+        self.useFixture(fixtures.EnvironmentVariable(jsoncodec.ENV_VAR,
+                                                     'json'))
+        self.assertEqual('json', jsoncodec._default_codec().name)
+
+        self.useFixture(fixtures.EnvironmentVariable(jsoncodec.ENV_VAR,
+                                                     'unknown'))
+        self.assertEqual(jsoncodec.get_codec().name,
+                         jsoncodec._default_codec().name)
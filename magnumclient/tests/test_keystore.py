@@ -0,0 +1,89 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import stat
+
+import fixtures
+
+from magnumclient.common import keystore
+from magnumclient.common import utils
+from magnumclient import exceptions
+from magnumclient.tests import utils as test_utils
+
+
+class KeyStoreTest(test_utils.BaseTestCase):
+
+    def setUp(self):
+        super(KeyStoreTest, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'keys')
+        self.store = keystore.KeyStore(self.path)
+
+    def _mode(self, path):
+        return stat.S_IMODE(os.stat(path).st_mode)
+
+    def test_get_key_creates_secure_files(self):
+        key = self.store.get_key('cluster-uuid', 'ecdsa')
+        self.assertIn('PRIVATE KEY', key)
+        self.assertEqual(0o700, self._mode(self.path))
+        key_path = os.path.join(self.path, 'cluster-uuid.ecdsa.pem')
+        self.assertEqual(0o600, self._mode(key_path))
+        self.assertEqual(['cluster-uuid.ecdsa.pem'], os.listdir(self.path))
+
+    def test_get_key_reuses_key(self):
+        key = self.store.get_key('cluster-uuid', 'ed25519')
+        self.assertEqual(key, self.store.get_key('cluster-uuid', 'ed25519'))
+        self.assertNotEqual(key, self.store.get_key('other', 'ed25519'))
+
+    def test_find_and_add_key(self):
+        self.assertIsNone(self.store.find_key('cluster-uuid', 'ed25519'))
+        key = utils.generate_key('ed25519')
+        self.assertEqual(key, self.store.add_key('cluster-uuid', key,
+                                                 'ed25519'))
+        self.assertEqual(key, self.store.find_key('cluster-uuid', 'ed25519'))
+        self.assertEqual(key, self.store.get_key('cluster-uuid', 'ed25519'))
+        # The key stored first is kept.
+        self.assertEqual(key, self.store.add_key(
+            'cluster-uuid', utils.generate_key('ed25519'), 'ed25519'))
+        self.assertEqual(0o600, self._mode(
+            os.path.join(self.path, 'cluster-uuid.ed25519.pem')))
+
+    def test_delete_key(self):
+        key = self.store.get_key('cluster-uuid', 'ed25519')
+        self.store.delete_key('cluster-uuid', 'ed25519')
+        self.store.delete_key('cluster-uuid', 'ed25519')
+        self.assertNotEqual(key, self.store.get_key('cluster-uuid',
+                                                    'ed25519'))
+
+    def test_loose_directory_permissions(self):
+        os.makedirs(self.path)
+        os.chmod(self.path, 0o755)
+        self.assertRaises(exceptions.CommandError,
+                          self.store.get_key, 'cluster-uuid', 'ed25519')
+
+    def test_loose_key_permissions(self):
+        self.store.get_key('cluster-uuid', 'ed25519')
+        os.chmod(os.path.join(self.path, 'cluster-uuid.ed25519.pem'), 0o644)
+        self.assertRaises(exceptions.CommandError,
+                          self.store.get_key, 'cluster-uuid', 'ed25519')
+
+    def test_invalid_name(self):
+        for name in ('../escape', '.hidden', 'a/b', ''):
+            self.assertRaises(exceptions.InvalidAttribute,
+                              self.store.get_key, name, 'ed25519')
+
+    def test_default_path(self):
+        self.useFixture(fixtures.EnvironmentVariable('XDG_CONFIG_HOME',
+                                                     '/tmp/xdg'))
+        self.assertEqual('/tmp/xdg/magnumclient/keys',
+                         keystore.KeyStore().path)
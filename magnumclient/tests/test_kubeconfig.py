@@ -0,0 +1,202 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import stat
+import threading
+from unittest import mock
+
+import fixtures
+import yaml
+
+from magnumclient.common import kubeconfig
+from magnumclient.common import utils
+from magnumclient import exceptions
+from magnumclient.tests import utils as test_utils
+
+EXISTING = """\
+apiVersion: v1
+kind: Config
+clusters:
+- name: other
+  cluster:
+    server: https://other:6443
+    certificate-authority-data: b3RoZXI=
+users:
+- name: other
+  user:
+    token: secret
+contexts:
+- name: other
+  context:
+    cluster: other
+    user: other
+    namespace: kube-system
+current-context: other
+"""
+
+
+def _kubeconfig(name, server):
+    cfg = kubeconfig.KubeConfig()
+    cfg.set_cluster(name, server, ca_data='Y2E=')
+    cfg.set_user(name, {'token': name})
+    cfg.set_context(name, name, name)
+    return cfg
+
+
+class KubeConfigTest(test_utils.BaseTestCase):
+
+    def setUp(self):
+        super(KubeConfigTest, self).setUp()
+        self.dir = self.useFixture(fixtures.TempDir()).path
+        self.path = os.path.join(self.dir, 'config')
+
+    def test_empty(self):
+        cfg = kubeconfig.KubeConfig.load(self.path)
+        self.assertEqual({'apiVersion': 'v1', 'kind': 'Config',
+                          'preferences': {}, 'clusters': [], 'users': [],
+                          'contexts': [], 'current-context': ''},
+                         yaml.safe_load(cfg.to_yaml()))
+
+    def test_set_replaces_in_place(self):
+        cfg = kubeconfig.KubeConfig.from_yaml(EXISTING)
+        cfg.merge(_kubeconfig('c1', 'https://c1:6443'))
+        cfg.set_cluster('other', 'https://new:6443')
+
+        self.assertEqual(['other', 'c1'], cfg.names('clusters'))
+        self.assertEqual({'server': 'https://new:6443'},
+                         cfg.get('clusters', 'other'))
+        self.assertEqual({'cluster': 'other', 'user': 'other',
+                          'namespace': 'kube-system'},
+                         cfg.get('contexts', 'other'))
+        self.assertEqual('other', cfg.current_context)
+
+    def test_first_context_becomes_current(self):
+        cfg = _kubeconfig('c1', 'https://c1:6443')
+        cfg.set_context('c2', 'c1', 'c1')
+        self.assertEqual('c1', cfg.current_context)
+
+    def test_remove_context(self):
+        cfg = kubeconfig.KubeConfig.from_yaml(EXISTING)
+        cfg.merge(_kubeconfig('c1', 'https://c1:6443'))
+        cfg.set_context('shared', 'c1', 'other')
+
+        cfg.remove_context('other')
+        self.assertEqual(['c1'], cfg.names('clusters'))
+        self.assertEqual(['other', 'c1'], cfg.names('users'))
+        self.assertEqual('', cfg.current_context)
+        cfg.remove_context('missing')
+
+    def test_invalid(self):
+        self.assertRaises(exceptions.CommandError,
+                          kubeconfig.KubeConfig.from_yaml, '[1, 2]')
+        self.assertRaises(exceptions.CommandError,
+                          kubeconfig.KubeConfig.from_yaml, 'a: [')
+
+    def test_save_is_atomic_and_private(self):
+        _kubeconfig('c1', 'https://c1:6443').save(self.path)
+        self.assertEqual(['config'], os.listdir(self.dir))
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.path).st_mode))
+
+        with mock.patch('os.replace', side_effect=OSError):
+            self.assertRaises(OSError,
+                              _kubeconfig('c2', 'https://c2').save,
+                              self.path)
+        self.assertEqual(['config'], os.listdir(self.dir))
+        self.assertEqual(['c1'],
+                         kubeconfig.KubeConfig.load(self.path).names(
+                             'contexts'))
+
+    def test_update_file(self):
+        with open(self.path, 'w') as f:
+            f.write(EXISTING)
+
+        kubeconfig.update_file(self.path, _kubeconfig('c1', 'https://c1'))
+        merged = kubeconfig.update_file(self.path,
+                                        _kubeconfig('c1', 'https://c1b'))
+
+        self.assertEqual(merged.data,
+                         kubeconfig.KubeConfig.load(self.path).data)
+        self.assertEqual(['other', 'c1'], merged.names('contexts'))
+        self.assertEqual('https://c1b', merged.get('clusters', 'c1')['server'])
+        self.assertEqual(yaml.safe_load(EXISTING)['users'][0],
+                         merged.data['users'][0])
+        self.assertEqual('other', merged.current_context)
+        # The lock file is removed.
+        self.assertEqual(['config'], os.listdir(self.dir))
+
+    def test_update_file_concurrently(self):
+        threads = [threading.Thread(
+            target=kubeconfig.update_file,
+            args=(self.path, _kubeconfig('c%d' % i, 'https://c%d' % i)))
+            for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # No update is lost.
+        self.assertEqual(sorted('c%d' % i for i in range(20)),
+                         sorted(kubeconfig.KubeConfig.load(self.path).names(
+                             'contexts')))
+        self.assertEqual(['config'], os.listdir(self.dir))
+
+
+class KubeconfigForClusterTest(test_utils.BaseTestCase):
+
+    def setUp(self):
+        super(KubeconfigForClusterTest, self).setUp()
+        self.cluster = mock.Mock(api_address='https://c1:6443')
+        self.cluster.name = 'c1'
+        self.template = mock.Mock(tls_disabled=False, coe='kubernetes')
+        self.certs = {'ca': 'ca', 'cert': 'cert', 'key': 'key'}
+
+    def test_certificate(self):
+        cfg = utils.kubeconfig_for_cluster(self.cluster, self.template,
+                                           certs=self.certs)
+        self.assertEqual('default', cfg.current_context)
+        self.assertEqual({'cluster': 'c1', 'user': 'admin'},
+                         cfg.get('contexts', 'default'))
+        self.assertEqual({'server': 'https://c1:6443',
+                          'certificate-authority-data': 'Y2E='},
+                         cfg.get('clusters', 'c1'))
+        self.assertEqual({'client-certificate-data': 'Y2VydA==',
+                          'client-key-data': 'a2V5'},
+                         cfg.get('users', 'admin'))
+
+    def test_keystone_named(self):
+        cfg = utils.kubeconfig_for_cluster(self.cluster, self.template,
+                                           certs=self.certs,
+                                           use_keystone=True, name='prod')
+        self.assertEqual(['prod'], cfg.names('contexts'))
+        self.assertEqual(['-c', utils._OS_TOKEN_EXEC],
+                         cfg.get('users', 'prod')['exec']['args'])
+
+    def test_tls_disabled(self):
+        self.template.tls_disabled = True
+        cfg = utils.kubeconfig_for_cluster(self.cluster, self.template)
+        self.assertEqual({'server': 'https://c1:6443'},
+                         cfg.get('clusters', 'c1'))
+        self.assertEqual('c1', cfg.current_context)
+
+    def test_config_cluster_without_shell(self):
+        directory = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(fixtures.EnvironmentVariable('SHELL'))
+        self.assertEqual(
+            'export KUBECONFIG=%s/config\n' % directory,
+            utils.config_cluster(self.cluster, self.template, directory,
+                                 certs=self.certs))
+        with mock.patch.dict(os.environ, {'SHELL': '/bin/tcsh'}):
+            self.assertEqual(
+                'setenv KUBECONFIG %s/config\n' % directory,
+                utils.config_cluster(self.cluster, self.template, directory,
+                                     force=True, certs=self.certs))
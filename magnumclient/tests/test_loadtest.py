@@ -0,0 +1,109 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import io
+import json
+
+import fixtures
+
+from magnumclient import loadtest
+from magnumclient import stub_server
+from magnumclient.tests import utils
+from magnumclient.v1 import client
+
+
+class LoadTestTest(utils.BaseTestCase):
+
+    def setUp(self):
+        super(LoadTestTest, self).setUp()
+        self.server = stub_server.StubServer(clusters=5, seed=0).start()
+        self.addCleanup(self.server.stop)
+        self.client = client.Client(endpoint_override=self.server.endpoint,
+                                    auth_token=self.server.token,
+                                    single_flight=False)
+
+    def test_parse_mix(self):
+        self.assertEqual([('clusters.list', 2.0), ('clusters.get', 1.0)],
+                         loadtest.parse_mix('clusters.list=2, clusters.get'))
+        self.assertRaises(ValueError, loadtest.parse_mix, 'clusters.foo=1')
+        self.assertRaises(ValueError, loadtest.parse_mix, 'clusters.list=x')
+        self.assertRaises(ValueError, loadtest.parse_mix, 'clusters.list=0')
+
+    def test_percentile(self):
+        values = [float(i) for i in range(1, 101)]
+        self.assertEqual(50.5, loadtest.percentile(values, 50))
+        self.assertEqual(100.0, loadtest.percentile(values, 100))
+        self.assertEqual(3.0, loadtest.percentile([3.0], 99))
+        self.assertIsNone(loadtest.percentile([], 50))
+
+    def _run(self, mode, error_rate=0.0, **kwargs):
+        test = loadtest.LoadTest(
+            self.client, loadtest.parse_mix(
+                'clusters.list=1,clusters.get=1,nodegroups.list=1'),
+            concurrency=4, duration=0, requests=60, seed=1)
+        test.setup()
+        self.server.error_rate = error_rate
+        if mode == 'async':
+            return test.run_async(**kwargs)
+        return test.run_threads()
+
+    def test_threads(self):
+        summary = self._run('thread')
+
+        self.assertEqual(60, summary['total']['requests'])
+        self.assertEqual(0, summary['total']['errors'])
+        self.assertEqual(['clusters.get', 'clusters.list', 'nodegroups.list'],
+                         sorted(summary['operations']))
+        self.assertGreater(summary['total']['throughput'], 0)
+        self.assertLessEqual(summary['total']['p50'],
+                             summary['total']['p99'])
+        # Setup lists the clusters once, then every request hits the API.
+        self.assertEqual(61, sum(self.server.requests.values()))
+
+    def test_async_with_rate(self):
+        summary = self._run('async', rate=1000)
+
+        self.assertEqual(60, summary['total']['requests'])
+
+    def test_async_latency_excludes_waiting_for_a_slot(self):
+        test = loadtest.LoadTest(self.client, [('clusters.list', 1)],
+                                 concurrency=1, duration=0, requests=3)
+        starts = []
+        test._call = lambda name, rng, started=None: starts.append(started)
+
+        test.run_async()
+        # Each call times itself once it got a slot.
+        self.assertEqual([None] * 3, starts)
+
+        starts[:] = []
+        test.run_async(rate=1000)
+        self.assertNotIn(None, starts)
+
+    def test_errors_are_counted(self):
+        self.server.error_codes = (503,)
+        summary = self._run('thread', error_rate=1.0)
+
+        self.assertEqual(1.0, summary['total']['error_rate'])
+        self.assertEqual({'HTTP 503': 60}, summary['total']['error_types'])
+        self.assertIsNone(summary['total']['p50'])
+        self.assertIn('HTTP 503', loadtest.format_report(summary))
+
+    def test_main_with_stub(self):
+        stdout = self.useFixture(fixtures.MonkeyPatch('sys.stdout',
+                                                      io.StringIO())).new_value
+        self.assertEqual(0, loadtest.main(
+            ['--stub', '--stub-clusters', '3', '--mode', 'async', '-n',
+             '20', '-f', 'json', '--mix', 'clusters.get,stats.list',
+             '--transport', 'urllib3']))
+
+        summary = json.loads(stdout.getvalue())
+        self.assertEqual(20, summary['total']['requests'])
@@ -0,0 +1,106 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import io
+import json
+import os
+import subprocess
+import sys
+import tomllib
+
+from magnumclient.osc.v1 import clusters as osc_clusters
+from magnumclient import shell
+from magnumclient import stub_server
+from magnumclient.tests import utils
+
+PYPROJECT = os.path.join(os.path.dirname(__file__), '..', '..',
+                         'pyproject.toml')
+
+# Imports the modules a "magnum cluster show --help" run needs and reports
+# which command modules got loaded.
+_LOADED_COMMANDS = """
+import contextlib, io, json, sys
+from magnumclient import shell
+with contextlib.redirect_stdout(io.StringIO()):
+    shell.main(['cluster', 'show', '--help'])
+print(json.dumps(sorted(m for m in sys.modules
+                        if m.startswith('magnumclient.osc.v1.'))))
+"""
+
+
+class CommandManagerTest(utils.BaseTestCase):
+
+    def test_commands_match_entry_points(self):
+        if not os.path.exists(PYPROJECT):
+            self.skipTest('pyproject.toml is not available')
+        with open(PYPROJECT, 'rb') as f:
+            project = tomllib.load(f)['project']
+        entry_points = project['entry-points']['openstack.container_infra.v1']
+
+        expected = dict(
+            (name[len('coe_'):].replace('_', ' '),
+             value[len('magnumclient.osc.v1.'):])
+            for name, value in entry_points.items())
+        self.assertEqual(expected, shell.COMMANDS)
+
+    def test_find_command(self):
+        manager = shell.CommandManager()
+
+        cmd, name, args = manager.find_command(['cluster', 'list', '-f',
+                                                'json'])
+
+        self.assertIs(osc_clusters.ListCluster, cmd)
+        self.assertEqual('cluster list', name)
+        self.assertEqual(['-f', 'json'], args)
+
+    def test_only_the_command_module_is_imported(self):
+        output = subprocess.check_output(
+            [sys.executable, '-c', _LOADED_COMMANDS])
+
+        self.assertEqual(['magnumclient.osc.v1.clusters',
+                          'magnumclient.osc.v1.streaming',
+                          'magnumclient.osc.v1.watch'],
+                         json.loads(output))
+
+
+class MagnumShellTest(utils.BaseTestCase):
+
+    def setUp(self):
+        super(MagnumShellTest, self).setUp()
+        self.server = stub_server.StubServer(clusters=3).start()
+        self.addCleanup(self.server.stop)
+
+    def _run(self, *argv):
+        stdout = io.StringIO()
+        result = shell.MagnumShell(stdout=stdout).run(list(argv))
+        self.assertEqual(0, result)
+        return stdout.getvalue()
+
+    def test_password_auth(self):
+        output = self._run(
+            '--os-auth-url', self.server.auth_url,
+            '--os-username', 'user', '--os-password', 'secret',
+            '--os-project-name', 'demo',
+            '--os-user-domain-name', 'Default',
+            '--os-project-domain-name', 'Default',
+            'cluster', 'list', '-f', 'value', '-c', 'name')
+
+        self.assertEqual('cluster-0\ncluster-1\ncluster-2\n', output)
+
+    def test_token_and_endpoint(self):
+        output = self._run(
+            '--os-auth-type', 'admin_token',
+            '--os-endpoint', self.server.endpoint,
+            '--os-token', self.server.token,
+            'cluster', 'show', 'cluster-1', '-f', 'value', '-c', 'name')
+
+        self.assertEqual('cluster-1\n', output)
@@ -0,0 +1,140 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from concurrent import futures
+import threading
+import time
+
+from magnumclient.common import httpclient
+from magnumclient import exceptions
+from magnumclient import stub_server
+from magnumclient.tests import utils
+from magnumclient.v1 import client
+
+
+class SingleFlightTest(utils.BaseTestCase):
+
+    def setUp(self):
+        super(SingleFlightTest, self).setUp()
+        self.flight = httpclient.SingleFlight()
+        self.release = threading.Event()
+        self.executions = 0
+        self.pool = futures.ThreadPoolExecutor(max_workers=5)
+        self.addCleanup(self.pool.shutdown)
+        self.addCleanup(self.release.set)
+
+    def _func(self, result=None, error=None):
+        def func():
+            self.executions += 1
+            self.release.wait(10)
+            if error is not None:
+                raise error
+            return result
+        return func
+
+    def _submit(self, count, func, key='key', **kwargs):
+        calls = [self.pool.submit(self.flight.do, key, func, **kwargs)
+                 for _ in range(count)]
+        # Let the waiters join the call before it completes.
+        while self.flight.coalesced < count - 1:
+            time.sleep(0.001)
+        self.release.set()
+        return calls
+
+    def test_coalesces(self):
+        calls = self._submit(5, self._func({'name': 'a'}))
+
+        results = [c.result() for c in calls]
+        self.assertEqual([{'name': 'a'}] * 5, results)
+        self.assertEqual(5, len(set(id(r) for r in results)))
+        self.assertEqual(1, self.executions)
+        self.assertEqual({'calls': 1, 'coalesced': 4},
+                         self.flight.to_dict())
+
+    def test_error_raised_to_every_caller(self):
+        error = exceptions.NotFound()
+        calls = self._submit(3, self._func(error=error))
+
+        for call in calls:
+            self.assertIs(error, call.exception())
+        self.assertEqual(1, self.executions)
+
+    def test_keys_are_separate(self):
+        self.release.set()
+        self.flight.do('a', self._func(1))
+        self.flight.do('b', self._func(2))
+        self.flight.do('a', self._func(1))
+
+        self.assertEqual(3, self.executions)
+        self.assertEqual({'calls': 3, 'coalesced': 0}, self.flight.to_dict())
+
+    def test_waiter_deadline(self):
+        leader = self.pool.submit(self.flight.do, 'key', self._func(1))
+        while not self.executions:
+            time.sleep(0.001)
+
+        self.assertRaises(exceptions.DeadlineExceeded, self.flight.do,
+                          'key', self._func(2),
+                          deadline=httpclient.Deadline(0.01))
+        self.release.set()
+        self.assertEqual(1, leader.result())
+
+
+class SingleFlightStubServerTest(utils.BaseTestCase):
+
+    def setUp(self):
+        super(SingleFlightStubServerTest, self).setUp()
+        self.server = stub_server.StubServer(clusters=3, latency=0.2)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def _get_concurrently(self, magnum, count=8):
+        barrier = threading.Barrier(count)
+
+        def get():
+            barrier.wait()
+            return magnum.clusters.get('cluster-1')
+
+        with futures.ThreadPoolExecutor(max_workers=count) as pool:
+            return list(pool.map(lambda _: get(), range(count)))
+
+    def _check(self, magnum):
+        clusters = self._get_concurrently(magnum)
+
+        self.assertEqual(['cluster-1'] * 8, [c.name for c in clusters])
+        clusters[0].labels['changed'] = 'yes'
+        self.assertNotIn('changed', clusters[1].labels)
+        flight = magnum.http_client.single_flight
+        sent = self.server.requests[('GET', 'get_cluster', 200)]
+        self.assertEqual(8, sent + flight.coalesced)
+        self.assertLess(sent, 8)
+
+    def test_httpclient(self):
+        self._check(client.Client(endpoint_override=self.server.endpoint,
+                                  auth_token=self.server.token))
+
+    def test_sessionclient(self):
+        self._check(client.Client(auth_url=self.server.auth_url,
+                                  username='user', password='secret',
+                                  project_name='demo',
+                                  user_domain_name='Default',
+                                  project_domain_name='Default'))
+
+    def test_disabled(self):
+        magnum = client.Client(endpoint_override=self.server.endpoint,
+                               auth_token=self.server.token,
+                               single_flight=False)
+
+        self._get_concurrently(magnum)
+
+        self.assertIsNone(magnum.http_client.single_flight)
+        self.assertEqual(8, self.server.requests[('GET', 'get_cluster', 200)])
@@ -0,0 +1,165 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import time
+
+from magnumclient.common import utils as magnum_utils
+from magnumclient import exceptions
+from magnumclient import stub_server
+from magnumclient.tests import utils
+from magnumclient.v1 import client
+
+
+class StubServerTest(utils.BaseTestCase):
+
+    def _server(self, **kwargs):
+        server = stub_server.StubServer(**kwargs).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def _client(self, server, **kwargs):
+        return client.Client(endpoint_override=server.endpoint,
+                             auth_token=server.token, **kwargs)
+
+    def test_list_follows_next_links(self):
+        server = self._server(clusters=25, max_limit=10)
+        magnum = self._client(server)
+
+        clusters = magnum.clusters.list(limit=0)
+
+        self.assertEqual(['cluster-%d' % i for i in range(25)],
+                         [c.name for c in clusters])
+        # Two full pages, a partial one and no empty page.
+        self.assertEqual(
+            3, server.requests[('GET', 'list_clusters', 200)])
+
+    def test_list_sorted_with_limit(self):
+        server = self._server(clusters=5, max_limit=2)
+        magnum = self._client(server)
+
+        clusters = magnum.clusters.list(limit=3, sort_key='name',
+                                        sort_dir='desc')
+
+        self.assertEqual(['cluster-4', 'cluster-3', 'cluster-2'],
+                         [c.name for c in clusters])
+
+    def test_summary_and_detail(self):
+        server = self._server(clusters=1)
+        magnum = self._client(server)
+
+        summary = magnum.clusters.list()[0]
+        detail = magnum.clusters.list(detail=True)[0]
+
+        self.assertNotIn('api_address', summary.to_dict())
+        self.assertEqual(detail.api_address,
+                         magnum.clusters.get('cluster-0').api_address)
+
+    def test_cluster_life_cycle(self):
+        server = self._server(clusters=0, transition_time=0.05)
+        magnum = self._client(server)
+        template = magnum.cluster_templates.list()[0]
+
+        created = magnum.clusters.create(name='new',
+                                         cluster_template_id=template.name)
+        cluster = magnum.clusters.get(created.uuid)
+        self.assertEqual('CREATE_IN_PROGRESS', cluster.status)
+        self.assertEqual(['default-master', 'default-worker'],
+                         [ng.name for ng in magnum.nodegroups.list('new')])
+
+        time.sleep(0.1)
+        self.assertEqual('CREATE_COMPLETE',
+                         magnum.clusters.get('new').status)
+
+        magnum.clusters.resize(created.uuid, 4)
+        self.assertEqual('UPDATE_IN_PROGRESS',
+                         magnum.clusters.get('new').status)
+        time.sleep(0.1)
+        self.assertEqual(4, magnum.clusters.get('new').node_count)
+
+        magnum.clusters.delete('new')
+        time.sleep(0.1)
+        self.assertRaises(exceptions.NotFound, magnum.clusters.get, 'new')
+
+    def test_nodegroup_role_filter(self):
+        server = self._server(clusters=1, extra_nodegroups=2)
+        magnum = self._client(server)
+
+        self.assertEqual(3, len(magnum.nodegroups.list('cluster-0',
+                                                       role='worker')))
+
+    def _password_client(self, server, project_name='demo'):
+        return client.Client(auth_url=server.auth_url, username='user',
+                             password='secret', project_name=project_name,
+                             user_domain_name='Default',
+                             project_domain_name='Default')
+
+    def test_certificates(self):
+        server = self._server(clusters=1)
+        magnum = self._password_client(server)
+        csr = magnum_utils.generate_csr_and_key()['csr']
+
+        ca = magnum.certificates.get('cluster-0')
+        signed = magnum.certificates.create(cluster_uuid=ca.cluster_uuid,
+                                            csr=csr)
+
+        self.assertIn('BEGIN CERTIFICATE', ca.pem)
+        self.assertIn('BEGIN CERTIFICATE', signed.pem)
+        magnum.certificates.rotate_ca(cluster_uuid=ca.cluster_uuid)
+        self.assertNotEqual(ca.pem,
+                            magnum.certificates.get('cluster-0').pem)
+
+    def test_quotas_and_stats(self):
+        server = self._server(clusters=4, projects=2)
+        magnum = self._client(server)
+
+        self.assertEqual(2, len(magnum.quotas.list(all_tenants=True)))
+        magnum.quotas.update('project-0', 'Cluster',
+                             [{'op': 'replace', 'path': '/hard_limit',
+                               'value': 5}])
+        self.assertEqual(5, magnum.quotas.get('project-0',
+                                              'Cluster').hard_limit)
+
+        stats = magnum.stats.list(project_id='project-1')
+        self.assertEqual(2, stats.clusters)
+        self.assertEqual(4, stats.nodes)
+        self.assertEqual(1, len(magnum.mservices.list()))
+
+    def test_token_required(self):
+        server = self._server(clusters=1)
+        magnum = client.Client(endpoint_override=server.endpoint,
+                               auth_token='wrong')
+
+        self.assertRaises(exceptions.Unauthorized, magnum.clusters.list)
+
+    def test_keystone_password_auth(self):
+        server = self._server(clusters=3)
+        magnum = self._password_client(server)
+
+        self.assertEqual(3, len(magnum.clusters.list()))
+        self.assertIn('demo', server.tokens.values())
+
+    def test_error_injection(self):
+        server = self._server(clusters=1, error_rate=1.0,
+                              error_codes=(429,), retry_after=7)
+        magnum = self._client(server)
+
+        e = self.assertRaises(exceptions.HttpError, magnum.clusters.list)
+        self.assertEqual(429, e.http_status)
+        self.assertEqual(1, server.requests[('GET', 'list_clusters', 429)])
+
+    def test_item_size(self):
+        server = self._server(clusters=1, item_size=4096)
+        magnum = self._client(server)
+
+        cluster = magnum.clusters.get('cluster-0')
+
+        self.assertGreater(len(cluster.stub_padding), 2000)
@@ -0,0 +1,274 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import time
+
+from keystoneauth1 import exceptions as ksa_exceptions
+from keystoneauth1 import session as ksa_session
+from keystoneauth1 import token_endpoint
+
+from magnumclient.common import httpclient
+from magnumclient.common import transport
+from magnumclient.common import utils as magnum_utils
+from magnumclient import exceptions
+from magnumclient import stub_server
+from magnumclient.tests import utils
+from magnumclient.v1 import client
+
+
+class TransportTest(utils.BaseTestCase):
+
+    def _client(self, name, client_kwargs=None, **kwargs):
+        server = stub_server.StubServer(clusters=20, **kwargs).start()
+        self.addCleanup(server.stop)
+        mag_client = client.Client(endpoint_override=server.endpoint,
+                                   auth_token=server.token, transport=name,
+                                   single_flight=False,
+                                   ca_file=server.ca_file,
+                                   **(client_kwargs or {}))
+        self.addCleanup(mag_client.http_client.close)
+        return server, mag_client
+
+    def _session_client(self, name, **kwargs):
+        server = stub_server.StubServer(clusters=20, **kwargs).start()
+        self.addCleanup(server.stop)
+        session = ksa_session.Session(
+            auth=token_endpoint.Token(server.endpoint, server.token),
+            verify=server.ca_file or True)
+        self.addCleanup(session.session.close)
+        mag_client = client.Client(session=session,
+                                   endpoint_override=server.endpoint,
+                                   transport=name, single_flight=False)
+        self.addCleanup(mag_client.http_client.close)
+        return server, session, mag_client
+
+    def _require_http2(self):
+        if 'httpx' not in transport.available() or transport.h2 is None:
+            self.skipTest('httpx and h2 are not installed')
+
+    def _check_transport(self, name, tls=False):
+        server, mag_client = self._client(name, compress_min_size=1,
+                                          tls=tls)
+        self.assertEqual(name, mag_client.http_client.transport.name)
+
+        clusters = mag_client.clusters.list(limit=0, detail=True)
+        self.assertEqual(20, len(clusters))
+        stats = mag_client.http_client.transfer_stats.to_dict()
+        self.assertLess(stats['bytes_received_wire'],
+                        stats['bytes_received'])
+
+        cluster = mag_client.clusters.create(
+            name='new', cluster_template_id=clusters[0].cluster_template_id)
+        self.assertEqual('new', mag_client.clusters.get(cluster.uuid).name)
+        self.assertRaises(exceptions.NotFound, mag_client.clusters.get,
+                          'missing')
+
+    def test_httplib(self):
+        self._check_transport('httplib')
+
+    def test_requests(self):
+        self._check_transport('requests')
+
+    def test_urllib3(self):
+        self._check_transport('urllib3')
+
+    def test_httpx(self):
+        if 'httpx' not in transport.available():
+            self.skipTest('httpx is not installed')
+        self._check_transport('httpx')
+
+    def test_https(self):
+        for name in transport.available():
+            self._check_transport(name, tls=True)
+
+    def test_httpx_http2_multiplexes(self):
+        self._require_http2()
+        server, mag_client = self._client('httpx', tls=True,
+                                          extra_nodegroups=1, latency=0.01,
+                                          item_size=20000)
+        self.assertTrue(mag_client.http_client.transport.multiplexed)
+        uuids = [c.uuid for c in mag_client.clusters.list(limit=0)]
+        results = list(magnum_utils.run_concurrently(
+            mag_client.nodegroups.list, uuids * 2, max_workers=20,
+            http_client=mag_client.http_client))
+        self.assertEqual([3] * 40, [len(r.result) for r in results])
+        # Every request went over the one HTTP/2 connection.
+        self.assertEqual(1, server.connections)
+
+    def test_pooled_fan_out_reuses_connections(self):
+        for name in ('httplib', 'urllib3', 'requests'):
+            server, mag_client = self._client(name, extra_nodegroups=1)
+            uuids = [c.uuid for c in mag_client.clusters.list(limit=0)]
+            results = list(magnum_utils.run_concurrently(
+                mag_client.nodegroups.list, uuids * 2, max_workers=10))
+            self.assertEqual([3] * 40, [len(r.result) for r in results])
+            # httplib connects for every request, the pools at most once
+            # per worker.
+            if name == 'httplib':
+                self.assertEqual(41, server.connections)
+            else:
+                self.assertLessEqual(server.connections, 10, name)
+
+    def test_fan_out_grows_the_pool(self):
+        server, mag_client = self._client('urllib3', latency=0.01)
+        uuids = [c.uuid for c in mag_client.clusters.list(limit=0)]
+        for _round in range(3):
+            results = list(magnum_utils.run_concurrently(
+                mag_client.nodegroups.list, uuids, max_workers=20,
+                http_client=mag_client.http_client))
+            self.assertEqual(20, len([r for r in results
+                                      if r.error is None]))
+        self.assertEqual(20, mag_client.http_client.transport.pool_size)
+        # The connections of every round are kept for the next, beside
+        # the one of the listing.
+        self.assertLessEqual(server.connections, 21)
+
+    def test_session(self):
+        for name in ('requests', 'urllib3', 'httpx'):
+            if name not in transport.available():
+                continue
+            server, session, mag_client = self._session_client(
+                name, tls=True, compress_min_size=1)
+            clusters = mag_client.clusters.list(limit=0, detail=True)
+            self.assertEqual(20, len(clusters))
+            cluster = mag_client.clusters.create(
+                name='new',
+                cluster_template_id=clusters[0].cluster_template_id)
+            self.assertEqual('new',
+                             mag_client.clusters.get(cluster.uuid).name)
+            self.assertRaises(exceptions.NotFound, mag_client.clusters.get,
+                              'missing')
+            stats = mag_client.http_client.transfer_stats.to_dict()
+            self.assertLess(stats['bytes_received_wire'],
+                            stats['bytes_received'])
+            adapter = session.session.get_adapter(server.endpoint)
+            self.assertIsInstance(adapter, transport.HttpxAdapter
+                                  if name == 'httpx'
+                                  else transport.requests.adapters.HTTPAdapter)
+            # Only the requests to the endpoint go through it.
+            self.assertIsNot(adapter,
+                             session.session.get_adapter('https://other/'))
+
+    def test_session_httpx_http2(self):
+        self._require_http2()
+        server, session, mag_client = self._session_client('httpx', tls=True)
+        uuids = [c.uuid for c in mag_client.clusters.list(limit=0)]
+        results = list(magnum_utils.run_concurrently(
+            mag_client.nodegroups.list, uuids, max_workers=20,
+            http_client=mag_client.http_client))
+        self.assertEqual(20, len([r for r in results if r.error is None]))
+        self.assertEqual(1, server.connections)
+
+    def test_session_fan_out_grows_the_pool(self):
+        server, session, mag_client = self._session_client(None, latency=0.01)
+        uuids = [c.uuid for c in mag_client.clusters.list(limit=0)]
+        # The default pool of requests is kept below its size.
+        self.assertIsNone(mag_client.http_client._adapter)
+        magnum_utils.run_concurrently(mag_client.nodegroups.list, uuids,
+                                      max_workers=10,
+                                      http_client=mag_client.http_client)
+        self.assertIsNone(mag_client.http_client._adapter)
+        for _round in range(3):
+            results = list(magnum_utils.run_concurrently(
+                mag_client.nodegroups.list, uuids, max_workers=20,
+                http_client=mag_client.http_client))
+            self.assertEqual(20, len([r for r in results
+                                      if r.error is None]))
+        self.assertEqual(20, mag_client.http_client.pool_size)
+        # At most 10 for the listing and the first fan-out, then 20.
+        self.assertLessEqual(server.connections, 30)
+
+    def test_session_httpx_response(self):
+        if 'httpx' not in transport.available():
+            self.skipTest('httpx is not installed')
+        server, session, mag_client = self._session_client('httpx')
+        mag_client.clusters.list()
+        adapter = session.session.get_adapter(server.endpoint)
+        request = transport.requests.Request(
+            'GET', server.endpoint + '/clusters',
+            headers={'X-Auth-Token': server.token}).prepare()
+
+        resp = adapter.send(request, stream=True)
+        lines = list(resp.iter_lines(decode_unicode=True))
+        self.assertEqual(resp.content, b''.join(resp.iter_content(7)))
+        self.assertEqual(resp.text.splitlines(), lines)
+
+        # The proxy is used: none listens on the port of a stopped server.
+        proxy = stub_server.StubServer().start()
+        proxy.stop()
+        self.assertRaises(transport.requests.exceptions.ConnectionError,
+                          adapter.send, request,
+                          proxies={'http': proxy.endpoint})
+        self.assertEqual(200, adapter.send(
+            request, proxies={'https': proxy.endpoint}).status_code)
+
+    def test_session_timeouts(self):
+        if 'httpx' not in transport.available():
+            self.skipTest('httpx is not installed')
+        server, session, mag_client = self._session_client('httpx',
+                                                           latency=0.5)
+        mag_client.http_client.read_timeout = 0.05
+        self.assertRaises(ksa_exceptions.ConnectTimeout,
+                          mag_client.clusters.list)
+        server.stop()
+        self.assertRaises(ksa_exceptions.ConnectFailure,
+                          mag_client.clusters.list)
+
+    def test_session_httplib(self):
+        self.assertRaises(exceptions.ClientException,
+                          transport.session_adapter, 'httplib')
+
+    def test_connection_errors(self):
+        server, mag_client = self._client('urllib3')
+        server.stop()
+        self.assertRaises(exceptions.ConnectionRefused,
+                          mag_client.clusters.list)
+
+    def test_read_timeout(self):
+        for name in ('requests', 'urllib3'):
+            server, mag_client = self._client(
+                name, client_kwargs={'read_timeout': 0.05}, latency=0.5)
+            self.assertRaises(exceptions.ConnectionRefused,
+                              mag_client.clusters.list)
+            self.assertRaises(exceptions.DeadlineExceeded,
+                              mag_client.clusters.list,
+                              deadline=httpclient.Deadline(0.01))
+
+    def test_deadline_while_reading_the_body(self):
+        for name in transport.available():
+            server, mag_client = self._client(
+                name, client_kwargs={'read_timeout': 5}, item_size=2000,
+                trickle=0.02)
+            # The body takes about 0.8s to arrive, each piece in 0.02s.
+            start = time.monotonic()
+            self.assertRaises(exceptions.DeadlineExceeded,
+                              mag_client.clusters.list,
+                              deadline=httpclient.Deadline(0.2))
+            self.assertLess(time.monotonic() - start, 0.5, name)
+            # The client is still usable.
+            server.trickle = 0
+            self.assertEqual(20, len(mag_client.clusters.list(limit=0)))
+
+    def test_unavailable_transport(self):
+        self.assertRaises(exceptions.ClientException,
+                          httpclient.HTTPClient, 'http://localhost/',
+                          transport='pycurl')
+
+    def test_connection_params(self):
+        http_client = httpclient.HTTPClient(
+            'https://magnum-host:9511/v1', transport='urllib3',
+            insecure=True)
+        self.assertEqual('https://magnum-host:9511',
+                         http_client.transport.base_url)
+        self.assertFalse(http_client.transport.multiplexed)
+        conn = http_client.get_connection(deadline=httpclient.Deadline(10))
+        self.assertLessEqual(conn.read_timeout, 10)
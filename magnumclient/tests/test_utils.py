@@ -17,9 +17,17 @@
 
 import builtins
 import collections
+import io
+import threading
+import time
 from unittest import mock
 
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography import x509
 from oslo_serialization import jsonutils
+import prettytable
 import tempfile
 
 from magnumclient.common import cliutils
@@ -47,6 +55,36 @@ class CommonFiltersTest(test_utils.BaseTestCase):
             self.assertEqual(['%s=test' % key], result)
 
 
+class FiltersTest(test_utils.BaseTestCase):
+    def test_split_filters(self):
+        query, client = utils.split_filters(
+            {'role': 'a b', 'status': 'X', 'name': ['n1', 'n2']},
+            server_keys=('role', 'name'))
+        self.assertEqual(['role=a%20b'], query)
+        self.assertEqual({'status': 'X', 'name': ['n1', 'n2']}, client)
+        self.assertEqual(([], {}), utils.split_filters(None))
+
+    def test_matches_filters(self):
+        resource = mock.Mock(status='CREATE_FAILED', node_count=3,
+                             public=True, keypair=None)
+        self.assertTrue(utils.matches_filters(resource, {}))
+        self.assertTrue(utils.matches_filters(
+            resource, {'status': ['UPDATE_FAILED', 'CREATE_FAILED'],
+                       'node_count': '3', 'public': 'true'}))
+        self.assertTrue(utils.matches_filters(resource, {'keypair': None}))
+        self.assertFalse(utils.matches_filters(resource,
+                                               {'node_count': '4'}))
+        self.assertFalse(utils.matches_filters(resource, {'keypair': ''}))
+
+    def test_format_filters(self):
+        self.assertEqual({}, utils.format_filters(None))
+        self.assertEqual({'status': ['A', 'B'], 'name': 'x=y'},
+                         utils.format_filters(['status=A', 'name=x=y',
+                                               'status=B']))
+        self.assertRaises(exc.CommandError, utils.format_filters,
+                          ['status'])
+
+
 class SplitAndDeserializeTest(test_utils.BaseTestCase):
 
     def test_split_and_deserialize(self):
@@ -314,6 +352,82 @@ class CliUtilsTest(test_utils.BaseTestCase):
         self.assertEqual(str(dict_exp), str(dict_act))
 
 
+class PrintListTest(test_utils.BaseTestCase):
+
+    def setUp(self):
+        super(PrintListTest, self).setUp()
+        Row = collections.namedtuple('Row', ['name', 'status', 'nodes'])
+        self.objs = [Row('b', 'ok', 3), Row('a', 'long status', None),
+                     Row('c', 'multi\nline', 10)]
+        self.fields = ['name', 'status', 'nodes']
+
+    def _print(self, objs=None, **kwargs):
+        stream = io.StringIO()
+        cliutils.print_list(self.objs if objs is None else objs,
+                            self.fields, stream=stream, **kwargs)
+        return stream.getvalue()
+
+    def _prettytable(self, sortby=None):
+        pt = prettytable.PrettyTable(self.fields)
+        pt.align = 'l'
+        for obj in self.objs:
+            pt.add_row(['-' if v is None else v for v in obj])
+        kwargs = {'sortby': sortby} if sortby else {}
+        return pt.get_string(**kwargs) + '\n'
+
+    def test_table_matches_prettytable(self):
+        self.assertEqual(self._prettytable('name'), self._print())
+        self.assertEqual(self._prettytable(), self._print(sortby_index=None))
+        self.assertEqual(self._prettytable('status'),
+                         self._print(sortby_index=1))
+
+    def test_empty_table(self):
+        self.assertEqual('+------+--------+-------+\n'
+                         '| name | status | nodes |\n'
+                         '+------+--------+-------+\n'
+                         '+------+--------+-------+\n',
+                         self._print(objs=[]))
+
+    def test_formatters_and_labels(self):
+        output = self._print(sortby_index=None,
+                             formatters={'nodes': lambda o: o.nodes or 0},
+                             field_labels=['Name', 'Status', 'Nodes'],
+                             output_format='csv')
+        self.assertEqual('Name,Status,Nodes\r\nb,ok,3\r\n'
+                         'a,long status,0\r\nc,"multi\nline",10\r\n',
+                         output)
+
+    def test_json_lines(self):
+        output = self._print(output_format='json')
+        self.assertEqual(
+            [{'name': 'a', 'status': 'long status', 'nodes': None},
+             {'name': 'b', 'status': 'ok', 'nodes': 3},
+             {'name': 'c', 'status': 'multi\nline', 'nodes': 10}],
+            [jsonutils.loads(line) for line in output.splitlines()])
+
+    def test_sampled_widths_stream_rows(self):
+        stream = io.StringIO()
+        written = []
+
+        def objs():
+            for obj in self.objs:
+                written.append(stream.getvalue())
+                yield obj
+
+        cliutils.print_list(objs(), self.fields, sortby_index=None,
+                            sample_size=1, stream=stream)
+
+        # Nothing is written before the sample is read, then rows are
+        # written as they arrive, sized by the sample.
+        self.assertEqual('', written[0])
+        self.assertIn('| b    | ok     | 3     |', written[2])
+        self.assertIn('| a    | long status | -     |', stream.getvalue())
+
+    def test_invalid_arguments(self):
+        self.assertRaises(ValueError, self._print, field_labels=['a'])
+        self.assertRaises(ValueError, self._print, output_format='xml')
+
+
 class HandleJsonFromFileTest(test_utils.BaseTestCase):
 
     def test_handle_json_from_file_bad_json(self):
@@ -349,3 +463,118 @@ class HandleJsonFromFileTest(test_utils.BaseTestCase):
                                    utils.handle_json_from_file, f.name)
             mock_open.assert_called_once_with(f.name, 'r')
             mock_file_object.read.assert_called_once_with()
+
+
+class HandleYamlFromFileTest(test_utils.BaseTestCase):
+
+    def test_handle_yaml_from_file_valid_file(self):
+        contents = 'clusters:\n- name: a\n  node_count: 2\n'
+
+        with tempfile.NamedTemporaryFile(mode='w') as f:
+            f.write(contents)
+            f.flush()
+            manifest = utils.handle_yaml_from_file(f.name)
+
+        self.assertEqual({'clusters': [{'name': 'a', 'node_count': 2}]},
+                         manifest)
+
+    def test_handle_yaml_from_file_bad_yaml(self):
+        with tempfile.NamedTemporaryFile(mode='w') as f:
+            f.write('foo: [bar')
+            f.flush()
+            self.assertRaisesRegex(exc.InvalidAttribute,
+                                   'For YAML',
+                                   utils.handle_yaml_from_file, f.name)
+
+    def test_handle_yaml_from_file_missing(self):
+        self.assertRaisesRegex(exc.InvalidAttribute,
+                               'from file',
+                               utils.handle_yaml_from_file,
+                               '/nonexistent/manifest.yaml')
+
+
+class RunConcurrentlyTest(test_utils.BaseTestCase):
+
+    def test_results_for_every_item(self):
+        results = list(utils.run_concurrently(lambda x: x * 2, [1, 2, 3]))
+        self.assertEqual([(1, 2), (2, 4), (3, 6)],
+                         sorted((r.item, r.result) for r in results))
+        self.assertTrue(all(r.error is None for r in results))
+
+    def test_errors_are_captured(self):
+        def _func(item):
+            if item == 2:
+                raise exc.CommandError('boom')
+            return item
+
+        results = dict((r.item, r)
+                       for r in utils.run_concurrently(_func, [1, 2, 3]))
+        self.assertEqual(1, results[1].result)
+        self.assertIsInstance(results[2].error, exc.CommandError)
+        self.assertIsNone(results[2].result)
+        self.assertEqual(3, results[3].result)
+
+    def test_bounded_parallelism(self):
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def _func(item):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.01)
+            with lock:
+                state['running'] -= 1
+
+        list(utils.run_concurrently(_func, range(12), max_workers=3))
+        self.assertLessEqual(state['peak'], 3)
+
+    def test_no_items(self):
+        self.assertEqual([], list(utils.run_concurrently(len, [])))
+
+
+class GenerateCsrAndKeyTest(test_utils.BaseTestCase):
+
+    def _check(self, result, key_class):
+        csr = x509.load_pem_x509_csr(result['csr'].encode('utf-8'))
+        self.assertTrue(csr.is_signature_valid)
+        self.assertIsInstance(csr.public_key(), key_class)
+        self.assertIn('PRIVATE KEY', result['key'])
+        return csr
+
+    def test_default_rsa(self):
+        result = utils.generate_csr_and_key()
+        self._check(result, rsa.RSAPublicKey)
+        self.assertIn('BEGIN RSA PRIVATE KEY', result['key'])
+
+    def test_ecdsa(self):
+        self._check(utils.generate_csr_and_key('ecdsa'),
+                    ec.EllipticCurvePublicKey)
+
+    def test_ed25519(self):
+        self._check(utils.generate_csr_and_key('ed25519'),
+                    ed25519.Ed25519PublicKey)
+
+    def test_invalid_key_type(self):
+        self.assertRaises(exc.InvalidAttribute,
+                          utils.generate_csr_and_key, 'dsa')
+
+    def test_reuse_key(self):
+        key = utils.generate_key('ecdsa')
+        first = utils.generate_csr_and_key(key=key)
+        second = utils.generate_csr_and_key(key=key)
+        self.assertEqual(key, first['key'])
+        self.assertEqual(
+            self._check(first, ec.EllipticCurvePublicKey).public_key(),
+            self._check(second, ec.EllipticCurvePublicKey).public_key())
+
+    def test_generate_many(self):
+        results = utils.generate_csrs_and_keys(3, 'ed25519', max_workers=2)
+        self.assertEqual(3, len(results))
+        self.assertEqual(3, len(set(r['key'] for r in results)))
+        for result in results:
+            self._check(result, ed25519.Ed25519PublicKey)
+
+    def test_generate_many_invalid_key_type(self):
+        self.assertRaises(exc.InvalidAttribute,
+                          utils.generate_csrs_and_keys, 2, 'dsa')
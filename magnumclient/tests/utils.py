@@ -42,10 +42,12 @@ class FakeAPI(object):
     def __init__(self, responses):
         self.responses = responses
         self.calls = []
+        self.deadlines = []
 
-    def _request(self, method, url, headers=None, body=None):
+    def _request(self, method, url, headers=None, body=None, deadline=None):
         call = (method, url, headers or {}, body)
         self.calls.append(call)
+        self.deadlines.append(deadline)
         return self.responses[url][method]
 
     def raw_request(self, *args, **kwargs):
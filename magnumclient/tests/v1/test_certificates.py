@@ -16,6 +16,7 @@ import copy
 
 import testtools
 
+from magnumclient.common import cacache
 from magnumclient import exceptions
 from magnumclient.tests import utils
 from magnumclient.v1 import certificates
@@ -97,3 +98,21 @@ class CertificateManagerTest(testtools.TestCase):
             ('PATCH', '/v1/certificates/%s' % CERT1['cluster_uuid'], {}, None)
         ]
         self.assertEqual(expect, self.api.calls)
+
+    def test_cert_show_uses_ca_cache(self):
+        mgr = certificates.CertificateManager(self.api,
+                                              ca_cache=cacache.CACache())
+        first = mgr.get(CERT1['cluster_uuid'])
+        second = mgr.get(CERT1['cluster_uuid'])
+        self.assertEqual(1, len(self.api.calls))
+        self.assertEqual(first.pem, second.pem)
+        self.assertEqual(CERT1['cluster_uuid'], second.cluster_uuid)
+
+    def test_rotate_ca_invalidates_ca_cache(self):
+        mgr = certificates.CertificateManager(self.api,
+                                              ca_cache=cacache.CACache())
+        mgr.get(CERT1['cluster_uuid'])
+        mgr.rotate_ca(cluster_uuid=CERT1['cluster_uuid'])
+        mgr.get(CERT1['cluster_uuid'])
+        self.assertEqual(['GET', 'PATCH', 'GET'],
+                         [call[0] for call in self.api.calls])
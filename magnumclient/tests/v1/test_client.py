@@ -50,6 +50,12 @@ class ClientInitializeTest(testtools.TestCase):
         kwargs['endpoint_override'] = None
         kwargs['session'] = session
         kwargs['api_version'] = None
+        kwargs['connect_timeout'] = None
+        kwargs['read_timeout'] = None
+        kwargs['compress_threshold'] = None
+        kwargs['single_flight'] = True
+        kwargs['transport'] = None
+        kwargs['pool_size'] = None
 
         return kwargs
 
@@ -130,9 +136,62 @@ class ClientInitializeTest(testtools.TestCase):
             token=expected_token,
             api_version=expected_api_version,
             timeout=expected_timeout,
+            connect_timeout=None,
+            read_timeout=None,
             insecure=expected_insecure,
+            compress_threshold=None,
+            single_flight=True,
+            transport=None,
+            pool_size=None,
             **expected_kwargs)
 
+    @mock.patch('magnumclient.common.httpclient.HTTPClient')
+    def test_init_with_split_timeouts(self, mock_http_client):
+        client.Client(auth_token='token',
+                      magnum_url='magnum_url',
+                      connect_timeout=5,
+                      read_timeout=120)
+
+        _, kwargs = mock_http_client.call_args
+        self.assertEqual(5, kwargs['connect_timeout'])
+        self.assertEqual(120, kwargs['read_timeout'])
+        self.assertEqual(600, kwargs['timeout'])
+
+    @mock.patch('magnumclient.common.httpclient.HTTPClient')
+    def test_init_with_transport(self, mock_http_client):
+        client.Client(auth_token='token', magnum_url='magnum_url',
+                      transport='urllib3')
+
+        _, kwargs = mock_http_client.call_args
+        self.assertEqual('urllib3', kwargs['transport'])
+
+    @mock.patch('magnumclient.common.httpclient.SessionClient')
+    @mock.patch('magnumclient.v1.client._load_service_type',
+                return_value='container-infra')
+    def test_init_with_session_and_transport(self, mock_load_service_type,
+                                             mock_http_client):
+        client.Client(session=mock.Mock(), transport='httpx', pool_size=20)
+
+        _, kwargs = mock_http_client.call_args
+        self.assertEqual('httpx', kwargs['transport'])
+        self.assertEqual(20, kwargs['pool_size'])
+
+    @mock.patch('magnumclient.common.httpclient.SessionClient')
+    @mock.patch('magnumclient.v1.client._load_session')
+    @mock.patch('magnumclient.v1.client._load_service_type',
+                return_value='container-infra')
+    def test_init_with_session_split_timeouts(self,
+                                              mock_load_service_type,
+                                              mock_load_session,
+                                              mock_http_client):
+        session = mock.Mock()
+        client.Client(session=session, connect_timeout=5, read_timeout=120)
+
+        expected_kwargs = self._session_client_kwargs(session)
+        expected_kwargs['connect_timeout'] = 5
+        expected_kwargs['read_timeout'] = 120
+        mock_http_client.assert_called_once_with(**expected_kwargs)
+
     def _test_init_with_interface(self,
                                   init_func,
                                   mock_load_service_type,
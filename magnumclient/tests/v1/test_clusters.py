@@ -13,12 +13,16 @@
 #    under the License.
 
 import copy
+from unittest import mock
 
 import testtools
 from testtools import matchers
 
+from magnumclient.common import httpclient
 from magnumclient import exceptions
+from magnumclient import stub_server
 from magnumclient.tests import utils
+from magnumclient.v1 import client
 from magnumclient.v1 import clusters
 
 
@@ -118,6 +122,22 @@ fake_responses = {
             {'clusters': [CLUSTER1, CLUSTER2]},
         ),
     },
+    '/v1/clusters/?limit=0':
+    {
+        'GET': (
+            {},
+            {'clusters': [CLUSTER1],
+             'next': 'http://127.0.0.1:9511/v1/clusters/?marker=%s'
+                     % CLUSTER1['uuid']},
+        ),
+    },
+    '/v1/clusters/?marker=%s' % CLUSTER1['uuid']:
+    {
+        'GET': (
+            {},
+            {'clusters': [CLUSTER2]},
+        ),
+    },
     '/v1/clusters/?marker=%s' % CLUSTER2['uuid']:
     {
         'GET': (
@@ -246,6 +266,46 @@ class ClusterManagerTest(testtools.TestCase):
             sort_key='uuid', sort_dir='desc',
             expect=expect)
 
+    def test_cluster_list_pages_share_deadline(self):
+        clusters = self.mgr.list(limit=0, deadline=30)
+        expect = [
+            ('GET', '/v1/clusters/?limit=0', {}, None),
+            ('GET', '/v1/clusters/?marker=%s' % CLUSTER1['uuid'], {}, None),
+        ]
+        self.assertEqual(expect, self.api.calls)
+        self.assertThat(clusters, matchers.HasLength(2))
+        first, second = self.api.deadlines
+        self.assertIsInstance(first, httpclient.Deadline)
+        self.assertIs(first, second)
+        self.assertEqual(30, first.timeout)
+
+    def test_cluster_list_without_deadline(self):
+        self.mgr.list()
+        self.assertEqual([None], self.api.deadlines)
+
+    def test_cluster_list_expired_deadline(self):
+        def _json_request(method, url, deadline=None):
+            deadline.check()
+
+        self.api.json_request = _json_request
+        self.assertRaises(exceptions.DeadlineExceeded,
+                          self.mgr.list, limit=0, deadline=0)
+
+    def test_cluster_list_iter_fetches_pages_lazily(self):
+        clusters = self.mgr.list_iter(limit=0)
+        self.assertEqual([], self.api.calls)
+
+        self.assertEqual(CLUSTER1['name'], next(clusters).name)
+        self.assertEqual(1, len(self.api.calls))
+
+        self.assertEqual([CLUSTER2['name']], [c.name for c in clusters])
+        self.assertEqual(2, len(self.api.calls))
+
+    def test_cluster_show_with_deadline(self):
+        cluster = self.mgr.get(CLUSTER1['id'], deadline=10)
+        self.assertEqual(CLUSTER1['name'], cluster.name)
+        self.assertIsInstance(self.api.deadlines[0], httpclient.Deadline)
+
     def test_cluster_show_by_id(self):
         cluster = self.mgr.get(CLUSTER1['id'])
         expect = [
@@ -338,6 +398,81 @@ class ClusterManagerTest(testtools.TestCase):
                                self.mgr.create, **CREATE_CLUSTER_FAIL)
         self.assertEqual([], self.api.calls)
 
+    def test_cluster_create_many(self):
+        second = dict(CREATE_CLUSTER, name='cluster2')
+        results = list(self.mgr.create_many([CREATE_CLUSTER, second],
+                                            max_workers=2))
+        self.assertEqual(2, len(results))
+        self.assertTrue(all(r.error is None for r in results))
+        self.assertEqual(
+            sorted([CREATE_CLUSTER['name'], 'cluster2']),
+            sorted(body['name'] for (_, _, _, body) in self.api.calls))
+
+    def test_cluster_create_many_validates_before_sending(self):
+        bad = dict(CREATE_CLUSTER, wrong_key='wrong')
+        self.assertRaisesRegex(exceptions.InvalidAttribute,
+                               "Entry 1: Key must be in",
+                               self.mgr.create_many, [CREATE_CLUSTER, bad])
+        self.assertEqual([], self.api.calls)
+
+    def test_cluster_create_many_reports_failures(self):
+        self.mgr.create = mock.Mock(
+            side_effect=[exceptions.BadRequest(), clusters.Cluster(
+                self.mgr, {'uuid': CLUSTER1['uuid']})])
+        results = list(self.mgr.create_many(
+            [{'name': 'bad'}, {'name': 'good'}], max_workers=1))
+        self.assertEqual(2, len(results))
+        errors = [r for r in results if r.error is not None]
+        self.assertEqual(1, len(errors))
+        self.assertIsInstance(errors[0].error, exceptions.BadRequest)
+
+    def test_cluster_create_many_wait(self):
+        created = clusters.Cluster(self.mgr, {'uuid': CLUSTER1['uuid']})
+        settled = clusters.Cluster(
+            self.mgr, dict(CLUSTER1, status='CREATE_COMPLETE'))
+        in_progress = clusters.Cluster(
+            self.mgr, dict(CLUSTER1, status='CREATE_IN_PROGRESS'))
+        self.mgr.create = mock.Mock(return_value=created)
+        self.mgr.get = mock.Mock(side_effect=[in_progress, settled])
+
+        results = list(self.mgr.create_many([CREATE_CLUSTER], wait=True,
+                                            poll_interval=0))
+        self.assertEqual(1, len(results))
+        self.assertEqual('CREATE_COMPLETE', results[0].result.status)
+        self.assertEqual(2, self.mgr.get.call_count)
+
+    def test_cluster_create_many_wait_deleted(self):
+        self.mgr.create = mock.Mock(return_value=clusters.Cluster(
+            self.mgr, {'uuid': CLUSTER1['uuid']}))
+        self.mgr.get = mock.Mock(return_value=None)
+
+        results = list(self.mgr.create_many([CREATE_CLUSTER], wait=True,
+                                            poll_interval=0))
+        self.assertEqual(1, len(results))
+        self.assertIsNone(results[0].result)
+        self.assertIsInstance(results[0].error, exceptions.NotFound)
+
+    def test_cluster_wait_for_completion_deleted(self):
+        self.mgr.get = mock.Mock(return_value=None)
+        self.assertRaises(exceptions.NotFound,
+                          self.mgr.wait_for_completion, 'c1',
+                          poll_interval=0)
+
+    def test_cluster_wait_for_completion(self):
+        self.mgr.get = mock.Mock(side_effect=[
+            clusters.Cluster(self.mgr, {'status': 'UPDATE_IN_PROGRESS'}),
+            clusters.Cluster(self.mgr, {'status': 'UPDATE_FAILED'}),
+        ])
+        cluster = self.mgr.wait_for_completion('c1', poll_interval=0)
+        self.assertEqual('UPDATE_FAILED', cluster.status)
+
+    def test_cluster_wait_for_completion_timeout(self):
+        self.mgr.get = mock.Mock(return_value=clusters.Cluster(
+            self.mgr, {'status': 'UPDATE_IN_PROGRESS'}))
+        self.assertRaises(exceptions.DeadlineExceeded,
+                          self.mgr.wait_for_completion, 'c1',
+                          poll_interval=0, timeout=0.01)
+
     def test_cluster_delete_by_id(self):
         cluster = self.mgr.delete(CLUSTER1['id'])
         expect = [
@@ -398,3 +533,168 @@ class ClusterManagerTest(testtools.TestCase):
         ]
         self.assertEqual(expect, self.api.calls)
         self.assertEqual(UPGRADED_TO_TEMPLATE, cluster.cluster_template_id)
+
+
+def _sync_cluster(uuid, created_at, updated_at=None, **kwargs):
+    cluster = {'uuid': uuid, 'name': uuid, 'status': 'CREATE_COMPLETE',
+               'created_at': created_at, 'updated_at': updated_at}
+    cluster.update(kwargs)
+    return cluster
+
+
+SYNC_FULL = '/v1/clusters/detail?limit=0'
+SYNC_UPDATED = '/v1/clusters/detail?limit=2&sort_key=updated_at&sort_dir=desc'
+SYNC_CREATED = '/v1/clusters/detail?limit=2&sort_key=created_at&sort_dir=desc'
+
+
+class ClusterSyncTest(testtools.TestCase):
+
+    def setUp(self):
+        super(ClusterSyncTest, self).setUp()
+        self.c1 = _sync_cluster('c1', '2024-01-01T00:00:00+00:00',
+                                '2024-01-05T00:00:00+00:00')
+        self.c2 = _sync_cluster('c2', '2024-01-02T00:00:00+00:00')
+        self.c0 = _sync_cluster('c0', '2023-12-01T00:00:00+00:00',
+                                '2024-01-03T00:00:00+00:00')
+        self.responses = {
+            SYNC_FULL: {'GET': ({}, {'clusters': [self.c0, self.c1,
+                                                  self.c2]})},
+            SYNC_UPDATED: {'GET': ({}, {'clusters': [self.c1, self.c0]})},
+            SYNC_CREATED: {'GET': ({}, {'clusters': [self.c2, self.c1]})},
+        }
+        self.api = utils.FakeAPI(self.responses)
+        self.mgr = clusters.ClusterManager(self.api)
+        self.sync = self.mgr.incremental_sync(page_size=2)
+
+    def _events(self, events):
+        return sorted((e.action, e.uuid) for e in events)
+
+    def test_first_sync_is_full(self):
+        events = self.sync.sync()
+        self.assertEqual([('added', 'c0'), ('added', 'c1'), ('added', 'c2')],
+                         self._events(events))
+        self.assertEqual([('GET', SYNC_FULL, {}, None)], self.api.calls)
+        self.assertEqual(['c0', 'c1', 'c2'], sorted(self.sync.clusters))
+
+    def test_incremental_sync_no_changes(self):
+        self.sync.sync()
+        self.api.calls = []
+
+        self.assertEqual([], self.sync.sync())
+        self.assertEqual([('GET', SYNC_UPDATED, {}, None),
+                          ('GET', SYNC_CREATED, {}, None)], self.api.calls)
+
+    def test_incremental_sync_stops_at_watermark(self):
+        self.sync.sync()
+        self.api.calls = []
+        changed = dict(self.c1, status='UPDATE_IN_PROGRESS',
+                       updated_at='2024-01-06T00:00:00+00:00')
+        # The second page is never requested: the first page already
+        # reaches rows older than the watermark.
+        self.responses[SYNC_UPDATED] = {'GET': ({}, {
+            'clusters': [changed, self.c0],
+            'next': 'http://127.0.0.1:9511/v1/clusters/detail?marker=c0'})}
+        new = _sync_cluster('c3', '2024-01-07T00:00:00+00:00')
+        self.responses[SYNC_CREATED] = {'GET': ({}, {
+            'clusters': [new, self.c2, self.c1]})}
+
+        events = self.sync.sync()
+
+        self.assertEqual([('added', 'c3'), ('changed', 'c1')],
+                         self._events(events))
+        self.assertEqual('UPDATE_IN_PROGRESS', self.sync.clusters['c1'].status)
+        self.assertEqual(2, len(self.api.calls))
+
+    def test_full_sync_detects_removals(self):
+        self.sync.sync()
+        self.responses[SYNC_FULL] = {'GET': ({}, {'clusters': [self.c0,
+                                                               self.c2]})}
+
+        events = self.sync.sync(full=True)
+
+        self.assertEqual([('removed', 'c1')], self._events(events))
+        self.assertEqual('c1', events[0].cluster.uuid)
+        self.assertEqual(['c0', 'c2'], sorted(self.sync.clusters))
+
+    @mock.patch('time.monotonic')
+    def test_periodic_full_sync(self, mock_monotonic):
+        sync = self.mgr.incremental_sync(full_sync_interval=60, page_size=2)
+        mock_monotonic.return_value = 100
+        sync.sync()
+        mock_monotonic.return_value = 130
+        sync.sync()
+        mock_monotonic.return_value = 161
+        sync.sync()
+        self.assertEqual(
+            [SYNC_FULL, SYNC_UPDATED, SYNC_CREATED, SYNC_FULL],
+            [call[1] for call in self.api.calls])
+
+
+class ListFiltersTest(testtools.TestCase):
+
+    def setUp(self):
+        super(ListFiltersTest, self).setUp()
+        self.server = stub_server.StubServer(clusters=6)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.client = client.Client(endpoint_override=self.server.endpoint,
+                                    auth_token=self.server.token)
+        for cluster in self.server.clusters.items.values():
+            if cluster['name'] in ('cluster-1', 'cluster-4'):
+                cluster['status'] = 'CREATE_FAILED'
+
+    def _list_requests(self):
+        return self.server.requests[('GET', 'list_clusters', 200)]
+
+    def test_filters(self):
+        failed = self.client.clusters.list(
+            filters={'status': 'CREATE_FAILED'})
+
+        self.assertEqual(['cluster-1', 'cluster-4'],
+                         [c.name for c in failed])
+        self.assertEqual(1, self._list_requests())
+
+    def test_filters_limit_counts_matches(self):
+        failed = self.client.clusters.list(
+            limit=2, filters={'status': 'CREATE_FAILED', 'node_count': '1'})
+
+        self.assertEqual(['cluster-1', 'cluster-4'],
+                         [c.name for c in failed])
+        # Pages of two clusters are requested until two of them match.
+        self.assertEqual(3, self._list_requests())
+
+    def test_filters_stop_paging_early(self):
+        failed = self.client.clusters.list(
+            limit=1, filters={'status': 'CREATE_FAILED'})
+
+        self.assertEqual(['cluster-1'], [c.name for c in failed])
+        self.assertEqual(2, self._list_requests())
+
+    def test_filters_on_detail_attributes(self):
+        project = self.server.projects[1]
+        clusters = self.client.clusters.list(
+            filters={'project_id': project})
+
+        self.assertEqual(
+            sorted(c['name'] for c in self.server.clusters.items.values()
+                   if c['project_id'] == project),
+            sorted(c.name for c in clusters))
+        self.assertTrue(clusters)
+        # The summaries have no project_id, so the details were listed.
+        self.assertIn('master_flavor_id', clusters[0]._info)
+
+        templates = self.client.cluster_templates.list(
+            filters={'coe': 'kubernetes'})
+        self.assertEqual(3, len(templates))
+
+    def test_filters_unknown_attribute(self):
+        self.assertRaises(exceptions.ValidationError,
+                          self.client.clusters.list,
+                          filters={'keypiar': 'kp'})
+
+    def test_template_filters(self):
+        templates = self.client.cluster_templates.list(
+            filters={'name': ['template-0', 'template-2']})
+
+        self.assertEqual(['template-0', 'template-2'],
+                         sorted(t.name for t in templates))
@@ -0,0 +1,198 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import os
+import signal
+import threading
+from unittest import mock
+
+import fixtures
+import testtools
+
+from magnumclient import exceptions
+from magnumclient import stub_server
+from magnumclient.v1 import client
+from magnumclient.v1 import fleet_upgrade
+
+TEMPLATE_ID = '00000000-0000-0000-0000-000000000001'
+
+
+class FleetUpgradeTest(testtools.TestCase):
+
+    def setUp(self):
+        super(FleetUpgradeTest, self).setUp()
+        # Clusters 1, 2, 4 and 5 do not use template-0.
+        self.server = stub_server.StubServer(clusters=6,
+                                             transition_time=0.05)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.client = client.Client(endpoint_override=self.server.endpoint,
+                                    auth_token=self.server.token)
+        self.state_path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'upgrade.json')
+
+    def _upgrade(self, **kwargs):
+        kwargs.setdefault('wave_size', 2)
+        kwargs.setdefault('poll_interval', 0.02)
+        return fleet_upgrade.FleetUpgrade(self.client, 'template-0',
+                                          self.state_path, **kwargs)
+
+    def _cluster(self, name):
+        return [c for c in self.server.clusters.items.values()
+                if c['name'] == name][0]
+
+    def _upgrade_requests(self):
+        return self.server.requests[('POST', 'upgrade_cluster', 202)]
+
+    def test_upgrade(self):
+        events = list(self._upgrade().run())
+
+        self.assertEqual(
+            ['started', 'wave_started', 'upgraded', 'upgraded',
+             'wave_passed', 'wave_started', 'upgraded', 'upgraded',
+             'wave_passed', 'finished'],
+            [e.kind for e in events])
+        self.assertEqual(set(['cluster-1', 'cluster-2', 'cluster-4',
+                              'cluster-5']),
+                         set(e.entry['name'] for e in events
+                             if e.kind == 'upgraded'))
+        for name in ('cluster-1', 'cluster-4'):
+            self.assertEqual(TEMPLATE_ID,
+                             self._cluster(name)['cluster_template_id'])
+        progress = events[-1].progress
+        self.assertEqual(4, progress['upgraded'])
+        self.assertEqual(0, progress['remaining'])
+        self.assertGreater(progress['clusters_per_hour'], 0)
+        self.assertEqual(0, progress['eta'])
+
+        with open(self.state_path) as f:
+            state = json.load(f)
+        self.assertEqual(2, state['waves_passed'])
+        self.assertEqual(set(['upgraded']),
+                         set(c['state'] for c in state['clusters'].values()))
+
+    def test_given_clusters(self):
+        upgrade = self._upgrade(clusters=['cluster-5', 'cluster-0',
+                                          'cluster-1'])
+
+        self.assertEqual([[str(self._cluster('cluster-5')['uuid']),
+                           str(self._cluster('cluster-1')['uuid'])]],
+                         upgrade.plan()['waves'])
+
+    def test_health_gate_pauses(self):
+        self._cluster('cluster-2')['health_status'] = 'UNHEALTHY'
+
+        events = list(self._upgrade().run())
+
+        self.assertEqual('paused', events[-1].kind)
+        self.assertIn('wave 1 failed its health gate',
+                      events[-1].entry['reason'])
+        self.assertEqual(2, self._upgrade_requests())
+
+        # Allowing one failure per wave resumes with the second wave.
+        events = list(self._upgrade(max_failures=1).run())
+
+        self.assertEqual(
+            ['started', 'wave_passed', 'wave_started', 'upgraded',
+             'upgraded', 'wave_passed', 'finished'],
+            [e.kind for e in events])
+        self.assertEqual(1, events[-1].progress['failed'])
+        self.assertEqual(4, self._upgrade_requests())
+
+    def test_pause_file(self):
+        upgrade = self._upgrade()
+        upgrade.plan()
+        open(upgrade.pause_path, 'w').close()
+
+        events = list(upgrade.run())
+
+        self.assertEqual(['started', 'paused'], [e.kind for e in events])
+        self.assertEqual(0, self._upgrade_requests())
+        os.unlink(upgrade.pause_path)
+        self.assertEqual('finished', list(self._upgrade().run())[-1].kind)
+
+    def test_interrupted_run_resumes(self):
+        self.server.transition_time = 0.3
+        upgrade = self._upgrade(concurrency=2)
+        upgrade.plan()
+        # Interrupt the run while the first wave is upgrading.
+        timer = threading.Timer(0.1, os.kill, (os.getpid(), signal.SIGINT))
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        self.assertRaises(KeyboardInterrupt, list, upgrade.run())
+
+        self.assertEqual(2, self._upgrade_requests())
+        self.assertEqual(['upgrading', 'upgrading', 'pending', 'pending'],
+                         [upgrade.state['clusters'][uuid]['state']
+                          for wave in upgrade.state['waves']
+                          for uuid in wave])
+
+        events = list(self._upgrade().run())
+
+        self.assertEqual(4, events[-1].progress['upgraded'])
+        # The clusters left upgrading were waited for, not upgraded again.
+        self.assertEqual(4, self._upgrade_requests())
+
+    def test_failed_upgrade_request(self):
+        upgrade = self._upgrade(max_failures=1)
+        upgrade.plan()
+        self.server.clusters.remove(self._cluster('cluster-1')['uuid'])
+
+        events = list(upgrade.run())
+
+        failed = [e for e in events if e.kind == 'failed']
+        self.assertEqual(['cluster-1'], [e.entry['name'] for e in failed])
+        self.assertIn('could not be found', failed[0].entry['error'])
+        self.assertEqual('finished', events[-1].kind)
+
+    def test_upgrade_not_started(self):
+        upgrade = self._upgrade(max_failures=4)
+        # The clusters keep their settled status and template.
+        upgrade.client.clusters.upgrade = mock.Mock()
+
+        events = list(upgrade.run())
+
+        failed = [e for e in events if e.kind == 'failed']
+        self.assertEqual(4, len(failed))
+        self.assertIn('the upgrade did not start', failed[0].entry['error'])
+
+    def test_nodegroup_upgrade(self):
+        events = list(self._upgrade(nodegroup='default-worker').run())
+        self.assertEqual(6, events[-1].progress['upgraded'])
+
+        # A cluster never seen upgrading fails, whatever its template.
+        os.unlink(self.state_path)
+        upgrade = self._upgrade(nodegroup='default-worker', max_failures=6)
+        upgrade.client.clusters.upgrade = mock.Mock()
+        events = list(upgrade.run())
+        self.assertEqual(6, events[-1].progress['failed'])
+
+    def test_cluster_deleted_while_upgrading(self):
+        upgrade = self._upgrade(max_failures=2, wave_size=4)
+        upgrade.plan()
+        upgrade.client.clusters.upgrade = mock.Mock()
+        upgrade.client.clusters.get = mock.Mock(return_value=None)
+
+        events = list(upgrade.run())
+
+        failed = [e for e in events if e.kind == 'failed']
+        self.assertEqual(4, len(failed))
+        self.assertIn('was deleted', failed[0].entry['error'])
+
+    def test_state_file_of_another_template(self):
+        self._upgrade().plan()
+        upgrade = fleet_upgrade.FleetUpgrade(self.client, 'template-1',
+                                             self.state_path)
+
+        self.assertRaises(exceptions.ValidationError, upgrade.plan)
@@ -0,0 +1,189 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import io
+import json
+import os
+from unittest import mock
+
+import fixtures
+import testtools
+
+from magnumclient import exceptions
+from magnumclient.tests import utils
+from magnumclient.v1 import cluster_templates
+from magnumclient.v1 import clusters
+from magnumclient.v1 import inventory
+from magnumclient.v1 import nodegroups
+from magnumclient.v1 import quotas
+from magnumclient.v1 import stats
+
+
+CLUSTER1 = {'uuid': 'c1', 'name': 'cluster1', 'project_id': 'p1',
+            'cluster_template_id': 't1'}
+CLUSTER2 = {'uuid': 'c2', 'name': 'cluster2', 'project_id': 'p1',
+            'cluster_template_id': 't1'}
+CLUSTER3 = {'uuid': 'c3', 'name': 'cluster3', 'project_id': 'p2',
+            'cluster_template_id': 't2'}
+
+fake_responses = {
+    '/v1/clusters/detail?limit=0':
+    {
+        'GET': (
+            {},
+            {'clusters': [CLUSTER1, CLUSTER2, CLUSTER3]},
+        ),
+    },
+    '/v1/clusters/c1/nodegroups/detail?limit=0':
+    {
+        'GET': (
+            {},
+            {'nodegroups': [{'uuid': 'ng1', 'role': 'master'},
+                            {'uuid': 'ng2', 'role': 'worker'}]},
+        ),
+    },
+    '/v1/clusters/c2/nodegroups/detail?limit=0':
+    {
+        'GET': (
+            {},
+            {'nodegroups': [{'uuid': 'ng3', 'role': 'worker',
+                             'labels': {'a': 'b'}}]},
+        ),
+    },
+    '/v1/clustertemplates/t1':
+    {
+        'GET': (
+            {},
+            {'uuid': 't1', 'name': 'template1'},
+        ),
+    },
+    '/v1/clustertemplates/t2':
+    {
+        'GET': (
+            {},
+            {'uuid': 't2', 'name': 'template2'},
+        ),
+    },
+    '/v1/stats?project_id=p1':
+    {
+        'GET': (
+            {},
+            {'clusters': 2, 'nodes': 5},
+        ),
+    },
+    '/v1/stats?project_id=p2':
+    {
+        'GET': (
+            {},
+            {'clusters': 1, 'nodes': 2},
+        ),
+    },
+    '/v1/quotas?limit=0':
+    {
+        'GET': (
+            {},
+            {'quotas': [{'project_id': 'p1', 'resource': 'Cluster',
+                         'hard_limit': 10}]},
+        ),
+    },
+}
+
+
+class FakeClient(object):
+    def __init__(self, api):
+        self.clusters = clusters.ClusterManager(api)
+        self.cluster_templates = cluster_templates.ClusterTemplateManager(api)
+        self.nodegroups = nodegroups.NodeGroupManager(api)
+        self.quotas = quotas.QuotasManager(api)
+        self.stats = stats.StatsManager(api)
+        self.http_client = api
+
+
+class InventoryTest(testtools.TestCase):
+
+    def setUp(self):
+        super(InventoryTest, self).setUp()
+        self.api = utils.FakeAPI(fake_responses)
+        self.client = FakeClient(self.api)
+
+    def _by_type(self, records):
+        by_type = {}
+        for record in records:
+            by_type.setdefault(record['record_type'], []).append(record)
+        return by_type
+
+    def test_collect(self):
+        records = list(inventory.collect(self.client, max_workers=4))
+        by_type = self._by_type(records)
+
+        # Clusters come first, in listing order.
+        self.assertEqual(['c1', 'c2', 'c3'],
+                         [r['uuid'] for r in records[:3]])
+        self.assertEqual(['ng1', 'ng2', 'ng3'],
+                         sorted(r['uuid'] for r in by_type['nodegroup']))
+        self.assertEqual('c2', [r for r in by_type['nodegroup']
+                                if r['uuid'] == 'ng3'][0]['cluster_id'])
+        templates = by_type['cluster_template']
+        self.assertEqual(['t1', 't2'], sorted(r['uuid'] for r in templates))
+        self.assertEqual({'p1': 5, 'p2': 2},
+                         dict((r['project_id'], r['nodes'])
+                              for r in by_type['stats']))
+        self.assertEqual(1, len(by_type['quota']))
+
+        # c3 has no nodegroups response, which is reported, not raised.
+        self.assertEqual(1, len(by_type['error']))
+        self.assertEqual('nodegroup', by_type['error'][0]['resource'])
+        self.assertEqual('c3', by_type['error'][0]['id'])
+
+    def test_collect_dedupes_templates(self):
+        list(inventory.collect(self.client))
+        urls = [call[1] for call in self.api.calls]
+        self.assertEqual(1, urls.count('/v1/clustertemplates/t1'))
+        self.assertEqual(1, urls.count('/v1/stats?project_id=p1'))
+
+    def test_write_jsonl(self):
+        records = [{'record_type': 'cluster', 'uuid': 'c1'},
+                   {'record_type': 'stats', 'nodes': 2}]
+        stream = io.StringIO()
+        self.assertEqual(2, inventory.write_jsonl(records, stream))
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(records, [json.loads(line) for line in lines])
+
+    @mock.patch.object(inventory, 'pyarrow', None)
+    def test_write_parquet_without_pyarrow(self):
+        self.assertRaises(exceptions.CommandError,
+                          inventory.write_parquet, [], 'out')
+
+    def test_write_parquet(self):
+        if inventory.parquet is None:
+            self.skipTest('pyarrow is not installed')
+        directory = self.useFixture(fixtures.TempDir()).path
+        # Keys only some rows have and a column of mixed types.
+        records = [{'record_type': 'cluster', 'uuid': 'c1', 'node_count': 1},
+                   {'record_type': 'cluster', 'uuid': 'c2',
+                    'labels': {'a': 'b'}, 'node_count': 2.5},
+                   {'record_type': 'cluster', 'uuid': 'c3',
+                    'master_lb_enabled': True, 'node_count': 'x'},
+                   {'record_type': 'stats', 'nodes': 2}]
+
+        written = inventory.write_parquet(records, directory)
+
+        path = os.path.join(directory, 'cluster.parquet')
+        self.assertEqual(
+            {path: 3, os.path.join(directory, 'stats.parquet'): 1}, written)
+        table = inventory.parquet.read_table(path).to_pydict()
+        self.assertEqual(
+            {'record_type': ['cluster'] * 3,
+             'uuid': ['c1', 'c2', 'c3'],
+             'node_count': ['1', '2.5', 'x'],
+             'labels': [None, '{"a": "b"}', None],
+             'master_lb_enabled': [None, None, True]}, table)
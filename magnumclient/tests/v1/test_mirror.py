@@ -0,0 +1,147 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+
+import fixtures
+import testtools
+
+from magnumclient import exceptions
+from magnumclient import stub_server
+from magnumclient.v1 import client
+from magnumclient.v1 import mirror
+
+
+class MirrorTest(testtools.TestCase):
+
+    def setUp(self):
+        super(MirrorTest, self).setUp()
+        # Clusters 0 and 3 use template-0, clusters 1, 4 template-1, ...
+        self.server = stub_server.StubServer(clusters=6, extra_nodegroups=1)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.client = client.Client(endpoint_override=self.server.endpoint,
+                                    auth_token=self.server.token)
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'mirror.sqlite')
+        self.mirror = self._mirror()
+
+    def _mirror(self):
+        store = mirror.Mirror(self.path)
+        self.addCleanup(store.close)
+        return store
+
+    def _cluster(self, name):
+        return [c for c in self.server.clusters.items.values()
+                if c['name'] == name][0]
+
+    def _requests(self, route):
+        return self.server.requests[('GET', route, 200)]
+
+    def test_refresh_and_query(self):
+        counts = self.mirror.refresh(self.client)
+
+        self.assertEqual({'clusters': 6, 'nodegroups': 18,
+                          'cluster_templates': 3, 'quotas': 3,
+                          'removed': 0, 'errors': 0}, counts)
+        self._cluster('cluster-3')['status'] = 'CREATE_FAILED'
+        self.mirror.refresh(self.client, full=True)
+
+        result = self.mirror.query(
+            'clusters', columns=['name', 'cluster_templates.name'],
+            where=[('cluster_templates.name', '=', 'template-0'),
+                   ('status', '=', 'CREATE_FAILED')],
+            join='cluster_templates')
+        self.assertEqual(['name', 'cluster_templates.name'], result.columns)
+        self.assertEqual([('cluster-3', 'template-0')], result.rows)
+        self.assertEqual(['cluster_templates', 'clusters'],
+                         sorted(result.freshness))
+        self.assertLess(result.freshness['clusters']['age'], 60)
+
+    def test_query_group_by_and_json_attributes(self):
+        self.mirror.refresh(self.client)
+
+        result = self.mirror.query('nodegroups', group_by=['role'])
+        self.assertEqual(['role', 'count'], result.columns)
+        self.assertEqual([('worker', 12), ('master', 6)], result.rows)
+
+        # flavor_id is not indexed, so it is read from the stored JSON.
+        result = self.mirror.query(
+            'nodegroups', columns=['name'], sort_key='name',
+            where=[('flavor_id', '!=', 'm1.medium'), ('node_count', '=', '1'),
+                   ('clusters.name', '=', 'cluster-0')], join='clusters')
+        self.assertEqual([], result.rows)
+        result = self.mirror.query(
+            'nodegroups', columns=['name'], sort_key='name', sort_dir='desc',
+            where=[('is_default', '=', True),
+                   ('clusters.name', '=', 'cluster-0')], join='clusters')
+        self.assertEqual([('default-worker',), ('default-master',)],
+                         result.rows)
+
+    def test_query_json_booleans(self):
+        self._cluster('cluster-1')['master_lb_enabled'] = False
+        self.mirror.refresh(self.client)
+
+        for value in (False, 'false'):
+            self.assertEqual([('cluster-1',)], self.mirror.query(
+                'clusters', columns=['name'],
+                where=[('master_lb_enabled', '=', value)]).rows)
+        self.assertEqual(5, len(self.mirror.query(
+            'clusters', where=[('master_lb_enabled', '=', True),
+                               ('floating_ip_enabled', '=', 'true')]).rows))
+        self.assertEqual([('cluster-1',)], self.mirror.query(
+            'clusters', columns=['name'],
+            where=[('master_lb_enabled', '!=', True)]).rows)
+        # Other attributes are still compared as text.
+        self.assertEqual(6, len(self.mirror.query(
+            'clusters', where=[('coe_version', '=', 'v1.27.4')]).rows))
+
+    def test_incremental_refresh(self):
+        self.mirror.refresh(self.client)
+        cluster = self._cluster('cluster-1')
+        cluster['node_count'] = 5
+        cluster['updated_at'] = stub_server._now()
+        self.server.clusters.remove(self._cluster('cluster-2')['uuid'])
+        nodegroup_lists = self._requests('list_nodegroups')
+
+        # A new process resumes from the watermark kept in the database.
+        counts = self._mirror().refresh(self.client)
+
+        self.assertEqual(1, counts['clusters'])
+        self.assertEqual(0, counts['removed'])
+        self.assertEqual(nodegroup_lists + 1,
+                         self._requests('list_nodegroups'))
+        self.assertEqual([(5,)], self.mirror.query(
+            'clusters', columns=['node_count'],
+            where=[('name', '=', 'cluster-1')]).rows)
+
+        # Deletions are only seen by a full refresh.
+        counts = self.mirror.refresh(self.client, full=True)
+
+        self.assertEqual(1, counts['removed'])
+        self.assertEqual([], self.mirror.query(
+            'nodegroups', join='clusters',
+            where=[('clusters.name', '=', None)]).rows)
+        self.assertEqual(5, len(self.mirror.query('clusters').rows))
+
+    def test_freshness_never_refreshed(self):
+        self.assertEqual({'synced_at': None, 'age': None},
+                         self.mirror.freshness()['quotas'])
+
+    def test_invalid_queries(self):
+        for kwargs in [{'table': 'servers'},
+                       {'table': 'clusters', 'join': 'quotas'},
+                       {'table': 'clusters', 'columns': ['name; DROP']},
+                       {'table': 'clusters', 'columns': ['quotas.resource']},
+                       {'table': 'clusters', 'where': [('name', '<', 'a')]}]:
+            self.assertRaises(exceptions.ValidationError,
+                              self.mirror.query, **kwargs)
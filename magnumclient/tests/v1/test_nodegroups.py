@@ -63,12 +63,34 @@ del CREATE_NODEGROUP['node_addresses']
 del CREATE_NODEGROUP['is_default']
 del CREATE_NODEGROUP['cluster_id']
 
+NODEGROUP3 = copy.deepcopy(NODEGROUP1)
+NODEGROUP3['uuid'] = '66666666-7777-8888-9999-000000000003'
+del NODEGROUP3['cluster_id']
+
 UPDATED_NODEGROUP = copy.deepcopy(NODEGROUP1)
 NEW_NODE_COUNT = 9
 UPDATED_NODEGROUP['node_count'] = NEW_NODE_COUNT
 
 
 fake_responses = {
+    '/v1/clusters/?limit=0':
+    {
+        'GET': (
+            {},
+            {'clusters': [{'uuid': 'test'}, {'uuid': 'test2'}]},
+        ),
+    },
+    '/v1/clusters/test2/nodegroups/':
+    {
+        'GET': (
+            {},
+            {'nodegroups': [NODEGROUP3]},
+        ),
+        'POST': (
+            {},
+            CREATE_NODEGROUP,
+        ),
+    },
     '/v1/clusters/test/nodegroups/':
     {
         'GET': (
@@ -80,6 +102,13 @@ fake_responses = {
             CREATE_NODEGROUP,
         ),
     },
+    '/v1/clusters/test/nodegroups/?role=worker':
+    {
+        'GET': (
+            {},
+            {'nodegroups': [NODEGROUP1]},
+        ),
+    },
     '/v1/clusters/test/nodegroups/%s' % NODEGROUP1['id']:
     {
         'GET': (
@@ -248,6 +277,65 @@ class NodeGroupManagerTest(testtools.TestCase):
             sort_key='uuid', sort_dir='desc',
             expect=expect)
 
+    def test_nodegroup_list_with_filters(self):
+        nodegroups = self.mgr.list(self.cluster_id,
+                                   filters={'role': 'worker',
+                                            'node_count': 3})
+        # role is filtered by the API, node_count client-side.
+        self.assertEqual(
+            [('GET', self.base_path + '?role=worker', {}, None)],
+            self.api.calls)
+        self.assertEqual([], nodegroups)
+
+        nodegroups = self.mgr.list(self.cluster_id,
+                                   filters={'role': ['master', 'infra'],
+                                            'is_default': 'true'})
+        self.assertEqual(('GET', self.base_path, {}, None),
+                         self.api.calls[-1])
+        self.assertEqual([NODEGROUP2['uuid']], [n.uuid for n in nodegroups])
+
+    def test_nodegroup_list_all(self):
+        results = sorted(self.mgr.list_all(), key=lambda r: r.item)
+        self.assertEqual(['test', 'test2'], [r.item for r in results])
+        self.assertEqual([None, None], [r.error for r in results])
+        self.assertThat(results[0].result, matchers.HasLength(2))
+        self.assertEqual(NODEGROUP1['cluster_id'],
+                         results[0].result[0].cluster_id)
+        # cluster_id is filled in when the server does not return it.
+        self.assertEqual('test2', results[1].result[0].cluster_id)
+        self.assertIn(('GET', '/v1/clusters/?limit=0', {}, None),
+                      self.api.calls)
+
+    def test_nodegroup_list_all_given_clusters(self):
+        results = list(self.mgr.list_all(['test2'], role='worker'))
+        self.assertEqual(1, len(results))
+        self.assertEqual(
+            [('GET', '/v1/clusters/test2/nodegroups/?role=worker', {}, None)],
+            self.api.calls)
+
+    def test_nodegroup_list_all_partial_failure(self):
+        results = list(self.mgr.list_all(['test', 'missing'],
+                                         max_workers=1))
+        errors = dict((r.item, r.error) for r in results)
+        self.assertIsNone(errors['test'])
+        self.assertIsNotNone(errors['missing'])
+
+    def test_nodegroup_create_many(self):
+        cluster_ids = ['test', 'test2']
+        results = list(self.mgr.create_many(CREATE_NODEGROUP, cluster_ids))
+        self.assertEqual(sorted(cluster_ids), sorted(r.item for r in results))
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertEqual(CREATE_NODEGROUP['name'], result.result.name)
+        self.assertEqual(2, len(self.api.calls))
+
+    def test_nodegroup_create_many_fail(self):
+        spec = copy.deepcopy(CREATE_NODEGROUP)
+        spec['invalid'] = 'fake'
+        self.assertRaises(exceptions.InvalidAttribute,
+                          self.mgr.create_many, spec, ['test'])
+        self.assertEqual([], self.api.calls)
+
     def test_nodegroup_show_by_name(self):
         nodegroup = self.mgr.get(self.cluster_id, NODEGROUP1['name'])
         expect = [
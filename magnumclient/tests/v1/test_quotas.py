@@ -11,11 +11,16 @@
 #    under the License.
 
 import copy
+import os
 
+import fixtures
 import testtools
 from testtools import matchers
 
+from magnumclient import exceptions
+from magnumclient import stub_server
 from magnumclient.tests import utils
+from magnumclient.v1 import client
 from magnumclient.v1 import quotas
 
 
@@ -150,3 +155,99 @@ class QuotasManagerTest(testtools.TestCase):
         ]
         self.assertEqual(expect, self.api.calls)
         self.assertIsNone(quota)
+
+
+class QuotaFileTest(testtools.TestCase):
+
+    def setUp(self):
+        super(QuotaFileTest, self).setUp()
+        self.tempdir = self.useFixture(fixtures.TempDir()).path
+
+    def _write(self, name, content):
+        path = os.path.join(self.tempdir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_load_csv(self):
+        path = self._write('quotas.csv', 'project_id,resource,hard_limit\n'
+                                         'abc,Cluster,5\n'
+                                         'bcd,Cluster,\n')
+        self.assertEqual({('abc', 'Cluster'): 5, ('bcd', 'Cluster'): None},
+                         quotas.load_quota_file(path))
+
+    def test_load_yaml_list(self):
+        path = self._write('quotas.yaml',
+                           '- {project_id: abc, resource: Cluster, '
+                           'hard_limit: 5}\n')
+        self.assertEqual({('abc', 'Cluster'): 5},
+                         quotas.load_quota_file(path))
+
+    def test_load_yaml_mapping(self):
+        path = self._write('quotas.yaml', 'abc:\n  Cluster: 5\n'
+                                          'bcd:\n  Cluster: null\n')
+        self.assertEqual({('abc', 'Cluster'): 5, ('bcd', 'Cluster'): None},
+                         quotas.load_quota_file(path))
+
+    def test_load_invalid(self):
+        for name, content in [
+                ('bad.csv', 'project_id,resource,hard_limit\nabc,C,x\n'),
+                ('dup.csv', 'project_id,resource,hard_limit\n'
+                            'abc,C,1\nabc,C,2\n'),
+                ('missing.csv', 'project_id,hard_limit\nabc,1\n'),
+                ('scalar.yaml', '5\n')]:
+            self.assertRaises(exceptions.ValidationError,
+                              quotas.load_quota_file,
+                              self._write(name, content))
+
+    def test_plan(self):
+        current = [quotas.Quotas(None, q) for q in (
+            {'project_id': 'abc', 'resource': 'Cluster', 'hard_limit': 5},
+            {'project_id': 'abc', 'resource': 'Node', 'hard_limit': 9},
+            {'project_id': 'bcd', 'resource': 'Cluster', 'hard_limit': 5},
+            {'project_id': 'cde', 'resource': 'Cluster', 'hard_limit': 5})]
+        desired = {('abc', 'Cluster'): 6, ('bcd', 'Cluster'): None,
+                   ('def', 'Cluster'): 1, ('efg', 'Cluster'): None}
+
+        self.assertEqual(
+            [('update', 'abc', 'Cluster', 5, 6),
+             ('delete', 'bcd', 'Cluster', 5, None),
+             ('create', 'def', 'Cluster', None, 1)],
+            quotas.plan_quota_changes(current, desired))
+        self.assertIn(('delete', 'abc', 'Node', 9, None),
+                      quotas.plan_quota_changes(current, desired,
+                                                prune=True))
+
+
+class QuotasApplyTest(testtools.TestCase):
+
+    def setUp(self):
+        super(QuotasApplyTest, self).setUp()
+        self.server = stub_server.StubServer(clusters=3, projects=3)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.client = client.Client(endpoint_override=self.server.endpoint,
+                                    auth_token=self.server.token)
+
+    def _limits(self):
+        return dict(((q['project_id'], q['resource']), q['hard_limit'])
+                    for q in self.server.quotas.items.values())
+
+    def test_apply(self):
+        desired = {('project-0', 'Cluster'): 20,
+                   ('project-1', 'Cluster'): 30,
+                   ('project-2', 'Cluster'): None,
+                   ('project-3', 'Cluster'): 7}
+
+        results = list(self.client.quotas.apply(desired, max_workers=3))
+
+        self.assertEqual([None] * 3, [r.error for r in results])
+        self.assertEqual(['create', 'delete', 'update'],
+                         sorted(r.item.action for r in results))
+        self.assertEqual({('project-0', 'Cluster'): 20,
+                          ('project-1', 'Cluster'): 30,
+                          ('project-3', 'Cluster'): 7}, self._limits())
+        self.assertEqual(1, self.server.requests[('GET', 'list_quotas',
+                                                  200)])
+        # Applying the same quotas again changes nothing.
+        self.assertEqual([], list(self.client.quotas.apply(desired)))
@@ -12,7 +12,10 @@
 
 import testtools
 
+from magnumclient.common import utils as magnum_utils
+from magnumclient import stub_server
 from magnumclient.tests import utils
+from magnumclient.v1 import client
 from magnumclient.v1 import stats
 
 
@@ -89,3 +92,77 @@ class StatsManagerTest(testtools.TestCase):
         expected_stats = {'clusters': 1,
                           'nodes': C2[nc] + C2[mc]}
         self.assertEqual(expected_stats, stats._info)
+
+
+class StatsListManyTest(testtools.TestCase):
+
+    def setUp(self):
+        super(StatsListManyTest, self).setUp()
+        self.server = stub_server.StubServer(clusters=7, projects=3)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.client = client.Client(endpoint_override=self.server.endpoint,
+                                    auth_token=self.server.token)
+
+    def test_list_many_all_projects(self):
+        results = list(self.client.stats.list_many(max_workers=2))
+
+        self.assertEqual(['project-0', 'project-1', 'project-2'],
+                         sorted(r.item for r in results))
+        self.assertEqual([None] * 3, [r.error for r in results])
+        # The stats are counted from the cluster listing.
+        self.assertEqual(0, self.server.requests[('GET', 'stats', 200)])
+        aggregate = stats.StatsAggregate().add_results(iter(results))
+        self.assertEqual(self.server._stats(query={})[1], aggregate.totals)
+        self.assertEqual([3, 2, 2], [row['clusters'] for row
+                                     in aggregate.top_projects()])
+
+    def test_list_many_given_projects(self):
+        results = list(self.client.stats.list_many(['project-1', 'none']))
+
+        self.assertEqual({'project-1': 2, 'none': 0},
+                         dict((r.item, r.result.clusters) for r in results))
+
+
+class StatsAggregateTest(testtools.TestCase):
+
+    def _results(self):
+        return [
+            magnum_utils.BulkResult('p1', {'clusters': 1, 'nodes': 5}, None),
+            magnum_utils.BulkResult('p2', {'clusters': 4, 'nodes': 8}, None),
+            magnum_utils.BulkResult('p3', None, Exception('boom')),
+            magnum_utils.BulkResult('p4', {'clusters': 2, 'nodes': 8}, None),
+            magnum_utils.BulkResult('p5', None, None),
+        ]
+
+    def test_aggregate(self):
+        aggregate = stats.StatsAggregate(top=2)
+        aggregate.add_results(self._results())
+
+        self.assertEqual(4, aggregate.projects)
+        self.assertEqual({'clusters': 7, 'nodes': 21}, aggregate.totals)
+        self.assertEqual(['p2', 'p4'], [row['project_id'] for row
+                                        in aggregate.top_projects()])
+        self.assertEqual([{'project_id': 'p3', 'error': 'boom'}],
+                         aggregate.failures)
+        self.assertEqual(['p2', 'p4'],
+                         [row['project_id']
+                          for row in aggregate.to_dict()['top']])
+
+    def test_aggregate_sort_key_and_all(self):
+        aggregate = stats.StatsAggregate(top=None, sort_key='clusters')
+        aggregate.add_results(self._results())
+
+        self.assertEqual(['p2', 'p4', 'p1', 'p5'],
+                         [row['project_id'] for row
+                          in aggregate.top_projects()])
+
+    def test_aggregate_totals_only(self):
+        aggregate = stats.StatsAggregate(top=0)
+        aggregate.add_results(self._results())
+
+        self.assertEqual([], aggregate.top_projects())
+        self.assertEqual({'clusters': 7, 'nodes': 21}, aggregate.totals)
+
+    def test_bad_sort_key(self):
+        self.assertRaises(ValueError, stats.StatsAggregate, sort_key='cpus')
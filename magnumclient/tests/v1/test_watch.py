@@ -0,0 +1,133 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import time
+
+import testtools
+
+from magnumclient import stub_server
+from magnumclient.v1 import client
+from magnumclient.v1 import watch
+
+Resource = collections.namedtuple(
+    'Resource', ['uuid', 'name', 'status', 'health_status', 'node_count'])
+
+
+def _resource(uuid, status='CREATE_COMPLETE', node_count=1):
+    return Resource(uuid, 'name-' + uuid, status, 'HEALTHY', node_count)
+
+
+class StateWatchTest(testtools.TestCase):
+
+    def setUp(self):
+        super(StateWatchTest, self).setUp()
+        self.listings = []
+        self.watch = watch.StateWatch(lambda: self.listings.pop(0),
+                                      fast_interval=2, slow_interval=30)
+
+    def _poll(self, *resources):
+        self.listings.append(list(resources))
+        return self.watch.poll()
+
+    def test_first_poll_adds_everything(self):
+        deltas = self._poll(_resource('a'), _resource('b'))
+
+        self.assertEqual([watch.ADDED, watch.ADDED],
+                         [d.action for d in deltas])
+        self.assertEqual({'status': 'CREATE_COMPLETE',
+                          'health_status': 'HEALTHY', 'node_count': 1},
+                         deltas[0].state)
+
+    def test_only_changes_reported(self):
+        self._poll(_resource('a'), _resource('b'), _resource('c'))
+
+        deltas = self._poll(_resource('a'),
+                            _resource('b', 'UPDATE_IN_PROGRESS', 3),
+                            _resource('d'))
+
+        self.assertEqual(
+            [watch.Delta(watch.CHANGED, 'b', 'name-b',
+                         {'status': 'UPDATE_IN_PROGRESS',
+                          'health_status': 'HEALTHY', 'node_count': 3},
+                         {'status': ('CREATE_COMPLETE', 'UPDATE_IN_PROGRESS'),
+                          'node_count': (1, 3)}),
+             watch.Delta(watch.ADDED, 'd', 'name-d',
+                         {'status': 'CREATE_COMPLETE',
+                          'health_status': 'HEALTHY', 'node_count': 1}, {}),
+             watch.Delta(watch.REMOVED, 'c', 'name-c',
+                         {'status': 'CREATE_COMPLETE',
+                          'health_status': 'HEALTHY', 'node_count': 1}, {})],
+            deltas)
+        self.assertEqual([], self._poll(_resource('a'),
+                                        _resource('b', 'UPDATE_IN_PROGRESS',
+                                                  3),
+                                        _resource('d')))
+
+    def test_adaptive_interval(self):
+        intervals = []
+        for status in ('CREATE_COMPLETE', 'CREATE_COMPLETE',
+                       'UPDATE_IN_PROGRESS', 'UPDATE_IN_PROGRESS',
+                       'UPDATE_COMPLETE', 'UPDATE_COMPLETE',
+                       'UPDATE_COMPLETE', 'UPDATE_COMPLETE',
+                       'UPDATE_COMPLETE'):
+            self._poll(_resource('a', status))
+            intervals.append(self.watch.interval)
+
+        self.assertEqual([4, 8, 2, 2, 2, 4, 8, 16, 30], intervals)
+
+    def test_watch(self):
+        sleeps = []
+        self.listings = [[_resource('a')], [_resource('a')],
+                         [_resource('a', 'DELETE_IN_PROGRESS')]]
+
+        batches = list(self.watch.watch(count=3, sleep=sleeps.append))
+
+        self.assertEqual([1, 0, 1], [len(b) for b in batches])
+        self.assertEqual([4, 8], sleeps)
+
+
+class WatchStubServerTest(testtools.TestCase):
+
+    def setUp(self):
+        super(WatchStubServerTest, self).setUp()
+        self.server = stub_server.StubServer(clusters=3, transition_time=0.2)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.client = client.Client(endpoint_override=self.server.endpoint,
+                                    auth_token=self.server.token)
+
+    def test_cluster_resize(self):
+        cluster_watch = self.client.clusters.watch(fast_interval=0.05)
+        self.assertEqual(3, len(cluster_watch.poll()))
+
+        self.client.clusters.resize('cluster-1', 5)
+        deltas = cluster_watch.poll()
+        self.assertEqual({'status': ('CREATE_COMPLETE',
+                                     'UPDATE_IN_PROGRESS')},
+                         deltas[0].changes)
+        self.assertEqual(0.05, cluster_watch.interval)
+
+        time.sleep(0.25)
+        deltas = cluster_watch.poll()
+        self.assertEqual(['cluster-1'], [d.name for d in deltas])
+        self.assertEqual('UPDATE_COMPLETE', deltas[0].state['status'])
+        self.assertEqual(5, deltas[0].state['node_count'])
+
+    def test_nodegroups(self):
+        nodegroup_watch = self.client.nodegroups.watch('cluster-0')
+
+        deltas = nodegroup_watch.poll()
+
+        self.assertEqual(('status', 'node_count'), nodegroup_watch.fields)
+        self.assertEqual(set([watch.ADDED]), set(d.action for d in deltas))
+        self.assertIn('default-worker', [d.name for d in deltas])
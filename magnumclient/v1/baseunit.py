@@ -34,6 +34,12 @@ class BaseTemplateManager(base.Manager):
     # template_name must be overridden by any derived class.
     # template_name should be a lowercase plural, e.g. "clusters"
     template_name = ''
+    # Attributes the list API filters on; list filters on other attributes
+    # are applied client-side.
+    server_filters = ()
+    # Attributes of the items of a summary listing; filtering on another
+    # one lists the details instead. None when unknown.
+    summary_fields = None
 
     @classmethod
     def _path(cls, id=None):
@@ -41,7 +47,7 @@ class BaseTemplateManager(base.Manager):
                '/%s' % id if id else '/v1/' + cls.template_name
 
     def list(self, limit=None, marker=None, sort_key=None,
-             sort_dir=None, detail=False):
+             sort_dir=None, detail=False, deadline=None, filters=None):
         """Retrieve a list of clusters.
 
         :param marker: Optional, the UUID of a cluster, eg the last
@@ -64,30 +70,55 @@ class BaseTemplateManager(base.Manager):
         :param detail: Optional, boolean whether to return detailed information
                        about clusters.
 
+        :param deadline: Optional, overall time budget in seconds for the
+                         whole listing, spanning every page request.
+
+        :param filters: Optional, dict mapping attributes to the value, or
+                        list of values, the clusters must have. The filters
+                        in ``server_filters`` are sent to the API, the
+                        others are applied as the pages arrive. Filtering
+                        on an attribute outside ``summary_fields`` lists
+                        the details.
+
         :returns: A list of clusters.
 
+        """
+        return list(self.list_iter(limit=limit, marker=marker,
+                                   sort_key=sort_key, sort_dir=sort_dir,
+                                   detail=detail, deadline=deadline,
+                                   filters=filters))
+
+    def list_iter(self, limit=None, marker=None, sort_key=None,
+                  sort_dir=None, detail=False, deadline=None, filters=None):
+        """Iterate over clusters, a page at a time.
+
+        Pages are requested as they are consumed. Takes the same arguments
+        as :meth:`list`: without a limit only the first page the API
+        returns is listed, a limit of 0 pages through every item.
         """
         if limit is not None:
             limit = int(limit)
 
-        filters = utils.common_filters(marker, limit, sort_key, sort_dir)
+        query_filters, client_filters = utils.split_filters(
+            filters, self.server_filters)
+        detail = detail or utils.filters_need_detail(client_filters,
+                                                     self.summary_fields)
+        query_filters = utils.common_filters(marker, limit, sort_key,
+                                             sort_dir) + query_filters
 
         path = ''
         if detail:
             path += 'detail'
-        if filters:
-            path += '?' + '&'.join(filters)
+        if query_filters:
+            path += '?' + '&'.join(query_filters)
 
-        if limit is None:
-            return self._list(self._path(path), self.__class__.template_name)
-        else:
-            return self._list_pagination(self._path(path),
-                                         self.__class__.template_name,
-                                         limit=limit)
+        return self._iter_list(self._path(path), self.__class__.template_name,
+                               limit=limit, deadline=deadline,
+                               filters=client_filters)
 
-    def get(self, id):
+    def get(self, id, deadline=None):
         try:
-            return self._list(self._path(id))[0]
+            return self._list(self._path(id), deadline=deadline)[0]
         except IndexError:
             return None
 
@@ -27,15 +27,35 @@ class Certificate(base.Resource):
 class CertificateManager(base.Manager):
     resource_class = Certificate
 
+    def __init__(self, api, ca_cache=None):
+        """Manage cluster certificates.
+
+        :param ca_cache: optional
+            :class:`magnumclient.common.cacache.CACache` serving cluster CA
+            certificates without downloading them again. It is invalidated
+            by :meth:`rotate_ca`.
+        """
+        super(CertificateManager, self).__init__(api)
+        self.ca_cache = ca_cache
+
     @staticmethod
     def _path(id=None):
         return '/v1/certificates/%s' % id if id else '/v1/certificates'
 
     def get(self, cluster_uuid):
+        if self.ca_cache is not None:
+            entry = self.ca_cache.get(cluster_uuid)
+            if entry is not None:
+                return self.resource_class(
+                    self, {'cluster_uuid': cluster_uuid, 'pem': entry['pem']},
+                    loaded=True)
         try:
-            return self._list(self._path(cluster_uuid))[0]
+            cert = self._list(self._path(cluster_uuid))[0]
         except IndexError:
             return None
+        if self.ca_cache is not None and getattr(cert, 'pem', None):
+            self.ca_cache.put(cluster_uuid, cert.pem)
+        return cert
 
     def create(self, **kwargs):
         new = {}
@@ -48,4 +68,7 @@ class CertificateManager(base.Manager):
         return self._create(self._path(), new)
 
     def rotate_ca(self, **kwargs):
-        return self._update(self._path(id=kwargs['cluster_uuid']))
+        result = self._update(self._path(id=kwargs['cluster_uuid']))
+        if self.ca_cache is not None:
+            self.ca_cache.invalidate(kwargs['cluster_uuid'])
+        return result
@@ -72,7 +72,9 @@ def _load_session_client(session=None, endpoint_override=None, username=None,
                          project_domain_name=None, auth_token=None,
                          timeout=None, service_type=None, service_name=None,
                          interface=None, region_name=None, api_version=None,
-                         **kwargs):
+                         connect_timeout=None, read_timeout=None,
+                         compress_threshold=None, single_flight=True,
+                         transport=None, pool_size=None, **kwargs):
     if not session:
         session = _load_session(
             username=username,
@@ -108,6 +110,12 @@ def _load_session_client(session=None, endpoint_override=None, username=None,
         session=session,
         endpoint_override=endpoint_override,
         api_version=api_version,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        compress_threshold=compress_threshold,
+        single_flight=single_flight,
+        transport=transport,
+        pool_size=pool_size,
     )
 
 
@@ -123,7 +131,41 @@ class Client(object):
                  user_domain_id=None, user_domain_name=None,
                  project_domain_id=None, project_domain_name=None,
                  auth_token=None, timeout=600, api_version=None,
-                 **kwargs):
+                 connect_timeout=None, read_timeout=None, ca_cache=None,
+                 compress_threshold=None, single_flight=True, transport=None,
+                 pool_size=None, **kwargs):
+        """Create a client for the Magnum v1 API.
+
+        ``timeout`` is the socket timeout used for both connecting and
+        reading. ``connect_timeout`` and ``read_timeout`` override it for
+        the respective phase, so that an unreachable endpoint fails fast
+        while slow list responses keep a generous budget. An overall
+        per-operation budget can additionally be given to manager calls
+        through their ``deadline`` argument.
+
+        ``ca_cache`` is an optional
+        :class:`magnumclient.common.cacache.CACache` used by
+        ``certificates.get`` to avoid downloading cluster CAs again.
+
+        Responses are always requested compressed. Request bodies of at
+        least ``compress_threshold`` bytes are sent gzip compressed, which
+        the API server must accept; by default they are not compressed.
+        ``http_client.transfer_stats`` counts the bytes sent and received.
+
+        Identical GET requests made by several threads sharing the client
+        at the same time are sent once, each thread getting its own copy of
+        the response body; ``http_client.single_flight`` counts how many
+        were coalesced. ``single_flight=False`` sends every request.
+
+        ``transport`` picks the HTTP library of a client created with
+        ``endpoint_override`` and ``auth_token``: ``httplib`` (default),
+        ``requests``, ``urllib3`` or ``httpx``, see
+        :mod:`magnumclient.common.transport`. The pooling ones reuse up to
+        ``pool_size`` connections across the requests of concurrent
+        commands, which grow the pool to their parallelism. Clients using a
+        session send requests through keystoneauth, with ``requests``
+        (default), ``urllib3`` or ``httpx``.
+        """
 
         if endpoint_type:
             interface = endpoint_type
@@ -146,7 +188,13 @@ class Client(object):
                 token=auth_token,
                 api_version=api_version,
                 timeout=timeout,
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
                 insecure=insecure,
+                compress_threshold=compress_threshold,
+                single_flight=single_flight,
+                transport=transport,
+                pool_size=pool_size,
                 **kwargs
             )
         else:
@@ -171,11 +219,18 @@ class Client(object):
                 interface=interface,
                 region_name=region_name,
                 api_version=api_version,
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+                compress_threshold=compress_threshold,
+                single_flight=single_flight,
+                transport=transport,
+                pool_size=pool_size,
                 **kwargs
             )
 
         self.clusters = clusters.ClusterManager(self.http_client)
-        self.certificates = certificates.CertificateManager(self.http_client)
+        self.certificates = certificates.CertificateManager(
+            self.http_client, ca_cache=ca_cache)
         self.cluster_templates = \
             cluster_templates.ClusterTemplateManager(self.http_client)
         self.mservices = mservices.MServiceManager(self.http_client)
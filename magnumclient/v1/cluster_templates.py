@@ -62,3 +62,4 @@ class ClusterTemplate(basemodels.BaseModel):
 class ClusterTemplateManager(basemodels.BaseModelManager):
     api_name = "clustertemplates"
     resource_class = ClusterTemplate
+    summary_fields = ('uuid', 'name')
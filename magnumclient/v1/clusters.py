@@ -12,7 +12,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import time
+
+from oslo_utils import timeutils
+
+from magnumclient.common import httpclient
+from magnumclient.common import utils
+from magnumclient import exceptions
 from magnumclient.v1 import baseunit
+from magnumclient.v1 import watch
 
 
 CLUSTER_ATTRIBUTES = [
@@ -65,14 +74,128 @@ CREATION_ATTRIBUTES.append('floating_ip_enabled')
 CREATION_ATTRIBUTES.append('merge_labels')
 CREATION_ATTRIBUTES.append('master_lb_enabled')
 
+IN_PROGRESS_SUFFIX = watch.IN_PROGRESS_SUFFIX
+
+SYNC_ADDED = 'added'
+SYNC_CHANGED = 'changed'
+SYNC_REMOVED = 'removed'
+
+SyncEvent = collections.namedtuple('SyncEvent', ['action', 'uuid', 'cluster'])
+
 
 class Cluster(baseunit.BaseTemplate):
     template_name = "Clusters"
 
 
+def _deleted(id):
+    return exceptions.NotFound("Cluster %s was deleted" % id)
+
+
+def _timestamp(value):
+    return timeutils.normalize_time(timeutils.parse_isotime(value))
+
+
+class ClusterSync(object):
+    """Incrementally mirror the clusters visible to a project.
+
+    Keeps a snapshot of the detailed cluster list keyed by uuid. Each call
+    to :meth:`sync` only pages through clusters updated or created since
+    the last watermark, newest first, and stops as soon as it reaches older
+    rows. Deletions cannot be seen that way, so a full listing is done on
+    the first sync and then every ``full_sync_interval`` seconds.
+
+    Use :meth:`ClusterManager.incremental_sync` to create one.
+    """
+
+    def __init__(self, manager, full_sync_interval=3600, page_size=None):
+        self.manager = manager
+        self.full_sync_interval = full_sync_interval
+        self.page_size = page_size
+        self.clusters = {}
+        self.watermark = None
+        self._last_full_sync = None
+
+    def _full_sync_due(self):
+        if self._last_full_sync is None or self.watermark is None:
+            return True
+        if self.full_sync_interval is None:
+            return False
+        elapsed = time.monotonic() - self._last_full_sync
+        return elapsed >= self.full_sync_interval
+
+    def _changed_since(self, sort_key, watermark):
+        filters = utils.common_filters(limit=self.page_size,
+                                       sort_key=sort_key, sort_dir='desc')
+        path = self.manager._path('detail?' + '&'.join(filters))
+        for cluster in self.manager._iter_pagination(
+                path, self.manager.template_name):
+            value = getattr(cluster, sort_key, None)
+            if value is None:
+                # Depending on the database, never updated clusters sort
+                # first or last; the created_at pass picks them up.
+                continue
+            if _timestamp(value) < watermark:
+                return
+            yield self.manager._normalize(cluster)
+
+    def _apply(self, cluster, events):
+        previous = self.clusters.get(cluster.uuid)
+        if previous is None:
+            events.append(SyncEvent(SYNC_ADDED, cluster.uuid, cluster))
+        elif previous.to_dict() != cluster.to_dict():
+            events.append(SyncEvent(SYNC_CHANGED, cluster.uuid, cluster))
+        self.clusters[cluster.uuid] = cluster
+        for key in ('updated_at', 'created_at'):
+            value = getattr(cluster, key, None)
+            if value is not None:
+                stamp = _timestamp(value)
+                if self.watermark is None or stamp > self.watermark:
+                    self.watermark = stamp
+
+    def restore(self, clusters, watermark, full_sync_age=0):
+        """Resume from a snapshot kept by an earlier process.
+
+        :param clusters: the clusters of the snapshot.
+        :param watermark: its watermark, a naive UTC datetime.
+        :param full_sync_age: seconds since its last full reconciliation.
+        """
+        self.clusters = dict((c.uuid, c) for c in clusters)
+        self.watermark = watermark
+        self._last_full_sync = time.monotonic() - full_sync_age
+
+    def sync(self, full=False):
+        """Bring the snapshot up to date.
+
+        :param full: force a full reconciliation.
+        :returns: a list of :class:`SyncEvent` ``(action, uuid, cluster)``
+                  tuples, where action is one of 'added', 'changed' or
+                  'removed'. For removals, cluster is its last known state.
+        """
+        events = []
+        if full or self._full_sync_due():
+            self._last_full_sync = time.monotonic()
+            seen = set()
+            for cluster in self.manager.list(limit=0, detail=True):
+                seen.add(cluster.uuid)
+                self._apply(cluster, events)
+            for uuid in set(self.clusters) - seen:
+                events.append(SyncEvent(SYNC_REMOVED, uuid,
+                                        self.clusters.pop(uuid)))
+            return events
+
+        watermark = self.watermark
+        for sort_key in ('updated_at', 'created_at'):
+            for cluster in self._changed_since(sort_key, watermark):
+                self._apply(cluster, events)
+        return events
+
+
 class ClusterManager(baseunit.BaseTemplateManager):
     resource_class = Cluster
     template_name = 'clusters'
+    summary_fields = ('uuid', 'name', 'node_count', 'master_count', 'status',
+                      'health_status', 'cluster_template_id',
+                      'create_timeout', 'stack_id')
 
     @staticmethod
     def _normalize(cluster):
@@ -83,12 +206,120 @@ class ClusterManager(baseunit.BaseTemplateManager):
             cluster._info['cluster_id'] = stack_id
         return cluster
 
-    def get(self, id):
-        cluster = super().get(id)
+    def get(self, id, deadline=None):
+        cluster = super().get(id, deadline=deadline)
         return self._normalize(cluster) if cluster else None
 
-    def list(self, **kwargs):
-        return [self._normalize(c) for c in super().list(**kwargs)]
+    def list_iter(self, **kwargs):
+        return (self._normalize(c) for c in super().list_iter(**kwargs))
+
+    def incremental_sync(self, full_sync_interval=3600, page_size=None):
+        """Return a :class:`ClusterSync` tracking the clusters list.
+
+        :param full_sync_interval: seconds between full reconciliations,
+                                   which are needed to detect deletions.
+                                   None only does one, on the first sync.
+        :param page_size: optional number of clusters per page request.
+        """
+        return ClusterSync(self, full_sync_interval=full_sync_interval,
+                           page_size=page_size)
+
+    def watch(self, fast_interval=watch.DEFAULT_FAST_INTERVAL,
+              slow_interval=watch.DEFAULT_SLOW_INTERVAL):
+        """Return a :class:`magnumclient.v1.watch.StateWatch` of clusters.
+
+        Every poll lists all the clusters and reports the changes of their
+        status, health_status and node_count.
+        """
+        return watch.StateWatch(lambda: self.list_iter(limit=0),
+                                fields=watch.CLUSTER_FIELDS,
+                                fast_interval=fast_interval,
+                                slow_interval=slow_interval)
+
+    def create_many(self, specs, max_workers=utils.DEFAULT_MAX_WORKERS,
+                    wait=False, poll_interval=10):
+        """Create several clusters concurrently.
+
+        Every spec is validated against CREATION_ATTRIBUTES before any
+        request is sent, so a typo in one entry cannot leave the batch half
+        created.
+
+        :param specs: iterable of dicts of cluster creation attributes.
+        :param max_workers: maximum number of create requests in flight.
+        :param wait: if True, each result is only reported once the cluster
+                     status is no longer *_IN_PROGRESS.
+        :param poll_interval: seconds between status polls when waiting.
+        :returns: a generator of :class:`magnumclient.common.utils.BulkResult`
+                  ``(spec, cluster, error)`` tuples in completion order. A
+                  cluster deleted while waiting is reported with a NotFound
+                  error.
+        """
+        specs = list(specs)
+        for index, spec in enumerate(specs):
+            if not isinstance(spec, dict):
+                raise exceptions.InvalidAttribute(
+                    "Entry %d must be a mapping of cluster attributes" % index)
+            for key in spec:
+                if key not in CREATION_ATTRIBUTES:
+                    raise exceptions.InvalidAttribute(
+                        "Entry %d: Key must be in %s" %
+                        (index, ",".join(CREATION_ATTRIBUTES)))
+        results = utils.run_concurrently(lambda spec: self.create(**spec),
+                                         specs, max_workers=max_workers,
+                                         http_client=self.api)
+        if not wait:
+            return results
+        return self._wait_for_many(results, max_workers, poll_interval)
+
+    def _wait_for_many(self, results, max_workers, poll_interval):
+        # Every create is submitted before any waiting starts, then all the
+        # accepted clusters are polled together once per interval, so slow
+        # builds never hold back the remaining submissions.
+        pending = []
+        for result in results:
+            if result.error is not None:
+                yield result
+            else:
+                pending.append(result)
+
+        while pending:
+            time.sleep(poll_interval)
+            polls = utils.run_concurrently(
+                lambda result: self.get(result.result.uuid), pending,
+                max_workers=max_workers, http_client=self.api)
+            pending = []
+            for poll in polls:
+                if poll.error is not None:
+                    yield utils.BulkResult(poll.item.item, None, poll.error)
+                elif poll.result is None:
+                    yield utils.BulkResult(poll.item.item, None,
+                                           _deleted(poll.item.result.uuid))
+                elif (poll.result.status or '').endswith(IN_PROGRESS_SUFFIX):
+                    pending.append(poll.item)
+                else:
+                    yield utils.BulkResult(poll.item.item, poll.result, None)
+
+    def wait_for_completion(self, id, poll_interval=10, timeout=None):
+        """Poll a cluster until its status is no longer *_IN_PROGRESS.
+
+        :param id: UUID or name of the cluster.
+        :param poll_interval: seconds to sleep between polls.
+        :param timeout: optional overall budget in seconds, after which
+                        DeadlineExceeded is raised.
+        :returns: the cluster in its settled state.
+        :raises NotFound: if the cluster is deleted while waiting.
+        """
+        deadline = httpclient.Deadline.coerce(timeout)
+        while True:
+            cluster = self.get(id, deadline=deadline)
+            if cluster is None:
+                raise _deleted(id)
+            if not (cluster.status or '').endswith(IN_PROGRESS_SUFFIX):
+                return cluster
+            interval = poll_interval
+            if deadline is not None:
+                interval = deadline.cap(poll_interval)
+            time.sleep(interval)
 
     def resize(self, cluster_uuid, node_count,
                nodes_to_remove=[], nodegroup=None):
@@ -0,0 +1,424 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Rolling upgrade of many clusters to a new cluster template.
+
+The clusters are split into waves. The clusters of a wave are upgraded a
+few at a time, and the next wave only starts once every cluster of the
+current one has settled and the wave passed its health gate. The plan and
+the outcome of every cluster are kept in a local JSON state file, so an
+interrupted or paused upgrade continues where it stopped when run again
+with the same file.
+"""
+
+import collections
+from concurrent import futures
+import datetime
+import os
+import threading
+import time
+
+from oslo_serialization import jsonutils
+
+from magnumclient.common import httpclient
+from magnumclient.common import utils
+from magnumclient import exceptions
+from magnumclient.v1 import watch
+
+# Cluster states in the state file.
+PENDING = 'pending'
+UPGRADING = 'upgrading'
+UPGRADED = 'upgraded'
+FAILED = 'failed'
+
+# Event kinds.
+STARTED = 'started'
+WAVE_STARTED = 'wave_started'
+WAVE_PASSED = 'wave_passed'
+PAUSED = 'paused'
+FINISHED = 'finished'
+
+DEFAULT_WAVE_SIZE = 10
+DEFAULT_CONCURRENCY = 2
+DEFAULT_POLL_INTERVAL = 10
+# Polls of a cluster that looks settled but was never seen upgrading, after
+# which its upgrade counts as not started.
+START_POLLS = 3
+
+FleetEvent = collections.namedtuple(
+    'FleetEvent', ['kind', 'wave', 'uuid', 'entry', 'progress'])
+FleetEvent.__doc__ = """Something that happened during a fleet upgrade.
+
+``kind`` is 'upgraded' or 'failed' when a cluster settled, with its
+``uuid`` and state file ``entry``, or one of 'started', 'wave_started',
+'wave_passed', 'paused' and 'finished'. ``wave`` counts from 1, and
+``progress`` is :meth:`FleetUpgrade.progress` at that time.
+"""
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+class FleetUpgrade(object):
+    """Upgrade a fleet of clusters to a cluster template in waves.
+
+    :param client: a :class:`magnumclient.v1.client.Client`.
+    :param cluster_template: ID or name of the cluster template.
+    :param state_path: the JSON state file. It is created with the plan on
+                       the first run, and its plan is used on later ones.
+    :param clusters: IDs or names of the clusters to upgrade, in order. By
+                     default every cluster not using the template yet,
+                     ordered by name.
+    :param wave_size: number of clusters per wave.
+    :param concurrency: number of clusters upgrading at the same time.
+    :param max_batch_size: passed to every cluster upgrade request.
+    :param nodegroup: upgrade only this nodegroup of every cluster.
+    :param max_failures: number of failed clusters a wave may have and
+                         still pass its health gate.
+    :param require_healthy: if True a cluster must be HEALTHY to pass,
+                            otherwise only UNHEALTHY fails, as clusters
+                            without health monitoring report UNKNOWN.
+    :param poll_interval: seconds between status polls of a cluster.
+    :param timeout: optional seconds an upgrading cluster may take before
+                    it counts as failed.
+    :param retry_failed: upgrade again the clusters that failed in an
+                         earlier run.
+
+    Creating ``<state_path>.pause`` pauses the upgrade: no more clusters
+    are started, and :meth:`run` stops once the upgrading ones settled.
+    """
+
+    def __init__(self, client, cluster_template, state_path, clusters=None,
+                 wave_size=DEFAULT_WAVE_SIZE,
+                 concurrency=DEFAULT_CONCURRENCY, max_batch_size=1,
+                 nodegroup=None, max_failures=0, require_healthy=False,
+                 poll_interval=DEFAULT_POLL_INTERVAL, timeout=None,
+                 retry_failed=False):
+        if wave_size < 1 or concurrency < 1:
+            raise exceptions.ValidationError(
+                "wave_size and concurrency must be at least 1")
+        self.client = client
+        self.cluster_template = cluster_template
+        self.state_path = state_path
+        self.pause_path = state_path + '.pause'
+        self.clusters = clusters
+        self.wave_size = wave_size
+        self.concurrency = concurrency
+        self.max_batch_size = max_batch_size
+        self.nodegroup = nodegroup
+        self.max_failures = max_failures
+        self.require_healthy = require_healthy
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.retry_failed = retry_failed
+        self.state = None
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._started_at = None
+        self._settled = 0
+
+    # State file
+
+    def _save(self):
+        with self._save_lock:
+            with self._lock:
+                self.state['updated_at'] = _now()
+                data = jsonutils.dumps(self.state, indent=2, sort_keys=True)
+            tmp_path = '%s.%d.tmp' % (self.state_path, os.getpid())
+            with open(tmp_path, 'w') as f:
+                f.write(data)
+            os.replace(tmp_path, self.state_path)
+
+    def _resolve_clusters(self):
+        if self.clusters is None:
+            clusters = sorted(self.client.clusters.list(limit=0),
+                              key=lambda c: c.name or c.uuid)
+        else:
+            results = dict(
+                (r.item, r) for r in utils.run_concurrently(
+                    self.client.clusters.get, self.clusters,
+                    http_client=self.client.http_client))
+            clusters = []
+            for ident in self.clusters:
+                if results[ident].error is not None:
+                    raise results[ident].error
+                clusters.append(results[ident].result)
+        return clusters
+
+    def plan(self):
+        """Load the state file, or create it with a new plan.
+
+        :returns: the state, a dict holding the plan in ``waves``, lists of
+                  cluster UUIDs, and the state of every cluster in
+                  ``clusters``.
+        :raises ValidationError: if the state file is for another cluster
+                                 template.
+        """
+        if self.state is not None:
+            return self.state
+        template = self.client.cluster_templates.get(self.cluster_template)
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                state = jsonutils.loads(f.read())
+            if state['cluster_template_id'] != template.uuid:
+                raise exceptions.ValidationError(
+                    "%s is the state of an upgrade to cluster template %s"
+                    % (self.state_path, state['cluster_template_id']))
+            self.state = state
+            return state
+
+        # Without a nodegroup, clusters already using the template have
+        # nothing to upgrade.
+        clusters = [c for c in self._resolve_clusters()
+                    if self.nodegroup or
+                    c.cluster_template_id != template.uuid]
+        uuids = [c.uuid for c in clusters]
+        self.state = {
+            'cluster_template_id': template.uuid,
+            'nodegroup': self.nodegroup,
+            'created_at': _now(),
+            'paused': None,
+            'waves_passed': 0,
+            'waves': [uuids[i:i + self.wave_size]
+                      for i in range(0, len(uuids), self.wave_size)],
+            'clusters': dict(
+                (c.uuid, {'name': c.name, 'state': PENDING,
+                          'status': c.status,
+                          'health_status': getattr(c, 'health_status',
+                                                   None),
+                          'error': None, 'started_at': None,
+                          'finished_at': None, 'upgrade_seen': False})
+                for c in clusters),
+        }
+        self._save()
+        return self.state
+
+    # Progress
+
+    def progress(self):
+        """Return counts, throughput and the estimated time left.
+
+        Throughput and ETA are based on the clusters that settled during
+        this run, and are None until one did.
+        """
+        with self._lock:
+            counts = collections.Counter(
+                entry['state'] for entry in self.state['clusters'].values())
+            settled = self._settled
+        total = len(self.state['clusters'])
+        remaining = counts[PENDING] + counts[UPGRADING]
+        elapsed = (time.monotonic() - self._started_at
+                   if self._started_at is not None else 0.0)
+        rate = settled / elapsed * 3600 if settled and elapsed else None
+        eta = remaining / rate * 3600 if rate else None
+        return {'total': total, 'upgraded': counts[UPGRADED],
+                'failed': counts[FAILED], 'remaining': remaining,
+                'elapsed': elapsed, 'clusters_per_hour': rate,
+                'eta': eta}
+
+    # Upgrade
+
+    def pause_requested(self):
+        return os.path.exists(self.pause_path)
+
+    def _update(self, uuid, **values):
+        with self._lock:
+            self.state['clusters'][uuid].update(values)
+            entry = dict(self.state['clusters'][uuid])
+        self._save()
+        return entry
+
+    def _failed(self, cluster):
+        status = cluster.status or ''
+        if not status.endswith('_COMPLETE'):
+            return 'cluster status is %s' % status
+        health = getattr(cluster, 'health_status', None)
+        if health == 'UNHEALTHY' or (self.require_healthy and
+                                     health != 'HEALTHY'):
+            return 'cluster health_status is %s' % health
+        return None
+
+    def _started(self, uuid, cluster):
+        # Without a nodegroup a cluster on the template was upgraded, even
+        # if it was never seen upgrading.
+        return (self.state['clusters'][uuid].get('upgrade_seen') or
+                (not self.state['nodegroup'] and
+                 cluster.cluster_template_id ==
+                 self.state['cluster_template_id']))
+
+    def _settle(self, uuid, cluster):
+        error = None
+        if not self._started(uuid, cluster):
+            error = 'the upgrade did not start, cluster status is %s' % (
+                cluster.status)
+        error = error or self._failed(cluster)
+        with self._lock:
+            self._settled += 1
+        return self._update(uuid, state=FAILED if error else UPGRADED,
+                            status=cluster.status,
+                            health_status=getattr(cluster, 'health_status',
+                                                  None),
+                            error=error, finished_at=_now())
+
+    def _wait(self, uuid, deadline):
+        # Like ClusterManager.wait_for_completion, but returns None as soon
+        # as the run is interrupted. Magnum starts an upgrade
+        # asynchronously, so a cluster may still report its previous
+        # status at first: one that looks settled is polled again until it
+        # was seen upgrading, or for START_POLLS polls.
+        polls = 0
+        while not self._stop.wait(deadline.cap(self.poll_interval)
+                                  if deadline else self.poll_interval):
+            cluster = self.client.clusters.get(uuid, deadline=deadline)
+            if cluster is None:
+                raise exceptions.NotFound("Cluster %s was deleted" % uuid)
+            if (cluster.status or '').endswith(watch.IN_PROGRESS_SUFFIX):
+                if not self.state['clusters'][uuid].get('upgrade_seen'):
+                    self._update(uuid, upgrade_seen=True)
+                continue
+            polls += 1
+            if self._started(uuid, cluster) or polls >= START_POLLS:
+                return cluster
+        return None
+
+    def _upgrade_one(self, uuid):
+        """Upgrade a cluster and wait for it, returning its state entry.
+
+        None is returned if the run was interrupted or paused first.
+        """
+        entry = self.state['clusters'][uuid]
+        if entry['state'] != UPGRADING:
+            if self._stop.is_set() or self.pause_requested():
+                return None
+            entry = self._update(uuid, state=UPGRADING, error=None,
+                                 started_at=_now(), finished_at=None,
+                                 upgrade_seen=False)
+            try:
+                self.client.clusters.upgrade(
+                    uuid, self.state['cluster_template_id'],
+                    self.max_batch_size, self.state['nodegroup'])
+            except Exception as e:
+                with self._lock:
+                    self._settled += 1
+                return self._update(uuid, state=FAILED, error=str(e),
+                                    finished_at=_now())
+        try:
+            cluster = self._wait(
+                uuid, httpclient.Deadline.coerce(self.timeout))
+        except Exception as e:
+            with self._lock:
+                self._settled += 1
+            return self._update(uuid, state=FAILED, error=str(e),
+                                finished_at=_now())
+        if cluster is None:
+            return None
+        return self._settle(uuid, cluster)
+
+    def _todo(self, wave):
+        states = [UPGRADING, PENDING]
+        if self.retry_failed:
+            states.append(FAILED)
+        return [uuid for uuid in wave
+                if self.state['clusters'][uuid]['state'] in states]
+
+    def _gate(self, wave):
+        """Check a wave, returning the number of its failed clusters.
+
+        The upgraded clusters are fetched again, since their health may
+        have changed while the rest of the wave was upgrading.
+        """
+        upgraded = [uuid for uuid in wave
+                    if self.state['clusters'][uuid]['state'] == UPGRADED]
+        for result in utils.run_concurrently(
+                self.client.clusters.get, upgraded,
+                max_workers=self.concurrency,
+                http_client=self.client.http_client):
+            error = (str(result.error) if result.error is not None
+                     else self._failed(result.result))
+            if error is not None:
+                self._update(result.item, state=FAILED,
+                             error='health gate: %s' % error)
+        return sum(1 for uuid in wave
+                   if self.state['clusters'][uuid]['state'] == FAILED)
+
+    def _event(self, kind, wave, uuid=None, entry=None):
+        return FleetEvent(kind, wave, uuid, entry, self.progress())
+
+    def _pause(self, wave, reason):
+        with self._lock:
+            self.state['paused'] = reason
+        self._save()
+        return self._event(PAUSED, wave, entry={'reason': reason})
+
+    def run(self):
+        """Run or continue the upgrade, yielding FleetEvents.
+
+        The run ends with a 'finished' event once every wave passed, or a
+        'paused' event, whose entry holds the ``reason``, when a wave
+        failed its health gate or a pause was requested. If the caller
+        stops iterating, or on KeyboardInterrupt, the clusters being
+        upgraded are left ``upgrading`` and are waited for on the next
+        run.
+        """
+        self.plan()
+        self._stop.clear()
+        self._started_at = time.monotonic()
+        self._settled = 0
+        with self._lock:
+            self.state['paused'] = None
+        self._save()
+        yield self._event(STARTED, None)
+
+        for number, wave in enumerate(self.state['waves'], 1):
+            todo = self._todo(wave)
+            if number <= self.state['waves_passed'] and not todo:
+                continue
+            if todo:
+                if self.pause_requested():
+                    yield self._pause(number, 'pause requested')
+                    return
+                yield self._event(WAVE_STARTED, number)
+                executor = futures.ThreadPoolExecutor(
+                    max_workers=min(self.concurrency, len(todo)))
+                try:
+                    pending = dict(
+                        (executor.submit(self._upgrade_one, uuid), uuid)
+                        for uuid in todo)
+                    for future in futures.as_completed(pending):
+                        entry = future.result()
+                        if entry is not None:
+                            yield self._event(entry['state'], number,
+                                              pending[future], entry)
+                except BaseException:
+                    self._stop.set()
+                    raise
+                finally:
+                    executor.shutdown(wait=True, cancel_futures=True)
+                if self._todo(wave) and self.pause_requested():
+                    yield self._pause(number, 'pause requested')
+                    return
+
+            failed = self._gate(wave)
+            if failed > self.max_failures:
+                yield self._pause(
+                    number, 'wave %d failed its health gate: %d failed '
+                    'clusters, at most %d allowed'
+                    % (number, failed, self.max_failures))
+                return
+            with self._lock:
+                self.state['waves_passed'] = max(number,
+                                                 self.state['waves_passed'])
+            self._save()
+            yield self._event(WAVE_PASSED, number)
+        yield self._event(FINISHED, None)
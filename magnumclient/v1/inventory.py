@@ -0,0 +1,166 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Fleet inventory snapshots.
+
+An inventory is a flat sequence of records, one per cluster, nodegroup,
+cluster template, quota and project stats entry. Every record is a dict
+holding the resource attributes plus a ``record_type`` key, so a snapshot can
+be written as JSON Lines or, when pyarrow is installed, as one Parquet file
+per record type.
+"""
+
+import os
+
+from oslo_serialization import jsonutils
+from oslo_utils import importutils
+
+from magnumclient.common import utils
+from magnumclient import exceptions
+
+pyarrow = importutils.try_import('pyarrow')
+parquet = importutils.try_import('pyarrow.parquet')
+
+RECORD_TYPES = ('cluster', 'nodegroup', 'cluster_template', 'quota', 'stats',
+                'error')
+
+
+def _record(record_type, info, **extra):
+    record = {'record_type': record_type}
+    record.update(info)
+    record.update(extra)
+    return record
+
+
+def collect(client, all_projects=False,
+            max_workers=utils.DEFAULT_MAX_WORKERS):
+    """Gather a fleet inventory snapshot.
+
+    Clusters are listed first; nodegroups (per cluster), cluster templates
+    (fetched once per distinct template), stats (once per project) and
+    quotas are then fetched concurrently. A fetch that fails produces an
+    ``error`` record instead of aborting the snapshot.
+
+    :param client: a :class:`magnumclient.v1.client.Client`.
+    :param all_projects: list quotas of all projects (admin only).
+    :param max_workers: maximum number of API calls in flight.
+    :returns: a generator of inventory records.
+    """
+    clusters = client.clusters.list(limit=0, detail=True)
+    template_ids = set()
+    project_ids = set()
+    for cluster in clusters:
+        info = cluster.to_dict()
+        template_ids.add(info.get('cluster_template_id'))
+        project_ids.add(info.get('project_id'))
+        yield _record('cluster', info)
+    template_ids.discard(None)
+    project_ids.discard(None)
+
+    def _fetch(task):
+        kind, key = task
+        if kind == 'nodegroup':
+            nodegroups = client.nodegroups.list(key, limit=0, detail=True)
+            return [_record(kind, ng.to_dict(), cluster_id=key)
+                    for ng in nodegroups]
+        if kind == 'cluster_template':
+            return [_record(kind, client.cluster_templates.get(key)
+                            .to_dict())]
+        if kind == 'stats':
+            stats = client.stats.list(project_id=key)
+            info = stats.to_dict() if stats is not None else {}
+            return [_record(kind, info, project_id=key)]
+        return [_record(kind, quota.to_dict())
+                for quota in client.quotas.list(limit=0,
+                                                all_tenants=all_projects)]
+
+    tasks = [('nodegroup', c.uuid) for c in clusters]
+    tasks.extend(('cluster_template', t) for t in sorted(template_ids))
+    tasks.extend(('stats', p) for p in sorted(project_ids))
+    tasks.append(('quota', None))
+
+    for result in utils.run_concurrently(_fetch, tasks,
+                                         max_workers=max_workers,
+                                         http_client=client.http_client):
+        if result.error is not None:
+            kind, key = result.item
+            yield _record('error', {}, resource=kind, id=key,
+                          error=str(result.error))
+            continue
+        for record in result.result:
+            yield record
+
+
+def write_jsonl(records, stream):
+    """Write inventory records to a text stream as JSON Lines.
+
+    :returns: the number of records written.
+    """
+    count = 0
+    for record in records:
+        stream.write(jsonutils.dumps(record, sort_keys=True))
+        stream.write('\n')
+        count += 1
+    return count
+
+
+def _flatten(record):
+    # Parquet needs a stable schema per column; nested labels, addresses and
+    # the like vary per row, so they are stored as JSON strings.
+    return dict((k, jsonutils.dumps(v) if isinstance(v, (dict, list)) else v)
+                for k, v in record.items())
+
+
+def _columns(rows):
+    """Return the rows as a dict of columns, for Table.from_pydict.
+
+    Every key of any row is a column, None where a row lacks it. A column
+    whose values have different types, other than integers and floats,
+    holds their JSON text instead, as Parquet columns have a single type.
+    """
+    names = []
+    for row in rows:
+        names.extend(k for k in row if k not in names)
+    columns = {}
+    for name in names:
+        values = [row.get(name) for row in rows]
+        types = set(type(v) for v in values if v is not None)
+        if len(types) > 1 and not types <= {int, float}:
+            values = [v if v is None or isinstance(v, str)
+                      else jsonutils.dumps(v) for v in values]
+        columns[name] = values
+    return columns
+
+
+def write_parquet(records, directory):
+    """Write inventory records as one Parquet file per record type.
+
+    :param directory: output directory, created if missing.
+    :returns: a dict mapping each written file path to its row count.
+    :raises CommandError: if pyarrow is not installed.
+    """
+    if pyarrow is None or parquet is None:
+        raise exceptions.CommandError(
+            "Writing Parquet requires the pyarrow package.")
+    by_type = dict((record_type, []) for record_type in RECORD_TYPES)
+    for record in records:
+        by_type[record['record_type']].append(_flatten(record))
+
+    os.makedirs(directory, exist_ok=True)
+    written = {}
+    for record_type, rows in by_type.items():
+        if not rows:
+            continue
+        path = os.path.join(directory, '%s.parquet' % record_type)
+        parquet.write_table(pyarrow.Table.from_pydict(_columns(rows)), path)
+        written[path] = len(rows)
+    return written
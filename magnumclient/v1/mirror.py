@@ -0,0 +1,379 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""A local SQLite mirror of clusters, templates, nodegroups and quotas.
+
+A :class:`Mirror` copies the resources visible to a client into indexed
+tables, so that questions such as "which clusters of template X are in
+CREATE_FAILED" are answered locally, without listing everything again.
+
+Clusters are refreshed incrementally through
+:class:`magnumclient.v1.clusters.ClusterSync`, whose watermark is kept in
+the database between runs, and only the nodegroups of the clusters that
+changed are listed again. Cluster templates and quotas are few and are
+listed in full on every refresh. The time of the last refresh of every
+table is kept too, and returned with every query result.
+"""
+
+import collections
+import os
+import re
+import sqlite3
+import time
+
+from oslo_serialization import jsonutils
+from oslo_utils import timeutils
+
+from magnumclient.common import utils
+from magnumclient import exceptions
+from magnumclient.v1 import clusters as clusters_lib
+
+DEFAULT_PATH = os.path.join('~', '.cache', 'magnumclient', 'mirror.sqlite')
+
+# Table -> (primary key, indexed columns). Every other attribute is kept in
+# the JSON "data" column, where queries can still reach it.
+TABLES = collections.OrderedDict([
+    ('clusters', ('uuid', ('name', 'project_id', 'cluster_template_id',
+                           'status', 'health_status', 'node_count',
+                           'master_count', 'created_at', 'updated_at'))),
+    ('cluster_templates', ('uuid', ('name', 'coe', 'project_id', 'public',
+                                    'created_at', 'updated_at'))),
+    ('nodegroups', ('uuid', ('name', 'cluster_id', 'role', 'status',
+                             'node_count', 'is_default', 'created_at',
+                             'updated_at'))),
+    ('quotas', ('id', ('project_id', 'resource', 'hard_limit'))),
+])
+
+# (table, joined table) -> (column of table, column of joined table).
+JOINS = {
+    ('clusters', 'cluster_templates'): ('cluster_template_id', 'uuid'),
+    ('nodegroups', 'clusters'): ('cluster_id', 'uuid'),
+    ('quotas', 'clusters'): ('project_id', 'project_id'),
+}
+
+# Columns holding numbers or booleans; all the others hold text.
+INTEGER_COLUMNS = frozenset(['id', 'node_count', 'master_count', 'hard_limit',
+                             'public', 'is_default'])
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+QueryResult = collections.namedtuple('QueryResult',
+                                     ['columns', 'rows', 'freshness'])
+QueryResult.__doc__ = """The answer of a :meth:`Mirror.query`.
+
+``freshness`` maps every table the query read to a dict with the time of
+its last refresh (``synced_at``, seconds since the epoch, or None if it was
+never refreshed) and its ``age`` in seconds.
+"""
+
+
+def _columns(table):
+    key, indexed = TABLES[table]
+    return (key,) + indexed
+
+
+def _definition(column):
+    return '%s %s' % (column,
+                      'INTEGER' if column in INTEGER_COLUMNS else 'TEXT')
+
+
+def _value(value):
+    if isinstance(value, (dict, list)):
+        return jsonutils.dumps(value, sort_keys=True)
+    return value
+
+
+class Mirror(object):
+    """An indexed SQLite copy of Magnum resources.
+
+    :param path: the database file, created if missing. ``':memory:'``
+                 keeps the mirror in memory.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        if path != ':memory:':
+            path = os.path.expanduser(path)
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self._create_schema()
+
+    def close(self):
+        self.db.close()
+
+    def _create_schema(self):
+        with self.db:
+            for table, (key, indexed) in TABLES.items():
+                self.db.execute(
+                    'CREATE TABLE IF NOT EXISTS %s (%s PRIMARY KEY, %s, '
+                    'data TEXT NOT NULL)'
+                    % (table, _definition(key),
+                       ', '.join(_definition(c) for c in indexed)))
+                for column in indexed:
+                    self.db.execute(
+                        'CREATE INDEX IF NOT EXISTS %s_%s ON %s (%s)'
+                        % (table, column, table, column))
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS sync_state (name PRIMARY KEY, '
+                'synced_at REAL, full_synced_at REAL, watermark TEXT)')
+
+    # Writing
+
+    def _upsert(self, table, infos):
+        columns = _columns(table) + ('data',)
+        self.db.executemany(
+            'INSERT OR REPLACE INTO %s (%s) VALUES (%s)'
+            % (table, ', '.join(columns), ', '.join('?' * len(columns))),
+            ([_value(info.get(c)) for c in columns[:-1]] +
+             [jsonutils.dumps(info, sort_keys=True)] for info in infos))
+
+    def _replace_all(self, table, infos):
+        # table is one of TABLES, only ever passed by refresh().
+        self.db.execute('DELETE FROM %s' % table)  # nosec B608
+        self._upsert(table, infos)
+
+    def _sync_state(self, name):
+        row = self.db.execute(
+            'SELECT synced_at, full_synced_at, watermark FROM sync_state '
+            'WHERE name = ?', (name,)).fetchone()
+        return row or (None, None, None)
+
+    def _set_sync_state(self, name, full=False, watermark=None):
+        now = time.time()
+        _, full_synced_at, _ = self._sync_state(name)
+        self.db.execute(
+            'INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)',
+            (name, now, now if full else full_synced_at, watermark))
+
+    def _cluster_sync(self, client, full_sync_interval):
+        sync = client.clusters.incremental_sync(
+            full_sync_interval=full_sync_interval)
+        _, full_synced_at, watermark = self._sync_state('clusters')
+        if watermark is None or full_synced_at is None:
+            return sync, True
+        age = time.time() - full_synced_at
+        sync.restore(
+            (clusters_lib.Cluster(client.clusters, jsonutils.loads(data),
+                                  loaded=True)
+             for data, in self.db.execute('SELECT data FROM clusters')),
+            timeutils.normalize_time(timeutils.parse_isotime(watermark)),
+            full_sync_age=age)
+        return sync, (full_sync_interval is not None and
+                      age >= full_sync_interval)
+
+    def refresh(self, client, full=False, full_sync_interval=3600,
+                max_workers=utils.DEFAULT_MAX_WORKERS):
+        """Bring the mirror up to date.
+
+        :param client: a :class:`magnumclient.v1.client.Client`.
+        :param full: relist every cluster and nodegroup, which is needed to
+                     see deletions. This is done anyway on the first refresh
+                     and then every ``full_sync_interval`` seconds.
+        :param full_sync_interval: seconds between full refreshes.
+        :param max_workers: maximum number of nodegroup lists in flight.
+        :returns: a dict mapping ``clusters``, ``nodegroups``,
+                  ``cluster_templates`` and ``quotas`` to the number of
+                  rows written, and ``removed`` and ``errors`` to the
+                  number of clusters removed and of lists that failed. The
+                  rows a failed list would have replaced are left as they
+                  were.
+        """
+        counts = dict.fromkeys(('clusters', 'nodegroups', 'cluster_templates',
+                                'quotas', 'removed', 'errors'), 0)
+        sync, full_due = self._cluster_sync(client, full_sync_interval)
+        full = full or full_due
+        events = sync.sync(full=full)
+
+        with self.db:
+            changed = [e.cluster.to_dict() for e in events
+                       if e.action != clusters_lib.SYNC_REMOVED]
+            self._upsert('clusters', changed)
+            counts['clusters'] = len(changed)
+            removed = [(e.uuid,) for e in events
+                       if e.action == clusters_lib.SYNC_REMOVED]
+            self.db.executemany('DELETE FROM clusters WHERE uuid = ?',
+                                removed)
+            self.db.executemany('DELETE FROM nodegroups WHERE cluster_id = ?',
+                                removed)
+            counts['removed'] = len(removed)
+            self._set_sync_state('clusters', full=full,
+                                 watermark=sync.watermark and
+                                 sync.watermark.isoformat())
+
+        cluster_ids = sorted(sync.clusters) if full else sorted(
+            info['uuid'] for info in changed)
+        with self.db:
+            for result in client.nodegroups.list_all(
+                    cluster_ids, max_workers=max_workers, detail=True):
+                if result.error is not None:
+                    counts['errors'] += 1
+                    continue
+                self.db.execute('DELETE FROM nodegroups WHERE cluster_id = ?',
+                                (result.item,))
+                self._upsert('nodegroups',
+                             (ng.to_dict() for ng in result.result))
+                counts['nodegroups'] += len(result.result)
+            self._set_sync_state('nodegroups', full=full)
+
+        for table, manager, kwargs in (
+                ('cluster_templates', client.cluster_templates,
+                 {'detail': True}),
+                ('quotas', client.quotas, {'all_tenants': True})):
+            try:
+                infos = [r.to_dict() for r in manager.list(limit=0, **kwargs)]
+            except exceptions.ClientException:
+                # Listing the quotas of all projects is for admins only.
+                counts['errors'] += 1
+                continue
+            with self.db:
+                self._replace_all(table, infos)
+                self._set_sync_state(table, full=True)
+            counts[table] = len(infos)
+        return counts
+
+    # Reading
+
+    def freshness(self, tables=None):
+        """Return the time of the last refresh and age of tables.
+
+        :param tables: table names, all of them by default.
+        :returns: a dict mapping every table to a dict with ``synced_at``,
+                  seconds since the epoch or None, and ``age`` in seconds
+                  or None.
+        """
+        now = time.time()
+        result = {}
+        for table in tables or TABLES:
+            synced_at = self._sync_state(table)[0]
+            result[table] = {
+                'synced_at': synced_at,
+                'age': None if synced_at is None else now - synced_at}
+        return result
+
+    def _column(self, table, column, joined=None, compared=False):
+        """Return the SQL expression of a [table.]column reference.
+
+        A compared attribute of the stored JSON is returned as text, with
+        booleans as ``true`` and ``false`` rather than 1 and 0.
+        """
+        if '.' in column:
+            prefix, column = column.split('.', 1)
+            if prefix not in (table, joined):
+                raise exceptions.ValidationError(
+                    "Unknown table %s in column %s.%s"
+                    % (prefix, prefix, column))
+            table = prefix
+        if not _IDENTIFIER.match(column):
+            raise exceptions.ValidationError("Invalid column %s" % column)
+        if column in _columns(table):
+            return '%s.%s' % (table, column)
+        path = "%s.data, '$.%s'" % (table, column)
+        if compared:
+            return ("CASE json_type(%s) WHEN 'true' THEN 'true' "
+                    "WHEN 'false' THEN 'false' "
+                    "ELSE CAST(json_extract(%s) AS TEXT) END" % (path, path))
+        return 'json_extract(%s)' % path
+
+    def query(self, table, where=None, columns=None, group_by=None,
+              join=None, sort_key=None, sort_dir='asc', limit=None):
+        """Answer a query from the mirror.
+
+        A column is a name of the queried table, or ``<table>.<name>`` to
+        read the joined table. Attributes that are not indexed are read from
+        the stored JSON documents.
+
+        :param table: one of :data:`TABLES`.
+        :param where: a list of ``(column, op, value)`` filters, all of which
+                      must match, where op is ``=`` or ``!=``. Values may
+                      be given as text, and ``None`` matches nulls. A
+                      boolean matches booleans of the stored JSON as well
+                      as the indexed 1 and 0, as does the text ``true`` or
+                      ``false`` for attributes that are not indexed.
+        :param columns: the columns to return, the indexed ones by default.
+        :param group_by: columns to group by. The result then has these
+                         columns and a ``count`` column, largest first.
+        :param join: a table related to ``table`` in :data:`JOINS`.
+        :param sort_key: a column to sort by.
+        :param sort_dir: 'asc' or 'desc'.
+        :param limit: maximum number of rows.
+        :returns: a :class:`QueryResult`.
+        :raises ValidationError: for an unknown table, join or column, or an
+                                 invalid operator.
+        """
+        if table not in TABLES:
+            raise exceptions.ValidationError(
+                "Unknown table %s, expected one of %s"
+                % (table, ', '.join(TABLES)))
+        sql_from = table
+        if join:
+            if (table, join) not in JOINS:
+                raise exceptions.ValidationError(
+                    "%s cannot be joined with %s" % (table, join))
+            left, right = JOINS[(table, join)]
+            sql_from += ' LEFT JOIN %s ON %s.%s = %s.%s' % (
+                join, table, left, join, right)
+
+        if group_by:
+            columns = list(group_by) + ['count']
+            select = [self._column(table, c, join) for c in group_by]
+            select.append('COUNT(*)')
+        else:
+            columns = list(columns or _columns(table))
+            select = [self._column(table, c, join) for c in columns]
+
+        conditions = []
+        params = []
+        for column, op, value in where or []:
+            if op not in ('=', '!='):
+                raise exceptions.ValidationError(
+                    "Invalid operator %s, expected = or !=" % op)
+            expression = self._column(table, column, join, compared=True)
+            if value is None:
+                conditions.append('%s IS %sNULL' % (
+                    expression, 'NOT ' if op == '!=' else ''))
+                continue
+            if isinstance(value, bool):
+                if expression.startswith('CASE'):
+                    value = 'true' if value else 'false'
+                else:
+                    value = int(value)
+            # Equality can use the index of the column; the column type
+            # converts the text of the value.
+            conditions.append('%s %s ?' % (expression,
+                                           '=' if op == '=' else 'IS NOT'))
+            params.append(str(value))
+
+        # The table and join are checked against TABLES and JOINS, and the
+        # columns by _column() against _IDENTIFIER; values are parameters.
+        sql = 'SELECT %s FROM %s' % (  # nosec B608
+            ', '.join(select), sql_from)
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        if group_by:
+            sql += ' GROUP BY %s' % ', '.join(select[:-1])
+        if sort_key:
+            if sort_dir not in ('asc', 'desc'):
+                raise exceptions.ValidationError(
+                    "Invalid sort direction %s" % sort_dir)
+            order = ('COUNT(*)' if group_by and sort_key == 'count'
+                     else self._column(table, sort_key, join))
+            sql += ' ORDER BY %s %s' % (order, sort_dir.upper())
+        elif group_by:
+            sql += ' ORDER BY COUNT(*) DESC, %s' % ', '.join(select[:-1])
+        if limit is not None:
+            sql += ' LIMIT %d' % int(limit)
+
+        rows = self.db.execute(sql, params).fetchall()
+        tables = [table] + ([join] if join else [])
+        return QueryResult(columns, rows, self.freshness(tables))
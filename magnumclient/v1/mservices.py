@@ -52,6 +52,13 @@ class MServiceManager(base.Manager):
 
         :returns: A list of services.
         """
+        return list(self.list_iter(marker=marker, limit=limit,
+                                   sort_key=sort_key, sort_dir=sort_dir,
+                                   detail=detail))
+
+    def list_iter(self, marker=None, limit=None, sort_key=None,
+                  sort_dir=None, detail=False):
+        """Iterate over magnum services, a page at a time."""
 
         if limit is not None:
             limit = int(limit)
@@ -64,8 +71,4 @@ class MServiceManager(base.Manager):
         if filters:
             path += '?' + '&'.join(filters)
 
-        if limit is None:
-            return self._list(self._path(path), "mservices")
-        else:
-            return self._list_pagination(self._path(path), "mservices",
-                                         limit=limit)
+        return self._iter_list(self._path(path), "mservices", limit=limit)
@@ -16,6 +16,8 @@
 from magnumclient.common import utils
 from magnumclient import exceptions
 from magnumclient.v1 import baseunit
+from magnumclient.v1 import clusters
+from magnumclient.v1 import watch
 
 
 NODEGROUP_ATTRIBUTES = [
@@ -57,6 +59,9 @@ class NodeGroupManager(baseunit.BaseTemplateManager):
     resource_class = NodeGroup
     template_name = 'nodegroups'
     api_name = 'nodegroups'
+    server_filters = ('role',)
+    summary_fields = ('uuid', 'name', 'flavor_id', 'image_id', 'node_count',
+                      'role', 'is_default', 'status', 'stack_id')
 
     @classmethod
     def _path(cls, cluster_id, id=None):
@@ -66,33 +71,98 @@ class NodeGroupManager(baseunit.BaseTemplateManager):
         return path
 
     def list(self, cluster_id, limit=None, marker=None, sort_key=None,
-             sort_dir=None, role=None, detail=False):
+             sort_dir=None, role=None, detail=False, deadline=None,
+             filters=None):
+        return list(self.list_iter(cluster_id, limit=limit, marker=marker,
+                                   sort_key=sort_key, sort_dir=sort_dir,
+                                   role=role, detail=detail,
+                                   deadline=deadline, filters=filters))
+
+    def list_iter(self, cluster_id, limit=None, marker=None, sort_key=None,
+                  sort_dir=None, role=None, detail=False, deadline=None,
+                  filters=None):
+        """Iterate over the nodegroups of a cluster, a page at a time.
+
+        ``filters`` maps attributes to the value, or list of values, the
+        nodegroups must have. A role is filtered by the API, other
+        attributes as the pages arrive, from the details if they are not
+        in ``summary_fields``. Without a limit only the first page the API
+        returns is listed, a limit of 0 pages through every nodegroup.
+        """
         if limit is not None:
             limit = int(limit)
 
-        filters = utils.common_filters(marker, limit, sort_key, sort_dir)
-        path = ''
+        filters = dict(filters or {})
         if role:
-            filters.append('role=%s' % role)
+            filters['role'] = role
+        query_filters, client_filters = utils.split_filters(
+            filters, self.server_filters)
+        detail = detail or utils.filters_need_detail(client_filters,
+                                                     self.summary_fields)
+        query_filters = utils.common_filters(marker, limit, sort_key,
+                                             sort_dir) + query_filters
+        path = ''
         if detail:
             path += 'detail'
-        if filters:
-            path += '?' + '&'.join(filters)
-
-        if limit is None:
-            return self._list(self._path(cluster_id, id=path),
-                              self.__class__.api_name)
-        else:
-            return self._list_pagination(self._path(cluster_id, id=path),
-                                         self.__class__.api_name,
-                                         limit=limit)
-
-    def get(self, cluster_id, id):
+        if query_filters:
+            path += '?' + '&'.join(query_filters)
+
+        return self._iter_list(self._path(cluster_id, id=path),
+                               self.__class__.api_name, limit=limit,
+                               deadline=deadline, filters=client_filters)
+
+    def get(self, cluster_id, id, deadline=None):
         try:
-            return self._list(self._path(cluster_id, id=id))[0]
+            return self._list(self._path(cluster_id, id=id),
+                              deadline=deadline)[0]
         except IndexError:
             return None
 
+    def _all_cluster_ids(self):
+        cluster_mgr = clusters.ClusterManager(self.api)
+        return [c.uuid for c in cluster_mgr.list(limit=0)]
+
+    def list_all(self, cluster_ids=None, max_workers=utils.DEFAULT_MAX_WORKERS,
+                 **kwargs):
+        """List the nodegroups of many clusters concurrently.
+
+        :param cluster_ids: IDs or names of the clusters to list, or None
+                            for every cluster visible to the project.
+        :param max_workers: maximum number of list requests in flight.
+        :param kwargs: passed to :meth:`list` for every cluster, e.g.
+                       ``role`` or ``detail``.
+        :returns: a generator of :class:`magnumclient.common.utils.BulkResult`
+                  ``(cluster_id, nodegroups, error)`` tuples in completion
+                  order. Every nodegroup has its ``cluster_id`` set.
+        """
+        if cluster_ids is None:
+            cluster_ids = self._all_cluster_ids()
+
+        def _list(cluster_id):
+            nodegroups = self.list(cluster_id, **kwargs)
+            for nodegroup in nodegroups:
+                if not getattr(nodegroup, 'cluster_id', None):
+                    nodegroup._add_details({'cluster_id': cluster_id})
+            return nodegroups
+
+        return utils.run_concurrently(_list, cluster_ids,
+                                      max_workers=max_workers,
+                                      http_client=self.api)
+
+    def watch(self, cluster_id, role=None,
+              fast_interval=watch.DEFAULT_FAST_INTERVAL,
+              slow_interval=watch.DEFAULT_SLOW_INTERVAL):
+        """Return a :class:`magnumclient.v1.watch.StateWatch` of nodegroups.
+
+        Every poll lists the nodegroups of the cluster, optionally only
+        those with the given role, and reports the changes of their status
+        and node_count.
+        """
+        return watch.StateWatch(
+            lambda: self.list_iter(cluster_id, limit=0, role=role),
+            fields=watch.NODEGROUP_FIELDS, fast_interval=fast_interval,
+            slow_interval=slow_interval)
+
     def create(self, cluster_id, **kwargs):
         new = {}
         for (key, value) in kwargs.items():
@@ -103,6 +173,28 @@ class NodeGroupManager(baseunit.BaseTemplateManager):
                     "Key must be in %s" % ",".join(CREATION_ATTRIBUTES))
         return self._create(self._path(cluster_id), new)
 
+    def create_many(self, spec, cluster_ids,
+                    max_workers=utils.DEFAULT_MAX_WORKERS):
+        """Create the same nodegroup in many clusters concurrently.
+
+        The spec is validated against CREATION_ATTRIBUTES before any request
+        is sent.
+
+        :param spec: dict of nodegroup creation attributes.
+        :param cluster_ids: IDs or names of the target clusters.
+        :param max_workers: maximum number of create requests in flight.
+        :returns: a generator of :class:`magnumclient.common.utils.BulkResult`
+                  ``(cluster_id, nodegroup, error)`` tuples in completion
+                  order.
+        """
+        for key in spec:
+            if key not in CREATION_ATTRIBUTES:
+                raise exceptions.InvalidAttribute(
+                    "Key must be in %s" % ",".join(CREATION_ATTRIBUTES))
+        return utils.run_concurrently(
+            lambda cluster_id: self.create(cluster_id, **spec),
+            cluster_ids, max_workers=max_workers, http_client=self.api)
+
     def delete(self, cluster_id, id):
         return self._delete(self._path(cluster_id, id=id))
 
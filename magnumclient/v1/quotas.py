@@ -10,6 +10,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import csv
+import os
+
 from magnumclient.common import utils
 from magnumclient import exceptions
 from magnumclient.v1 import basemodels
@@ -26,6 +30,18 @@ QUOTA_ATTRIBUTES = [
 
 CREATION_ATTRIBUTES = ['project_id', 'resource', 'hard_limit']
 
+CREATE = 'create'
+UPDATE = 'update'
+DELETE = 'delete'
+
+QuotaChange = collections.namedtuple(
+    'QuotaChange', ['action', 'project_id', 'resource', 'old', 'new'])
+QuotaChange.__doc__ = """A create, update or delete of one quota.
+
+``old`` is the current hard limit, None for a create, and ``new`` the
+desired one, None for a delete.
+"""
+
 
 class Quotas(basemodels.BaseModel):
     model_name = "Quotas"
@@ -44,7 +60,17 @@ class QuotasManager(basemodels.BaseModelManager):
 
     def list(self, limit=None, marker=None, sort_key=None,
              sort_dir=None, all_tenants=False):
+        return list(self.list_iter(limit=limit, marker=marker,
+                                   sort_key=sort_key, sort_dir=sort_dir,
+                                   all_tenants=all_tenants))
 
+    def list_iter(self, limit=None, marker=None, sort_key=None,
+                  sort_dir=None, all_tenants=False):
+        """Iterate over quotas, a page at a time.
+
+        Without a limit only the first page the API returns is listed, a
+        limit of 0 pages through every quota.
+        """
         if limit is not None:
             limit = int(limit)
 
@@ -57,11 +83,7 @@ class QuotasManager(basemodels.BaseModelManager):
         if filters:
             path += '?' + '&'.join(filters)
 
-        if limit is None:
-            return self._list(path, self.api_name)
-        else:
-            return self._list_pagination(path, self.api_name,
-                                         limit=limit)
+        return self._iter_list(path, self.api_name, limit=limit)
 
     def get(self, id, resource):
         try:
@@ -85,3 +107,143 @@ class QuotasManager(basemodels.BaseModelManager):
     def update(self, id, resource, patch):
         url = self._path(id, resource)
         return self._update(url, patch)
+
+    def _apply_change(self, change):
+        if change.action == CREATE:
+            return self.create(project_id=change.project_id,
+                               resource=change.resource,
+                               hard_limit=change.new)
+        if change.action == UPDATE:
+            return self.update(change.project_id, change.resource,
+                               {'project_id': change.project_id,
+                                'resource': change.resource,
+                                'hard_limit': change.new})
+        return self.delete(change.project_id, change.resource)
+
+    def apply_changes(self, changes, max_workers=utils.DEFAULT_MAX_WORKERS):
+        """Create, update and delete quotas concurrently.
+
+        :param changes: iterable of :class:`QuotaChange`, such as returned
+                        by :func:`plan_quota_changes`.
+        :param max_workers: maximum number of API calls in flight.
+        :returns: a generator of :class:`magnumclient.common.utils.BulkResult`
+                  ``(change, result, error)`` tuples in completion order.
+        """
+        return utils.run_concurrently(self._apply_change, changes,
+                                      max_workers=max_workers,
+                                      http_client=self.api)
+
+    def apply(self, desired, prune=False,
+              max_workers=utils.DEFAULT_MAX_WORKERS):
+        """Bring the quotas of all projects to the desired hard limits.
+
+        The current quotas come from a single listing of all tenants, and
+        only the quotas that differ are changed.
+
+        :param desired: dict mapping ``(project_id, resource)`` to a hard
+                        limit, or None to delete the quota.
+        :param prune: see :func:`plan_quota_changes`.
+        :param max_workers: maximum number of API calls in flight.
+        :returns: a generator of BulkResults, as :meth:`apply_changes`.
+        """
+        changes = plan_quota_changes(self.list_iter(limit=0,
+                                                    all_tenants=True),
+                                     desired, prune=prune)
+        return self.apply_changes(changes, max_workers=max_workers)
+
+
+def _hard_limit(value, where):
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise exceptions.ValidationError(
+            "%s: hard_limit must be an integer, not %r" % (where, value))
+
+
+def load_quota_file(path):
+    """Read desired quotas from a CSV or YAML file.
+
+    A ``.csv`` file has a header row with ``project_id``, ``resource`` and
+    ``hard_limit`` columns. Any other file is YAML (or JSON), either a list
+    of mappings with the same keys or a mapping of project IDs to mappings
+    of resources to hard limits. An empty or null hard limit asks for the
+    quota to be deleted.
+
+    :returns: a dict mapping ``(project_id, resource)`` to the hard limit,
+              or None for a deletion.
+    :raises ValidationError: if an entry is incomplete, has a hard limit
+                             that is not an integer or is repeated.
+    """
+    if os.path.splitext(path)[1].lower() == '.csv':
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+    else:
+        data = utils.handle_yaml_from_file(path) or []
+        if isinstance(data, dict):
+            rows = []
+            for project_id, limits in sorted(data.items()):
+                if not isinstance(limits, dict):
+                    raise exceptions.ValidationError(
+                        "%s: the quotas of project %s must be a mapping of "
+                        "resources to hard limits" % (path, project_id))
+                rows.extend({'project_id': project_id, 'resource': resource,
+                             'hard_limit': limit}
+                            for resource, limit in sorted(limits.items()))
+        elif isinstance(data, list):
+            rows = data
+        else:
+            raise exceptions.ValidationError(
+                "%s must hold a list or a mapping of quotas" % path)
+
+    desired = {}
+    for number, row in enumerate(rows, 1):
+        where = '%s entry %d' % (path, number)
+        if not isinstance(row, dict):
+            raise exceptions.ValidationError("%s is not a mapping" % where)
+        project_id = row.get('project_id')
+        resource = row.get('resource')
+        if not project_id or not resource:
+            raise exceptions.ValidationError(
+                "%s: project_id and resource are required" % where)
+        key = (str(project_id), str(resource))
+        if key in desired:
+            raise exceptions.ValidationError(
+                "%s: quota of project %s for resource %s is repeated"
+                % ((where,) + key))
+        desired[key] = _hard_limit(row.get('hard_limit'), where)
+    return desired
+
+
+def plan_quota_changes(current, desired, prune=False):
+    """Return the QuotaChanges turning current quotas into desired ones.
+
+    :param current: iterable of quotas, such as the listing of
+                    ``QuotasManager.list(all_tenants=True, limit=0)``.
+    :param desired: dict mapping ``(project_id, resource)`` to a hard
+                    limit, or None to delete the quota, as returned by
+                    :func:`load_quota_file`.
+    :param prune: also delete the quotas of the projects in ``desired``
+                  for resources it does not list.
+    :returns: a list of QuotaChange sorted by project and resource.
+              Quotas already at their desired hard limit need no change.
+    """
+    existing = dict(((q.project_id, q.resource), q.hard_limit)
+                    for q in current)
+    changes = []
+    for key, new in desired.items():
+        old = existing.get(key)
+        if key not in existing:
+            if new is not None:
+                changes.append(QuotaChange(CREATE, key[0], key[1], None, new))
+        elif new is None:
+            changes.append(QuotaChange(DELETE, key[0], key[1], old, None))
+        elif old != new:
+            changes.append(QuotaChange(UPDATE, key[0], key[1], old, new))
+    if prune:
+        projects = set(project_id for project_id, _ in desired)
+        for key, old in existing.items():
+            if key[0] in projects and key not in desired:
+                changes.append(QuotaChange(DELETE, key[0], key[1], old, None))
+    return sorted(changes, key=lambda c: (c.project_id, c.resource))
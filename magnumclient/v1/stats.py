@@ -10,7 +10,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import heapq
+
 from magnumclient.common import base
+from magnumclient.common import utils
+from magnumclient.v1 import clusters
+
+STATS_FIELDS = ('clusters', 'nodes')
 
 
 class Stats(base.Resource):
@@ -30,3 +36,106 @@ class StatsManager(base.Manager):
             return self._list(self._path(project_id))[0]
         except IndexError:
             return None
+
+    def _from_clusters(self):
+        # The detailed cluster listing has the project, node_count and
+        # master_count of every cluster, all the stats API would add up.
+        stats = {}
+        cluster_mgr = clusters.ClusterManager(self.api)
+        for cluster in cluster_mgr.list_iter(limit=0, detail=True):
+            project_id = getattr(cluster, 'project_id', None)
+            if not project_id:
+                continue
+            info = stats.setdefault(project_id, {'clusters': 0, 'nodes': 0})
+            info['clusters'] += 1
+            info['nodes'] += ((getattr(cluster, 'node_count', None) or 0) +
+                              (getattr(cluster, 'master_count', None) or 0))
+        return [utils.BulkResult(project_id,
+                                 self.resource_class(self, info, loaded=True),
+                                 None)
+                for project_id, info in sorted(stats.items())]
+
+    def list_many(self, project_ids=None,
+                  max_workers=utils.DEFAULT_MAX_WORKERS):
+        """Get the stats of many projects.
+
+        :param project_ids: IDs of the projects, whose stats are requested
+                            concurrently, or None for every project owning
+                            a cluster visible to the caller (all of them
+                            for an admin). Their stats are then counted
+                            from a single listing of the clusters, as the
+                            API does, rather than requested per project.
+                            Projects without clusters have no stats to add.
+        :param max_workers: maximum number of stats requests in flight.
+        :returns: an iterable of :class:`magnumclient.common.utils.BulkResult`
+                  ``(project_id, stats, error)`` tuples, in completion order
+                  for given projects.
+        """
+        if project_ids is None:
+            return iter(self._from_clusters())
+        return utils.run_concurrently(
+            lambda project_id: self.list(project_id=project_id), project_ids,
+            max_workers=max_workers, http_client=self.api)
+
+
+class StatsAggregate(object):
+    """Totals and top projects of per-project stats, built incrementally.
+
+    Only the ``top`` largest projects by ``sort_key`` are kept, so memory
+    does not grow with the number of projects. A failed project is counted
+    in ``failures`` and left out of the totals.
+
+    :param top: number of projects to keep, or None for all of them.
+    :param sort_key: the stats field ranking the projects.
+    """
+
+    def __init__(self, top=10, sort_key='nodes'):
+        if sort_key not in STATS_FIELDS:
+            raise ValueError('sort_key must be one of %s'
+                             % ', '.join(STATS_FIELDS))
+        self.top = top
+        self.sort_key = sort_key
+        self.totals = dict.fromkeys(STATS_FIELDS, 0)
+        self.projects = 0
+        self.failures = []
+        self._rows = []
+
+    def add(self, project_id, stats):
+        info = getattr(stats, '_info', stats) or {}
+        row = {'project_id': project_id}
+        for field in STATS_FIELDS:
+            row[field] = info.get(field) or 0
+            self.totals[field] += row[field]
+        self.projects += 1
+        item = (row[self.sort_key], project_id, row)
+        if self.top is None:
+            self._rows.append(item)
+        elif len(self._rows) < self.top:
+            heapq.heappush(self._rows, item)
+        elif self.top:
+            heapq.heappushpop(self._rows, item)
+
+    def add_failure(self, project_id, error):
+        self.failures.append({'project_id': project_id, 'error': str(error)})
+
+    def add_results(self, results):
+        """Add the BulkResults of :meth:`StatsManager.list_many`."""
+        for result in results:
+            if result.error is not None:
+                self.add_failure(result.item, result.error)
+            else:
+                self.add(result.item, result.result)
+        return self
+
+    def top_projects(self):
+        """Return the kept projects, largest first."""
+        return [row for _, _, row in sorted(
+            self._rows, key=lambda item: (-item[0], item[1]))]
+
+    def to_dict(self):
+        return {'projects': self.projects,
+                'totals': dict(self.totals),
+                'sort_key': self.sort_key,
+                'top': self.top_projects(),
+                'failures': sorted(self.failures,
+                                   key=lambda f: f['project_id'])}
@@ -0,0 +1,137 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Follow the state of clusters or nodegroups by polling their list.
+
+A :class:`StateWatch` lists the resources again and again and reports only
+what changed since the previous listing. It keeps nothing but the watched
+fields of each resource, and polls often while anything is in progress and
+less and less often once everything is stable.
+"""
+
+import collections
+import time
+
+ADDED = 'added'
+CHANGED = 'changed'
+REMOVED = 'removed'
+
+IN_PROGRESS_SUFFIX = '_IN_PROGRESS'
+
+CLUSTER_FIELDS = ('status', 'health_status', 'node_count')
+NODEGROUP_FIELDS = ('status', 'node_count')
+
+DEFAULT_FAST_INTERVAL = 2
+DEFAULT_SLOW_INTERVAL = 30
+
+Delta = collections.namedtuple(
+    'Delta', ['action', 'uuid', 'name', 'state', 'changes'])
+Delta.__doc__ = """A change of one resource between two listings.
+
+``state`` maps the watched fields to their current values, or their last
+known values for a removal. ``changes`` maps the fields that changed to
+``(old, new)`` tuples, and is empty for additions and removals.
+"""
+
+
+class StateWatch(object):
+    """Report the changes of a list of resources between polls.
+
+    :param list_func: callable returning an iterable of resources, each
+                      with ``uuid``, ``name`` and the watched attributes.
+    :param fields: the attributes to watch.
+    :param fast_interval: seconds between polls while a resource is
+                          ``*_IN_PROGRESS``.
+    :param slow_interval: the longest time between polls. Once everything
+                          is stable, the interval doubles after every poll
+                          from ``fast_interval`` up to this.
+    """
+
+    def __init__(self, list_func, fields=CLUSTER_FIELDS,
+                 fast_interval=DEFAULT_FAST_INTERVAL,
+                 slow_interval=DEFAULT_SLOW_INTERVAL):
+        self.list_func = list_func
+        self.fields = tuple(fields)
+        self.fast_interval = fast_interval
+        self.slow_interval = max(slow_interval, fast_interval)
+        self.interval = fast_interval
+        self.polls = 0
+        # uuid -> (name, tuple of the watched field values)
+        self._state = {}
+
+    def _state_dict(self, values):
+        return dict(zip(self.fields, values))
+
+    def in_progress(self):
+        """Return whether any resource was in progress at the last poll."""
+        if 'status' not in self.fields:
+            return False
+        index = self.fields.index('status')
+        return any((values[index] or '').endswith(IN_PROGRESS_SUFFIX)
+                   for _, values in self._state.values())
+
+    def poll(self):
+        """List the resources and return their changes as Deltas.
+
+        On the first poll every resource is reported as added. The
+        interval to wait before the next poll is then in ``interval``.
+        """
+        deltas = []
+        previous = self._state
+        current = {}
+        for resource in self.list_func():
+            values = tuple(getattr(resource, field, None)
+                           for field in self.fields)
+            uuid = resource.uuid
+            current[uuid] = (resource.name, values)
+            old = previous.get(uuid)
+            if old is None:
+                deltas.append(Delta(ADDED, uuid, resource.name,
+                                    self._state_dict(values), {}))
+            elif old[1] != values:
+                changes = dict((field, (before, after))
+                               for field, before, after
+                               in zip(self.fields, old[1], values)
+                               if before != after)
+                deltas.append(Delta(CHANGED, uuid, resource.name,
+                                    self._state_dict(values), changes))
+        for uuid in sorted(set(previous) - set(current)):
+            name, values = previous[uuid]
+            deltas.append(Delta(REMOVED, uuid, name,
+                                self._state_dict(values), {}))
+        self._state = current
+        self.polls += 1
+
+        if self.in_progress() or deltas and self.polls > 1:
+            self.interval = self.fast_interval
+        else:
+            self.interval = min(self.interval * 2, self.slow_interval)
+        return deltas
+
+    def watch(self, count=None, sleep=None):
+        """Poll repeatedly, yielding the list of deltas of every poll.
+
+        Polls with no change yield an empty list, so a caller can tell the
+        watch is alive. The first wait after a poll that saw changes, or
+        while anything is in progress, is ``fast_interval``.
+
+        :param count: number of polls, or None to poll forever.
+        :param sleep: function used to wait between polls, time.sleep by
+                      default.
+        """
+        sleep = sleep or time.sleep
+        polls = 0
+        while count is None or polls < count:
+            if polls:
+                sleep(self.interval)
+            yield self.poll()
+            polls += 1